@@ -0,0 +1,49 @@
+"""Add indexes for the replay, history, throw and player lookups
+
+Revision ID: 3c8e1f0a9d42
+Revises: 95f33c1ce707
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c8e1f0a9d42"
+down_revision: str | None = "95f33c1ce707"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (name, table, columns, unique); keep in sync with __table_args__ in database_models.py
+INDEXES = [
+    ("ix_player_name", "player", ["name"], False),
+    ("ix_gameresults_game_session_id", "gameresults", ["game_session_id", "player_order"], False),
+    (
+        "ix_gameresults_history",
+        "gameresults",
+        ["player_order", "started_at", "game_session_id"],
+        False,
+    ),
+    (
+        "uq_scores_game_result_id_throw_sequence",
+        "scores",
+        ["game_result_id", "throw_sequence"],
+        True,
+    ),
+]
+
+
+def upgrade() -> None:
+    # Build the indexes without blocking writes on PostgreSQL; CREATE INDEX
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _unique in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
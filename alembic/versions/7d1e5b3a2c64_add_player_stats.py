@@ -0,0 +1,62 @@
+"""Add player_stats aggregate table
+
+Revision ID: 7d1e5b3a2c64
+Revises: 3c8e1f0a9d42
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d1e5b3a2c64"
+down_revision: str | None = "3c8e1f0a9d42"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Running totals; keep in sync with PlayerStats in database_models.py
+STAT_COLUMNS = (
+    "games_played",
+    "games_won",
+    "darts_thrown",
+    "points_scored",
+    "first9_darts",
+    "first9_points",
+    "checkout_attempts",
+    "checkouts",
+    "ton_plus",
+    "one_eighties",
+    "cricket_marks",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "player_stats",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("game_type_id", sa.Integer(), nullable=False),
+        sa.Column("period", sa.Date(), nullable=False),
+        *(
+            sa.Column(column, sa.Integer(), nullable=False, server_default="0")
+            for column in STAT_COLUMNS
+        ),
+        sa.ForeignKeyConstraint(["game_type_id"], ["gametype.id"]),
+        sa.ForeignKeyConstraint(["player_id"], ["player.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "player_id",
+            "game_type_id",
+            "period",
+            name="uq_player_stats_player_game_type_period",
+        ),
+    )
+    # Existing games are counted by: python db_manage.py rebuild-stats
+
+
+def downgrade() -> None:
+    op.drop_table("player_stats")
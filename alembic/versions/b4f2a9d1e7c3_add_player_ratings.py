@@ -0,0 +1,62 @@
+"""Add player_ratings and rating_history tables
+
+Revision ID: b4f2a9d1e7c3
+Revises: 7d1e5b3a2c64
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4f2a9d1e7c3"
+down_revision: str | None = "7d1e5b3a2c64"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "player_ratings",
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("rating", sa.Float(), nullable=False),
+        sa.Column("games_rated", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["player_id"], ["player.id"]),
+        sa.PrimaryKeyConstraint("player_id"),
+    )
+    op.create_index(
+        "ix_player_ratings_leaderboard",
+        "player_ratings",
+        ["rating", "player_id"],
+        unique=False,
+    )
+    op.create_table(
+        "rating_history",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("game_session_id", sa.String(length=100), nullable=False),
+        sa.Column("rating_before", sa.Float(), nullable=False),
+        sa.Column("rating_after", sa.Float(), nullable=False),
+        sa.Column("rated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["player_id"], ["player.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_rating_history_player_id",
+        "rating_history",
+        ["player_id", "id"],
+        unique=False,
+    )
+    # Ratings of existing games: python db_manage.py rebuild-ratings
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rating_history_player_id", table_name="rating_history")
+    op.drop_table("rating_history")
+    op.drop_index("ix_player_ratings_leaderboard", table_name="player_ratings")
+    op.drop_table("player_ratings")
@@ -0,0 +1,33 @@
+"""Add data_version table
+
+Revision ID: c5d8e2f4a1b6
+Revises: b4f2a9d1e7c3
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d8e2f4a1b6"
+down_revision: str | None = "b4f2a9d1e7c3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    data_version = op.create_table(
+        "data_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(data_version, [{"id": 1, "version": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("data_version")
@@ -2,10 +2,11 @@
 API Gateway Service for Darts Game System
 Provides secure REST API endpoints that publish to RabbitMQ
 Integrates with WSO2 Identity Server for OAuth2/JWT authentication
+See api_gateway_async.py for the ASGI implementation of the same API
 """
 
-import json
 import logging
+import math
 import os
 from datetime import datetime, timezone
 from functools import wraps
@@ -13,14 +14,48 @@ from typing import Any
 
 import jwt
 import pika
-import requests
-from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
-from jwt import PyJWKClient
-
-# Load environment variables
-load_dotenv()
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from gateway_common import (
+    ADMISSION_EXEMPT_PATHS,
+    JWT_VALIDATION_MODE,
+    MAX_REQUEST_BODY_BYTES,
+    RABBITMQ_CONFIG,
+    ROUTING_KEY_GAME_CREATE,
+    ROUTING_KEY_PLAYER_ADD,
+    ROUTING_KEY_SCORE,
+    ROUTING_KEY_SCORE_BATCH,
+    TRUSTED_PROXY_HOPS,
+    WSO2_IS_INTROSPECT_PASSWORD,
+    WSO2_IS_INTROSPECT_URL,
+    WSO2_IS_INTROSPECT_USER,
+    WSO2_IS_JWKS_URL,
+    WSO2_IS_URL,
+    WSO2_IS_VERIFY_SSL,
+    RequestError,
+    bearer_token,
+    build_game_message,
+    build_player_message,
+    build_score_batch_message,
+    build_score_message,
+    check_scopes,
+    client_key,
+    payload_too_large,
+    publish_failed,
+    published,
+    require_claims,
+)
+from idp_client import get_idp_client
+from json_provider import FastJSONProvider
+from jwks_store import jwks_store_from_env
+from metrics import PROMETHEUS_CONTENT_TYPE, render_latest
+from rate_limiter import ADMITTED_REQUESTS, RATE_LIMIT_ENABLED, limiters_from_env
+from score_codec import WIRE_FORMAT_JSON, encode_message
+from token_cache import TokenCache
+from transport import create_transport
 
 # Configure logging
 logging.basicConfig(
@@ -31,42 +66,33 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret-key")
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BODY_BYTES
 CORS(app)
+# Behind nginx, request.remote_addr is the proxy; take the client address
+# from X-Forwarded-For, trusting only the configured number of hops
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
 
-# WSO2 Identity Server Configuration
-WSO2_IS_URL = os.getenv("WSO2_IS_URL", "https://localhost:9443")
-WSO2_IS_JWKS_URL = f"{WSO2_IS_URL}/oauth2/jwks"
-WSO2_IS_INTROSPECT_URL = f"{WSO2_IS_URL}/oauth2/introspect"
-WSO2_IS_CLIENT_ID = os.getenv("WSO2_IS_CLIENT_ID", "")
-WSO2_IS_CLIENT_SECRET = os.getenv("WSO2_IS_CLIENT_SECRET", "")
-
-# Introspection credentials (separate from client credentials)
-WSO2_IS_INTROSPECT_USER = os.getenv("WSO2_IS_INTROSPECT_USER", "admin")
-WSO2_IS_INTROSPECT_PASSWORD = os.getenv("WSO2_IS_INTROSPECT_PASSWORD", "admin")
-WSO2_IS_VERIFY_SSL = os.getenv("WSO2_IS_VERIFY_SSL", "False").lower() == "true"
-
-# RabbitMQ Configuration
-RABBITMQ_CONFIG = {
-    "host": os.getenv("RABBITMQ_HOST", "localhost"),
-    "port": int(os.getenv("RABBITMQ_PORT", 5672)),
-    "user": os.getenv("RABBITMQ_USER", "guest"),
-    "password": os.getenv("RABBITMQ_PASSWORD", "guest"),
-    "vhost": os.getenv("RABBITMQ_VHOST", "/"),
-    "exchange": os.getenv("RABBITMQ_EXCHANGE", "darts_exchange"),
-}
-
-# JWT validation mode: 'jwks' or 'introspection'
-JWT_VALIDATION_MODE = os.getenv("JWT_VALIDATION_MODE", "jwks")
+# Pooled keep-alive client shared by every WSO2 IS call
+idp_client = get_idp_client()
 
 # Initialize JWKS client for JWT validation
 jwks_client = None
 if JWT_VALIDATION_MODE == "jwks":
     try:
-        jwks_client = PyJWKClient(WSO2_IS_JWKS_URL)
+        jwks_client = jwks_store_from_env(WSO2_IS_JWKS_URL, verify_ssl=WSO2_IS_VERIFY_SSL)
     except Exception as e:
         logger.warning(f"Failed to initialize JWKS client: {e}")
 
+# Validated tokens are cached until 'exp' (capped by TOKEN_CACHE_TTL)
+token_cache = TokenCache.from_env("gateway")
+
+# Admission control: token buckets per IP (before authentication) and per
+# client (client_id or sub), plus a cap on requests handled at once
+ip_limiter, client_limiter, concurrency_limiter = limiters_from_env()
+
 
 class RabbitMQPublisher:
     """RabbitMQ message publisher"""
@@ -76,24 +102,13 @@ class RabbitMQPublisher:
         self.config = config
         self.connection = None
         self.channel = None
+        self.transport = create_transport(config)
         self._connect()
 
     def _connect(self):
         """Establish connection to RabbitMQ"""
         try:
-            credentials = pika.PlainCredentials(
-                self.config["user"],
-                self.config["password"],
-            )
-            parameters = pika.ConnectionParameters(
-                host=self.config["host"],
-                port=self.config["port"],
-                virtual_host=self.config["vhost"],
-                credentials=credentials,
-                heartbeat=600,
-                blocked_connection_timeout=300,
-            )
-            self.connection = pika.BlockingConnection(parameters)
+            self.connection = self.transport.connect(self.config)
             self.channel = self.connection.channel()
 
             # Declare exchange
@@ -114,14 +129,19 @@ class RabbitMQPublisher:
             if self.connection is None or self.connection.is_closed:
                 self._connect()
 
+            body, content_type = encode_message(
+                message,
+                self.config.get("wire_format", WIRE_FORMAT_JSON),
+            )
+
             # Publish message
             self.channel.basic_publish(
                 exchange=self.config["exchange"],
                 routing_key=routing_key,
-                body=json.dumps(message),
+                body=body,
                 properties=pika.BasicProperties(
                     delivery_mode=2,  # Make message persistent
-                    content_type="application/json",
+                    content_type=content_type,
                     timestamp=int(datetime.now(timezone.utc).timestamp()),
                 ),
             )
@@ -156,8 +176,27 @@ def validate_jwt_token(token: str) -> dict[str, Any] | None:
     """
     Validate JWT token using JWKS or introspection
     Returns decoded token claims if valid, None otherwise
+    Results are served from token_cache when the token was seen recently
+    """
+    hit, claims = token_cache.lookup(token)
+    if hit:
+        return claims
+
+    claims, cacheable = _validate_jwt_token_uncached(token)
+    if cacheable:
+        token_cache.store(token, claims)
+    return claims
+
+
+def _validate_jwt_token_uncached(token: str) -> tuple[dict[str, Any] | None, bool]:
+    """
+    Validate a token against WSO2 IS without the cache
+
+    Returns:
+        (claims or None, cacheable); IdP errors are not cached
     """
     result = None
+    cacheable = False
     if JWT_VALIDATION_MODE == "jwks" and jwks_client:
         try:
             # Get signing key from JWKS
@@ -172,10 +211,13 @@ def validate_jwt_token(token: str) -> dict[str, Any] | None:
             )
             logger.info(f"Token validated for user: {decoded.get('sub', 'unknown')}")
             result = decoded
+            cacheable = True
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
+            cacheable = True
         except jwt.InvalidTokenError as e:
             logger.warning(f"Invalid token: {e}")
+            cacheable = True
         except Exception:
             logger.exception("Error validating token")
     elif JWT_VALIDATION_MODE == "introspection":
@@ -185,18 +227,18 @@ def validate_jwt_token(token: str) -> dict[str, Any] | None:
                 f"Introspecting token at {WSO2_IS_INTROSPECT_URL} "
                 f"with user {WSO2_IS_INTROSPECT_USER}",
             )
-            response = requests.post(
+            response = idp_client.post(
                 WSO2_IS_INTROSPECT_URL,
                 auth=(WSO2_IS_INTROSPECT_USER, WSO2_IS_INTROSPECT_PASSWORD),
                 data={"token": token},
                 verify=WSO2_IS_VERIFY_SSL,
-                timeout=10,
             )
             logger.info(
                 f"Introspection response: status={response.status_code}, body={response.text}",
             )
             if response.status_code == 200:
                 introspection_result = response.json()
+                cacheable = True
                 if introspection_result.get("active"):
                     logger.info(
                         f"Token validated via introspection for client: "
@@ -214,7 +256,46 @@ def validate_jwt_token(token: str) -> dict[str, Any] | None:
             logger.exception("Error during token introspection")
     else:
         logger.error("No valid JWT validation mode configured")
-    return result
+    return result, cacheable
+
+
+def _too_many_requests(retry_after: float, message: str):
+    """429 response telling the client when to retry"""
+    response = jsonify({"error": "Too many requests", "message": message})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+@app.before_request
+def admit_request():
+    """Apply the per-IP rate limit and the concurrency cap"""
+    if not RATE_LIMIT_ENABLED or request.path in ADMISSION_EXEMPT_PATHS:
+        return None
+
+    retry_after = ip_limiter.acquire(request.remote_addr or "unknown")
+    if retry_after:
+        return _too_many_requests(retry_after, "Request rate limit exceeded for this address")
+
+    if not concurrency_limiter.try_acquire():
+        response = jsonify(
+            {
+                "error": "Service overloaded",
+                "message": "Too many requests in progress, please retry",
+            },
+        )
+        response.status_code = 503
+        response.headers["Retry-After"] = "1"
+        return response
+    g.admission_slot = True
+    return None
+
+
+@app.teardown_request
+def release_admission(_exc):
+    """Release the concurrency slot taken by admit_request"""
+    if g.pop("admission_slot", False):
+        concurrency_limiter.release()
 
 
 def require_auth(required_scopes: list | None = None):
@@ -226,60 +307,24 @@ def require_auth(required_scopes: list | None = None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Get token from Authorization header
-            auth_header = request.headers.get("Authorization")
-            if not auth_header:
-                return (
-                    jsonify(
-                        {
-                            "error": "Missing Authorization header",
-                            "message": "Please provide a valid Bearer token",
-                        },
-                    ),
-                    401,
-                )
-
-            # Extract token
-            parts = auth_header.split()
-            if len(parts) != 2 or parts[0].lower() != "bearer":
-                return (
-                    jsonify(
-                        {
-                            "error": "Invalid Authorization header",
-                            "message": "Format should be: Bearer <token>",
-                        },
-                    ),
-                    401,
-                )
-
-            token = parts[1]
-
-            # Validate token
-            claims = validate_jwt_token(token)
-            if not claims:
-                return (
-                    jsonify(
-                        {
-                            "error": "Invalid or expired token",
-                            "message": "Please obtain a new access token",
-                        },
-                    ),
-                    401,
-                )
-
-            # Check required scopes
-            if required_scopes:
-                token_scopes = claims.get("scope", "").split()
-                if not any(scope in token_scopes for scope in required_scopes):
-                    return (
-                        jsonify(
-                            {
-                                "error": "Insufficient permissions",
-                                "message": f"Required scopes: {', '.join(required_scopes)}",
-                            },
-                        ),
-                        403,
+            try:
+                token = bearer_token(request.headers.get("Authorization"))
+
+                # Validate token
+                claims = require_claims(validate_jwt_token(token))
+                check_scopes(claims, required_scopes)
+            except RequestError as e:
+                return jsonify(e.body), e.status
+
+            # Per-client rate limit
+            if RATE_LIMIT_ENABLED:
+                retry_after = client_limiter.acquire(client_key(claims))
+                if retry_after:
+                    return _too_many_requests(
+                        retry_after,
+                        "Request rate limit exceeded for this client",
                     )
+                ADMITTED_REQUESTS.inc()
 
             # Add claims to request context
             request.user_claims = claims
@@ -291,6 +336,33 @@ def require_auth(required_scopes: list | None = None):
     return decorator
 
 
+def _publish_request(build, routing_key, failure_error, log_message, success_text=None):
+    """
+    Validate the JSON body, build the message and publish it
+
+    Args:
+        build: gateway_common builder for the endpoint
+        routing_key: RabbitMQ routing key
+        failure_error: 'error' of the 500 response when publishing fails
+        log_message: Logged with the traceback on unexpected errors
+        success_text: Callable building the 201 message from the message
+    """
+    try:
+        message = build(request.json, request.user_claims.get("sub", "unknown"))
+    except RequestError as e:
+        return jsonify(e.body), e.status
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        logger.exception(log_message)
+        return jsonify({"error": "Internal server error", "message": str(e)}), 500
+
+    # Publish to RabbitMQ
+    if rabbitmq_publisher.publish(routing_key, message):
+        return jsonify(published(success_text(message), message)), 201
+    return jsonify(publish_failed(failure_error)), 500
+
+
 # Health check endpoint (no auth required)
 @app.route("/health", methods=["GET"])
 def health_check():
@@ -304,6 +376,12 @@ def health_check():
     )
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus metrics (no auth required)"""
+    return Response(render_latest(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # API v1 endpoints
 @app.route("/api/v1/scores", methods=["POST"])
 @require_auth(required_scopes=["score:write"])
@@ -312,102 +390,29 @@ def submit_score():
     Submit a score to the game system
     Publishes score to RabbitMQ for processing
     """
-    try:
-        data = request.json
-        error_response = None
-
-        if not data:
-            error_response = jsonify(
-                {
-                    "error": "Invalid request",
-                    "message": "Request body must be JSON",
-                },
-            )
-
-        # Validate required fields
-        if not error_response:
-            required_fields = ["score", "multiplier"]
-            missing_fields = [field for field in required_fields if field not in data]
-            if missing_fields:
-                error_response = jsonify(
-                    {
-                        "error": "Missing required fields",
-                        "message": f"Required fields: {', '.join(missing_fields)}",
-                    },
-                )
-
-        # Validate score value
-        if not error_response:
-            score = data.get("score")
-            if not isinstance(score, int) or score < 0 or score > 60:
-                error_response = jsonify(
-                    {
-                        "error": "Invalid score",
-                        "message": "Score must be an integer between 0 and 60",
-                    },
-                )
-
-        # Validate multiplier
-        if not error_response:
-            valid_multipliers = ["SINGLE", "DOUBLE", "TRIPLE"]
-            multiplier = data.get("multiplier", "SINGLE").upper()
-            if multiplier not in valid_multipliers:
-                error_response = jsonify(
-                    {
-                        "error": "Invalid multiplier",
-                        "message": f"Multiplier must be one of: {', '.join(valid_multipliers)}",
-                    },
-                )
-
-        if error_response:
-            return error_response, 400
+    return _publish_request(
+        build_score_message,
+        ROUTING_KEY_SCORE,
+        "Failed to submit score",
+        "Error submitting score",
+        lambda _message: "Score submitted successfully",
+    )
 
-        # Add metadata
-        message = {
-            "score": score,
-            "multiplier": multiplier,
-            "player_id": data.get("player_id"),
-            "game_id": data.get("game_id"),
-            "user": request.user_claims.get("sub", "unknown"),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-
-        # Publish to RabbitMQ
-        routing_key = "darts.scores.api"
-        success = rabbitmq_publisher.publish(routing_key, message)
-
-        if success:
-            return (
-                jsonify(
-                    {
-                        "status": "success",
-                        "message": "Score submitted successfully",
-                        "data": message,
-                    },
-                ),
-                201,
-            )
-        return (
-            jsonify(
-                {
-                    "error": "Failed to submit score",
-                    "message": "Unable to publish message to queue",
-                },
-            ),
-            500,
-        )
 
-    except Exception as e:
-        logger.exception("Error submitting score")
-        return (
-            jsonify(
-                {
-                    "error": "Internal server error",
-                    "message": str(e),
-                },
-            ),
-            500,
-        )
+@app.route("/api/v1/scores:batch", methods=["POST"])
+@require_auth(required_scopes=["score:write"])
+def submit_score_batch():
+    """
+    Submit an ordered batch of scores to the game system
+    The whole batch is validated up front and published as a single message
+    """
+    return _publish_request(
+        build_score_batch_message,
+        ROUTING_KEY_SCORE_BATCH,
+        "Failed to submit scores",
+        "Error submitting score batch",
+        lambda message: f"{len(message['throws'])} scores submitted successfully",
+    )
 
 
 @app.route("/api/v1/games", methods=["POST"])
@@ -417,92 +422,13 @@ def create_game():
     Create a new game
     Publishes game creation event to RabbitMQ
     """
-    try:
-        data = request.json
-        if not data:
-            return (
-                jsonify(
-                    {
-                        "error": "Invalid request",
-                        "message": "Request body must be JSON",
-                    },
-                ),
-                400,
-            )
-
-        # Validate game type
-        valid_game_types = ["301", "401", "501", "cricket"]
-        game_type = data.get("game_type", "301")
-        if game_type not in valid_game_types:
-            return (
-                jsonify(
-                    {
-                        "error": "Invalid game type",
-                        "message": f"Game type must be one of: {', '.join(valid_game_types)}",
-                    },
-                ),
-                400,
-            )
-
-        # Validate players
-        players = data.get("players", [])
-        if not players or len(players) < 1:
-            return (
-                jsonify(
-                    {
-                        "error": "Invalid players",
-                        "message": "At least one player is required",
-                    },
-                ),
-                400,
-            )
-
-        # Create game message
-        message = {
-            "action": "new_game",
-            "game_type": game_type,
-            "players": players,
-            "double_out": data.get("double_out", False),
-            "created_by": request.user_claims.get("sub", "unknown"),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-
-        # Publish to RabbitMQ
-        routing_key = "darts.games.create"
-        success = rabbitmq_publisher.publish(routing_key, message)
-
-        if success:
-            return (
-                jsonify(
-                    {
-                        "status": "success",
-                        "message": "Game created successfully",
-                        "data": message,
-                    },
-                ),
-                201,
-            )
-        return (
-            jsonify(
-                {
-                    "error": "Failed to create game",
-                    "message": "Unable to publish message to queue",
-                },
-            ),
-            500,
-        )
-
-    except Exception as e:
-        logger.exception("Error creating game")
-        return (
-            jsonify(
-                {
-                    "error": "Internal server error",
-                    "message": str(e),
-                },
-            ),
-            500,
-        )
+    return _publish_request(
+        build_game_message,
+        ROUTING_KEY_GAME_CREATE,
+        "Failed to create game",
+        "Error creating game",
+        lambda _message: "Game created successfully",
+    )
 
 
 @app.route("/api/v1/players", methods=["POST"])
@@ -512,76 +438,13 @@ def add_player():
     Add a player to the current game
     Publishes player addition event to RabbitMQ
     """
-    try:
-        data = request.json
-        if not data:
-            return (
-                jsonify(
-                    {
-                        "error": "Invalid request",
-                        "message": "Request body must be JSON",
-                    },
-                ),
-                400,
-            )
-
-        # Validate player name
-        player_name = data.get("name")
-        if not player_name or not isinstance(player_name, str):
-            return (
-                jsonify(
-                    {
-                        "error": "Invalid player name",
-                        "message": "Player name is required and must be a string",
-                    },
-                ),
-                400,
-            )
-
-        # Create player message
-        message = {
-            "action": "add_player",
-            "name": player_name,
-            "added_by": request.user_claims.get("sub", "unknown"),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-
-        # Publish to RabbitMQ
-        routing_key = "darts.players.add"
-        success = rabbitmq_publisher.publish(routing_key, message)
-
-        if success:
-            return (
-                jsonify(
-                    {
-                        "status": "success",
-                        "message": "Player added successfully",
-                        "data": message,
-                    },
-                ),
-                201,
-            )
-        return (
-            jsonify(
-                {
-                    "error": "Failed to add player",
-                    "message": "Unable to publish message to queue",
-                },
-            ),
-            500,
-        )
-
-    except Exception as e:
-        logger.exception("Error adding player")
-        return (
-            jsonify(
-                {
-                    "error": "Internal server error",
-                    "message": str(e),
-                },
-            ),
-            500,
-        )
+    return _publish_request(
+        build_player_message,
+        ROUTING_KEY_PLAYER_ADD,
+        "Failed to add player",
+        "Error adding player",
+        lambda _message: "Player added successfully",
+    )
 
 
 # Error handlers
@@ -599,6 +462,12 @@ def not_found(_error):
     )
 
 
+@app.errorhandler(413)
+def payload_too_large_error(_error):
+    """Handle 413 errors"""
+    return jsonify(payload_too_large()), 413
+
+
 @app.errorhandler(500)
 def internal_error(_error):
     """Handle 500 errors"""
@@ -0,0 +1,561 @@
+"""
+ASGI API Gateway for Darts Game System
+Same /health, /metrics and /api/v1 contract as api_gateway.py, but requests
+are handled as coroutines: token introspection uses an async HTTP client
+(httpx, or a worker thread without it) and messages are published with
+aio-pika, so a request waiting on the IdP or RabbitMQ does not hold a thread
+
+Usage:
+    uvicorn api_gateway_async:app --host 0.0.0.0 --port 8080
+"""
+
+import asyncio
+import logging
+import math
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+import jwt
+import pika
+
+import json_provider
+from gateway_common import (
+    JWT_VALIDATION_MODE,
+    MAX_REQUEST_BODY_BYTES,
+    RABBITMQ_CONFIG,
+    ROUTING_KEY_GAME_CREATE,
+    ROUTING_KEY_PLAYER_ADD,
+    ROUTING_KEY_SCORE,
+    ROUTING_KEY_SCORE_BATCH,
+    TRUSTED_PROXY_HOPS,
+    WSO2_IS_INTROSPECT_PASSWORD,
+    WSO2_IS_INTROSPECT_URL,
+    WSO2_IS_INTROSPECT_USER,
+    WSO2_IS_JWKS_URL,
+    WSO2_IS_URL,
+    WSO2_IS_VERIFY_SSL,
+    RequestError,
+    bearer_token,
+    build_game_message,
+    build_player_message,
+    build_score_batch_message,
+    build_score_message,
+    check_scopes,
+    client_address,
+    client_key,
+    payload_too_large,
+    publish_failed,
+    published,
+    require_claims,
+)
+from idp_client import get_idp_client
+from jwks_store import jwks_store_from_env
+from metrics import PROMETHEUS_CONTENT_TYPE, render_latest
+from rate_limiter import ADMITTED_REQUESTS, RATE_LIMIT_ENABLED, limiters_from_env
+from score_codec import WIRE_FORMAT_JSON, encode_message
+from token_cache import TokenCache
+from transport import TRANSPORT_MEMORY, create_transport
+
+try:
+    import aio_pika
+
+    AIO_PIKA_AVAILABLE = True
+except ImportError:
+    AIO_PIKA_AVAILABLE = False
+
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import uvicorn
+
+    UVICORN_AVAILABLE = True
+except ImportError:
+    UVICORN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Pooled keep-alive client, used from a worker thread when httpx is missing
+idp_client = get_idp_client()
+
+# Initialize JWKS client for JWT validation
+jwks_client = None
+if JWT_VALIDATION_MODE == "jwks":
+    try:
+        jwks_client = jwks_store_from_env(WSO2_IS_JWKS_URL, verify_ssl=WSO2_IS_VERIFY_SSL)
+    except Exception as e:
+        logger.warning(f"Failed to initialize JWKS client: {e}")
+
+# Validated tokens are cached until 'exp' (capped by TOKEN_CACHE_TTL)
+token_cache = TokenCache.from_env("gateway")
+
+# Admission control, configured like the Flask gateway
+ip_limiter, client_limiter, concurrency_limiter = limiters_from_env()
+
+
+class AsyncRabbitMQPublisher:
+    """RabbitMQ message publisher for the event loop"""
+
+    def __init__(self, config: dict[str, Any]):
+        """
+        Initialize publisher
+
+        Raises:
+            RuntimeError: If the pika transport is selected without aio-pika
+        """
+        self.config = config
+        self.transport = create_transport(config)
+        if self.transport.name != TRANSPORT_MEMORY and not AIO_PIKA_AVAILABLE:
+            raise RuntimeError("The asyncio gateway requires aio-pika for RabbitMQ")
+        self.connection = None
+        self._channel = None
+        self._exchange = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        """Connect and declare the exchange"""
+        if self.transport.name == TRANSPORT_MEMORY:
+            self.connection = self.transport.connect(self.config)
+            self._channel = self.connection.channel()
+            self._channel.exchange_declare(
+                exchange=self.config["exchange"],
+                exchange_type="topic",
+                durable=True,
+            )
+        else:
+            self.connection = await aio_pika.connect_robust(
+                host=self.config["host"],
+                port=self.config["port"],
+                login=self.config["user"],
+                password=self.config["password"],
+                virtualhost=self.config["vhost"],
+            )
+            self._channel = await self.connection.channel()
+            self._exchange = await self._channel.declare_exchange(
+                self.config["exchange"],
+                aio_pika.ExchangeType.TOPIC,
+                durable=True,
+            )
+        logger.info("Connected to RabbitMQ")
+
+    async def publish(self, routing_key: str, message: dict[str, Any]) -> bool:
+        """Publish message to RabbitMQ"""
+        try:
+            if self.connection is None or self.connection.is_closed:
+                async with self._lock:
+                    if self.connection is None or self.connection.is_closed:
+                        await self.connect()
+
+            body, content_type = encode_message(
+                message,
+                self.config.get("wire_format", WIRE_FORMAT_JSON),
+            )
+            now = datetime.now(timezone.utc)
+            if self._exchange is None:
+                self._channel.basic_publish(
+                    exchange=self.config["exchange"],
+                    routing_key=routing_key,
+                    body=body,
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,  # Make message persistent
+                        content_type=content_type,
+                        timestamp=int(now.timestamp()),
+                    ),
+                )
+            else:
+                await self._exchange.publish(
+                    aio_pika.Message(
+                        body,
+                        content_type=content_type,
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                        timestamp=now,
+                    ),
+                    routing_key=routing_key,
+                )
+            logger.debug(f"Published message to {routing_key}: {message}")
+            return True
+        except Exception:
+            logger.exception("Failed to publish message")
+            self.connection = None
+            return False
+
+    async def close(self):
+        """Close RabbitMQ connection"""
+        connection, self.connection = self.connection, None
+        self._channel = self._exchange = None
+        if connection is None:
+            return
+        try:
+            result = connection.close()
+            if asyncio.iscoroutine(result):
+                await result
+            logger.info("RabbitMQ connection closed")
+        except Exception:
+            logger.exception("Error closing RabbitMQ connection")
+
+
+rabbitmq_publisher = AsyncRabbitMQPublisher(RABBITMQ_CONFIG)
+_http_client = None
+
+
+def _get_http_client():
+    """Shared httpx client, created on first use inside the event loop"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            verify=WSO2_IS_VERIFY_SSL,
+            timeout=float(os.getenv("IDP_TIMEOUT", "5")),
+            limits=httpx.Limits(max_keepalive_connections=int(os.getenv("IDP_POOL_SIZE", "10"))),
+        )
+    return _http_client
+
+
+async def validate_jwt_token(token: str) -> dict[str, Any] | None:
+    """
+    Validate JWT token using JWKS or introspection without blocking the loop
+    Returns decoded token claims if valid, None otherwise
+    Results are served from token_cache when the token was seen recently
+    """
+    hit, claims = token_cache.lookup(token)
+    if hit:
+        return claims
+
+    if JWT_VALIDATION_MODE == "jwks" and jwks_client:
+        # Key lookups may refetch the JWKS; keep that off the event loop
+        claims, cacheable = await asyncio.to_thread(_validate_with_jwks, token)
+    elif JWT_VALIDATION_MODE == "introspection":
+        claims, cacheable = await _introspect(token)
+    else:
+        logger.error("No valid JWT validation mode configured")
+        return None
+
+    if cacheable:
+        token_cache.store(token, claims)
+    return claims
+
+
+def _validate_with_jwks(token: str) -> tuple[dict[str, Any] | None, bool]:
+    """Verify a token's signature; returns (claims or None, cacheable)"""
+    try:
+        signing_key = jwks_client.get_signing_key_from_jwt(token)
+        decoded = jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=["RS256"],
+            options={"verify_exp": True},
+        )
+    except jwt.ExpiredSignatureError:
+        logger.warning("Token has expired")
+        return None, True
+    except jwt.InvalidTokenError as e:
+        logger.warning(f"Invalid token: {e}")
+        return None, True
+    except Exception:
+        logger.exception("Error validating token")
+        return None, False
+    return decoded, True
+
+
+async def _introspect(token: str) -> tuple[dict[str, Any] | None, bool]:
+    """Introspect a token at WSO2 IS; returns (claims or None, cacheable)"""
+    auth = (WSO2_IS_INTROSPECT_USER, WSO2_IS_INTROSPECT_PASSWORD)
+    try:
+        if HTTPX_AVAILABLE:
+            response = await _get_http_client().post(
+                WSO2_IS_INTROSPECT_URL,
+                auth=auth,
+                data={"token": token},
+            )
+        else:
+            response = await asyncio.to_thread(
+                idp_client.post,
+                WSO2_IS_INTROSPECT_URL,
+                auth=auth,
+                data={"token": token},
+                verify=WSO2_IS_VERIFY_SSL,
+            )
+    except Exception:
+        logger.exception("Error during token introspection")
+        return None, False
+
+    if response.status_code != 200:
+        logger.warning(f"Token introspection failed: status={response.status_code}")
+        return None, False
+    result = response.json()
+    if not result.get("active"):
+        logger.warning("Token is not active")
+        return None, True
+    return result, True
+
+
+# Method and path -> (required scopes, message builder, routing key,
+# publish failure error, 201 message)
+ROUTES = {
+    ("POST", "/api/v1/scores"): (
+        ["score:write"],
+        build_score_message,
+        ROUTING_KEY_SCORE,
+        "Failed to submit score",
+        lambda _message: "Score submitted successfully",
+    ),
+    ("POST", "/api/v1/scores:batch"): (
+        ["score:write"],
+        build_score_batch_message,
+        ROUTING_KEY_SCORE_BATCH,
+        "Failed to submit scores",
+        lambda message: f"{len(message['throws'])} scores submitted successfully",
+    ),
+    ("POST", "/api/v1/games"): (
+        ["game:write"],
+        build_game_message,
+        ROUTING_KEY_GAME_CREATE,
+        "Failed to create game",
+        lambda _message: "Game created successfully",
+    ),
+    ("POST", "/api/v1/players"): (
+        ["player:write"],
+        build_player_message,
+        ROUTING_KEY_PLAYER_ADD,
+        "Failed to add player",
+        lambda _message: "Player added successfully",
+    ),
+}
+ROUTE_PATHS = frozenset(path for _method, path in ROUTES)
+
+NOT_FOUND = {"error": "Not found", "message": "The requested resource was not found"}
+
+
+def _json_response(status: int, body: dict[str, Any], headers=()):
+    return (
+        status,
+        json_provider.dumps_bytes(body),
+        [
+            (b"content-type", b"application/json"),
+            *headers,
+        ],
+    )
+
+
+def _too_many_requests(retry_after: float, message: str):
+    """429 response telling the client when to retry"""
+    return _json_response(
+        429,
+        {"error": "Too many requests", "message": message},
+        [(b"retry-after", str(max(1, math.ceil(retry_after))).encode())],
+    )
+
+
+async def _read_body(receive) -> bytes:
+    """
+    Collect the request body from its http.request events
+
+    Raises:
+        RequestError: 413 once the body exceeds MAX_REQUEST_BODY_BYTES
+    """
+    chunks = []
+    size = 0
+    while True:
+        event = await receive()
+        chunk = event.get("body", b"")
+        size += len(chunk)
+        if size > MAX_REQUEST_BODY_BYTES:
+            raise RequestError(payload_too_large(), 413)
+        chunks.append(chunk)
+        if not event.get("more_body"):
+            return b"".join(chunks)
+
+
+def _parse_json(body: bytes):
+    try:
+        return json_provider.loads(body) if body else None
+    except ValueError as e:
+        raise RequestError(
+            {"error": "Invalid request", "message": "Request body must be JSON"},
+        ) from e
+
+
+async def _handle_api(route, headers: dict[bytes, bytes], receive):
+    """Authenticate, apply the client rate limit, validate and publish"""
+    required_scopes, build, routing_key, failure_error, success_text = route
+    try:
+        authorization = headers.get(b"authorization", b"").decode("latin-1") or None
+        claims = require_claims(await validate_jwt_token(bearer_token(authorization)))
+        check_scopes(claims, required_scopes)
+
+        if RATE_LIMIT_ENABLED:
+            retry_after = client_limiter.acquire(client_key(claims))
+            if retry_after:
+                return _too_many_requests(
+                    retry_after,
+                    "Request rate limit exceeded for this client",
+                )
+            ADMITTED_REQUESTS.inc()
+
+        data = _parse_json(await _read_body(receive))
+        message = build(data, claims.get("sub", "unknown"))
+    except RequestError as e:
+        return _json_response(e.status, e.body)
+    except Exception as e:
+        logger.exception(f"Error handling {routing_key}")
+        return _json_response(500, {"error": "Internal server error", "message": str(e)})
+
+    if await rabbitmq_publisher.publish(routing_key, message):
+        return _json_response(201, published(success_text(message), message))
+    return _json_response(500, publish_failed(failure_error))
+
+
+def _health():
+    return _json_response(
+        200,
+        {
+            "status": "healthy",
+            "service": "darts-api-gateway",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+
+
+def _metrics():
+    return (
+        200,
+        render_latest().encode("utf-8"),
+        [(b"content-type", PROMETHEUS_CONTENT_TYPE.encode())],
+    )
+
+
+# Endpoints without authentication or admission control
+OPEN_ROUTES = {("GET", "/health"): _health, ("GET", "/metrics"): _metrics}
+
+
+def _admit(scope):
+    """
+    Apply the per-IP rate limit and take a concurrency slot
+
+    Returns:
+        None if admitted (the caller must release the slot), else a response
+    """
+    peer = (scope.get("client") or ("unknown", 0))[0]
+    forwarded_for = ",".join(
+        value.decode("latin-1") for name, value in scope["headers"] if name == b"x-forwarded-for"
+    )
+    retry_after = ip_limiter.acquire(client_address(peer, forwarded_for, TRUSTED_PROXY_HOPS))
+    if retry_after:
+        return _too_many_requests(retry_after, "Request rate limit exceeded for this address")
+
+    if not concurrency_limiter.try_acquire():
+        return _json_response(
+            503,
+            {
+                "error": "Service overloaded",
+                "message": "Too many requests in progress, please retry",
+            },
+            [(b"retry-after", b"1")],
+        )
+    return None
+
+
+async def handle_request(scope, receive):
+    """
+    Route one HTTP request
+
+    Returns:
+        (status, body bytes, header list)
+    """
+    key = (scope["method"], scope["path"])
+    if key in OPEN_ROUTES:
+        return OPEN_ROUTES[key]()
+
+    route = ROUTES.get(key)
+    if route is None:
+        if scope["path"] in ROUTE_PATHS:
+            return _json_response(
+                405,
+                {
+                    "error": "Method not allowed",
+                    "message": f"{scope['method']} is not allowed here",
+                },
+            )
+        return _json_response(404, NOT_FOUND)
+
+    if not RATE_LIMIT_ENABLED:
+        return await _handle_api(route, dict(scope["headers"]), receive)
+
+    rejected = _admit(scope)
+    if rejected:
+        return rejected
+    try:
+        return await _handle_api(route, dict(scope["headers"]), receive)
+    finally:
+        concurrency_limiter.release()
+
+
+async def _lifespan(receive, send):
+    """Connect the publisher on startup and close connections on shutdown"""
+    global _http_client
+    while True:
+        event = await receive()
+        if event["type"] == "lifespan.startup":
+            try:
+                await rabbitmq_publisher.connect()
+            except Exception as e:
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif event["type"] == "lifespan.shutdown":
+            await rabbitmq_publisher.close()
+            if _http_client is not None:
+                await _http_client.aclose()
+                _http_client = None
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    if scope["method"] == "OPTIONS":
+        # CORS preflight, matching flask-cors defaults on the Flask gateway
+        status, body, headers = (
+            200,
+            b"",
+            [
+                (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+                (b"access-control-allow-headers", b"Authorization, Content-Type"),
+            ],
+        )
+    else:
+        status, body, headers = await handle_request(scope, receive)
+
+    headers = [
+        *headers,
+        (b"content-length", str(len(body)).encode()),
+        (b"access-control-allow-origin", b"*"),
+    ]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    if not UVICORN_AVAILABLE:
+        raise SystemExit("uvicorn is required to serve the ASGI gateway")
+
+    host = os.getenv("API_GATEWAY_HOST", "0.0.0.0")
+    port = int(os.getenv("API_GATEWAY_PORT", 8080))
+    logger.info(f"Starting ASGI API Gateway on {host}:{port}")
+    logger.info(f"WSO2 IS URL: {WSO2_IS_URL}")
+    logger.info(f"JWT Validation Mode: {JWT_VALIDATION_MODE}")
+    uvicorn.run(app, host=host, port=port)
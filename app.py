@@ -4,33 +4,56 @@ Receives scores through RabbitMQ and manages 301 and Cricket games
 Includes WSO2 IS authentication and role-based access control
 """
 
+import math
 import os
 import secrets
 import threading
+import time
 
 from dotenv import load_dotenv
 from flasgger import Swagger
-from flask import Flask, jsonify, redirect, render_template, request, session, url_for
+from flask import Flask, Response, jsonify, redirect, render_template, request, session, url_for
 from flask_cors import CORS
 from flask_socketio import SocketIO
 
+import json_provider
 from auth import (
     exchange_code_for_token,
     get_authorization_url,
     get_user_info,
+    get_user_roles,
+    invalidate_token,
     login_required,
     logout_user,
     permission_required,
     role_required,
+    validate_token,
 )
+from database_service import history_cursor, leaderboard_cursor
 from game_manager import GameManager
+from history_export import EXTENSIONS, MEDIA_TYPES, export_history, parse_export_date
+from http_cache import (
+    CACHE_IMMUTABLE,
+    CACHE_PRIVATE_REVALIDATE,
+    ETagCache,
+    content_etag,
+    not_modified,
+    version_etag,
+    with_etag,
+)
+from live_events import LiveEvent, format_event_id, parse_event_id
+from metrics import PROMETHEUS_CONTENT_TYPE, render_latest
+from player_stats import parse_period
 from rabbitmq_consumer import RabbitMQConsumer
+from rabbitmq_consumer_async import CONSUMER_ASYNCIO, AsyncRabbitMQConsumer
+from score_validation import GAME_MULTIPLIERS, validate_throws
 
 # Load environment variables
 load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = json_provider.FastJSONProvider(app)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret-key")
 app.config["SESSION_COOKIE_SECURE"] = os.getenv("SESSION_COOKIE_SECURE", "False").lower() == "true"
 app.config["SESSION_COOKIE_HTTPONLY"] = True
@@ -38,6 +61,21 @@ app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["PERMANENT_SESSION_LIFETIME"] = 3600  # 1 hour
 _dsas = os.getenv("DARTBOARD_SENDS_ACTUAL_SCORE", "false")
 app.config["DARTBOARD_SENDS_ACTUAL_SCORE"] = _dsas.lower() == "true"
+
+# Live event streams (/api/game/stream): SSE connections are closed after
+# STREAM_MAX_SECONDS and resume with Last-Event-ID; long polls wait at most
+# LONG_POLL_MAX_SECONDS
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "300"))
+STREAM_KEEPALIVE_SECONDS = 15
+STREAM_RETRY_MS = 3000
+LONG_POLL_DEFAULT_SECONDS = 25
+LONG_POLL_MAX_SECONDS = 30
+
+# Largest page of /api/game/history
+HISTORY_MAX_LIMIT = 100
+
+# Largest page of /api/leaderboard
+LEADERBOARD_MAX_LIMIT = 100
 CORS(app)
 
 # Initialize Swagger
@@ -74,17 +112,21 @@ swagger_template = {
         {"name": "Score", "description": "Score submission endpoints"},
         {"name": "TTS", "description": "Text-to-Speech configuration endpoints"},
         {"name": "UI", "description": "User interface endpoints"},
+        {"name": "Monitoring", "description": "Metrics endpoints"},
     ],
 }
 
 swagger = Swagger(app, config=swagger_config, template=swagger_template)
 
 # Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet", json=json_provider)
 
 # Initialize Game Manager
 game_manager = GameManager(socketio)
 
+# ETags of finished game replays, by game session id
+replay_etags = ETagCache()
+
 # Initialize RabbitMQ Consumer
 rabbitmq_consumer = None
 
@@ -92,7 +134,11 @@ rabbitmq_consumer = None
 def on_score_received(score_data):
     """Callback when a score is received from RabbitMQ"""
     print(f"Score received: {score_data}")
-    game_manager.process_score(score_data)
+    if "throws" in score_data:
+        # Batch published by the API gateway
+        game_manager.process_scores(score_data["throws"])
+    else:
+        game_manager.process_score(score_data)
 
 
 @app.route("/")
@@ -192,6 +238,10 @@ def callback():
     if user_info:
         session["user_info"] = user_info
 
+    # Resolve roles once per login; protected routes read them from the session
+    claims = validate_token(session["access_token"]) or {}
+    session["roles"] = get_user_roles(claims, user_info)
+
     # Clear OAuth state
     session.pop("oauth_state", None)
 
@@ -204,6 +254,11 @@ def callback():
 def logout():
     """Logout endpoint"""
     id_token = session.get("id_token")
+    access_token = session.get("access_token")
+
+    # Stop honouring the cached validation of this session's token
+    if access_token:
+        invalidate_token(access_token)
 
     # Clear session
     session.clear()
@@ -299,8 +354,154 @@ def get_game_state():
             game_data:
               type: object
               description: Game-specific data
+      304:
+        description: Not modified since the version in If-None-Match
+    """
+    # Read the version before the state: a change in between costs the
+    # client a refetch, never a stale 304
+    etag = version_etag(game_manager.state_version)
+    cached = not_modified(etag, CACHE_PRIVATE_REVALIDATE)
+    if cached:
+        return cached
+    return with_etag(jsonify(game_manager.get_game_state()), etag, CACHE_PRIVATE_REVALIDATE)
+
+
+def _resume_live_events(last_event_id):
+    """
+    Events a live client missed since last_event_id
+
+    Clients without a usable id (first connection, another server process, or
+    too far behind for the buffer) get a game_state snapshot instead.
+
+    Returns:
+        (sequence number after the events, events)
+    """
+    live_events = game_manager.live_events
+    seq = parse_event_id(last_event_id)
+    events = None if seq is None else live_events.since(seq)
+    if events is None:
+        # Read the sequence before the state, as for the state ETag
+        seq = live_events.last_seq
+        state = json_provider.dumps(game_manager.get_game_state())
+        events = [LiveEvent(seq, "game_state", state)]
+    return (events[-1].seq if events else seq), events
+
+
+@app.route("/api/game/stream", methods=["GET"])
+@login_required
+def stream_game_events():
+    """Stream live game events (Server-Sent Events)
+    ---
+    tags:
+      - Game
+    summary: Stream game_state and throw events
+    description: >
+      Lightweight alternative to Socket.IO. Starts with a game_state snapshot,
+      or with the events missed since Last-Event-ID when reconnecting.
+      The connection is closed periodically; EventSource reconnects on its own.
+    produces:
+      - text/event-stream
+    parameters:
+      - in: header
+        name: Last-Event-ID
+        type: string
+        description: Id of the last event received
+      - in: query
+        name: last_event_id
+        type: string
+        description: Same as Last-Event-ID, for clients that cannot set headers
+    responses:
+      200:
+        description: Event stream
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+
+    def generate():
+        seq, events = _resume_live_events(last_event_id)
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while True:
+            for event in events:
+                yield event.sse()
+            if time.monotonic() >= deadline:
+                return
+            events = game_manager.live_events.wait(seq, STREAM_KEEPALIVE_SECONDS)
+            if events is None:
+                seq, events = _resume_live_events(None)
+            elif events:
+                seq = events[-1].seq
+            else:
+                yield ": keep-alive\n\n"
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/game/stream/poll", methods=["GET"])
+@login_required
+def poll_game_events():
+    """Long-poll live game events
+    ---
+    tags:
+      - Game
+    summary: Wait for game_state and throw events
+    description: >
+      Fallback for clients without EventSource. Returns the events after
+      last_event_id at once if there are any, otherwise waits for the next one.
+      Without last_event_id a game_state snapshot is returned.
+    parameters:
+      - in: query
+        name: last_event_id
+        type: string
+        description: last_event_id of the previous response
+      - in: query
+        name: timeout
+        type: number
+        default: 25
+        description: Seconds to wait for an event (at most 30)
+    responses:
+      200:
+        description: Events in order, possibly none when the wait timed out
+        schema:
+          type: object
+          properties:
+            last_event_id:
+              type: string
+              description: Pass back on the next poll
+            events:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                  event:
+                    type: string
+                    enum: ['game_state', 'throw']
+                  data:
+                    type: object
     """
-    return jsonify(game_manager.get_game_state())
+    timeout = request.args.get("timeout", LONG_POLL_DEFAULT_SECONDS, type=float)
+    if not math.isfinite(timeout):
+        # nan would pass the clamp below; inf means "as long as allowed" anyway
+        timeout = LONG_POLL_DEFAULT_SECONDS
+    timeout = min(max(timeout, 0), LONG_POLL_MAX_SECONDS)
+    seq, events = _resume_live_events(request.args.get("last_event_id"))
+    if not events:
+        events = game_manager.live_events.wait(seq, timeout)
+        if events is None:
+            seq, events = _resume_live_events(None)
+        elif events:
+            seq = events[-1].seq
+    # Built from the already serialized event payloads
+    body = (
+        f'{{"last_event_id":"{format_event_id(seq)}",'
+        f'"events":[{",".join(event.json() for event in events)}]}}'
+    )
+    return Response(body, mimetype="application/json", headers={"Cache-Control": "no-store"})
 
 
 @app.route("/api/game/new", methods=["POST"])
@@ -528,6 +729,89 @@ def submit_score():
     return jsonify({"status": "success", "message": "Score submitted"})
 
 
+@app.route("/api/Throw/batch", methods=["POST"])
+# @login_required
+# @permission_required("score:submit")
+def submit_score_batch():
+    """Submit an ordered batch of scores via API
+    ---
+    tags:
+      - Score
+    summary: Submit a batch of dart scores
+    description: Validates all throws up front, applies them in order and broadcasts
+      the game state once. Throws arriving while the game is paused are ignored.
+    parameters:
+      - in: body
+        name: body
+        description: Ordered list of throws
+        required: true
+        schema:
+          type: object
+          required:
+            - throws
+          properties:
+            throws:
+              type: array
+              items:
+                type: object
+                required:
+                  - score
+                  - multiplier
+                properties:
+                  score:
+                    type: integer
+                    example: 20
+                  multiplier:
+                    type: string
+                    enum: ['SINGLE', 'DOUBLE', 'TRIPLE', 'BULL', 'DBLBULL']
+                    example: TRIPLE
+    responses:
+      200:
+        description: Batch processed
+        schema:
+          type: object
+          properties:
+            status:
+              type: string
+              example: success
+            submitted:
+              type: integer
+              description: Number of throws in the batch
+            applied:
+              type: integer
+              description: Number of throws applied to the game
+      400:
+        description: One or more throws failed validation
+    """
+    data = request.get_json(silent=True)
+    throws = data.get("throws") if isinstance(data, dict) else None
+
+    throws, errors = validate_throws(throws, valid_multipliers=GAME_MULTIPLIERS)
+    if errors:
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "One or more throws failed validation",
+                    "errors": errors,
+                },
+            ),
+            400,
+        )
+
+    applied = game_manager.process_scores(throws)
+    # Game state is emitted once by game_manager.process_scores()
+
+    return jsonify(
+        {
+            "status": "success",
+            "message": "Scores submitted",
+            "submitted": len(throws),
+            "applied": applied,
+        },
+    )
+
+
 @app.route("/api/tts/config", methods=["GET"])
 def get_tts_config():
     """Get TTS configuration
@@ -804,15 +1088,22 @@ def get_game_history():
         description: Maximum number of games to return
         default: 10
         example: 10
+      - in: query
+        name: cursor
+        type: string
+        description: next_cursor of the previous page
     responses:
       200:
-        description: List of recent games
+        description: List of recent games, newest first
         schema:
           type: object
           properties:
             status:
               type: string
               example: success
+            next_cursor:
+              type: string
+              description: Cursor of the next (older) page; null on the last page
             games:
               type: array
               items:
@@ -836,11 +1127,26 @@ def get_game_history():
                   finished_at:
                     type: string
                     description: Game finish timestamp
+      304:
+        description: No game was written since the version in If-None-Match
+      400:
+        description: Invalid cursor
     """
-    limit = request.args.get("limit", 10, type=int)
+    limit = min(max(request.args.get("limit", 10, type=int), 1), HISTORY_MAX_LIMIT)
+    cursor = request.args.get("cursor")
+    etag = version_etag(*game_manager.db_service.data_versions())
+    cached = not_modified(etag)
+    if cached:
+        return cached
     try:
-        games = game_manager.db_service.get_recent_games(limit=limit)
-        return jsonify({"status": "success", "games": games})
+        games = game_manager.db_service.get_recent_games(limit=limit, cursor=cursor)
+        next_cursor = history_cursor(games[-1]) if len(games) == limit else None
+        return with_etag(
+            jsonify({"status": "success", "games": games, "next_cursor": next_cursor}),
+            etag,
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -892,18 +1198,325 @@ def get_game_replay(game_session_id):
                 throws:
                   type: array
                   description: All throws in chronological order
+      304:
+        description: Not modified since the ETag in If-None-Match
       404:
         description: Game not found
     """
+    # Finished games never change; others change with any database write
+    etag = replay_etags.get(game_session_id)
+    if etag:
+        cached = not_modified(etag, CACHE_IMMUTABLE)
+    else:
+        etag = version_etag(*game_manager.db_service.data_versions())
+        cached = not_modified(etag)
+    if cached:
+        return cached
     try:
         game_data = game_manager.db_service.get_game_replay_data(game_session_id)
-        if game_data:
-            return jsonify({"status": "success", "game_data": game_data})
-        return jsonify({"status": "error", "message": "Game not found"}), 404
+        if not game_data:
+            return jsonify({"status": "error", "message": "Game not found"}), 404
+        response = jsonify({"status": "success", "game_data": game_data})
+        if game_data.get("finished_at"):
+            etag = content_etag(response.get_data())
+            replay_etags.set(game_session_id, etag)
+            return with_etag(response, etag, CACHE_IMMUTABLE)
+        return with_etag(response, etag)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route("/api/players/<int:player_id>/stats", methods=["GET"])
+def get_player_stats(player_id):
+    """Get player statistics
+    ---
+    tags:
+      - Players
+    summary: Get a player's statistics
+    description: |
+      League statistics of a player per game type, overall and per month:
+      3-dart and first-9 averages, checkout percentage, ton-plus turns and
+      180s for x01 games, marks per round for cricket. Read from the
+      player_stats aggregate, which is updated as throws are recorded.
+    parameters:
+      - in: path
+        name: player_id
+        type: integer
+        required: true
+        description: Player database ID (player_id in game replays)
+      - in: query
+        name: game_type
+        type: string
+        description: Only this game type
+        example: "501"
+      - in: query
+        name: period
+        type: string
+        description: Only this month (YYYY-MM)
+        example: "2024-06"
+    responses:
+      200:
+        description: Player statistics
+        schema:
+          type: object
+          properties:
+            status:
+              type: string
+              example: success
+            player_id:
+              type: integer
+            player_name:
+              type: string
+            game_types:
+              type: array
+              description: |
+                Totals (games_played, games_won, darts_thrown, points_scored,
+                first9_darts, first9_points, checkout_attempts, checkouts,
+                ton_plus, one_eighties, cricket_marks), three_dart_average,
+                first9_average, checkout_percentage, marks_per_round and the
+                same per month in periods (newest first)
+      304:
+        description: No game was written since the version in If-None-Match
+      400:
+        description: Invalid period
+      404:
+        description: Player not found
+    """
+    etag = version_etag(*game_manager.db_service.data_versions())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        period = request.args.get("period")
+        stats = game_manager.db_service.get_player_stats(
+            player_id,
+            game_type=request.args.get("game_type"),
+            period=parse_period(period) if period else None,
+        )
+        if not stats:
+            return jsonify({"status": "error", "message": "Player not found"}), 404
+        return with_etag(jsonify({"status": "success", **stats}), etag)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route("/api/players/<int:player_id>/rating", methods=["GET"])
+def get_player_rating(player_id):
+    """Get player rating
+    ---
+    tags:
+      - Players
+    summary: Get a player's rating and rating history
+    description: |
+      Elo rating of a player, updated when a game they played finishes,
+      with the latest rating changes.
+    parameters:
+      - in: path
+        name: player_id
+        type: integer
+        required: true
+        description: Player database ID (player_id in game replays)
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of rating changes to return
+        default: 20
+    responses:
+      200:
+        description: Player rating
+        schema:
+          type: object
+          properties:
+            status:
+              type: string
+              example: success
+            player_id:
+              type: integer
+            player_name:
+              type: string
+            rating:
+              type: number
+              description: Current rating; null before the first rated game
+            games_rated:
+              type: integer
+            history:
+              type: array
+              description: |
+                Rating changes, newest first (game_session_id, rating_before,
+                rating_after, change, rated_at)
+      304:
+        description: No game was written since the version in If-None-Match
+      404:
+        description: Player not found
+    """
+    limit = min(max(request.args.get("limit", 20, type=int), 1), LEADERBOARD_MAX_LIMIT)
+    etag = version_etag(*game_manager.db_service.data_versions())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        rating = game_manager.db_service.get_player_rating(player_id, history_limit=limit)
+        if not rating:
+            return jsonify({"status": "error", "message": "Player not found"}), 404
+        return with_etag(jsonify({"status": "success", **rating}), etag)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route("/api/leaderboard", methods=["GET"])
+def get_leaderboard():
+    """Get the leaderboard
+    ---
+    tags:
+      - Players
+    summary: Get the player leaderboard
+    description: |
+      Rated players, highest rating first. Ratings are maintained as games
+      finish, so every page is read straight from the leaderboard index.
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Maximum number of players to return
+        default: 20
+      - in: query
+        name: cursor
+        type: string
+        description: next_cursor of the previous page
+    responses:
+      200:
+        description: A page of the leaderboard
+        schema:
+          type: object
+          properties:
+            status:
+              type: string
+              example: success
+            next_cursor:
+              type: string
+              description: Cursor of the next page; null on the last page
+            players:
+              type: array
+              items:
+                type: object
+                properties:
+                  rank:
+                    type: integer
+                  player_id:
+                    type: integer
+                  player_name:
+                    type: string
+                  rating:
+                    type: number
+                  games_rated:
+                    type: integer
+      304:
+        description: No game was written since the version in If-None-Match
+      400:
+        description: Invalid cursor
+    """
+    limit = min(max(request.args.get("limit", 20, type=int), 1), LEADERBOARD_MAX_LIMIT)
+    cursor = request.args.get("cursor")
+    etag = version_etag(*game_manager.db_service.data_versions())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        players = game_manager.db_service.get_leaderboard(limit=limit, cursor=cursor)
+        next_cursor = leaderboard_cursor(players[-1]) if len(players) == limit else None
+        return with_etag(
+            jsonify({"status": "success", "players": players, "next_cursor": next_cursor}),
+            etag,
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route("/api/export", methods=["GET"])
+@login_required
+@permission_required("history:export")
+def export_game_history():
+    """Export game history - requires history:export permission
+    ---
+    tags:
+      - Game
+    summary: Export game history as a file
+    description: |
+      Streams gameresults or scores, oldest game first, as CSV, Parquet or
+      an Arrow IPC stream for offline analysis. Rows are read through a
+      server-side cursor and encoded a chunk at a time, so memory use does
+      not grow with the history. Parquet and Arrow require pyarrow.
+    produces:
+      - text/csv
+      - application/vnd.apache.parquet
+      - application/vnd.apache.arrow.stream
+    parameters:
+      - in: query
+        name: table
+        type: string
+        enum: [gameresults, scores]
+        default: scores
+      - in: query
+        name: format
+        type: string
+        enum: [csv, parquet, arrow]
+        default: csv
+      - in: query
+        name: since
+        type: string
+        description: Only games started on or after this date (YYYY-MM-DD or ISO 8601)
+        example: "2024-01-01"
+      - in: query
+        name: until
+        type: string
+        description: Only games started before this date (YYYY-MM-DD or ISO 8601)
+      - in: query
+        name: game_type
+        type: string
+        description: Only games of this type
+        example: "501"
+    responses:
+      200:
+        description: The exported file, streamed
+      400:
+        description: Unknown table or format, or invalid date
+      501:
+        description: The format needs pyarrow, which is not installed
+    """
+    table = request.args.get("table", "scores")
+    export_format = request.args.get("format", "csv")
+    try:
+        since = request.args.get("since")
+        until = request.args.get("until")
+        chunks = export_history(
+            game_manager.db_service.db_manager,
+            table,
+            export_format,
+            since=parse_export_date(since) if since else None,
+            until=parse_export_date(until) if until else None,
+            game_type=request.args.get("game_type"),
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"status": "error", "message": str(e)}), 501
+
+    filename = f"{table}.{EXTENSIONS[export_format]}"
+    return Response(
+        chunks,
+        mimetype=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @app.route("/api/game/current/session_id", methods=["GET"])
 def get_current_game_session_id():
     """Get current game session ID
@@ -933,6 +1546,27 @@ def get_current_game_session_id():
     )
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Score pipeline metrics
+    ---
+    tags:
+      - Monitoring
+    summary: Score pipeline metrics
+    description: |
+      Prometheus text exposition of consumer and game metrics: broker delay,
+      throw-to-broadcast latency, process_score, database write, TTS and
+      emit durations, consumed message outcomes, queue depth and database
+      connection pool usage.
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in the Prometheus text format
+    """
+    return Response(render_latest(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @socketio.on("connect", namespace="/")
 def handle_connect():
     """Handle client connection"""
@@ -1003,10 +1637,17 @@ def start_rabbitmq_consumer():
         "vhost": os.getenv("RABBITMQ_VHOST", "/"),
         "exchange": os.getenv("RABBITMQ_EXCHANGE", "darts_exchange"),
         "topic": os.getenv("RABBITMQ_TOPIC", "darts.scores.#"),
+        "transport": os.getenv("RABBITMQ_TRANSPORT", "pika"),
+        "consumer": os.getenv("RABBITMQ_CONSUMER", "threaded"),
+        "prefetch": int(os.getenv("RABBITMQ_PREFETCH", 32)),
     }
 
     try:
-        rabbitmq_consumer = RabbitMQConsumer(rabbitmq_config, on_score_received)
+        # Both consumers block in start(); the asyncio one runs its own event loop
+        if rabbitmq_config["consumer"] == CONSUMER_ASYNCIO:
+            rabbitmq_consumer = AsyncRabbitMQConsumer(rabbitmq_config, on_score_received)
+        else:
+            rabbitmq_consumer = RabbitMQConsumer(rabbitmq_config, on_score_received)
         consumer_thread = threading.Thread(target=rabbitmq_consumer.start, daemon=True)
         consumer_thread.start()
         print("RabbitMQ consumer started")
@@ -6,14 +6,16 @@ Implements role-based access control (RBAC)
 
 import logging
 import os
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Any
 from urllib.parse import urlencode
 
 import jwt
-import requests
 from flask import jsonify, redirect, request, session, url_for
-from jwt import PyJWKClient
+
+from idp_client import get_idp_client
+from jwks_store import jwks_store_from_env
+from token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
@@ -45,14 +47,20 @@ JWT_VALIDATION_MODE = os.getenv("JWT_VALIDATION_MODE", "introspection")
 # SSL verification configuration
 WSO2_IS_VERIFY_SSL = os.getenv("WSO2_IS_VERIFY_SSL", "False").lower() == "true"
 
+# Pooled keep-alive client shared by every WSO2 IS call
+idp_client = get_idp_client()
+
 # Initialize JWKS client
 jwks_client = None
 if JWT_VALIDATION_MODE == "jwks":
     try:
-        jwks_client = PyJWKClient(WSO2_IS_JWKS_URL)
+        jwks_client = jwks_store_from_env(WSO2_IS_JWKS_URL, verify_ssl=WSO2_IS_VERIFY_SSL)
     except Exception as e:
         logger.warning(f"Failed to initialize JWKS client: {e}")
 
+# Validated tokens are cached until 'exp' (capped by TOKEN_CACHE_TTL)
+token_cache = TokenCache.from_env("app")
+
 # Role definitions
 ROLES = {
     "admin": {
@@ -81,10 +89,31 @@ ROLES = {
 }
 
 
-def validate_token(token: str) -> dict[str, Any] | None:  # noqa: PLR0911
+def validate_token(token: str) -> dict[str, Any] | None:
     """
     Validate JWT/OAuth2 token using JWKS or introspection
     Returns decoded token claims if valid, None otherwise
+    Results are served from token_cache when the token was seen recently
+    """
+    hit, claims = token_cache.lookup(token)
+    if hit:
+        return claims
+
+    claims, cacheable = _validate_token_uncached(token)
+    if cacheable:
+        token_cache.store(token, claims)
+    return claims
+
+
+def _validate_token_uncached(  # noqa: PLR0911
+    token: str,
+) -> tuple[dict[str, Any] | None, bool]:
+    """
+    Validate a token against WSO2 IS without the cache
+
+    Returns:
+        (claims or None, cacheable); errors talking to the IdP are not
+        cacheable so a transient outage does not lock users out
     """
     if JWT_VALIDATION_MODE == "jwks" and jwks_client:
         try:
@@ -96,24 +125,23 @@ def validate_token(token: str) -> dict[str, Any] | None:  # noqa: PLR0911
                 options={"verify_exp": True},
             )
             logger.info(f"Token validated for user: {decoded.get('sub', 'unknown')}")
-            return decoded
+            return decoded, True
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
-            return None
+            return None, True
         except jwt.InvalidTokenError as e:
             logger.warning(f"Invalid token: {e}")
-            return None
+            return None, True
         except Exception:
             logger.exception("Error validating token")
-            return None
+            return None, False
     elif JWT_VALIDATION_MODE == "introspection":
         try:
-            response = requests.post(
+            response = idp_client.post(
                 WSO2_IS_INTROSPECT_URL,
                 auth=(WSO2_IS_INTROSPECT_USER, WSO2_IS_INTROSPECT_PASSWORD),
                 data={"token": token},
                 verify=WSO2_IS_VERIFY_SSL,
-                timeout=5,
             )
             if response.status_code == 200:
                 result = response.json()
@@ -122,103 +150,86 @@ def validate_token(token: str) -> dict[str, Any] | None:  # noqa: PLR0911
                         f"Token validated via introspection for user: \
                         {result.get('username', 'unknown')}",
                     )
-                    return result
+                    return result, True
                 logger.warning(f"Token is not active: {result}")
-            else:
-                logger.warning(
-                    f"Token introspection failed: status={response.status_code}",
-                )
-            return None
+                return None, True
+            logger.warning(
+                f"Token introspection failed: status={response.status_code}",
+            )
+            return None, False
         except Exception:
             logger.exception("Error during token introspection")
-            return None
+            return None, False
     else:
         logger.error("No valid JWT validation mode configured")
-        return None
+        return None, False
 
 
-def get_user_roles(token_claims: dict, access_token: str | None = None) -> list[str]:
+def invalidate_token(token: str) -> bool:
     """
-    Extract user roles from token claims
-    WSO2 IS stores roles in 'groups' or 'roles' claim
-    If not found in token claims, try fetching from userinfo endpoint
+    Forget a cached validation result, e.g. after logout or revocation
+    Returns True if the token was cached
     """
-    # Debug: Log all token claims to see what's available
-    print(f"[DEBUG] Token claims for role extraction: {token_claims}")
-    logger.info(f"Token claims for role extraction: {token_claims}")
+    return token_cache.invalidate(token)
 
+
+def _claim_roles(claims: dict) -> list[str]:
+    """Collect raw role names from the 'groups' and 'roles' claims"""
     roles = []
+    for claim in ("groups", "roles"):
+        value = claims.get(claim)
+        if isinstance(value, list):
+            roles.extend(value)
+        elif isinstance(value, str):
+            roles.append(value)
+    return roles
 
-    # Check for roles in different claim formats
-    if "groups" in token_claims:
-        groups = token_claims["groups"]
-        if isinstance(groups, list):
-            roles.extend(groups)
-        elif isinstance(groups, str):
-            roles.append(groups)
-
-    if "roles" in token_claims:
-        token_roles = token_claims["roles"]
-        if isinstance(token_roles, list):
-            roles.extend(token_roles)
-        elif isinstance(token_roles, str):
-            roles.append(token_roles)
-
-    # If no roles found in token claims and we have an access token, try userinfo endpoint
-    if not roles and access_token:
-        print("[DEBUG] No roles in token claims, trying userinfo endpoint...")
-        logger.info("No roles in token claims, trying userinfo endpoint")
-        try:
-            userinfo = get_user_info(access_token)
-            if userinfo:
-                print(f"[DEBUG] UserInfo response: {userinfo}")
-                logger.info(f"UserInfo response: {userinfo}")
-
-                # Check for roles in userinfo
-                if "groups" in userinfo:
-                    groups = userinfo["groups"]
-                    if isinstance(groups, list):
-                        roles.extend(groups)
-                    elif isinstance(groups, str):
-                        roles.append(groups)
-
-                if "roles" in userinfo:
-                    userinfo_roles = userinfo["roles"]
-                    if isinstance(userinfo_roles, list):
-                        roles.extend(userinfo_roles)
-                    elif isinstance(userinfo_roles, str):
-                        roles.append(userinfo_roles)
-        except Exception as e:
-            logger.warning(f"Failed to fetch roles from userinfo: {e}")
-
-    # Normalize role names (remove domain prefixes if present)
-    normalized_roles = []
-    for role in roles:
-        # WSO2 roles might be in format "Internal/player" or "Application/player"
-        normalized_role = role.split("/")[-1] if "/" in role else role
-        normalized_roles.append(normalized_role.lower())
 
-    print(f"[DEBUG] Extracted and normalized roles: {normalized_roles}")
-    logger.info(f"Extracted and normalized roles: {normalized_roles}")
-    return normalized_roles
+def get_user_roles(token_claims: dict, userinfo: dict | None = None) -> list[str]:
+    """
+    Extract normalized user roles from token claims
+    WSO2 IS stores roles in 'groups' or 'roles' claim; userinfo (fetched once
+    at login) is used when the token itself carries no roles. No I/O is done
+    here, so this is safe to call per request.
+    """
+    roles = _claim_roles(token_claims)
+    if not roles and userinfo:
+        roles = _claim_roles(userinfo)
+
+    # WSO2 roles might be in format "Internal/player" or "Application/player"
+    return [role.rsplit("/", 1)[-1].lower() for role in roles]
+
+
+# Permissions granted by each role, precompiled from ROLES
+ROLE_PERMISSIONS: dict[str, frozenset[str]] = {
+    role: frozenset(definition["permissions"]) for role, definition in ROLES.items()
+}
+
+
+@lru_cache(maxsize=64)
+def _resolve_permissions(roles: frozenset[str]) -> frozenset[str]:
+    permissions = set()
+    for role in roles:
+        permissions |= ROLE_PERMISSIONS.get(role, frozenset())
+    if "admin" in roles:
+        permissions.add("*")
+    return frozenset(permissions)
 
 
-def has_permission(user_roles: list[str], required_permission: str) -> bool:
+def resolve_permissions(user_roles) -> frozenset[str]:
     """
-    Check if user has required permission based on their roles
+    Return the set of permissions granted by a set of roles
+    Contains "*" when any role grants every permission
     """
-    # Admin has all permissions
-    if "admin" in user_roles:
-        return True
+    return _resolve_permissions(frozenset(user_roles))
 
-    # Check each role's permissions
-    for role in user_roles:
-        if role in ROLES:
-            role_permissions = ROLES[role]["permissions"]
-            if "*" in role_permissions or required_permission in role_permissions:
-                return True
 
-    return False
+def has_permission(user_roles, required_permission: str) -> bool:
+    """
+    Check if user has required permission based on their roles
+    """
+    permissions = resolve_permissions(user_roles)
+    return "*" in permissions or required_permission in permissions
 
 
 def login_required(f):
@@ -241,9 +252,15 @@ def login_required(f):
             session.clear()
             return redirect(url_for("login", next=request.url))
 
+        # Roles are resolved once per login and kept in the session
+        roles = session.get("roles")
+        if roles is None:
+            roles = session["roles"] = get_user_roles(claims)
+
         # Store user info in request context
         request.user_claims = claims
-        request.user_roles = get_user_roles(claims, access_token=token)
+        request.user_roles = roles
+        request.user_permissions = resolve_permissions(roles)
 
         return f(*args, **kwargs)
 
@@ -256,22 +273,19 @@ def role_required(*required_roles):
     Returns 403 if user doesn't have required role
     """
 
+    allowed = frozenset(required_roles)
+
     def decorator(f):
         @wraps(f)
         @login_required
         def decorated_function(*args, **kwargs):
             user_roles = getattr(request, "user_roles", [])
 
-            # Debug: Log role check
-            logger.info(f"Role check - User roles: {user_roles}, Required roles: {required_roles}")
-
             # Check if user has any of the required roles
-            if not any(role in user_roles for role in required_roles):
+            if allowed.isdisjoint(user_roles):
                 logger.warning(
-                    f"""
-                    Access denied - User roles {user_roles} do not match
-                    required roles {required_roles}
-                    """,
+                    f"Access denied - User roles {user_roles} do not match "
+                    f"required roles {required_roles}",
                 )
                 return (
                     jsonify(
@@ -301,9 +315,9 @@ def permission_required(permission: str):
         @wraps(f)
         @login_required
         def decorated_function(*args, **kwargs):
-            user_roles = getattr(request, "user_roles", [])
+            permissions = getattr(request, "user_permissions", frozenset())
 
-            if not has_permission(user_roles, permission):
+            if "*" not in permissions and permission not in permissions:
                 return (
                     jsonify(
                         {
@@ -353,7 +367,8 @@ def exchange_code_for_token(code: str) -> dict | None:
     Exchange authorization code for access token
     """
     try:
-        response = requests.post(
+        # Authorization codes are single use, so the exchange is never retried
+        response = idp_client.post(
             WSO2_IS_TOKEN_URL,
             data={
                 "grant_type": "authorization_code",
@@ -363,7 +378,7 @@ def exchange_code_for_token(code: str) -> dict | None:
                 "client_secret": WSO2_CLIENT_SECRET,
             },
             verify=WSO2_IS_VERIFY_SSL,
-            timeout=10,
+            retries=0,
         )
 
         if response.status_code == 200:
@@ -382,11 +397,10 @@ def get_user_info(access_token: str) -> dict | None:
     Get user information from WSO2 IS userinfo endpoint
     """
     try:
-        response = requests.get(
+        response = idp_client.get(
             WSO2_IS_USERINFO_URL,
             headers={"Authorization": f"Bearer {access_token}"},
             verify=WSO2_IS_VERIFY_SSL,
-            timeout=5,
         )
 
         if response.status_code == 200:
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Throw analytics benchmark
+
+Seeds a SQLite database with x01 throws, then computes the season report
+distributions with throw_analytics.analyze_throws (NumPy, chunked) and with
+a per-row Python loop over the same stream. Reports the throughput of each
+(and of streaming the chunks alone, which bounds both) and checks both give
+the same report.
+
+Usage:
+    python benchmarks/bench_analytics.py [throws] [players] [chunk_size]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert, select
+
+from database_models import GameResult, GameType, Player, Score
+from database_service import DatabaseService
+from player_stats import DOUBLE_OUT_FINISHES
+from throw_analytics import (
+    CHUNK_SIZE,
+    DOUBLE,
+    MAX_TURN,
+    MULTIPLIERS,
+    SEGMENTS,
+    STREAK_SCORE,
+    analyze_throws,
+    stream_throws,
+    throws_query,
+)
+
+DARTS_PER_RESULT = 30
+BATCH = 50_000
+
+
+def seed(service, throws, players):
+    """Insert finished 501 legs with random throws; returns the player ids"""
+    rng = random.Random(1)
+    with service.db_manager.session_scope() as session:
+        game_type_id = session.execute(
+            select(GameType.id).where(GameType.name == "501"),
+        ).scalar_one()
+        session.execute(insert(Player), [{"name": f"Player {index}"} for index in range(players)])
+        player_ids = session.execute(select(Player.id)).scalars().all()
+        started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        results = [
+            {
+                "id": result_id,
+                "game_type_id": game_type_id,
+                "player_id": player_ids[result_id % players],
+                "player_order": result_id % 2,
+                "start_score": 501,
+                "game_session_id": f"game-{result_id // 2}",
+                "started_at": started + timedelta(minutes=result_id // 2),
+            }
+            for result_id in range(1, throws // DARTS_PER_RESULT + 2)
+        ]
+        for start in range(0, len(results), BATCH):
+            session.execute(insert(GameResult), results[start : start + BATCH])
+
+        scores = []
+        for index in range(throws):
+            result_id, sequence = divmod(index, DARTS_PER_RESULT)
+            turn, throw_in_turn = divmod(sequence, 3)
+            base_score = rng.choice((20, 20, 20, 1, 5, 19, 16, 25, 0))
+            multiplier_value = 1 if base_score in {0, 25} else rng.choice((1, 1, 1, 2, 3, 3))
+            score_before = rng.randrange(2, 502)
+            scores.append(
+                {
+                    "game_result_id": result_id + 1,
+                    "player_id": results[result_id]["player_id"],
+                    "throw_sequence": sequence + 1,
+                    "turn_number": turn + 1,
+                    "throw_in_turn": throw_in_turn + 1,
+                    "base_score": base_score,
+                    "multiplier": "SINGLE",
+                    "multiplier_value": multiplier_value,
+                    "actual_score": base_score * multiplier_value,
+                    "score_before": score_before,
+                    "score_after": score_before,
+                    "dartboard_sends_actual_score": False,
+                    "is_bust": rng.random() < 0.01,
+                    "is_finish": score_before in DOUBLE_OUT_FINISHES and multiplier_value == 2,
+                },
+            )
+            if len(scores) == BATCH:
+                session.execute(insert(Score), scores)
+                scores = []
+        if scores:
+            session.execute(insert(Score), scores)
+    return player_ids
+
+
+def python_report(service, player_ids):
+    """The same distributions with one Python iteration per throw, for comparison"""
+    stats = {
+        player_id: {
+            "heatmap": [[0] * MULTIPLIERS for _ in range(SEGMENTS)],
+            "turn_totals": [0] * (MAX_TURN + 1),
+            "busts": 0,
+            "double_attempts": 0,
+            "double_hits": 0,
+            "streak": 0,
+            "longest_streak": 0,
+        }
+        for player_id in player_ids
+    }
+
+    def end_turn(player_id, total, busted):
+        player = stats[player_id]
+        if busted:
+            player["busts"] += 1
+        else:
+            player["turn_totals"][min(max(total, 0), MAX_TURN)] += 1
+        player["streak"] = player["streak"] + 1 if not busted and total >= STREAK_SCORE else 0
+        player["longest_streak"] = max(player["longest_streak"], player["streak"])
+
+    turn = None
+    with service.db_manager.connect() as connection:
+        result = connection.execution_options(stream_results=True).execute(
+            throws_query(player_ids),
+        )
+        for row in result:
+            player = stats[row.player_id]
+            player["heatmap"][row.base_score][row.multiplier_value] += 1
+            if row.score_before in DOUBLE_OUT_FINISHES:
+                player["double_attempts"] += 1
+                if row.is_finish and row.multiplier_value == DOUBLE:
+                    player["double_hits"] += 1
+            key = (row.game_result_id, row.turn_number)
+            if turn is None or turn[0] != key:
+                if turn is not None:
+                    end_turn(*turn[1:])
+                turn = [key, row.player_id, 0, False]
+            turn[2] += row.actual_score
+            turn[3] = turn[3] or bool(row.is_bust)
+        if turn is not None:
+            end_turn(*turn[1:])
+    return stats
+
+
+def run(throws=10_000_000, players=200, chunk_size=CHUNK_SIZE):
+    """Seed the database and print the throughput of both implementations"""
+    with tempfile.TemporaryDirectory() as directory:
+        service = DatabaseService(f"sqlite:///{directory}/bench.db")
+        service.initialize_database()
+        start = time.perf_counter()
+        player_ids = seed(service, throws, players)
+        print(
+            f"Seeded {throws:,} throws of {players} players in {time.perf_counter() - start:.1f}s",
+        )
+        print("Analytics benchmark")
+        print("-" * 60)
+
+        start = time.perf_counter()
+        for _chunk in stream_throws(service.db_manager, player_ids, chunk_size=chunk_size):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"stream only               {elapsed:8.2f}s | {throws / elapsed:12,.0f} throws/s")
+
+        start = time.perf_counter()
+        report = analyze_throws(service.db_manager, player_ids, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        label = f"numpy (chunks of {chunk_size:,})"
+        print(f"{label:25s} {elapsed:8.2f}s | {throws / elapsed:12,.0f} throws/s")
+
+        start = time.perf_counter()
+        reference = python_report(service, player_ids)
+        elapsed = time.perf_counter() - start
+        print(f"python (per row)          {elapsed:8.2f}s | {throws / elapsed:12,.0f} throws/s")
+
+        for player_id, player in reference.items():
+            for key in ("heatmap", "turn_totals", "double_attempts", "double_hits"):
+                assert report[player_id][key] == player[key], (player_id, key)
+            assert report[player_id]["longest_streak"] == player["longest_streak"], player_id
+        print("Reports match")
+        service.db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    run(*args)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Token validation benchmark for the web app and the API gateway
+
+Starts the local IdP stand-in (local_idp.py) and validates its tokens from
+concurrent threads through auth.validate_token and
+api_gateway.validate_jwt_token in three modes:
+
+    jwks           signature check against the kid-indexed key store
+    introspection  one /oauth2/introspect call per validation
+    cached         introspection behind the token validation cache
+
+No WSO2 IS or RabbitMQ is needed.
+
+Usage:
+    python benchmarks/bench_auth.py [calls] [threads] [idp_latency_ms]
+"""
+
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["RABBITMQ_TRANSPORT"] = "memory"
+
+import api_gateway
+import auth
+from idp_client import IdPClient
+from jwks_store import JWKSKeyStore
+from local_idp import LocalIdP, LocalIdPServer
+from token_cache import TokenCache
+
+MODES = ("jwks", "introspection", "cached")
+TARGETS = {
+    "app": (auth, auth.validate_token),
+    "gateway": (api_gateway, api_gateway.validate_jwt_token),
+}
+# Distinct tokens in rotation, like a handful of boards and browsers
+TOKENS = 20
+
+
+def measure(module, validate, mode, base_url, *, tokens, calls, threads):
+    """Return (latencies, wall_seconds) for one target and mode"""
+    http = IdPClient(pool_size=threads, retries=0)
+    store = JWKSKeyStore(f"{base_url}/oauth2/jwks", http=http)
+    overrides = {
+        "JWT_VALIDATION_MODE": "jwks" if mode == "jwks" else "introspection",
+        "WSO2_IS_INTROSPECT_URL": f"{base_url}/oauth2/introspect",
+        "idp_client": http,
+        "jwks_client": store,
+        "token_cache": TokenCache(f"bench-{mode}", enabled=mode == "cached"),
+    }
+    latencies = []
+    lock = threading.Lock()
+    per_thread = calls // threads
+
+    def worker(offset):
+        local = []
+        for i in range(per_thread):
+            token = tokens[(offset + i) % len(tokens)]
+            start = time.perf_counter()
+            if validate(token) is None:
+                raise RuntimeError(f"{mode}: token rejected")
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    with patch.multiple(module, **overrides):
+        # Warm the key set and the connection pool outside the timing
+        validate(tokens[0])
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        wall_start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        wall = time.perf_counter() - wall_start
+
+    store.stop()
+    http.close()
+    return latencies, wall
+
+
+def run(calls=2000, threads=8, latency_ms=2.0):
+    """Benchmark every target and mode against one local IdP"""
+    logging.disable(logging.INFO)
+    idp = LocalIdP(latency=latency_ms / 1000)
+    tokens = [idp.issue_token(f"user-{n}", roles=("player",)) for n in range(TOKENS)]
+
+    print(f"{calls} validations, {threads} threads, IdP latency {latency_ms:.1f} ms")
+    print(
+        f"{'target':<8} {'mode':<14} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'IdP calls':>10}",
+    )
+    with LocalIdPServer(idp) as server:
+        for target, (module, validate) in TARGETS.items():
+            for mode in MODES:
+                before = sum(idp.requests.values())
+                latencies, wall = measure(
+                    module,
+                    validate,
+                    mode,
+                    server.url,
+                    tokens=tokens,
+                    calls=calls,
+                    threads=threads,
+                )
+                latencies.sort()
+                p99 = latencies[int(len(latencies) * 0.99) - 1]
+                print(
+                    f"{target:<8} {mode:<14} {len(latencies) / wall:>9.0f} "
+                    f"{statistics.median(latencies) * 1000:>8.3f} {p99 * 1000:>8.3f} "
+                    f"{sum(idp.requests.values()) - before:>10}",
+                )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(
+        calls=int(args[0]) if len(args) > 0 else 2000,
+        threads=int(args[1]) if len(args) > 1 else 8,
+        latency_ms=float(args[2]) if len(args) > 2 else 2.0,
+    )
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Latency and CPU benchmark for the threaded and asyncio score consumers
+
+Publishes score messages to the in-memory broker from the main thread and
+measures publish-to-callback latency and process CPU time for each consumer.
+The in-memory transport is used so no RabbitMQ is needed; against a real
+broker run with RABBITMQ_TRANSPORT=pika and aio-pika installed.
+
+Usage:
+    python benchmarks/bench_consumer.py [messages] [interval_ms]
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rabbitmq_consumer import RabbitMQConsumer
+from rabbitmq_consumer_async import AsyncRabbitMQConsumer
+from score_codec import encode_message
+
+CONFIG = {
+    "host": "localhost",
+    "port": 5672,
+    "user": "guest",
+    "password": "guest",
+    "vhost": "/",
+    "exchange": "darts_exchange",
+    "topic": "darts.scores.#",
+    "transport": os.getenv("RABBITMQ_TRANSPORT", "memory"),
+}
+
+
+def measure(consumer_class, messages, interval):
+    """Return (latencies, cpu_seconds, wall_seconds) for one consumer"""
+    latencies = []
+    done = threading.Event()
+
+    def on_score(message):
+        latencies.append(time.perf_counter() - message["sent"])
+        if len(latencies) == messages:
+            done.set()
+
+    consumer = consumer_class(CONFIG, on_score)
+    thread = threading.Thread(target=consumer.start, daemon=True)
+    thread.start()
+    while consumer.connection is None:
+        time.sleep(0.001)
+    # Let the consumer bind its queue before publishing
+    time.sleep(0.05)
+
+    channel = consumer.transport.connect(CONFIG).channel()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(messages):
+        message = {"score": 20, "multiplier": "TRIPLE", "sent": time.perf_counter()}
+        body, _content_type = encode_message(message)
+        channel.basic_publish(CONFIG["exchange"], "darts.scores.api", body)
+        if interval:
+            time.sleep(interval)
+    done.wait(timeout=60)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    consumer.stop()
+    thread.join(timeout=5)
+    return sorted(latencies), cpu, wall
+
+
+def run(messages=5000, interval_ms=0.0):
+    """Run the benchmark for both consumers and print a comparison"""
+    print(f"Consumer benchmark ({messages:,} messages, {interval_ms:g} ms apart)")
+    print("-" * 60)
+    for name, consumer_class in (
+        ("threaded", RabbitMQConsumer),
+        ("asyncio", AsyncRabbitMQConsumer),
+    ):
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, cpu, wall = measure(consumer_class, messages, interval_ms / 1000)
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+        print(
+            f"{name:8s} | {len(latencies) / wall:9.0f} msg/s | "
+            f"p50 {statistics.median(latencies) * 1000:7.3f} ms | "
+            f"p99 {p99 * 1000:7.3f} ms | "
+            f"cpu {cpu / max(len(latencies), 1) * 1e6:6.1f} us/msg",
+        )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.0,
+    )
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the Flask and ASGI API gateways
+
+Posts scores to api_gateway (one thread per concurrent client, as under a
+threaded WSGI server) and to api_gateway_async (one task per client on a
+single event loop). Tokens are introspected at the local IdP stand-in with
+the token cache off, so every request waits on the IdP; messages go to the
+in-memory broker. Reports requests/sec and p50/p99 latency.
+
+The ASGI gateway introspects with httpx when it is installed and falls back
+to a worker thread otherwise, which limits its advantage.
+
+Usage:
+    python benchmarks/bench_gateway.py [requests] [concurrency] [idp_latency_ms]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["RABBITMQ_TRANSPORT"] = "memory"
+# One client posts every score; measure the gateways, not the rate limiter
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import api_gateway
+import api_gateway_async
+from idp_client import IdPClient
+from local_idp import LocalIdP, LocalIdPServer
+from token_cache import TokenCache
+
+THROW = {"score": 20, "multiplier": "TRIPLE"}
+
+
+def idp_overrides(base_url, concurrency):
+    """Module attributes pointing a gateway at the local IdP"""
+    return {
+        "JWT_VALIDATION_MODE": "introspection",
+        "WSO2_IS_INTROSPECT_URL": f"{base_url}/oauth2/introspect",
+        "idp_client": IdPClient(pool_size=concurrency, retries=0),
+        "token_cache": TokenCache("bench", enabled=False),
+    }
+
+
+def run_flask(token, requests, concurrency):
+    """Return (latencies, wall_seconds) for the Flask gateway"""
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        with api_gateway.app.test_client() as client:
+            for _ in range(requests // concurrency):
+                start = time.perf_counter()
+                response = client.post("/api/v1/scores", json=THROW, headers=headers)
+                local.append(time.perf_counter() - start)
+                if response.status_code != 201:
+                    raise RuntimeError(f"Flask gateway returned {response.status_code}")
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - wall_start
+
+
+async def _asgi_post(token):
+    body = json.dumps(THROW).encode()
+    events = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return events.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/scores",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+    }
+    await api_gateway_async.app(scope, receive, send)
+    return sent[0]["status"]
+
+
+def run_asgi(token, requests, concurrency):
+    """Return (latencies, wall_seconds) for the ASGI gateway"""
+    latencies = []
+
+    async def worker():
+        for _ in range(requests // concurrency):
+            start = time.perf_counter()
+            status = await _asgi_post(token)
+            latencies.append(time.perf_counter() - start)
+            if status != 201:
+                raise RuntimeError(f"ASGI gateway returned {status}")
+
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    wall_start = time.perf_counter()
+    asyncio.run(main())
+    return latencies, time.perf_counter() - wall_start
+
+
+def report(name, latencies, wall):
+    """Print one result line"""
+    latencies.sort()
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    print(
+        f"{name:<6} {len(latencies) / wall:>9.0f} "
+        f"{statistics.median(latencies) * 1000:>8.2f} {p99 * 1000:>8.2f}",
+    )
+
+
+def run(requests=2000, concurrency=32, latency_ms=10.0):
+    """Benchmark both gateways against one local IdP"""
+    logging.disable(logging.WARNING)
+    idp = LocalIdP(latency=latency_ms / 1000)
+    token = idp.issue_token("bench-board", scope="score:write")
+
+    print(
+        f"{requests} requests, {concurrency} concurrent clients, "
+        f"IdP latency {latency_ms:.1f} ms, httpx: {api_gateway_async.HTTPX_AVAILABLE}",
+    )
+    print(f"{'':<6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    with LocalIdPServer(idp) as server:
+        with patch.multiple(api_gateway, **idp_overrides(server.url, concurrency)):
+            report("flask", *run_flask(token, requests, concurrency))
+        with patch.multiple(api_gateway_async, **idp_overrides(server.url, concurrency)):
+            report("asgi", *run_asgi(token, requests, concurrency))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(
+        requests=int(args[0]) if len(args) > 0 else 2000,
+        concurrency=int(args[1]) if len(args) > 1 else 32,
+        latency_ms=float(args[2]) if len(args) > 2 else 10.0,
+    )
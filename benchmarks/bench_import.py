@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Bulk import benchmark
+
+Generates a JSONL log of finished 501 games in the replay format, then loads
+it into a fresh SQLite database with history_import.import_history and
+replays a sample of the same games through the game commands
+(start_new_game, record_throw, update_player_score, mark_winner), which is
+how history was loaded before. Reports rows/s and throws/s of both.
+
+Usage:
+    python benchmarks/bench_import.py [games] [players] [turns] [command_games]
+"""
+
+import contextlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database_service import DatabaseService
+from history_import import import_history
+
+MULTIPLIERS = {1: "SINGLE", 2: "DOUBLE", 3: "TRIPLE"}
+
+
+def generate(games, players, turns):
+    """Replay documents of finished 501 games with random throws"""
+    rng = random.Random(1)
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for game in range(games):
+        game_start = started + timedelta(minutes=game * 20)
+        names = rng.sample(range(players * 10), players)
+        winner = rng.randrange(players)
+        throws = []
+        for order in range(players):
+            score = 501
+            for turn in range(1, turns + 1):
+                for throw_in_turn in (1, 2, 3):
+                    base_score = rng.choice((20, 20, 20, 1, 5, 19, 0))
+                    multiplier_value = rng.choice((1, 1, 3)) if base_score else 1
+                    points = min(base_score * multiplier_value, score - 2)
+                    throws.append(
+                        {
+                            "player_order": order,
+                            "throw_sequence": (turn - 1) * 3 + throw_in_turn,
+                            "turn_number": turn,
+                            "throw_in_turn": throw_in_turn,
+                            "base_score": base_score,
+                            "multiplier": MULTIPLIERS[multiplier_value],
+                            "multiplier_value": multiplier_value,
+                            "actual_score": points,
+                            "score_before": score,
+                            "score_after": score - points,
+                            "dartboard_sends_actual_score": False,
+                            "is_bust": False,
+                            "is_finish": False,
+                            "thrown_at": (game_start + timedelta(seconds=len(throws))).isoformat(),
+                        },
+                    )
+                    score -= points
+        yield {
+            "game_session_id": f"venue-{game}",
+            "game_type": "501",
+            "double_out_enabled": False,
+            "started_at": game_start.isoformat(),
+            "finished_at": (game_start + timedelta(minutes=15)).isoformat(),
+            "players": [
+                {
+                    "player_order": order,
+                    "player_name": f"Player {name}",
+                    "start_score": 501,
+                    "final_score": 0 if order == winner else 101,
+                    "is_winner": order == winner,
+                }
+                for order, name in enumerate(names)
+            ],
+            "throws": throws,
+        }
+
+
+def replay_commands(service, documents):
+    """Load games through the game commands, one write per call"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for document in documents:
+            service.start_new_game(
+                document["game_type"],
+                [player["player_name"] for player in document["players"]],
+                start_score=501,
+            )
+            for throw in document["throws"]:
+                service.record_throw(
+                    player_id=throw["player_order"],
+                    **{
+                        key: value
+                        for key, value in throw.items()
+                        if key not in {"player_order", "throw_sequence", "thrown_at"}
+                    },
+                )
+            for player in document["players"]:
+                service.update_player_score(player["player_order"], player["final_score"])
+            winner = next(player for player in document["players"] if player["is_winner"])
+            service.mark_winner(winner["player_order"])
+
+
+def run(games=20_000, players=2, turns=20, command_games=200):
+    """Generate the log and print the throughput of both paths"""
+    with tempfile.TemporaryDirectory() as directory:
+        log = Path(directory) / "history.jsonl"
+        with log.open("w") as file:
+            for document in generate(games, players, turns):
+                file.write(json.dumps(document) + "\n")
+        throws = games * players * turns * 3
+        print(f"Generated {games:,} games ({throws:,} throws), {log.stat().st_size:,} bytes")
+        print("Import benchmark")
+        print("-" * 60)
+
+        service = DatabaseService(f"sqlite:///{directory}/import.db")
+        service.initialize_database()
+        start = time.perf_counter()
+        with log.open() as file:
+            counts = import_history(service.db_manager, file)
+        elapsed = time.perf_counter() - start
+        rows = counts["players"] + counts["results"] + counts["throws"]
+        print(
+            f"import_history            {elapsed:8.2f}s | {rows / elapsed:10,.0f} rows/s"
+            f" | {counts['throws'] / elapsed:10,.0f} throws/s",
+        )
+        start = time.perf_counter()
+        service.rebuild_player_stats()
+        service.rebuild_ratings()
+        print(f"  + rebuild stats, ratings {time.perf_counter() - start:7.2f}s")
+        service.db_manager.engine.dispose()
+
+        service = DatabaseService(f"sqlite:///{directory}/commands.db")
+        service.initialize_database()
+        sample = list(generate(command_games, players, turns))
+        start = time.perf_counter()
+        replay_commands(service, sample)
+        elapsed = time.perf_counter() - start
+        sample_throws = command_games * players * turns * 3
+        sample_rows = sample_throws + command_games * players
+        print(
+            f"game commands ({command_games} games) {elapsed:6.2f}s"
+            f" | {sample_rows / elapsed:10,.0f} rows/s"
+            f" | {sample_throws / elapsed:10,.0f} throws/s",
+        )
+        service.db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:5]]
+    run(*args)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for the JSON provider
+
+Encodes and decodes the largest documents the app sends, a game replay
+(as returned by get_game_replay_data) and the game state pushed over
+Socket.IO after every dart, with the standard library, Flask's default
+provider and json_provider on each of its backends.
+
+Usage:
+    python benchmarks/bench_json.py [iterations] [throws]
+"""
+
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from games.game_cricket import GameCricket
+from json_provider import BACKEND_ORJSON, BACKEND_STDLIB, ORJSON_AVAILABLE
+
+PLAYERS = ["Alice", "Bob", "Carol", "Dave"]
+
+
+def replay_document(throws):
+    """Replay of a finished 501 game with the given number of throws"""
+    started = datetime(2024, 1, 1, 20, tzinfo=timezone.utc)
+    remaining = dict.fromkeys(range(len(PLAYERS)), 501)
+    documents = []
+    for sequence in range(throws):
+        order = (sequence // 3) % len(PLAYERS)
+        base, multiplier = (20, "TRIPLE") if sequence % 3 else (19, "SINGLE")
+        value = 3 if multiplier == "TRIPLE" else 1
+        before = remaining[order]
+        after = max(before - base * value, 0)
+        remaining[order] = after
+        documents.append(
+            {
+                "player_order": order,
+                "player_name": PLAYERS[order],
+                "throw_sequence": sequence,
+                "turn_number": sequence // (3 * len(PLAYERS)) + 1,
+                "throw_in_turn": sequence % 3 + 1,
+                "base_score": base,
+                "multiplier": multiplier,
+                "multiplier_value": value,
+                "actual_score": base * value,
+                "score_before": before,
+                "score_after": after,
+                "dartboard_sends_actual_score": False,
+                "is_bust": False,
+                "is_finish": after == 0,
+                "thrown_at": (started + timedelta(seconds=sequence * 4)).isoformat(),
+            },
+        )
+    return {
+        "game_session_id": "0f5d3c52-7a4e-4e1c-9d7e-2b1f3c4d5e6f",
+        "game_type": "501",
+        "double_out_enabled": True,
+        "started_at": started.isoformat(),
+        "finished_at": (started + timedelta(seconds=throws * 4)).isoformat(),
+        "players": [
+            {
+                "player_order": order,
+                "player_name": name,
+                "final_score": remaining[order],
+                "is_winner": order == 0,
+            }
+            for order, name in enumerate(PLAYERS)
+        ],
+        "throws": documents,
+    }
+
+
+def game_state_document():
+    """Game state as emitted by GameManager for a four player cricket game"""
+    players = [
+        {"id": index + 1, "name": name, "score": 0, "is_turn": index == 0}
+        for index, name in enumerate(PLAYERS)
+    ]
+    return {
+        "players": players,
+        "current_player": 0,
+        "game_type": "cricket",
+        "is_started": True,
+        "is_paused": False,
+        "is_winner": False,
+        "current_throw": 2,
+        "game_data": GameCricket(players).get_state(),
+    }
+
+
+def serializers():
+    """(name, json_provider backend or None, dumps, loads) for every serializer compared"""
+    flask_provider = DefaultJSONProvider(Flask(__name__))
+    candidates = [
+        ("json", None, json.dumps, json.loads),
+        ("flask default", None, flask_provider.dumps, flask_provider.loads),
+    ]
+    backends = [BACKEND_STDLIB] + ([BACKEND_ORJSON] if ORJSON_AVAILABLE else [])
+    candidates.extend(
+        (f"provider/{backend}", backend, json_provider.dumps_bytes, json_provider.loads)
+        for backend in backends
+    )
+    return candidates
+
+
+def run(iterations=200, throws=300):
+    """Run the benchmark and print per-document timings and sizes"""
+    documents = [
+        (f"replay ({throws} throws)", replay_document(throws)),
+        ("game state (cricket)", game_state_document()),
+    ]
+    print(f"JSON benchmark ({iterations:,} iterations)")
+    if not ORJSON_AVAILABLE:
+        print("orjson is not installed; only the stdlib backend is measured")
+    for label, document in documents:
+        print("-" * 72)
+        print(label)
+        for name, backend, dumps, loads in serializers():
+            with patch("json_provider.BACKEND", backend or json_provider.BACKEND):
+                body = dumps(document)
+                encode_s = timeit.timeit(
+                    lambda dumps=dumps, document=document: dumps(document),
+                    number=iterations,
+                )
+                decode_s = timeit.timeit(
+                    lambda loads=loads, body=body: loads(body),
+                    number=iterations,
+                )
+            print(
+                f"{name:18s} {len(body):7d} bytes | "
+                f"encode {encode_s / iterations * 1e6:9.1f} us | "
+                f"decode {decode_s / iterations * 1e6:9.1f} us",
+            )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 300,
+    )
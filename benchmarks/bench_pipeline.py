@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark for the score pipeline
+
+Posts throws to the API gateway, routes them through the in-memory broker to a
+RabbitMQConsumer running in its own thread, and applies them with GameManager
+(temporary SQLite file, TTS disabled). No RabbitMQ or identity provider is needed.
+
+Usage:
+    python benchmarks/bench_pipeline.py [throws] [batch_size]
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# A file database is shared by the request and consumer threads
+_DB_DIR = tempfile.mkdtemp(prefix="bench_pipeline_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/darts.db"
+os.environ["RABBITMQ_TRANSPORT"] = "memory"
+os.environ["TTS_ENABLED"] = "false"
+# One client posts every throw; measure the pipeline, not the rate limiter
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import api_gateway
+from game_manager import GameManager
+from rabbitmq_consumer import RabbitMQConsumer
+
+HEADERS = {"Authorization": "Bearer benchmark"}
+CLAIMS = {"sub": "bench-board", "scope": "score:write"}
+
+
+def run(throws=2000, batch_size=1):
+    """Push throws through the pipeline and report throughput and latency"""
+    game_manager = GameManager(MagicMock())
+    game_manager.new_game("501", ["Alice", "Bob"])
+
+    applied = threading.Semaphore(0)
+    # The consumer handles messages in publish order, so FIFO lists pair up
+    posted_at = []
+    applied_at = []
+
+    def on_score(message):
+        for throw in message.get("throws", [message]):
+            game_manager.process_score(throw)
+            # Keep the game running: misses never finish a 501 leg
+            if game_manager.is_paused:
+                game_manager.next_player()
+        applied_at.append(time.perf_counter())
+        applied.release()
+
+    config = {**api_gateway.RABBITMQ_CONFIG, "topic": "darts.scores.#", "transport": "memory"}
+    consumer = RabbitMQConsumer(config, on_score)
+    bound = threading.Event()
+    connect = consumer.connect
+
+    def connect_and_signal():
+        queue_name = connect()
+        bound.set()
+        return queue_name
+
+    consumer.connect = connect_and_signal
+    threading.Thread(target=consumer.start, daemon=True).start()
+    bound.wait(timeout=5)
+
+    client = api_gateway.app.test_client()
+    requests = throws // batch_size
+    miss = {"score": 0, "multiplier": "SINGLE"}
+
+    with (
+        patch("api_gateway.validate_jwt_token", return_value=CLAIMS),
+        contextlib.redirect_stdout(io.StringIO()),
+    ):
+        start = time.perf_counter()
+        for _ in range(requests):
+            posted_at.append(time.perf_counter())
+            if batch_size == 1:
+                client.post("/api/v1/scores", json=miss, headers=HEADERS)
+            else:
+                client.post(
+                    "/api/v1/scores:batch",
+                    json={"throws": [miss] * batch_size},
+                    headers=HEADERS,
+                )
+        for _ in range(requests):
+            applied.acquire(timeout=30)
+        elapsed = time.perf_counter() - start
+        consumer.stop()
+
+    latencies = sorted(done - posted for posted, done in zip(posted_at, applied_at, strict=False))
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    print(f"Pipeline benchmark: {throws:,} throws, batch size {batch_size}")
+    print("-" * 60)
+    print(f"throughput : {requests * batch_size / elapsed:10.1f} throws/s")
+    print(f"requests   : {requests / elapsed:10.1f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:10.2f} ms")
+    print(f"latency p99: {p99 * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1,
+    )
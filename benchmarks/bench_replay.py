@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Replay query benchmark
+
+Seeds a SQLite database with a game history, then builds replays with
+DatabaseService.get_game_replay_data and with the previous implementation
+(one Player lookup per result and per throw, throws loaded per result and
+sorted in Python). Reports the time and number of SQL statements per replay.
+
+Usage:
+    python benchmarks/bench_replay.py [games] [players] [darts_per_player] [replays]
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, insert
+
+from database_models import GameResult, GameType, Player, Score
+from database_service import DatabaseService
+
+
+def seed(service, games, players, darts_per_player):
+    """Insert a finished 501 history; returns the game session ids"""
+    session = service.db_manager.get_session()
+    try:
+        game_type_id = session.query(GameType).filter_by(name="501").one().id
+        session.execute(
+            insert(Player),
+            [{"name": f"Player {index}"} for index in range(players * 10)],
+        )
+        session_ids = []
+        started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        result_id = 0
+        for game in range(games):
+            session_id = str(uuid.uuid4())
+            session_ids.append(session_id)
+            game_start = started + timedelta(minutes=game * 20)
+            player_ids = random.sample(range(1, players * 10 + 1), players)
+            results = []
+            scores = []
+            for order, player_id in enumerate(player_ids):
+                result_id += 1
+                results.append(
+                    {
+                        "id": result_id,
+                        "game_type_id": game_type_id,
+                        "player_id": player_id,
+                        "player_order": order,
+                        "start_score": 501,
+                        "final_score": 0 if order == 0 else 101,
+                        "is_winner": order == 0,
+                        "double_out_enabled": False,
+                        "started_at": game_start,
+                        "finished_at": game_start + timedelta(minutes=15),
+                        "game_session_id": session_id,
+                    },
+                )
+                for sequence in range(darts_per_player):
+                    turn, throw_in_turn = divmod(sequence, 3)
+                    scores.append(
+                        {
+                            "game_result_id": result_id,
+                            "player_id": player_id,
+                            "throw_sequence": sequence + 1,
+                            "turn_number": turn + 1,
+                            "throw_in_turn": throw_in_turn + 1,
+                            "base_score": 20,
+                            "multiplier": "SINGLE",
+                            "multiplier_value": 1,
+                            "actual_score": 20,
+                            "score_before": 501 - sequence * 20,
+                            "score_after": 481 - sequence * 20,
+                            "dartboard_sends_actual_score": False,
+                            "is_bust": False,
+                            "is_finish": False,
+                            "thrown_at": game_start
+                            + timedelta(seconds=(turn * players + order) * 30 + throw_in_turn),
+                        },
+                    )
+            session.execute(insert(GameResult), results)
+            session.execute(insert(Score), scores)
+        session.commit()
+        return session_ids
+    finally:
+        session.close()
+
+
+def legacy_replay_data(service, game_session_id):
+    """get_game_replay_data before the joined queries, for comparison"""
+    session = service.db_manager.get_session()
+    try:
+        game_results = session.query(GameResult).filter_by(game_session_id=game_session_id).all()
+        game_type = session.query(GameType).filter_by(id=game_results[0].game_type_id).first()
+        players = []
+        for gr in sorted(game_results, key=lambda x: x.player_order):
+            player = session.query(Player).filter_by(id=gr.player_id).first()
+            players.append({"player_order": gr.player_order, "player_name": player.name})
+        all_throws = []
+        for gr in game_results:
+            throws = (
+                session.query(Score).filter_by(game_result_id=gr.id).order_by(Score.thrown_at).all()
+            )
+            for throw in throws:
+                all_throws.append(
+                    {
+                        "player_order": gr.player_order,
+                        "player_name": session.query(Player)
+                        .filter_by(id=throw.player_id)
+                        .first()
+                        .name,
+                        "actual_score": throw.actual_score,
+                        "thrown_at": throw.thrown_at.isoformat(),
+                    },
+                )
+        all_throws.sort(key=lambda x: x["thrown_at"])
+        return {"game_type": game_type.name, "players": players, "throws": all_throws}
+    finally:
+        session.close()
+
+
+def measure(service, replay, session_ids):
+    """Return (latencies, statements per replay) for a replay function"""
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(service.db_manager.engine, "before_cursor_execute", count)
+    latencies = []
+    try:
+        for session_id in session_ids:
+            start = time.perf_counter()
+            replay(service, session_id)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        event.remove(service.db_manager.engine, "before_cursor_execute", count)
+    return latencies, len(statements) / len(session_ids)
+
+
+def run(games=10_000, players=4, darts_per_player=36, replays=50):
+    """Seed the database and print per-replay timings"""
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as directory:
+        service = DatabaseService(f"sqlite:///{directory}/bench.db")
+        service.initialize_database()
+        start = time.perf_counter()
+        session_ids = seed(service, games, players, darts_per_player)
+        print(
+            f"Seeded {games:,} games, {games * players * darts_per_player:,} throws "
+            f"in {time.perf_counter() - start:.1f}s",
+        )
+        sample = random.sample(session_ids, min(replays, len(session_ids)))
+        print(f"Replay benchmark ({len(sample)} replays)")
+        print("-" * 60)
+        for name, replay in (
+            ("legacy (N+1)", legacy_replay_data),
+            ("joined", DatabaseService.get_game_replay_data),
+        ):
+            latencies, statements = measure(service, replay, sample)
+            print(
+                f"{name:14s} {statements:6.1f} statements | "
+                f"p50 {statistics.median(latencies) * 1000:8.2f} ms | "
+                f"max {max(latencies) * 1000:8.2f} ms",
+            )
+        service.db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:5]]
+    run(*args)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Encode/decode benchmark for score message wire formats
+
+Compares the JSON and compact binary encodings from score_codec on the
+message the API gateway publishes for every dart.
+
+Usage:
+    python benchmarks/bench_score_codec.py [iterations]
+"""
+
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from score_codec import (
+    WIRE_FORMAT_COMPACT,
+    WIRE_FORMAT_JSON,
+    decode_message,
+    encode_message,
+)
+
+SAMPLE_MESSAGE = {
+    "score": 20,
+    "multiplier": "TRIPLE",
+    "player_id": None,
+    "game_id": None,
+    "user": "dartboard-001",
+    "timestamp": datetime.now(timezone.utc).isoformat(),
+}
+
+
+def run(iterations=200_000):
+    """Run the benchmark and print per-message timings and sizes"""
+    print(f"Score codec benchmark ({iterations:,} iterations)")
+    print("-" * 60)
+    for wire_format in (WIRE_FORMAT_JSON, WIRE_FORMAT_COMPACT):
+        body, content_type = encode_message(SAMPLE_MESSAGE, wire_format)
+        encode_s = timeit.timeit(
+            lambda wire_format=wire_format: encode_message(SAMPLE_MESSAGE, wire_format),
+            number=iterations,
+        )
+        decode_s = timeit.timeit(
+            lambda body=body, content_type=content_type: decode_message(body, content_type),
+            number=iterations,
+        )
+        print(
+            f"{wire_format:8s} {len(body):4d} bytes | "
+            f"encode {encode_s / iterations * 1e6:6.2f} us | "
+            f"decode {decode_s / iterations * 1e6:6.2f} us | "
+            f"{content_type}",
+        )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -2,28 +2,58 @@
 Database models for storing game data in PostgreSQL
 """
 
+import os
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
     create_engine,
+    event,
+    insert,
+    select,
+    update,
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from metrics import gauge, histogram
 
 Base = declarative_base()
 
+POOL_CHECKED_OUT = gauge("darts_db_pool_checked_out", "Database connections in use")
+POOL_OVERFLOW = gauge(
+    "darts_db_pool_overflow",
+    "Database connections open beyond the pool size (negative while the pool is filling)",
+)
+POOL_WAIT_SECONDS = histogram(
+    "darts_db_pool_wait_seconds",
+    "Time to obtain a database connection, including connect and pre-ping",
+)
+
 
 class Player(Base):
     """Player table - stores player information"""
 
     __tablename__ = "player"
+    __table_args__ = (
+        # start_new_game looks players up by name
+        Index("ix_player_name", "name"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
@@ -58,6 +88,12 @@ class GameResult(Base):
     """GameResult table - stores information about each game played"""
 
     __tablename__ = "gameresults"
+    __table_args__ = (
+        # Replay, mark_winner and the history join: all results of a game in order
+        Index("ix_gameresults_game_session_id", "game_session_id", "player_order"),
+        # History pages: keyset on the first player's result, index only
+        Index("ix_gameresults_history", "player_order", "started_at", "game_session_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     game_type_id = Column(Integer, ForeignKey("gametype.id"), nullable=False)
@@ -89,6 +125,16 @@ class Score(Base):
     """
 
     __tablename__ = "scores"
+    __table_args__ = (
+        # Throws of a result by sequence (replay join, undo on bust); a
+        # sequence number is used once per result
+        Index(
+            "uq_scores_game_result_id_throw_sequence",
+            "game_result_id",
+            "throw_sequence",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     game_result_id = Column(Integer, ForeignKey("gameresults.id"), nullable=False)
@@ -129,19 +175,206 @@ class Score(Base):
         )
 
 
+class PlayerStats(Base):
+    """
+    PlayerStats table - running statistics per player, game type and month,
+    maintained as throws are written (see player_stats.py)
+    """
+
+    __tablename__ = "player_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "player_id",
+            "game_type_id",
+            "period",
+            name="uq_player_stats_player_game_type_period",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(Integer, ForeignKey("player.id"), nullable=False)
+    game_type_id = Column(Integer, ForeignKey("gametype.id"), nullable=False)
+    period = Column(Date, nullable=False)  # First day of the month games started in
+
+    games_played = Column(Integer, nullable=False, default=0, server_default="0")
+    games_won = Column(Integer, nullable=False, default=0, server_default="0")
+    darts_thrown = Column(Integer, nullable=False, default=0, server_default="0")
+    # x01 points
+    points_scored = Column(Integer, nullable=False, default=0, server_default="0")
+    first9_darts = Column(Integer, nullable=False, default=0, server_default="0")
+    first9_points = Column(Integer, nullable=False, default=0, server_default="0")
+    # Darts thrown at a finish
+    checkout_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    checkouts = Column(Integer, nullable=False, default=0, server_default="0")
+    # Turns of 100 or more
+    ton_plus = Column(Integer, nullable=False, default=0, server_default="0")
+    one_eighties = Column(Integer, nullable=False, default=0, server_default="0")
+    cricket_marks = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return (
+            f"<PlayerStats(player_id={self.player_id}, game_type_id={self.game_type_id}, "
+            f"period={self.period}, darts={self.darts_thrown})>"
+        )
+
+
+class PlayerRating(Base):
+    """
+    PlayerRating table - current rating of each rated player, updated as
+    games finish (see ratings.py)
+    """
+
+    __tablename__ = "player_ratings"
+    __table_args__ = (
+        # Leaderboard pages: keyset on (rating, player_id), read in index order
+        Index("ix_player_ratings_leaderboard", "rating", "player_id"),
+    )
+
+    player_id = Column(Integer, ForeignKey("player.id"), primary_key=True)
+    rating = Column(Float, nullable=False)
+    games_rated = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PlayerRating(player_id={self.player_id}, rating={self.rating:.1f})>"
+
+
+class RatingHistory(Base):
+    """RatingHistory table - one row per player per rated game"""
+
+    __tablename__ = "rating_history"
+    __table_args__ = (
+        # A player's history, newest first
+        Index("ix_rating_history_player_id", "player_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(Integer, ForeignKey("player.id"), nullable=False)
+    game_session_id = Column(String(100), nullable=False)
+    rating_before = Column(Float, nullable=False)
+    rating_after = Column(Float, nullable=False)
+    rated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return (
+            f"<RatingHistory(player_id={self.player_id}, session={self.game_session_id}, "
+            f"rating={self.rating_before:.1f}->{self.rating_after:.1f})>"
+        )
+
+
+class DataVersion(Base):
+    """
+    DataVersion table - one row counting writes made outside the game server
+    (db_manage rebuilds and imports); the server adds it to its ETags
+    """
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<DataVersion(version={self.version})>"
+
+
+# The single row of data_version
+DATA_VERSION_ID = 1
+
+
+def bump_data_version(connection):
+    """
+    Count a write made outside the game server, in the writer's transaction
+
+    Args:
+        connection: Connection or Session of the writing transaction
+    """
+    bumped = connection.execute(
+        update(DataVersion)
+        .where(DataVersion.id == DATA_VERSION_ID)
+        .values(version=DataVersion.version + 1),
+    )
+    if not bumped.rowcount:
+        # Databases created with create_tables() start without the row
+        connection.execute(insert(DataVersion).values(id=DATA_VERSION_ID, version=1))
+
+
+def read_data_version(connection):
+    """Current data_version (0 before the first bump)"""
+    version = connection.execute(
+        select(DataVersion.version).where(DataVersion.id == DATA_VERSION_ID),
+    ).scalar()
+    return version or 0
+
+
 class DatabaseManager:
     """Manager class for database operations"""
 
-    def __init__(self, database_url):
+    def __init__(
+        self,
+        database_url,
+        *,
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=30.0,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        statement_cache_size=500,
+    ):
         """
         Initialize database manager
 
         Args:
             database_url: PostgreSQL connection URL
+            pool_size: Connections kept open in the pool
+            max_overflow: Extra connections opened when the pool is exhausted
+            pool_timeout: Seconds to wait for a connection before failing
+            pool_recycle: Seconds after which a connection is replaced (-1 never)
+            pool_pre_ping: Test connections on checkout and replace dead ones
+            statement_cache_size: Compiled SQL statements cached by the engine
         """
-        self.engine = create_engine(database_url, echo=False)
+        options = {
+            "pool_recycle": pool_recycle,
+            "pool_pre_ping": pool_pre_ping,
+            "query_cache_size": statement_cache_size,
+        }
+        # SQLite (tests, benchmarks) keeps its own single-connection pools
+        url = make_url(database_url)
+        if url.get_backend_name() != "sqlite":
+            options.update(
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+            )
+        elif url.database in {None, "", ":memory:"}:
+            # One in-memory database shared by every thread (the consumer
+            # thread writes game commands), not an empty one per thread
+            options.update(poolclass=StaticPool, connect_args={"check_same_thread": False})
+        self.engine = create_engine(database_url, echo=False, **options)
         self.Session = sessionmaker(bind=self.engine)
 
+        event.listen(self.engine, "checkout", lambda *_args: self._update_pool_metrics())
+        # Fires before the pool takes the connection back
+        event.listen(self.engine, "checkin", lambda *_args: self._update_pool_metrics(returning=1))
+
+    @classmethod
+    def from_env(cls, database_url):
+        """Create a manager with the pool configured from DB_* environment variables"""
+        return cls(
+            database_url,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500")),
+        )
+
+    def _update_pool_metrics(self, returning=0):
+        pool = self.engine.pool
+        if hasattr(pool, "checkedout"):
+            POOL_CHECKED_OUT.set(pool.checkedout() - returning)
+            POOL_OVERFLOW.set(pool.overflow())
+
     def create_tables(self):
         """Create all tables in the database"""
         Base.metadata.create_all(self.engine)
@@ -153,3 +386,31 @@ class DatabaseManager:
     def get_session(self):
         """Get a new database session"""
         return self.Session()
+
+    def connect(self):
+        """Check a connection out of the pool, recording the wait"""
+        start = time.perf_counter()
+        connection = self.engine.connect()
+        POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+        return connection
+
+    @contextmanager
+    def session_scope(self):
+        """
+        Session for one unit of work
+
+        Commits when the block completes, rolls back if it raises and always
+        returns the connection to the pool.
+        """
+        session = self.Session()
+        try:
+            start = time.perf_counter()
+            session.connection()
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -6,19 +6,24 @@ This script provides convenient commands for managing the database,
 including migrations, seeding initial data, and viewing database status.
 """
 
+import argparse
 import datetime
 import os
 import sys
+import time
 from pathlib import Path
 
 # Add current directory to path
-sys.path.insert(0, Path.dirname(Path.abspath(__file__)))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
-from database_models import GameType, Player
+from database_models import DatabaseManager, GameType, Player
+from database_service import DatabaseService
+from history_export import EXTENSIONS, FORMATS, TABLES, export_history, parse_export_date
+from history_import import FORMAT_CSV, FORMAT_JSONL, import_history
 
 # Load environment variables
 load_dotenv()
@@ -85,6 +90,119 @@ def seed_game_types():
         session.close()
 
 
+def rebuild_stats():
+    """Recompute the player_stats aggregate from all recorded games."""
+    try:
+        rows = DatabaseService(DATABASE_URL).rebuild_player_stats()
+        print(f"✓ Rebuilt player statistics ({rows} player/game type/month rows)")
+    except Exception as e:
+        print(f"✗ Error rebuilding player statistics: {e}")
+        sys.exit(1)
+
+
+def rebuild_ratings():
+    """Recompute player ratings and their history from all finished games."""
+    try:
+        games = DatabaseService(DATABASE_URL).rebuild_ratings()
+        print(f"✓ Rebuilt player ratings ({games} rated games)")
+    except Exception as e:
+        print(f"✗ Error rebuilding player ratings: {e}")
+        sys.exit(1)
+
+
+def export(args):
+    """Stream a history table to a CSV, Parquet or Arrow file."""
+    parser = argparse.ArgumentParser(prog="db_manage.py export")
+    parser.add_argument("table", choices=TABLES)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--since", type=parse_export_date, help="games started on/after")
+    parser.add_argument("--until", type=parse_export_date, help="games started before")
+    parser.add_argument("--game-type", help="only this game type (301, 401, 501, cricket)")
+    parser.add_argument("--output", help="file to write ('-' for stdout)")
+    options = parser.parse_args(args)
+    output = options.output or f"{options.table}.{EXTENSIONS[options.format]}"
+
+    db_manager = DatabaseManager.from_env(DATABASE_URL)
+    try:
+        chunks = export_history(
+            db_manager,
+            options.table,
+            options.format,
+            since=options.since,
+            until=options.until,
+            game_type=options.game_type,
+        )
+        if output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+        size = 0
+        with Path(output).open("wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+                size += len(chunk)
+        print(f"✓ Exported {options.table} to {output} ({size:,} bytes)")
+    except Exception as e:
+        print(f"✗ Error exporting {options.table}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db_manager.engine.dispose()
+
+
+def import_games(args):
+    """Bulk load a JSONL or CSV game log, then rebuild statistics and ratings."""
+    parser = argparse.ArgumentParser(prog="db_manage.py import")
+    parser.add_argument("path", help="game log in the replay format ('-' for stdin)")
+    parser.add_argument(
+        "--format",
+        choices=(FORMAT_JSONL, FORMAT_CSV),
+        help="log format (default: from the file extension, else jsonl)",
+    )
+    parser.add_argument("--batch-size", type=int, default=1_000, help="games per batch")
+    options = parser.parse_args(args)
+    import_format = options.format or (
+        FORMAT_CSV if options.path.lower().endswith(".csv") else FORMAT_JSONL
+    )
+
+    service = DatabaseService(DATABASE_URL)
+    try:
+        start = time.perf_counter()
+        if options.path == "-":
+            counts = import_history(
+                service.db_manager,
+                sys.stdin,
+                import_format,
+                batch_size=options.batch_size,
+            )
+        else:
+            with Path(options.path).open(newline="", encoding="utf-8") as file:
+                counts = import_history(
+                    service.db_manager,
+                    file,
+                    import_format,
+                    batch_size=options.batch_size,
+                )
+        elapsed = time.perf_counter() - start
+        rows = counts["players"] + counts["results"] + counts["throws"]
+        print(
+            f"✓ Imported {counts['games']:,} games in {elapsed:.1f}s "
+            f"({rows:,} rows, {rows / max(elapsed, 1e-9):,.0f} rows/s)",
+        )
+        print(
+            f"  {counts['players']:,} new players, {counts['results']:,} game results, "
+            f"{counts['throws']:,} throws; {counts['skipped']:,} games already imported",
+        )
+        if counts["games"]:
+            stats = service.rebuild_player_stats()
+            games = service.rebuild_ratings()
+            print(f"✓ Rebuilt player statistics ({stats} rows) and ratings ({games} rated games)")
+    except Exception as e:
+        print(f"✗ Error importing {options.path}: {e}")
+        sys.exit(1)
+    finally:
+        service.db_manager.engine.dispose()
+
+
 def show_status():
     """Show database connection status and table information."""
     try:
@@ -189,13 +307,25 @@ Database Management Script
 Usage: python db_manage.py <command>
 
 Commands:
-  status      Show database connection status and statistics
-  seed        Seed the database with initial game types
-  help        Show this help message
+  status          Show database connection status and statistics
+  seed            Seed the database with initial game types
+  rebuild-stats   Recompute player statistics from recorded games
+                  (after upgrading, or if they drifted; run between games)
+  rebuild-ratings Recompute player ratings from finished games
+                  (after upgrading; run between games)
+  export          Stream gameresults or scores to a CSV, Parquet or Arrow
+                  file (see: python db_manage.py export --help)
+  import          Bulk load a JSONL or CSV game log in the replay format
+                  (see: python db_manage.py import --help; run between games)
+  help            Show this help message
 
 Examples:
   python db_manage.py status
   python db_manage.py seed
+  python db_manage.py rebuild-stats
+  python db_manage.py rebuild-ratings
+  python db_manage.py export scores --format parquet --since 2024-01-01 --game-type 501
+  python db_manage.py import venue-history.jsonl
 For migration commands, use Alembic directly:
   alembic current           # Show current migration
   alembic history           # Show migration history
@@ -217,6 +347,14 @@ def main():
         show_status()
     elif command == "seed":
         seed_game_types()
+    elif command == "rebuild-stats":
+        rebuild_stats()
+    elif command == "rebuild-ratings":
+        rebuild_ratings()
+    elif command == "export":
+        export(sys.argv[2:])
+    elif command == "import":
+        import_games(sys.argv[2:])
     elif command == "help":
         show_help()
     else:
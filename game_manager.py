@@ -1,13 +1,40 @@
 """Game Manager for handling game logic."""
 
 import base64
+import copy
+import itertools
 import os
 
 from database_service import DatabaseService
 from games.game_301 import Game301
 from games.game_cricket import GameCricket
+from live_events import LiveEventBuffer
+from metrics import histogram
 from tts_service import TTSService
 
+PROCESS_SCORE_SECONDS = histogram(
+    "darts_process_score_seconds",
+    "Time to apply one throw to the game, excluding the game state broadcast",
+)
+DB_WRITE_SECONDS = histogram(
+    "darts_db_write_seconds",
+    "Duration of game database writes",
+    ("operation",),
+)
+TTS_SECONDS = histogram("darts_tts_seconds", "Text-to-speech synthesis duration")
+EMIT_SECONDS = histogram("darts_emit_seconds", "Socket.IO emit duration", ("event",))
+
+# Game state a command may change; restored if applying the command fails
+COMMAND_STATE = (
+    "game",
+    "current_player",
+    "current_throw",
+    "is_paused",
+    "is_winner",
+    "turn_throws",
+    "turn_number",
+)
+
 
 class GameManager:
     """Manages game state and logic"""
@@ -37,6 +64,24 @@ class GameManager:
         self.turn_start_state = None  # Game state at start of turn
         self.turn_number = {}  # Track turn number per player
 
+        # Set while a batch of throws is applied so game_state is broadcast once
+        self._suppress_state_emits = False
+
+        # Database writes and client effects queued while a game command is
+        # applied (see _run_command); None outside a command
+        self._pending_writes = None
+        self._pending_effects = None
+
+        # Increases whenever the game state changes (see _emit_game_state);
+        # used as the ETag of /api/game/state
+        self.state_version = 0
+        self._state_versions = itertools.count(1)
+
+        # Recent game_state and throw events for SSE and long-poll clients
+        self.live_events = LiveEventBuffer(
+            max_events=int(os.getenv("LIVE_EVENTS_BUFFER_SIZE", "256")),
+        )
+
         # Initialize database service
         self.db_service = DatabaseService()
         try:
@@ -124,12 +169,13 @@ class GameManager:
         # Start new game in database
         try:
             player_name_list = [p["name"] for p in self.players]
-            self.db_service.start_new_game(
-                game_type_name=self.game_type,
-                player_names=player_name_list,
-                start_score=self.start_score if self.game_type != "cricket" else None,
-                double_out=double_out,
-            )
+            with DB_WRITE_SECONDS.labels("start_new_game").time():
+                self.db_service.start_new_game(
+                    game_type_name=self.game_type,
+                    player_names=player_name_list,
+                    start_score=self.start_score if self.game_type != "cricket" else None,
+                    double_out=double_out,
+                )
             print(f"Game started in database: session_id={self.db_service.current_game_session_id}")
         except Exception as e:
             print(f"Warning: Could not start game in database: {e}")
@@ -192,18 +238,142 @@ class GameManager:
             print(f"Player removed: {removed_player['name']}")
 
     def process_score(self, score_data):
+        with PROCESS_SCORE_SECONDS.time():
+            applied = self._run_command(self._apply_score, score_data)
+        if applied:
+            self._emit_game_state()
+
+    def process_scores(self, score_list):
+        """
+        Apply an ordered batch of throws with a single game state broadcast
+
+        Throws arriving while the game is paused (end of turn, bust, winner)
+        are ignored exactly as they would be when submitted one at a time.
+
+        Args:
+            score_list: List of score dictionaries, applied in order
+
+        Returns:
+            Number of throws applied to the game
+        """
+        self._suppress_state_emits = True
+        try:
+            # One transaction for the whole batch
+            applied = self._run_command(self._apply_scores, score_list)
+        finally:
+            self._suppress_state_emits = False
+
+        self._emit_game_state()
+        print(f"Score batch processed: {applied}/{len(score_list)} throws applied")
+        return applied
+
+    def _run_command(self, apply, *args):
+        """
+        Apply a game command, commit its database writes, then notify clients
+
+        Writes are queued while the command runs and committed together in
+        one unit of work afterwards, so no connection is held during game
+        logic. Client effects (Socket.IO events, TTS, live events) are sent
+        only after the commit. If a write or the commit fails, the writes
+        are rolled back and logged, and the game keeps the command's state,
+        so the game stays playable while the database is down. If applying
+        the command fails, the game is restored to its state before it and
+        the error is raised.
+
+        Args:
+            apply: Method applying the command to the game
+            *args: Arguments of apply
+
+        Returns:
+            The result of apply
+        """
+        snapshot = copy.deepcopy({name: getattr(self, name) for name in COMMAND_STATE})
+        self._pending_writes, self._pending_effects = [], []
+        try:
+            result = apply(*args)
+            writes, effects = self._pending_writes, self._pending_effects
+        except Exception:
+            for name, value in snapshot.items():
+                setattr(self, name, value)
+            raise
+        finally:
+            self._pending_writes = self._pending_effects = None
+
+        if writes:
+            try:
+                with self.db_service.unit_of_work():
+                    for operation, write, write_args, write_kwargs in writes:
+                        self._write(operation, write, *write_args, **write_kwargs)
+            except Exception as e:
+                print(f"Warning: Could not save throw to database: {e}")
+
+        for effect, effect_args in effects:
+            effect(*effect_args)
+        return result
+
+    def _write(self, operation, write, *args, **kwargs):
+        """
+        Run a database write, or queue it while a game command is applied
+
+        Args:
+            operation: Label of the darts_db_write_seconds histogram
+            write: DatabaseService method
+            *args, **kwargs: Arguments of write
+        """
+        if self._pending_writes is not None:
+            self._pending_writes.append((operation, write, args, kwargs))
+            return
+        with DB_WRITE_SECONDS.labels(operation).time():
+            write(*args, **kwargs)
+
+    def _deferred(self, effect, *args):
+        """
+        Queue a client effect while a game command is applied
+
+        Returns:
+            True if the effect was queued, False if it should run now
+        """
+        if self._pending_effects is None:
+            return False
+        self._pending_effects.append((effect, args))
+        return True
+
+    def _apply_scores(self, score_list):
+        """
+        Apply an ordered batch of throws
+
+        Returns:
+            Number of throws applied to the game
+        """
+        applied = 0
+        for score_data in score_list:
+            with PROCESS_SCORE_SECONDS.time():
+                if self._apply_score(score_data):
+                    applied += 1
+        return applied
+
+    def _apply_score(self, score_data):
+        """
+        Apply a single throw to the game without broadcasting the final state
+
+        Args:
+            score_data: Score dictionary with 'score' and 'multiplier'
+
+        Returns:
+            True if the throw was applied, False if it was ignored
+        """
         if not self.is_started or self.is_paused:
             print("Game not active, ignoring score")
-            return
+            return False
 
         if not isinstance(score_data, dict):
             print("Invalid score_data: must be a dictionary, ignoring score")
-            return
+            return False
 
         base_score, multiplier = self._parse_score_data(score_data)
 
         if not self._is_valid_score(base_score):
-            return
+            return False
 
         # Convert multiplier string to numeric value
         multiplier_map = {
@@ -248,10 +418,22 @@ class GameManager:
 
         # Get score after throw
         score_after = self._get_player_current_score(self.current_player)
+        self._publish_live_event(
+            "throw",
+            {
+                "player": self.current_player,
+                "base_score": base_score,
+                "multiplier": multiplier,
+                "actual_score": actual_score,
+                "score_before": score_before,
+                "score_after": score_after,
+                "bust": bool(result and result.get("bust")),
+                "winner": bool(result and result.get("winner")),
+            },
+        )
 
         # Handle game events
         if result:
-
             # Emit throw effects
             self._emit_throw_effects(multiplier, base_score, actual_score)
 
@@ -280,8 +462,8 @@ class GameManager:
                 if self.current_throw > self.throws_per_turn:
                     self._end_turn()
 
-        self._emit_game_state()
         print(f"Score processed: {base_score} {multiplier}")
+        return True
 
     def _parse_score_data(self, score_data):
         base_score_raw = score_data.get("score")
@@ -397,10 +579,12 @@ class GameManager:
         # Undo throws in database (except the bust throw which we just recorded)
         throw_count = len(self.turn_throws) - 1
         if throw_count > 0:
-            try:
-                self.db_service.undo_throws_for_bust(self.current_player, throw_count)
-            except Exception as e:
-                print(f"Warning: Could not undo throws in database: {e}")
+            self._write(
+                "undo_throws_for_bust",
+                self.db_service.undo_throws_for_bust,
+                self.current_player,
+                throw_count,
+            )
 
         # Restore game state to beginning of turn
         self._restore_turn_start_state()
@@ -433,10 +617,7 @@ class GameManager:
             )
 
         # Mark winner in database
-        try:
-            self.db_service.mark_winner(player_id)
-        except Exception as e:
-            print(f"Warning: Could not mark winner in database: {e}")
+        self._write("mark_winner", self.db_service.mark_winner, player_id)
 
         self.is_winner = True
         self.is_paused = True
@@ -453,11 +634,13 @@ class GameManager:
     def _end_turn(self):
         """End the current turn"""
         # Update player score in database after turn completes
-        try:
-            current_score = self._get_player_current_score(self.current_player)
-            self.db_service.update_player_score(self.current_player, current_score)
-        except Exception as e:
-            print(f"Warning: Could not update player score in database: {e}")
+        current_score = self._get_player_current_score(self.current_player)
+        self._write(
+            "update_player_score",
+            self.db_service.update_player_score,
+            self.current_player,
+            current_score,
+        )
 
         # Increment turn number for next turn
         if self.current_player in self.turn_number:
@@ -504,9 +687,28 @@ class GameManager:
         except ValueError:
             return 0
 
+    def _emit(self, event, data):
+        """Emit an event to all clients, timing the broadcast"""
+        if self._deferred(self._emit, event, data):
+            return
+        with EMIT_SECONDS.labels(event).time():
+            self.socketio.emit(event, data, namespace="/")
+
     def _emit_game_state(self):
         """Emit game state to all clients"""
-        self.socketio.emit("game_state", self.get_game_state(), namespace="/")
+        # Every state change ends here, including throws of a batch
+        self.state_version = next(self._state_versions)
+        if self._suppress_state_emits:
+            return
+        state = self.get_game_state()
+        self._publish_live_event("game_state", state)
+        self._emit("game_state", state)
+
+    def _publish_live_event(self, event, data):
+        """Publish an event to SSE and long-poll clients"""
+        if self._deferred(self._publish_live_event, event, data):
+            return
+        self.live_events.publish(event, data)
 
     def _emit_sound(self, sound, text=None):
         """
@@ -516,41 +718,42 @@ class GameManager:
             sound: Sound identifier
             text: Optional text to speak via TTS
         """
-        self.socketio.emit("play_sound", {"sound": sound}, namespace="/")
+        # TTS synthesis runs after the command's writes commit
+        if self._deferred(self._emit_sound, sound, text):
+            return
+        self._emit("play_sound", {"sound": sound})
 
         # Use TTS if text is provided
         if text and self.tts.is_enabled():
             # Generate audio data for client-side playback
-            audio_data = self.tts.speak(text, generate_audio=True)
+            with TTS_SECONDS.time():
+                audio_data = self.tts.speak(text, generate_audio=True)
             if audio_data:
                 # Encode audio data as base64 for transmission
                 audio_base64 = base64.b64encode(audio_data).decode("utf-8")
-                self.socketio.emit(
+                self._emit(
                     "play_tts",
                     {
                         "audio": audio_base64,
                         "text": text,
                     },
-                    namespace="/",
                 )
 
     def _emit_video(self, video, angle):
         """Emit video event"""
-        self.socketio.emit("play_video", {"video": video, "angle": angle}, namespace="/")
+        self._emit("play_video", {"video": video, "angle": angle})
 
     def _emit_message(self, message):
         """Emit message event"""
-        self.socketio.emit("message", {"text": message}, namespace="/")
+        self._emit("message", {"text": message})
 
     def _emit_big_message(self, message):
         """Emit big message event"""
-        self.socketio.emit("big_message", {"text": message}, namespace="/")
+        self._emit("big_message", {"text": message})
 
     def _save_turn_start_state(self):
         """Save the game state at the start of a turn for potential undo"""
         if self.game:
-            import copy
-
             # Deep copy the game state to preserve it
             self.turn_start_state = copy.deepcopy(self.game.get_state())
             print(f"Saved turn start state for player {self.current_player}")
@@ -561,8 +764,6 @@ class GameManager:
             print("No turn start state to restore")
             return
 
-        import copy
-
         # Restore the saved state
         saved_state = copy.deepcopy(self.turn_start_state)
 
@@ -619,28 +820,27 @@ class GameManager:
             is_bust: Whether this throw resulted in a bust
             is_finish: Whether this throw won the game
         """
-        try:
-            # Get dartboard configuration
-            from app import app  # Import here to avoid circular dependency
-
-            dartboard_sends_actual_score = app.config.get("DARTBOARD_SENDS_ACTUAL_SCORE", False)
-
-            # Get current turn number
-            turn_num = self.turn_number.get(self.current_player, 1)
-
-            self.db_service.record_throw(
-                player_id=self.current_player,
-                base_score=base_score,
-                multiplier=multiplier,
-                multiplier_value=multiplier_value,
-                actual_score=actual_score,
-                score_before=score_before,
-                score_after=score_after,
-                turn_number=turn_num,
-                throw_in_turn=self.current_throw,
-                dartboard_sends_actual_score=dartboard_sends_actual_score,
-                is_bust=is_bust,
-                is_finish=is_finish,
-            )
-        except Exception as e:
-            print(f"Warning: Could not record throw in database: {e}")
+        # Get dartboard configuration
+        from app import app  # Import here to avoid circular dependency
+
+        dartboard_sends_actual_score = app.config.get("DARTBOARD_SENDS_ACTUAL_SCORE", False)
+
+        # Get current turn number
+        turn_num = self.turn_number.get(self.current_player, 1)
+
+        self._write(
+            "record_throw",
+            self.db_service.record_throw,
+            player_id=self.current_player,
+            base_score=base_score,
+            multiplier=multiplier,
+            multiplier_value=multiplier_value,
+            actual_score=actual_score,
+            score_before=score_before,
+            score_after=score_after,
+            turn_number=turn_num,
+            throw_in_turn=self.current_throw,
+            dartboard_sends_actual_score=dartboard_sends_actual_score,
+            is_bust=is_bust,
+            is_finish=is_finish,
+        )
@@ -0,0 +1,300 @@
+"""
+Shared pieces of the Flask (api_gateway.py) and ASGI (api_gateway_async.py)
+API gateways: configuration, bearer token parsing, scope checks and the
+request validation and message building behind each endpoint, so both
+implementations keep the same contract
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+from dotenv import load_dotenv
+
+from score_codec import WIRE_FORMAT_JSON
+from score_validation import validate_throw, validate_throws
+
+# Load environment variables
+load_dotenv()
+
+# WSO2 Identity Server Configuration
+WSO2_IS_URL = os.getenv("WSO2_IS_URL", "https://localhost:9443")
+WSO2_IS_JWKS_URL = f"{WSO2_IS_URL}/oauth2/jwks"
+WSO2_IS_INTROSPECT_URL = f"{WSO2_IS_URL}/oauth2/introspect"
+WSO2_IS_CLIENT_ID = os.getenv("WSO2_IS_CLIENT_ID", "")
+WSO2_IS_CLIENT_SECRET = os.getenv("WSO2_IS_CLIENT_SECRET", "")
+
+# Introspection credentials (separate from client credentials)
+WSO2_IS_INTROSPECT_USER = os.getenv("WSO2_IS_INTROSPECT_USER", "admin")
+WSO2_IS_INTROSPECT_PASSWORD = os.getenv("WSO2_IS_INTROSPECT_PASSWORD", "admin")
+WSO2_IS_VERIFY_SSL = os.getenv("WSO2_IS_VERIFY_SSL", "False").lower() == "true"
+
+# RabbitMQ Configuration
+RABBITMQ_CONFIG = {
+    "host": os.getenv("RABBITMQ_HOST", "localhost"),
+    "port": int(os.getenv("RABBITMQ_PORT", 5672)),
+    "user": os.getenv("RABBITMQ_USER", "guest"),
+    "password": os.getenv("RABBITMQ_PASSWORD", "guest"),
+    "vhost": os.getenv("RABBITMQ_VHOST", "/"),
+    "exchange": os.getenv("RABBITMQ_EXCHANGE", "darts_exchange"),
+    # 'json' or 'compact' (binary score layout, see score_codec.py)
+    "wire_format": os.getenv("RABBITMQ_WIRE_FORMAT", WIRE_FORMAT_JSON),
+    # 'pika' (RabbitMQ) or 'memory' (in-process broker, see transport.py)
+    "transport": os.getenv("RABBITMQ_TRANSPORT", "pika"),
+}
+
+# JWT validation mode: 'jwks' or 'introspection'
+JWT_VALIDATION_MODE = os.getenv("JWT_VALIDATION_MODE", "jwks")
+
+# Paths that skip admission control
+ADMISSION_EXEMPT_PATHS = frozenset({"/health", "/metrics"})
+
+# Largest request body accepted; a full score batch is well under this
+MAX_REQUEST_BODY_BYTES = int(os.getenv("GATEWAY_MAX_BODY_BYTES", str(1024 * 1024)))
+
+# Reverse proxies in front of the gateway that append to X-Forwarded-For
+# (1 behind the bundled nginx; 0 when clients connect directly)
+TRUSTED_PROXY_HOPS = int(os.getenv("GATEWAY_TRUSTED_PROXIES", "0"))
+
+ROUTING_KEY_SCORE = "darts.scores.api"
+ROUTING_KEY_SCORE_BATCH = "darts.scores.api.batch"
+ROUTING_KEY_GAME_CREATE = "darts.games.create"
+ROUTING_KEY_PLAYER_ADD = "darts.players.add"
+
+VALID_GAME_TYPES = ["301", "401", "501", "cricket"]
+
+
+class RequestError(Exception):
+    """A request the gateway refuses; body is returned as JSON with status"""
+
+    def __init__(self, body: dict[str, Any], status: int = 400):
+        """Initialize error"""
+        super().__init__(body.get("message", ""))
+        self.body = body
+        self.status = status
+
+
+def payload_too_large() -> dict[str, Any]:
+    """Error body for a request larger than MAX_REQUEST_BODY_BYTES"""
+    return {
+        "error": "Payload too large",
+        "message": f"Request body exceeds {MAX_REQUEST_BODY_BYTES} bytes",
+    }
+
+
+def bearer_token(auth_header: str | None) -> str:
+    """
+    Extract the token from an Authorization header
+
+    Raises:
+        RequestError: 401 when the header is missing or malformed
+    """
+    if not auth_header:
+        raise RequestError(
+            {
+                "error": "Missing Authorization header",
+                "message": "Please provide a valid Bearer token",
+            },
+            401,
+        )
+    parts = auth_header.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        raise RequestError(
+            {
+                "error": "Invalid Authorization header",
+                "message": "Format should be: Bearer <token>",
+            },
+            401,
+        )
+    return parts[1]
+
+
+def require_claims(claims: dict[str, Any] | None) -> dict[str, Any]:
+    """
+    Return the claims of a validated token
+
+    Raises:
+        RequestError: 401 when validation returned no claims
+    """
+    if not claims:
+        raise RequestError(
+            {
+                "error": "Invalid or expired token",
+                "message": "Please obtain a new access token",
+            },
+            401,
+        )
+    return claims
+
+
+def check_scopes(claims: dict[str, Any], required_scopes: list | None):
+    """
+    Check the token grants one of the required scopes
+
+    Raises:
+        RequestError: 403 when none of the scopes is granted
+    """
+    if not required_scopes:
+        return
+    token_scopes = claims.get("scope", "").split()
+    if not any(scope in token_scopes for scope in required_scopes):
+        raise RequestError(
+            {
+                "error": "Insufficient permissions",
+                "message": f"Required scopes: {', '.join(required_scopes)}",
+            },
+            403,
+        )
+
+
+def client_address(peer: str, forwarded_for: str | None, trusted_hops: int) -> str:
+    """
+    Address of the client behind trusted_hops reverse proxies
+
+    Follows werkzeug's ProxyFix(x_for=trusted_hops): each trusted proxy
+    appends the address it received the request from, so the client is
+    trusted_hops entries from the right. Entries further left were sent by
+    the client and are not trusted.
+
+    Args:
+        peer: Address of the direct peer (the nearest proxy)
+        forwarded_for: X-Forwarded-For header value, if any
+        trusted_hops: Number of proxies in front of the gateway
+
+    Returns:
+        The client address, or peer if the header is missing or too short
+    """
+    if not trusted_hops or not forwarded_for:
+        return peer
+    hops = [address.strip() for address in forwarded_for.split(",")]
+    if len(hops) < trusted_hops:
+        return peer
+    return hops[-trusted_hops]
+
+
+def client_key(claims: dict[str, Any]) -> str:
+    """Key for per-client rate limiting"""
+    return claims.get("client_id") or claims.get("sub", "unknown")
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _require_json(data):
+    if not data:
+        raise RequestError({"error": "Invalid request", "message": "Request body must be JSON"})
+
+
+def build_score_message(data, user: str) -> dict[str, Any]:
+    """Validate a single score request and build its message"""
+    throw, error = validate_throw(data)
+    if error:
+        raise RequestError(error)
+    return {
+        "score": throw["score"],
+        "multiplier": throw["multiplier"],
+        "player_id": data.get("player_id"),
+        "game_id": data.get("game_id"),
+        "user": user,
+        "timestamp": _timestamp(),
+    }
+
+
+def build_score_batch_message(data, user: str) -> dict[str, Any]:
+    """Validate a batch request and build one message for the whole batch"""
+    if not isinstance(data, dict):
+        raise RequestError(
+            {
+                "error": "Invalid request",
+                "message": "Request body must be a JSON object with a 'throws' array",
+            },
+        )
+
+    throws, errors = validate_throws(data.get("throws"))
+    if errors:
+        raise RequestError(
+            {
+                "error": "Invalid batch",
+                "message": "One or more throws failed validation",
+                "errors": errors,
+            },
+        )
+
+    # Add metadata once for the whole batch
+    return {
+        "throws": [
+            {
+                "score": throw["score"],
+                "multiplier": throw["multiplier"],
+                "player_id": throw.get("player_id", data.get("player_id")),
+                "game_id": throw.get("game_id", data.get("game_id")),
+            }
+            for throw in throws
+        ],
+        "user": user,
+        "timestamp": _timestamp(),
+    }
+
+
+def build_game_message(data, user: str) -> dict[str, Any]:
+    """Validate a new game request and build its message"""
+    _require_json(data)
+
+    game_type = data.get("game_type", "301")
+    if game_type not in VALID_GAME_TYPES:
+        raise RequestError(
+            {
+                "error": "Invalid game type",
+                "message": f"Game type must be one of: {', '.join(VALID_GAME_TYPES)}",
+            },
+        )
+
+    players = data.get("players", [])
+    if not players or len(players) < 1:
+        raise RequestError(
+            {
+                "error": "Invalid players",
+                "message": "At least one player is required",
+            },
+        )
+
+    return {
+        "action": "new_game",
+        "game_type": game_type,
+        "players": players,
+        "double_out": data.get("double_out", False),
+        "created_by": user,
+        "timestamp": _timestamp(),
+    }
+
+
+def build_player_message(data, user: str) -> dict[str, Any]:
+    """Validate an add player request and build its message"""
+    _require_json(data)
+
+    player_name = data.get("name")
+    if not player_name or not isinstance(player_name, str):
+        raise RequestError(
+            {
+                "error": "Invalid player name",
+                "message": "Player name is required and must be a string",
+            },
+        )
+
+    return {
+        "action": "add_player",
+        "name": player_name,
+        "added_by": user,
+        "timestamp": _timestamp(),
+    }
+
+
+def published(message_text: str, message: dict[str, Any]) -> dict[str, Any]:
+    """Body of a 201 response for a published message"""
+    return {"status": "success", "message": message_text, "data": message}
+
+
+def publish_failed(error: str) -> dict[str, Any]:
+    """Body of a 500 response when the message could not be published"""
+    return {"error": error, "message": "Unable to publish message to queue"}
@@ -0,0 +1,254 @@
+"""
+Streaming export of game history
+Reads gameresults or scores in chunks through a server-side cursor and
+encodes each chunk as it arrives, so an export of any size holds one chunk
+in memory. Used by the /api/export endpoint and `python db_manage.py export`.
+
+Formats:
+- csv: always available
+- parquet: Parquet file, one row group per chunk (requires pyarrow)
+- arrow: Arrow IPC stream, one record batch per chunk (requires pyarrow)
+"""
+
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import select
+
+from database_models import GameResult, GameType, Player, Score
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+
+FORMATS = (FORMAT_CSV, FORMAT_PARQUET, FORMAT_ARROW)
+
+# Content type and file extension per format
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv",
+    FORMAT_PARQUET: "application/vnd.apache.parquet",
+    FORMAT_ARROW: "application/vnd.apache.arrow.stream",
+}
+EXTENSIONS = {FORMAT_CSV: "csv", FORMAT_PARQUET: "parquet", FORMAT_ARROW: "arrows"}
+
+# Rows fetched and encoded per chunk
+CHUNK_SIZE = 50_000
+
+# Exported columns per table: (name, column, Arrow type name)
+TABLE_COLUMNS = {
+    "gameresults": (
+        ("id", GameResult.id, "int64"),
+        ("game_session_id", GameResult.game_session_id, "string"),
+        ("game_type", GameType.name, "string"),
+        ("player_id", GameResult.player_id, "int64"),
+        ("player_name", Player.name, "string"),
+        ("player_order", GameResult.player_order, "int64"),
+        ("start_score", GameResult.start_score, "int64"),
+        ("final_score", GameResult.final_score, "int64"),
+        ("is_winner", GameResult.is_winner, "bool"),
+        ("double_out_enabled", GameResult.double_out_enabled, "bool"),
+        ("started_at", GameResult.started_at, "timestamp"),
+        ("finished_at", GameResult.finished_at, "timestamp"),
+    ),
+    "scores": (
+        ("id", Score.id, "int64"),
+        ("game_result_id", Score.game_result_id, "int64"),
+        ("game_session_id", GameResult.game_session_id, "string"),
+        ("game_type", GameType.name, "string"),
+        ("player_id", Score.player_id, "int64"),
+        ("throw_sequence", Score.throw_sequence, "int64"),
+        ("turn_number", Score.turn_number, "int64"),
+        ("throw_in_turn", Score.throw_in_turn, "int64"),
+        ("base_score", Score.base_score, "int64"),
+        ("multiplier", Score.multiplier, "string"),
+        ("multiplier_value", Score.multiplier_value, "int64"),
+        ("actual_score", Score.actual_score, "int64"),
+        ("score_before", Score.score_before, "int64"),
+        ("score_after", Score.score_after, "int64"),
+        ("dartboard_sends_actual_score", Score.dartboard_sends_actual_score, "bool"),
+        ("is_bust", Score.is_bust, "bool"),
+        ("is_finish", Score.is_finish, "bool"),
+        ("thrown_at", Score.thrown_at, "timestamp"),
+    ),
+}
+
+TABLES = tuple(TABLE_COLUMNS)
+
+
+def check_export(table, export_format):
+    """
+    Validate an export request
+
+    Raises:
+        ValueError: If the table or format is unknown
+        RuntimeError: If the format needs pyarrow and it is not installed
+    """
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Unknown table: {table} (expected one of {', '.join(TABLES)})")
+    if export_format not in FORMATS:
+        raise ValueError(
+            f"Unknown format: {export_format} (expected one of {', '.join(FORMATS)})",
+        )
+    if export_format != FORMAT_CSV and not PYARROW_AVAILABLE:
+        raise RuntimeError(f"Exporting {export_format} requires pyarrow (pip install pyarrow)")
+
+
+def parse_export_date(value):
+    """
+    Parse a YYYY-MM-DD date or ISO 8601 datetime filter
+
+    Raises:
+        ValueError: If the value is neither
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid date: {value} (expected YYYY-MM-DD)") from e
+
+
+def export_query(table, since=None, until=None, game_type=None):
+    """
+    Select the exported columns of a table, oldest game first
+
+    Args:
+        table: 'gameresults' or 'scores'
+        since: Only games started at or after this datetime
+        until: Only games started before this datetime
+        game_type: Only games of this game type name
+    """
+    query = select(*(column.label(name) for name, column, _ in TABLE_COLUMNS[table]))
+    if table == "scores":
+        query = query.select_from(Score).join(GameResult, GameResult.id == Score.game_result_id)
+        order = (Score.game_result_id, Score.throw_sequence)
+    else:
+        query = query.select_from(GameResult).join(Player, Player.id == GameResult.player_id)
+        order = (GameResult.id,)
+    query = query.join(GameType, GameType.id == GameResult.game_type_id)
+    if since is not None:
+        query = query.where(GameResult.started_at >= since)
+    if until is not None:
+        query = query.where(GameResult.started_at < until)
+    if game_type is not None:
+        query = query.where(GameType.name == game_type)
+    return query.order_by(*order)
+
+
+def _chunks(db_manager, query, chunk_size):
+    """Rows of query in lists of at most chunk_size, from a server-side cursor"""
+    with db_manager.connect() as connection:
+        result = connection.execution_options(stream_results=True).execute(query)
+        yield from result.partitions(chunk_size)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream whose contents are taken as they are written"""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+
+    def take(self):
+        """Bytes written since the last take"""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _arrow_schema(table):
+    types = {
+        "int64": pa.int64(),
+        "string": pa.string(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types[kind]) for name, _, kind in TABLE_COLUMNS[table]])
+
+
+def _csv_export(table, chunks):
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(name for name, _, _ in TABLE_COLUMNS[table])
+    for rows in chunks:
+        writer.writerows(rows)
+        yield text.getvalue().encode("utf-8")
+        text.seek(0)
+        text.truncate()
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+
+def _arrow_export(table, chunks, export_format):
+    schema = _arrow_schema(table)
+    sink = _ChunkSink()
+    if export_format == FORMAT_PARQUET:
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for rows in chunks:
+            columns = list(zip(*rows, strict=True)) or [[] for _ in schema]
+            batch = pa.record_batch(
+                [
+                    pa.array(values, type=field.type)
+                    for values, field in zip(columns, schema, strict=True)
+                ],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def export_history(
+    db_manager,
+    table,
+    export_format=FORMAT_CSV,
+    *,
+    since=None,
+    until=None,
+    game_type=None,
+    chunk_size=CHUNK_SIZE,
+):
+    """
+    Stream a table of the game history as an encoded file
+
+    Args:
+        db_manager: DatabaseManager to read from (point it at a replica to
+            keep exports off the primary)
+        table: 'gameresults' or 'scores'
+        export_format: 'csv', 'parquet' or 'arrow'
+        since: Only games started at or after this datetime
+        until: Only games started before this datetime
+        game_type: Only games of this game type name
+        chunk_size: Rows read and encoded at a time
+
+    Returns:
+        Iterator of the file's bytes, one piece per chunk
+
+    Raises:
+        ValueError: If the table or format is unknown
+        RuntimeError: If the format needs pyarrow and it is not installed
+    """
+    check_export(table, export_format)
+    chunks = _chunks(db_manager, export_query(table, since, until, game_type), chunk_size)
+    if export_format == FORMAT_CSV:
+        return _csv_export(table, chunks)
+    return _arrow_export(table, chunks, export_format)
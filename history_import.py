@@ -0,0 +1,477 @@
+"""
+Bulk import of game history
+Loads game logs in the replay format of DatabaseService.get_game_replay_data
+without going through the game commands, for moving the history of another
+venue. Games are validated and written in batches inside one transaction, so
+an invalid file writes nothing: players are resolved by name with one lookup
+and one insert per batch, game results are inserted with executemany, and
+throws are loaded with COPY on PostgreSQL (executemany elsewhere). Used by
+`python db_manage.py import`; player statistics and ratings are rebuilt
+afterwards. The import counts as a write made outside the game server, so
+it bumps the stored data version.
+
+Formats:
+- jsonl: one replay document per line
+- csv: one row per throw, with the columns of its game and player repeated;
+  a player without throws has one row with the throw columns empty. The rows
+  of a game must be contiguous.
+
+A game_session_id may appear only once per file.
+"""
+
+import csv
+import io
+import itertools
+import json
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from database_models import GameResult, GameType, Player, Score, bump_data_version
+from score_validation import MAX_DART_SCORE
+
+FORMAT_JSONL = "jsonl"
+FORMAT_CSV = "csv"
+
+FORMATS = (FORMAT_JSONL, FORMAT_CSV)
+
+# Games validated and written per batch
+BATCH_SIZE = 1_000
+
+# Names looked up per player query
+NAME_LOOKUP_SIZE = 500
+
+# Validation errors listed in the raised ValueError
+MAX_ERRORS = 20
+
+GAME_FIELDS = ("game_session_id", "game_type", "double_out_enabled", "started_at", "finished_at")
+PLAYER_FIELDS = ("player_order", "player_name", "start_score", "final_score", "is_winner")
+THROW_FIELDS = (
+    "throw_sequence",
+    "turn_number",
+    "throw_in_turn",
+    "base_score",
+    "multiplier",
+    "multiplier_value",
+    "actual_score",
+    "score_before",
+    "score_after",
+    "dartboard_sends_actual_score",
+    "is_bust",
+    "is_finish",
+    "thrown_at",
+)
+CSV_COLUMNS = GAME_FIELDS + PLAYER_FIELDS + THROW_FIELDS
+
+# Throw fields stored as integers
+THROW_INTEGERS = (
+    "throw_sequence",
+    "turn_number",
+    "throw_in_turn",
+    "base_score",
+    "multiplier_value",
+    "actual_score",
+    "score_before",
+    "score_after",
+)
+THROW_FLAGS = ("dartboard_sends_actual_score", "is_bust", "is_finish")
+
+# Columns written to scores, in COPY order
+SCORE_COLUMNS = ("game_result_id", "player_id", *THROW_FIELDS)
+
+MULTIPLIER_VALUES = (1, 2, 3)
+MAX_NAME_LENGTH = 100
+
+TRUE_VALUES = ("true", "1", "t", "yes")
+FALSE_VALUES = ("false", "0", "f", "no", "")
+
+
+class _FieldError(ValueError):
+    """A field of an imported game that cannot be stored"""
+
+
+def _integer(value, field, required=True):
+    if type(value) is int:  # JSON logs; not bool
+        return value
+    if value is None or value == "":
+        if required:
+            raise _FieldError(f"{field} is missing")
+        return None
+    if isinstance(value, bool):
+        raise _FieldError(f"{field}: expected an integer, got {value!r}")
+    try:
+        return int(value)
+    except (TypeError, ValueError) as e:
+        raise _FieldError(f"{field}: expected an integer, got {value!r}") from e
+
+
+def _flag(value, field):
+    if value is None or type(value) is bool:
+        return bool(value)
+    if str(value).strip().lower() in TRUE_VALUES:
+        return True
+    if str(value).strip().lower() in FALSE_VALUES:
+        return False
+    raise _FieldError(f"{field}: expected true or false, got {value!r}")
+
+
+def _timestamp(value, field, required=True):
+    if value is None or value == "":
+        if required:
+            raise _FieldError(f"{field} is missing")
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError) as e:
+        raise _FieldError(f"{field}: expected an ISO 8601 timestamp, got {value!r}") from e
+
+
+def _name(value, field):
+    if not isinstance(value, str) or not value.strip():
+        raise _FieldError(f"{field} is missing")
+    if len(value) > MAX_NAME_LENGTH:
+        raise _FieldError(f"{field} is longer than {MAX_NAME_LENGTH} characters")
+    return value
+
+
+def _normalize_game(document, game_types):
+    """
+    Typed copy of a replay document, checked against the schema
+
+    Returns:
+        Tuple of (game, errors); game is None if any field is invalid
+    """
+    if not isinstance(document, dict):
+        return None, ["not a replay document"]
+    errors = []
+
+    def check(convert, *args):
+        try:
+            return convert(*args)
+        except _FieldError as e:
+            errors.append(str(e))
+            return None
+
+    game = {
+        "game_session_id": check(_name, document.get("game_session_id"), "game_session_id"),
+        "game_type": check(_name, document.get("game_type"), "game_type"),
+        "double_out_enabled": check(
+            _flag,
+            document.get("double_out_enabled"),
+            "double_out_enabled",
+        ),
+        "started_at": check(_timestamp, document.get("started_at"), "started_at"),
+        "finished_at": check(_timestamp, document.get("finished_at"), "finished_at", False),
+    }
+    if game["game_type"] is not None and game["game_type"] not in game_types:
+        errors.append(
+            f"game_type: unknown game type {game['game_type']!r} "
+            f"(expected one of {', '.join(sorted(game_types))})",
+        )
+
+    players = document.get("players")
+    if not isinstance(players, list) or not players:
+        errors.append("players: expected a non-empty list")
+        players = []
+    game["players"] = {}
+    for index, player in enumerate(players):
+        if not isinstance(player, dict):
+            errors.append(f"players[{index}]: expected an object")
+            continue
+        order = check(_integer, player.get("player_order"), f"players[{index}].player_order")
+        if order in game["players"]:
+            errors.append(f"players[{index}]: player_order {order} is used twice")
+            continue
+        game["players"][order] = {
+            "player_name": check(_name, player.get("player_name"), f"players[{index}].player_name"),
+            "start_score": check(
+                _integer,
+                player.get("start_score"),
+                f"players[{index}].start_score",
+                False,
+            ),
+            "final_score": check(
+                _integer,
+                player.get("final_score"),
+                f"players[{index}].final_score",
+                False,
+            ),
+            "is_winner": check(_flag, player.get("is_winner"), f"players[{index}].is_winner"),
+        }
+
+    throws = document.get("throws") or []
+    if not isinstance(throws, list):
+        errors.append("throws: expected a list")
+        throws = []
+    game["throws"] = []
+    sequences = set()
+    for index, throw in enumerate(throws):
+        if not isinstance(throw, dict):
+            errors.append(f"throws[{index}]: expected an object")
+            continue
+        field = f"throws[{index}]"
+        row = {name: check(_integer, throw.get(name), f"{field}.{name}") for name in THROW_INTEGERS}
+        row.update({name: check(_flag, throw.get(name), f"{field}.{name}") for name in THROW_FLAGS})
+        row["multiplier"] = check(_name, throw.get("multiplier"), f"{field}.multiplier")
+        row["thrown_at"] = (
+            check(_timestamp, throw.get("thrown_at"), f"{field}.thrown_at", False)
+            or game["started_at"]
+        )
+        order = check(_integer, throw.get("player_order"), f"{field}.player_order")
+        if order is not None and order not in game["players"]:
+            errors.append(f"{field}: player_order {order} is not a player of the game")
+        # The bound of the write path, so every stored throw replays
+        if row["base_score"] is not None and not 0 <= row["base_score"] <= MAX_DART_SCORE:
+            errors.append(
+                f"{field}.base_score: expected 0 to {MAX_DART_SCORE}, got {row['base_score']}",
+            )
+        if row["multiplier_value"] is not None and row["multiplier_value"] not in MULTIPLIER_VALUES:
+            errors.append(f"{field}.multiplier_value: expected 1, 2 or 3")
+        if (order, row["throw_sequence"]) in sequences:
+            errors.append(f"{field}: throw_sequence {row['throw_sequence']} is used twice")
+        sequences.add((order, row["throw_sequence"]))
+        row["player_order"] = order
+        game["throws"].append(row)
+
+    return (None, errors) if errors else (game, [])
+
+
+def _read_jsonl(file):
+    """(line number, replay document) per non-blank line"""
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+def _read_csv(file):
+    """(line number, replay document) per run of rows of one game"""
+    reader = csv.DictReader(file)
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+
+    rows = enumerate(reader, start=2)
+    for _, game_rows in itertools.groupby(rows, key=lambda row: row[1]["game_session_id"]):
+        number, first = next(game_rows)
+        players = {}
+        throws = []
+        for row in itertools.chain([first], (row for _, row in game_rows)):
+            players.setdefault(
+                row["player_order"],
+                {field: row[field] for field in PLAYER_FIELDS},
+            )
+            if row["throw_sequence"]:
+                throws.append(
+                    {"player_order": row["player_order"], **{f: row[f] for f in THROW_FIELDS}},
+                )
+        yield (
+            number,
+            {
+                **{field: first[field] for field in GAME_FIELDS},
+                "players": list(players.values()),
+                "throws": throws,
+            },
+        )
+
+
+def read_games(file, import_format=FORMAT_JSONL):
+    """
+    Replay documents of a game log
+
+    Args:
+        file: Text file of the log
+        import_format: 'jsonl' or 'csv'
+
+    Returns:
+        Iterator of (line number, replay document); documents that are not
+        valid JSON are None
+
+    Raises:
+        ValueError: If the format is unknown or a CSV lacks columns
+    """
+    if import_format not in FORMATS:
+        raise ValueError(
+            f"Unknown format: {import_format} (expected one of {', '.join(FORMATS)})",
+        )
+    if import_format == FORMAT_CSV:
+        return _read_csv(file)
+    return _read_jsonl(file)
+
+
+def _copy_rows(connection, table, columns, rows):
+    """Load rows with PostgreSQL COPY on the connection's transaction"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+class _Loader:
+    """Writes validated games on one connection, resolving players by name"""
+
+    def __init__(self, connection, game_types):
+        self.connection = connection
+        self.game_types = game_types
+        self.player_ids = {}  # Player.name -> Player.id
+        self.copy = connection.dialect.name == "postgresql" and connection.dialect.driver == (
+            "psycopg2"
+        )
+        self.counts = dict.fromkeys(("games", "skipped", "players", "results", "throws"), 0)
+
+    def _resolve_players(self, names):
+        """Look up the ids of new names and insert the players that do not exist"""
+        names = sorted(set(names) - set(self.player_ids))
+        for start in range(0, len(names), NAME_LOOKUP_SIZE):
+            # The oldest player of a name, like start_new_game
+            for player_id, name in self.connection.execute(
+                select(Player.id, Player.name)
+                .where(Player.name.in_(names[start : start + NAME_LOOKUP_SIZE]))
+                .order_by(Player.id),
+            ):
+                self.player_ids.setdefault(name, player_id)
+        added = [name for name in names if name not in self.player_ids]
+        if added:
+            ids = self.connection.execute(
+                insert(Player).returning(Player.id, sort_by_parameter_order=True),
+                [{"name": name} for name in added],
+            ).scalars()
+            self.player_ids.update(zip(added, ids, strict=True))
+            self.counts["players"] += len(added)
+
+    def load(self, games):
+        """Write a batch of games, skipping those already stored"""
+        session_ids = [game["game_session_id"] for game in games]
+        existing = set(
+            self.connection.execute(
+                select(GameResult.game_session_id)
+                .where(GameResult.game_session_id.in_(session_ids))
+                .distinct(),
+            ).scalars(),
+        )
+        new = []
+        for game in games:
+            if game["game_session_id"] in existing:
+                self.counts["skipped"] += 1
+                continue
+            new.append(game)
+        if not new:
+            return
+
+        self._resolve_players(
+            player["player_name"] for game in new for player in game["players"].values()
+        )
+        results = [
+            {
+                "game_type_id": self.game_types[game["game_type"]],
+                "player_id": self.player_ids[player["player_name"]],
+                "player_order": order,
+                "start_score": player["start_score"],
+                "final_score": player["final_score"],
+                "is_winner": player["is_winner"],
+                "double_out_enabled": game["double_out_enabled"],
+                "started_at": game["started_at"],
+                "finished_at": game["finished_at"],
+                "game_session_id": game["game_session_id"],
+            }
+            for game in new
+            for order, player in sorted(game["players"].items())
+        ]
+        result_ids = iter(
+            self.connection.execute(
+                insert(GameResult).returning(GameResult.id, sort_by_parameter_order=True),
+                results,
+            )
+            .scalars()
+            .all(),
+        )
+
+        scores = []
+        for game in new:
+            ids = {order: next(result_ids) for order in sorted(game["players"])}
+            for throw in game["throws"]:
+                order = throw["player_order"]
+                player_id = self.player_ids[game["players"][order]["player_name"]]
+                scores.append((ids[order], player_id, *(throw[f] for f in THROW_FIELDS)))
+        if scores and self.copy:
+            _copy_rows(self.connection, Score.__tablename__, SCORE_COLUMNS, scores)
+        elif scores:
+            self.connection.execute(
+                insert(Score),
+                [dict(zip(SCORE_COLUMNS, score, strict=True)) for score in scores],
+            )
+
+        self.counts["games"] += len(new)
+        self.counts["results"] += len(results)
+        self.counts["throws"] += len(scores)
+
+
+def import_history(db_manager, file, import_format=FORMAT_JSONL, *, batch_size=BATCH_SIZE):
+    """
+    Load a game log into the history tables
+
+    Games whose game_session_id is already stored are skipped, so an
+    interrupted import can be run again; a game_session_id repeated in the
+    file is invalid. Player statistics and ratings are not updated; rebuild
+    them afterwards.
+
+    Args:
+        db_manager: DatabaseManager to write to
+        file: Text file of the log, in the replay format
+        import_format: 'jsonl' or 'csv'
+        batch_size: Games validated and written at a time
+
+    Returns:
+        Dictionary with the number of games imported and skipped, and of
+        players, results and throws written
+
+    Raises:
+        ValueError: If the format is unknown or any game is invalid; nothing
+            is written then
+    """
+    games = read_games(file, import_format)
+    with db_manager.connect() as connection, connection.begin():
+        game_types = dict(connection.execute(select(GameType.name, GameType.id)).all())
+        loader = _Loader(connection, game_types)
+        errors = []
+        first_lines = {}  # game_session_id -> line of its game in this file
+        for batch in _batched(games, batch_size):
+            valid = []
+            for number, document in batch:
+                game, game_errors = _normalize_game(document, game_types)
+                if game is not None:
+                    session_id = game["game_session_id"]
+                    first = first_lines.setdefault(session_id, number)
+                    if first != number:
+                        game_errors = [
+                            f"game_session_id {session_id!r} was already read on line {first}",
+                        ]
+                errors.extend(f"line {number}: {error}" for error in game_errors)
+                valid.append(game)
+            # Keep validating after an error, but stop writing
+            if not errors:
+                loader.load(valid)
+        if errors:
+            listed = "\n".join(errors[:MAX_ERRORS])
+            more = f"\n... and {len(errors) - MAX_ERRORS} more" if len(errors) > MAX_ERRORS else ""
+            raise ValueError(f"{len(errors)} invalid field(s), nothing imported:\n{listed}{more}")
+        if loader.counts["games"]:
+            bump_data_version(connection)
+    return loader.counts
+
+
+def _batched(iterable, size):
+    """Lists of up to size items"""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
@@ -0,0 +1,97 @@
+"""
+Conditional GET support (ETag / If-None-Match) for the web app's JSON endpoints
+Version based ETags come from in-process change counters (GameManager and
+DatabaseService) and are prefixed with a per-process boot id, so a restart
+never produces a 304 for content served by an earlier process. Finished
+game replays never change, so they get a content hash that is remembered
+per game session.
+"""
+
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+
+from metrics import counter
+
+# Revalidate on every use; the browser may keep the body
+CACHE_REVALIDATE = "no-cache"
+CACHE_PRIVATE_REVALIDATE = "private, no-cache"
+# Finished replays
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+
+BOOT_ID = secrets.token_hex(4)
+
+NOT_MODIFIED_RESPONSES = counter(
+    "darts_http_not_modified_responses",
+    "Conditional GETs answered with 304 Not Modified",
+    ("endpoint",),
+)
+
+
+def version_etag(*versions) -> str:
+    """ETag for content identified by change counters"""
+    return "-".join([BOOT_ID, *map(str, versions)])
+
+
+def content_etag(body: bytes) -> str:
+    """ETag for immutable content"""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def not_modified(etag: str, cache_control: str = CACHE_REVALIDATE):
+    """
+    Answer a conditional GET whose If-None-Match matches etag
+
+    Returns:
+        304 response, or None when the client's copy is missing or outdated
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    NOT_MODIFIED_RESPONSES.labels(request.endpoint).inc()
+    return with_etag(current_app.response_class(status=304), etag, cache_control)
+
+
+def with_etag(response, etag: str, cache_control: str = CACHE_REVALIDATE):
+    """Set the ETag and Cache-Control headers of a response"""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+class ETagCache:
+    """Bounded LRU map of key to ETag"""
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize cache
+
+        Args:
+            max_size: ETags kept; the least recently used one is dropped
+        """
+        self.max_size = max_size
+        self._etags: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        """ETag stored for key, if any"""
+        with self._lock:
+            etag = self._etags.get(key)
+            if etag is not None:
+                self._etags.move_to_end(key)
+            return etag
+
+    def set(self, key: str, etag: str):
+        """Store the ETag for key"""
+        with self._lock:
+            self._etags[key] = etag
+            self._etags.move_to_end(key)
+            if len(self._etags) > self.max_size:
+                self._etags.popitem(last=False)
+
+    def clear(self):
+        """Drop every ETag"""
+        with self._lock:
+            self._etags.clear()
@@ -0,0 +1,180 @@
+"""
+Shared HTTP client for identity provider (WSO2 IS) calls
+One keep-alive requests.Session with a bounded connection pool, per-call
+timeouts and retries limited by a retry budget, so token introspection,
+code exchange, userinfo and JWKS fetches reuse TLS connections instead of
+opening a new one per call
+"""
+
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import counter
+
+logger = logging.getLogger(__name__)
+
+IDP_REQUESTS = counter(
+    "darts_idp_requests",
+    "Identity provider HTTP requests by outcome (ok, error, retry)",
+    ("outcome",),
+)
+
+# Gateway errors worth retrying; anything else is returned to the caller
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of requests
+
+    Every request deposits ratio tokens (up to a cap) and every retry
+    withdraws one, so a struggling IdP sees at most ~ratio extra load.
+    min_tokens keeps a few retries available when traffic is low.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_tokens: float = 3, max_tokens: float = 10):
+        """Initialize budget"""
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = float(min_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """Record a request"""
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        """Take a retry token; False when the budget is exhausted"""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class IdPClient:
+    """Pooled keep-alive HTTP client for identity provider endpoints"""
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = 10,
+        timeout: float = 5,
+        retries: int = 2,
+        backoff: float = 0.1,
+        verify_ssl: bool = True,
+        retry_budget: RetryBudget | None = None,
+    ):
+        """
+        Initialize client
+
+        Args:
+            pool_size: Keep-alive connections kept per IdP host
+            timeout: Default timeout in seconds for a single attempt
+            retries: Default retries for connection errors, timeouts and 502/503/504
+            backoff: Base delay in seconds between retries (doubled per attempt)
+            verify_ssl: Verify the IdP certificate
+            retry_budget: Shared budget capping retries across all calls
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.retry_budget = retry_budget or RetryBudget()
+        self.session = requests.Session()
+        self.session.verify = verify_ssl
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_env(cls) -> "IdPClient":
+        """Create a client configured from IDP_* environment variables"""
+        return cls(
+            pool_size=int(os.getenv("IDP_POOL_SIZE", "10")),
+            timeout=float(os.getenv("IDP_TIMEOUT", "5")),
+            retries=int(os.getenv("IDP_RETRIES", "2")),
+            verify_ssl=os.getenv("WSO2_IS_VERIFY_SSL", "False").lower() == "true",
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        timeout: float | None = None,
+        retries: int | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request through the shared session
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            timeout: Per-attempt timeout (defaults to the client timeout)
+            retries: Retries for this call; use 0 for non-idempotent calls
+            **kwargs: Passed to requests.Session.request
+
+        Raises:
+            requests.RequestException: When every allowed attempt failed
+        """
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        self.retry_budget.deposit()
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self._may_retry(attempt, retries):
+                    IDP_REQUESTS.labels("error").inc()
+                    raise
+                logger.warning(f"IdP request to {url} failed ({e}), retrying")
+            else:
+                if response.status_code not in RETRY_STATUSES or not self._may_retry(
+                    attempt,
+                    retries,
+                ):
+                    IDP_REQUESTS.labels("ok").inc()
+                    return response
+                logger.warning(f"IdP returned {response.status_code} for {url}, retrying")
+                response.close()
+
+            IDP_REQUESTS.labels("retry").inc()
+            time.sleep(self.backoff * (2**attempt))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request"""
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def _may_retry(self, attempt: int, retries: int) -> bool:
+        return attempt < retries and self.retry_budget.withdraw()
+
+
+_client: IdPClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_idp_client() -> IdPClient:
+    """Return the process-wide identity provider client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = IdPClient.from_env()
+        return _client
@@ -0,0 +1,123 @@
+"""
+Pluggable JSON serialization
+Uses orjson when it is installed and the standard library otherwise. The same
+functions back Flask responses (app.json), Socket.IO packets (SocketIO's json
+module) and RabbitMQ message bodies (score_codec), so switching the backend
+affects every hot serialization path at once.
+
+JSON_BACKEND=stdlib forces the standard library even when orjson is present.
+"""
+
+import dataclasses
+import decimal
+import json
+import os
+import uuid
+from datetime import date
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+BACKEND_ORJSON = "orjson"
+BACKEND_STDLIB = "stdlib"
+
+BACKEND = os.getenv("JSON_BACKEND", BACKEND_ORJSON if ORJSON_AVAILABLE else BACKEND_STDLIB)
+if BACKEND == BACKEND_ORJSON and not ORJSON_AVAILABLE:
+    BACKEND = BACKEND_STDLIB
+
+# Raised by loads() for malformed input with either backend
+# (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types the backends do not handle natively"""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _orjson_options(sort_keys: bool = False, indent: int | None = None) -> int:
+    # Game state uses integer keys (e.g. cricket marks per number)
+    option = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return option
+
+
+def dumps_bytes(obj: Any, *, sort_keys: bool = False, indent: int | None = None) -> bytes:
+    """Serialize to UTF-8 encoded JSON"""
+    if BACKEND == BACKEND_ORJSON:
+        return orjson.dumps(obj, default=_default, option=_orjson_options(sort_keys, indent))
+    return json.dumps(
+        obj,
+        default=_default,
+        sort_keys=sort_keys,
+        indent=indent,
+        separators=None if indent else (",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, **kwargs) -> str:
+    """
+    Serialize to a JSON string
+
+    Accepts the json.dumps keyword arguments used by callers such as
+    python-socketio; only sort_keys and indent change the output, the rest
+    (e.g. separators) are ignored because the output is always compact.
+    """
+    return dumps_bytes(
+        obj,
+        sort_keys=kwargs.get("sort_keys", False),
+        indent=kwargs.get("indent"),
+    ).decode("utf-8")
+
+
+def loads(data: str | bytes, **_kwargs) -> Any:
+    """Parse JSON text or bytes"""
+    if BACKEND == BACKEND_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by this module
+
+    Keys are not sorted (insertion order is kept) to save the sort on every
+    response.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        """Serialize data as JSON"""
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs) -> Any:
+        """Deserialize data as JSON"""
+        return loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Serialize the given arguments as JSON and return a response"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if self.compact is False or (self.compact is None and self._app.debug) else None
+        body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
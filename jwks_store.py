@@ -0,0 +1,241 @@
+"""
+JWKS signing key store shared by the web app and the API gateway
+Indexes the identity provider's keys by kid, refreshes them in a background
+thread before they go stale and rate-limits refetches triggered by unknown
+kids, so verifying a token never waits on the IdP in the common case
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import jwt
+from jwt import PyJWK, PyJWKSet
+from jwt.exceptions import PyJWKClientError, PyJWKSetError
+
+from idp_client import IdPClient, get_idp_client
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeyStore:
+    """
+    Kid-indexed JWKS cache with background refresh
+
+    Drop-in replacement for the part of PyJWKClient used here:
+    get_signing_key_from_jwt(token) returns a PyJWK or raises PyJWKClientError.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        *,
+        refresh_interval: float = 3600,
+        min_refetch_interval: float = 30,
+        preload_file: str | None = None,
+        verify_ssl: bool = True,
+        timeout: float | None = None,
+        http: IdPClient | None = None,
+    ):
+        """
+        Initialize key store
+
+        Args:
+            jwks_url: JWKS endpoint of the identity provider
+            refresh_interval: Seconds a fetched key set is considered fresh;
+                the background refresh runs at 80% of this
+            min_refetch_interval: Minimum seconds between fetches caused by an
+                unknown kid (protects the IdP from tokens with random kids)
+            preload_file: Optional JWKS JSON file loaded at startup, so tokens
+                can be verified before the IdP is reachable; a missing or
+                invalid file is logged and the store starts cold
+            verify_ssl: Verify the IdP certificate
+            timeout: HTTP timeout in seconds for JWKS fetches (defaults to the
+                client's timeout, IDP_TIMEOUT)
+            http: Client for the fetches (defaults to the shared IdP client)
+        """
+        self.jwks_url = jwks_url
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+        self.http = http or get_idp_client()
+        self._keys: dict[str, PyJWK] = {}
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._fetched_at: float | None = None
+        self._last_attempt = 0.0
+        self._stop = threading.Event()
+        self._refresher: threading.Thread | None = None
+
+        if preload_file:
+            try:
+                self.load_file(preload_file)
+            except (OSError, ValueError, PyJWKSetError) as e:
+                logger.warning(f"Could not preload JWKS from {preload_file}: {e}")
+
+    @property
+    def kids(self) -> list[str]:
+        """Key ids currently in the index"""
+        with self._lock:
+            return list(self._keys)
+
+    def load_jwks(self, jwks: dict[str, Any]) -> int:
+        """
+        Replace the key index with a JWKS document
+
+        Returns:
+            Number of signing keys indexed
+        """
+        keys = {}
+        for key in PyJWKSet.from_dict(jwks).keys:
+            if key.public_key_use in ("sig", None) and key.key_id:
+                keys[key.key_id] = key
+        if not keys:
+            raise PyJWKSetError("The JWKS endpoint did not contain any signing keys")
+        with self._lock:
+            self._keys = keys
+        return len(keys)
+
+    def load_file(self, path: str) -> int:
+        """Load keys from a local JWKS JSON file"""
+        with Path(path).open(encoding="utf-8") as f:
+            count = self.load_jwks(json.load(f))
+        logger.info(f"Preloaded {count} JWKS key(s) from {path}")
+        return count
+
+    def refresh(self) -> bool:
+        """
+        Fetch the key set from the IdP now
+
+        Concurrent callers share one fetch. Returns True if the index was
+        updated; failures keep the previous keys.
+        """
+        with self._fetch_lock:
+            return self._fetch()
+
+    def _fetch(self) -> bool:
+        """Fetch and index the key set; the caller holds _fetch_lock"""
+        self._last_attempt = time.monotonic()
+        try:
+            response = self.http.get(
+                self.jwks_url,
+                verify=self.verify_ssl,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            count = self.load_jwks(response.json())
+        except Exception as e:
+            logger.warning(f"Failed to refresh JWKS from {self.jwks_url}: {e}")
+            return False
+        self._fetched_at = time.monotonic()
+        logger.info(f"Refreshed {count} JWKS key(s)")
+        return True
+
+    def get_signing_key(self, kid: str) -> PyJWK:
+        """
+        Return the signing key for a kid
+
+        A kid that is not indexed triggers at most one refetch per
+        min_refetch_interval; otherwise PyJWKClientError is raised.
+        """
+        self.start()
+        with self._lock:
+            key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        if self._fetched_at is None:
+            # Wait for the initial fetch if the refresh thread is running it
+            with self._fetch_lock:
+                pass
+            with self._lock:
+                key = self._keys.get(kid)
+            if key is not None:
+                return key
+
+        attempted = self._last_attempt
+        if time.monotonic() - attempted >= self.min_refetch_interval:
+            with self._fetch_lock:
+                # Skip the fetch if another request refetched while we waited
+                if self._last_attempt == attempted:
+                    self._fetch()
+            with self._lock:
+                key = self._keys.get(kid)
+            if key is not None:
+                return key
+
+        raise PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+
+    def get_signing_key_from_jwt(self, token: str) -> PyJWK:
+        """Return the signing key for a token's kid header"""
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid")
+        if not kid:
+            raise PyJWKClientError("Token has no 'kid' header")
+        return self.get_signing_key(kid)
+
+    def start(self):
+        """Start the background refresh thread (idempotent)"""
+        if self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(
+                target=self._refresh_loop,
+                name="jwks-refresh",
+                daemon=True,
+            )
+        self._refresher.start()
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop.set()
+
+    def _refresh_loop(self):
+        """Refresh keys at 80% of refresh_interval, retrying failures sooner"""
+        if self._fetched_at is None:
+            self.refresh()
+        while not self._stop.is_set():
+            if self._fetched_at is None:
+                delay = self.min_refetch_interval
+            else:
+                fresh_until = self._fetched_at + self.refresh_interval * 0.8
+                delay = max(fresh_until - time.monotonic(), self.min_refetch_interval)
+            if self._stop.wait(delay):
+                return
+            self.refresh()
+
+
+_stores: dict[str, JWKSKeyStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_jwks_store(jwks_url: str, **kwargs) -> JWKSKeyStore:
+    """
+    Return the process-wide key store for a JWKS URL
+
+    The app and the gateway share one store (and one refresh thread) when
+    they run in the same process. kwargs only apply when the store is created.
+    """
+    with _stores_lock:
+        store = _stores.get(jwks_url)
+        if store is None:
+            store = _stores[jwks_url] = JWKSKeyStore(jwks_url, **kwargs)
+        return store
+
+
+def jwks_store_from_env(jwks_url: str, verify_ssl: bool = True) -> JWKSKeyStore:
+    """Return the shared key store configured from JWKS_* environment variables"""
+    return get_jwks_store(
+        jwks_url,
+        refresh_interval=float(os.getenv("JWKS_REFRESH_INTERVAL", "3600")),
+        min_refetch_interval=float(os.getenv("JWKS_MIN_REFETCH_INTERVAL", "30")),
+        preload_file=os.getenv("JWKS_PRELOAD_FILE") or None,
+        verify_ssl=verify_ssl,
+    )
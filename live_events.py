@@ -0,0 +1,141 @@
+"""
+Live game events for Server-Sent Events and long-poll clients
+GameManager publishes each game_state and throw event here as it broadcasts
+it over Socket.IO. Events are serialized once and kept in a bounded ring
+buffer, so an SSE stream or long-poll request that reconnects with the last
+event id it saw gets exactly the events it missed.
+
+Waiting clients block on a condition that publish notifies, so an idle SSE
+or long-poll client wakes only when an event arrives or its timeout passes,
+whichever thread (a request or the RabbitMQ consumer) publishes.
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, NamedTuple
+
+import json_provider
+from http_cache import BOOT_ID
+from metrics import counter
+
+STREAM_EVENTS = counter(
+    "darts_stream_events",
+    "Events published to SSE and long-poll clients",
+    ("event",),
+)
+
+
+class LiveEvent(NamedTuple):
+    """One published event; data is the serialized JSON payload"""
+
+    seq: int
+    event: str
+    data: str
+
+    @property
+    def id(self) -> str:
+        """Event id sent to clients (boot id and sequence number)"""
+        return format_event_id(self.seq)
+
+    def sse(self) -> str:
+        """Event in text/event-stream format"""
+        return f"id: {self.id}\nevent: {self.event}\ndata: {self.data}\n\n"
+
+    def json(self) -> str:
+        """Event as a JSON object, reusing the serialized payload"""
+        return f'{{"id":"{self.id}","event":"{self.event}","data":{self.data}}}'
+
+
+def format_event_id(seq: int) -> str:
+    """Event id for a sequence number of this process"""
+    return f"{BOOT_ID}.{seq}"
+
+
+def parse_event_id(event_id: str | None) -> int | None:
+    """
+    Sequence number of an event id
+
+    Returns:
+        None when the id is missing, malformed or from another process
+    """
+    if not event_id:
+        return None
+    boot_id, _, seq = event_id.partition(".")
+    if boot_id != BOOT_ID or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+class LiveEventBuffer:
+    """Ring buffer of the most recent events"""
+
+    def __init__(self, max_events: int = 256):
+        """
+        Initialize buffer
+
+        Args:
+            max_events: Events kept for clients resuming with Last-Event-ID
+        """
+        self.max_events = max_events
+        self._events: deque[LiveEvent] = deque(maxlen=max_events)
+        self._seqs = itertools.count(1)
+        self._lock = threading.Lock()
+        # Notified on every publish; shares the buffer's lock
+        self._published = threading.Condition(self._lock)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest event (0 before the first)"""
+        with self._lock:
+            return self._events[-1].seq if self._events else 0
+
+    def publish(self, event: str, data: Any) -> LiveEvent:
+        """Serialize and store an event"""
+        payload = json_provider.dumps(data)
+        with self._lock:
+            live_event = LiveEvent(next(self._seqs), event, payload)
+            self._events.append(live_event)
+            self._published.notify_all()
+        STREAM_EVENTS.labels(event).inc()
+        return live_event
+
+    def since(self, seq: int) -> list[LiveEvent] | None:
+        """
+        Events published after seq
+
+        Returns:
+            The events in order, or None when some of them were already
+            dropped from the buffer (or seq is unknown) and the client must
+            start again from a snapshot
+        """
+        with self._lock:
+            return self._since(seq)
+
+    def _since(self, seq: int) -> list[LiveEvent] | None:
+        """since() with the lock held"""
+        last = self._events[-1].seq if self._events else 0
+        if seq > last:
+            return None
+        if seq == last:
+            return []
+        if seq + 1 < self._events[0].seq:
+            return None
+        return [event for event in self._events if event.seq > seq]
+
+    def wait(self, seq: int, timeout: float) -> list[LiveEvent] | None:
+        """
+        Events published after seq, waiting up to timeout seconds for one
+
+        Returns:
+            As since(); an empty list when nothing was published in time
+        """
+        deadline = time.monotonic() + timeout
+        with self._published:
+            while True:
+                events = self._since(seq)
+                remaining = deadline - time.monotonic()
+                if events != [] or remaining <= 0:
+                    return events
+                self._published.wait(remaining)
@@ -0,0 +1,260 @@
+"""
+Local stand-in for the WSO2 Identity Server
+Serves /oauth2/jwks, /oauth2/introspect, /oauth2/token and /oauth2/userinfo
+with RS256 tokens signed by a throwaway key, so the validation paths in
+auth.py and api_gateway.py can be benchmarked and tested without a real IdP.
+Latency and failures can be injected per request.
+
+Usage:
+    python local_idp.py [--port 9443] [--latency-ms 0] [--failure-rate 0]
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from typing import Any
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from flask import Flask, jsonify, request
+from jwt.algorithms import RSAAlgorithm
+from werkzeug.serving import make_server
+
+ENDPOINTS = ("jwks", "introspect", "token", "userinfo")
+
+
+class LocalIdP:
+    """In-memory identity provider issuing and checking signed test tokens"""
+
+    def __init__(
+        self,
+        *,
+        issuer: str = "https://localhost:9443/oauth2/token",
+        latency: float = 0,
+        failure_rate: float = 0,
+        failure_status: int = 503,
+        seed: int | None = None,
+    ):
+        """
+        Initialize identity provider
+
+        Args:
+            issuer: 'iss' claim of issued tokens
+            latency: Seconds every endpoint sleeps before answering
+            failure_rate: Fraction (0-1) of requests answered with failure_status
+            failure_status: HTTP status used for injected failures
+            seed: Seed for the failure injection, for reproducible runs
+        """
+        self.issuer = issuer
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.kid = secrets.token_hex(8)
+        self._key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._random = random.Random(seed)
+        self._revoked: set[str] = set()
+        self._lock = threading.Lock()
+        self.requests = dict.fromkeys(ENDPOINTS, 0)
+
+    def issue_token(
+        self,
+        subject: str = "test-user",
+        *,
+        roles: tuple[str, ...] = ("player",),
+        scope: str = "openid score:write",
+        expires_in: int = 3600,
+        **claims,
+    ) -> str:
+        """Return a signed access token for a subject"""
+        now = int(time.time())
+        payload = {
+            "iss": self.issuer,
+            "sub": subject,
+            "username": subject,
+            "client_id": "local-idp",
+            "groups": list(roles),
+            "scope": scope,
+            "iat": now,
+            "exp": now + expires_in,
+            "jti": secrets.token_hex(8),
+            **claims,
+        }
+        return jwt.encode(payload, self._key, algorithm="RS256", headers={"kid": self.kid})
+
+    def revoke(self, token: str):
+        """Make introspection report a token as inactive"""
+        with self._lock:
+            self._revoked.add(token)
+
+    def jwks(self) -> dict[str, Any]:
+        """Return the public signing key as a JWKS document"""
+        jwk = json.loads(RSAAlgorithm.to_jwk(self._key.public_key()))
+        jwk.update({"kid": self.kid, "use": "sig", "alg": "RS256"})
+        return {"keys": [jwk]}
+
+    def decode(self, token: str) -> dict[str, Any] | None:
+        """Return the claims of a valid, unrevoked token issued here"""
+        with self._lock:
+            if token in self._revoked:
+                return None
+        try:
+            return jwt.decode(token, self._key.public_key(), algorithms=["RS256"])
+        except jwt.InvalidTokenError:
+            return None
+
+    def introspect(self, token: str) -> dict[str, Any]:
+        """Return an RFC 7662 introspection response"""
+        claims = self.decode(token)
+        if claims is None:
+            return {"active": False}
+        return {"active": True, "token_type": "Bearer", **claims}
+
+    def before_request(self, endpoint: str) -> bool:
+        """
+        Count a request and apply injected latency
+
+        Returns:
+            False if the request should fail
+        """
+        with self._lock:
+            self.requests[endpoint] += 1
+            failed = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        return not failed
+
+
+def _bearer_token() -> str | None:
+    parts = request.headers.get("Authorization", "").split()
+    if len(parts) == 2 and parts[0].lower() == "bearer":
+        return parts[1]
+    return None
+
+
+def create_app(idp: LocalIdP) -> Flask:
+    """Create the Flask app serving an identity provider's endpoints"""
+    app = Flask(__name__)
+
+    def guarded(endpoint, view):
+        def wrapper():
+            if not idp.before_request(endpoint):
+                return jsonify({"error": "injected_failure"}), idp.failure_status
+            return view()
+
+        wrapper.__name__ = f"{endpoint}_endpoint"
+        return wrapper
+
+    def jwks():
+        return jsonify(idp.jwks())
+
+    def introspect():
+        token = request.form.get("token", "")
+        return jsonify(idp.introspect(token))
+
+    def token():
+        grant_type = request.form.get("grant_type")
+        if grant_type not in ("authorization_code", "client_credentials", "password"):
+            return jsonify({"error": "unsupported_grant_type"}), 400
+        subject = request.form.get("username") or "test-user"
+        access_token = idp.issue_token(subject)
+        return jsonify(
+            {
+                "access_token": access_token,
+                "id_token": access_token,
+                "refresh_token": secrets.token_urlsafe(24),
+                "token_type": "Bearer",
+                "expires_in": 3600,
+            },
+        )
+
+    def userinfo():
+        claims = idp.decode(_bearer_token() or "")
+        if claims is None:
+            return jsonify({"error": "invalid_token"}), 401
+        return jsonify(
+            {
+                "sub": claims["sub"],
+                "username": claims.get("username"),
+                "groups": claims.get("groups", []),
+            },
+        )
+
+    app.add_url_rule("/oauth2/jwks", view_func=guarded("jwks", jwks))
+    app.add_url_rule(
+        "/oauth2/introspect",
+        view_func=guarded("introspect", introspect),
+        methods=["POST"],
+    )
+    app.add_url_rule("/oauth2/token", view_func=guarded("token", token), methods=["POST"])
+    app.add_url_rule("/oauth2/userinfo", view_func=guarded("userinfo", userinfo))
+    return app
+
+
+class LocalIdPServer:
+    """Threaded HTTP server running a LocalIdP in the background"""
+
+    def __init__(self, idp: LocalIdP | None = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize server
+
+        Args:
+            idp: Identity provider to serve (a new one by default)
+            host: Interface to bind
+            port: Port to bind; 0 picks a free port
+        """
+        self.idp = idp or LocalIdP()
+        self._server = make_server(host, port, create_app(self.idp), threaded=True)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL, used in place of WSO2_IS_URL"""
+        return f"http://{self._server.host}:{self._server.port}"
+
+    def start(self) -> "LocalIdPServer":
+        """Start serving in a daemon thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="local-idp",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted"""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Run the stand-in identity provider from the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    idp = LocalIdP(latency=args.latency_ms / 1000, failure_rate=args.failure_rate)
+    server = LocalIdPServer(idp, host=args.host, port=args.port)
+    print(f"Local IdP listening on {server.url} (WSO2_IS_URL={server.url})")
+    print(f"Sample access token:\n{idp.issue_token()}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Player statistics kept in the player_stats table
+The table holds running totals per player, game type and month. DatabaseService
+adds each throw's increments as it is written (and subtracts them when throws
+are undone), so league statistics never scan the scores table. The same
+functions rebuild the totals from scores (python db_manage.py rebuild-stats).
+"""
+
+from datetime import date, datetime, timezone
+
+# Running totals stored per player_stats row
+STAT_COLUMNS = (
+    "games_played",
+    "games_won",
+    "darts_thrown",
+    "points_scored",
+    "first9_darts",
+    "first9_points",
+    "checkout_attempts",
+    "checkouts",
+    "ton_plus",
+    "one_eighties",
+    "cricket_marks",
+)
+
+# Numbers that score marks in cricket (25 is the bull)
+CRICKET_TARGETS = frozenset((15, 16, 17, 18, 19, 20, 25))
+
+# Darts counted for the first-9 average
+FIRST_NINE = 9
+
+# Scores one dart can finish from, with and without double-out
+DOUBLE_OUT_FINISHES = frozenset((*range(2, 41, 2), 50))
+SINGLE_DART_FINISHES = frozenset(
+    (*(base * multiplier for base in range(1, 21) for multiplier in (1, 2, 3)), 25, 50),
+)
+
+
+def stats_period(moment=None):
+    """First day of the (UTC) month a game started in"""
+    moment = moment or datetime.now(tz=timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def format_period(period):
+    """Period as YYYY-MM"""
+    return period.strftime("%Y-%m")
+
+
+def parse_period(value):
+    """
+    Parse a YYYY-MM period
+
+    Raises:
+        ValueError: If the value is not a YYYY-MM month
+    """
+    try:
+        return date.fromisoformat(f"{value}-01")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid period: {value} (expected YYYY-MM)") from e
+
+
+def is_cricket(game_type_name):
+    """Whether a game type is scored in cricket marks rather than x01 points"""
+    return game_type_name == "cricket"
+
+
+def checkout_possible(score, double_out):
+    """Whether a single dart can finish from score"""
+    return score in (DOUBLE_OUT_FINISHES if double_out else SINGLE_DART_FINISHES)
+
+
+def throw_stats(
+    *,
+    cricket,
+    double_out,
+    throw_sequence,
+    base_score,
+    multiplier_value,
+    score_before,
+    score_after,
+    is_finish,
+):
+    """
+    Increments one throw adds to its player's totals
+
+    x01 points are the drop in the player's score, so a bust scores nothing.
+
+    Returns:
+        Dictionary of STAT_COLUMNS increments (columns left out are 0)
+    """
+    if cricket:
+        marks = multiplier_value if base_score in CRICKET_TARGETS else 0
+        return {"darts_thrown": 1, "cricket_marks": marks}
+
+    points = score_before - score_after
+    stats = {"darts_thrown": 1, "points_scored": points}
+    if throw_sequence <= FIRST_NINE:
+        stats["first9_darts"] = 1
+        stats["first9_points"] = points
+    if checkout_possible(score_before, double_out):
+        stats["checkout_attempts"] = 1
+        stats["checkouts"] = int(bool(is_finish))
+    return stats
+
+
+def add_turn_points(turns, key, turn_number, points, *, turn_over, is_bust):
+    """
+    Track the points of a player's current x01 turn
+
+    Args:
+        turns: Dictionary of key -> (turn_number, points so far), updated
+        key: Player (or game result) the throw belongs to
+        turn_number: Turn of the throw
+        points: Points the throw scored
+        turn_over: Whether the throw ended the turn (third dart or finish)
+        is_bust: Whether the throw busted; a bust turn never counts
+
+    Returns:
+        ton_plus / one_eighties increments when the turn ended, else {}
+    """
+    turn, total = turns.get(key, (turn_number, 0))
+    total = (total if turn == turn_number else 0) + points
+    if is_bust or turn_over:
+        turns.pop(key, None)
+        if is_bust or total < 100:
+            return {}
+        return {"ton_plus": 1, "one_eighties": int(total == 180)}
+    turns[key] = (turn_number, total)
+    return {}
+
+
+def negate(stats):
+    """Increments that undo stats"""
+    return {column: -value for column, value in stats.items()}
+
+
+def merge(totals, stats):
+    """Add increments to a dictionary of totals"""
+    for column, value in stats.items():
+        totals[column] = totals.get(column, 0) + value
+    return totals
+
+
+def summarize(totals, cricket=False):
+    """
+    Derived statistics of a set of totals
+
+    Args:
+        totals: Dictionary of STAT_COLUMNS totals
+        cricket: Whether the totals are of a cricket game type
+
+    Returns:
+        The totals plus three_dart_average, first9_average and
+        checkout_percentage (x01) or marks_per_round (cricket); None where
+        nothing was thrown yet or the statistic does not apply
+    """
+
+    def ratio(numerator, denominator, scale, applies=True):
+        if not applies or not totals.get(denominator):
+            return None
+        return round(totals.get(numerator, 0) * scale / totals[denominator], 2)
+
+    return {
+        **{column: totals.get(column, 0) for column in STAT_COLUMNS},
+        "three_dart_average": ratio("points_scored", "darts_thrown", 3, not cricket),
+        "first9_average": ratio("first9_points", "first9_darts", 3, not cricket),
+        "checkout_percentage": ratio("checkouts", "checkout_attempts", 100, not cricket),
+        "marks_per_round": ratio("cricket_marks", "darts_thrown", 3, cricket),
+    }
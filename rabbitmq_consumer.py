@@ -4,9 +4,60 @@ RabbitMQ Consumer for receiving dart scores
 
 import json
 import time
+from datetime import datetime, timezone
 
 import pika
 
+from metrics import counter, gauge, histogram
+from score_codec import MessageDecodeError, decode_message
+from transport import create_transport
+
+BROKER_DELAY_SECONDS = histogram(
+    "darts_broker_delay_seconds",
+    "Time from publish to receipt by the score consumer",
+)
+THROW_LATENCY_SECONDS = histogram(
+    "darts_throw_latency_seconds",
+    "Time from publish until the consumer callback (game update and broadcast) returned",
+)
+MESSAGES_CONSUMED = counter(
+    "darts_messages_consumed",
+    "Messages handled by the score consumer",
+    ("outcome",),
+)
+QUEUE_DEPTH = gauge("darts_queue_depth", "Messages waiting in the score consumer queue")
+
+# Seconds between passive queue declarations used to sample the queue depth
+QUEUE_DEPTH_INTERVAL = 1.0
+
+
+def message_age(message, properties=None):
+    """
+    Seconds since a message was published
+
+    Uses the ISO 'timestamp' the gateway puts in the body, falling back to the
+    AMQP timestamp property (whole seconds). Returns None when neither is set.
+    """
+    sent = None
+    timestamp = message.get("timestamp") if isinstance(message, dict) else None
+    if isinstance(timestamp, str):
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            sent = parsed.timestamp()
+    if sent is None:
+        amqp_timestamp = getattr(properties, "timestamp", None)
+        if isinstance(amqp_timestamp, (int, float)) and not isinstance(amqp_timestamp, bool):
+            sent = float(amqp_timestamp)
+    if sent is None:
+        return None
+    # Clock skew between publisher and consumer hosts must not go negative
+    return max(time.time() - sent, 0.0)
+
 
 class RabbitMQConsumer:
     """RabbitMQ consumer for dart scores"""
@@ -16,7 +67,8 @@ class RabbitMQConsumer:
         Initialize RabbitMQ consumer
 
         Args:
-            config: Dictionary with RabbitMQ configuration
+            config: Dictionary with RabbitMQ configuration ('transport' selects
+                pika or the in-memory broker)
             callback: Function to call when a message is received
         """
         self.config = config
@@ -24,24 +76,13 @@ class RabbitMQConsumer:
         self.connection = None
         self.channel = None
         self.should_stop = False
+        self.transport = create_transport(config)
+        self.queue_name = None
+        self._queue_depth_checked = 0.0
 
     def connect(self):
         """Establish connection to RabbitMQ"""
-        credentials = pika.PlainCredentials(
-            self.config["user"],
-            self.config["password"],
-        )
-
-        parameters = pika.ConnectionParameters(
-            host=self.config["host"],
-            port=self.config["port"],
-            virtual_host=self.config["vhost"],
-            credentials=credentials,
-            heartbeat=600,
-            blocked_connection_timeout=300,
-        )
-
-        self.connection = pika.BlockingConnection(parameters)
+        self.connection = self.transport.connect(self.config)
         self.channel = self.connection.channel()
 
         # Declare exchange
@@ -54,6 +95,7 @@ class RabbitMQConsumer:
         # Declare queue (auto-generated name)
         result = self.channel.queue_declare(queue="", exclusive=True)
         queue_name = result.method.queue
+        self.queue_name = queue_name
 
         # Bind queue to exchange with topic
         self.channel.queue_bind(
@@ -70,35 +112,57 @@ class RabbitMQConsumer:
 
         return queue_name
 
-    def on_message(self, channel, method, _properties, body):
+    def on_message(self, channel, method, properties, body):
         """
         Callback when a message is received
 
         Args:
             channel: Channel object
             method: Method frame
-            _properties: Properties - unused
+            properties: Message properties (content_type selects the wire format)
             body: Message body
         """
         try:
-            # Parse JSON message
-            message = json.loads(body.decode("utf-8"))
+            # Decode JSON or compact binary message
+            message = decode_message(body, getattr(properties, "content_type", None))
             print(f"Received message: {message}")
+            age = message_age(message, properties)
+            if age is not None:
+                BROKER_DELAY_SECONDS.observe(age)
 
             # Process the score
             self.callback(message)
+            if age is not None:
+                THROW_LATENCY_SECONDS.observe(message_age(message, properties))
 
             # Acknowledge the message
             channel.basic_ack(delivery_tag=method.delivery_tag)
+            MESSAGES_CONSUMED.labels("ack").inc()
 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, MessageDecodeError) as e:
             print(f"Failed to parse message: {e}")
             # Reject malformed messages
             channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            MESSAGES_CONSUMED.labels("reject").inc()
         except Exception as e:
             print(f"Error processing message: {e}")
             # Requeue on processing errors
             channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            MESSAGES_CONSUMED.labels("requeue").inc()
+
+        self._sample_queue_depth(channel)
+
+    def _sample_queue_depth(self, channel):
+        """Update the queue depth gauge at most once per QUEUE_DEPTH_INTERVAL"""
+        now = time.monotonic()
+        if not self.queue_name or now - self._queue_depth_checked < QUEUE_DEPTH_INTERVAL:
+            return
+        self._queue_depth_checked = now
+        try:
+            result = channel.queue_declare(queue=self.queue_name, passive=True)
+            QUEUE_DEPTH.set(result.method.message_count)
+        except Exception as e:
+            print(f"Could not sample queue depth: {e}")
 
     def start(self):
         """Start consuming messages"""
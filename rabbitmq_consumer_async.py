@@ -0,0 +1,310 @@
+"""
+Asyncio RabbitMQ Consumer for receiving dart scores
+Same callback contract as RabbitMQConsumer, but messages are consumed on an
+asyncio event loop (aio-pika for RabbitMQ, polling for the in-memory broker)
+instead of a blocking pika connection
+"""
+
+import asyncio
+import contextlib
+import inspect
+import json
+import queue
+import time
+
+from rabbitmq_consumer import (
+    BROKER_DELAY_SECONDS,
+    MESSAGES_CONSUMED,
+    QUEUE_DEPTH,
+    QUEUE_DEPTH_INTERVAL,
+    THROW_LATENCY_SECONDS,
+    message_age,
+)
+from score_codec import MessageDecodeError, decode_message
+from transport import TRANSPORT_MEMORY, create_transport
+
+try:
+    import aio_pika
+
+    AIO_PIKA_AVAILABLE = True
+except ImportError:
+    AIO_PIKA_AVAILABLE = False
+
+
+CONSUMER_THREADED = "threaded"
+CONSUMER_ASYNCIO = "asyncio"
+
+
+class _Delivery:
+    """A received message with transport-specific ack/nack coroutines"""
+
+    def __init__(self, body, content_type, ack, nack, timestamp=None):
+        self.body = body
+        self.content_type = content_type
+        self.ack = ack
+        self.nack = nack
+        # AMQP timestamp property as epoch seconds, read by message_age()
+        self.timestamp = timestamp
+
+
+class AsyncRabbitMQConsumer:
+    """Asyncio RabbitMQ consumer for dart scores"""
+
+    def __init__(self, config, callback):
+        """
+        Initialize asyncio RabbitMQ consumer
+
+        Args:
+            config: Dictionary with RabbitMQ configuration. Besides the keys used
+                by RabbitMQConsumer it accepts 'prefetch' (unacknowledged
+                messages the broker may push ahead, default 32) and
+                'shutdown_timeout' (seconds to let the current message finish)
+            callback: Function (or coroutine function) to call when a message
+                is received. Coroutine functions are awaited on the event loop;
+                plain functions (blocking database writes, TTS, emits) run in
+                a worker thread so heartbeats and acks are not held up.
+        """
+        self.config = config
+        self.callback = callback
+        self.connection = None
+        self.should_stop = False
+        self.transport = create_transport(config)
+        self.prefetch = int(config.get("prefetch", 32))
+        self.shutdown_timeout = float(config.get("shutdown_timeout", 10))
+        self.reconnect_delay = float(config.get("reconnect_delay", 5))
+        self.poll_interval = float(config.get("poll_interval", 0.5))
+        self._loop = None
+        self._stop_event = None
+        self._idle = None
+        self._queue_depth = None
+        self._queue_depth_checked = 0.0
+
+        if self.transport.name != TRANSPORT_MEMORY and not AIO_PIKA_AVAILABLE:
+            raise RuntimeError("aio-pika is required for the asyncio consumer with RabbitMQ")
+
+    async def handle(self, delivery):
+        """
+        Decode a delivery, run the callback and settle the message
+
+        Malformed messages are rejected; callback errors requeue the message,
+        as in RabbitMQConsumer.on_message.
+        """
+        try:
+            message = decode_message(delivery.body, delivery.content_type)
+            print(f"Received message: {message}")
+            age = message_age(message, delivery)
+            if age is not None:
+                BROKER_DELAY_SECONDS.observe(age)
+
+            if inspect.iscoroutinefunction(self.callback):
+                result = self.callback(message)
+            else:
+                result = await asyncio.to_thread(self.callback, message)
+            if inspect.isawaitable(result):
+                await result
+            if age is not None:
+                THROW_LATENCY_SECONDS.observe(message_age(message, delivery))
+
+            await delivery.ack()
+            MESSAGES_CONSUMED.labels("ack").inc()
+
+        except (json.JSONDecodeError, MessageDecodeError) as e:
+            print(f"Failed to parse message: {e}")
+            await delivery.nack(requeue=False)
+            MESSAGES_CONSUMED.labels("reject").inc()
+        except Exception as e:
+            print(f"Error processing message: {e}")
+            await delivery.nack(requeue=True)
+            MESSAGES_CONSUMED.labels("requeue").inc()
+
+        await self._sample_queue_depth()
+
+    async def run(self):
+        """Consume messages until stop() is called, reconnecting on errors"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        if self.should_stop:
+            self._stop_event.set()
+
+        try:
+            while not self._stop_event.is_set():
+                consume = asyncio.create_task(self._consume())
+                stopped = asyncio.create_task(self._stop_event.wait())
+                await asyncio.wait({consume, stopped}, return_when=asyncio.FIRST_COMPLETED)
+
+                if stopped.done():
+                    await self._drain(consume)
+                    break
+
+                stopped.cancel()
+                error = consume.exception()
+                if error is None:
+                    break
+                print(f"Consumer error: {error}")
+                print(f"Retrying in {self.reconnect_delay:g} seconds...")
+                await self._close_connection()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._stop_event.wait(), self.reconnect_delay)
+        finally:
+            await self._close_connection()
+            print("RabbitMQ consumer stopped")
+
+    def start(self):
+        """Run the consumer on a new event loop (blocks until stopped)"""
+        asyncio.run(self.run())
+
+    def stop(self):
+        """Stop consuming messages; safe to call from any thread"""
+        self.should_stop = True
+        if self._loop is None or self._loop.is_closed():
+            return
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+    async def _consume(self):
+        """Handle deliveries one at a time so the broker never outruns the callback"""
+        async for delivery in self._deliveries():
+            if self._stop_event.is_set():
+                await delivery.nack(requeue=True)
+                return
+            self._idle.clear()
+            try:
+                await self.handle(delivery)
+            finally:
+                self._idle.set()
+
+    async def _sample_queue_depth(self):
+        """Update the queue depth gauge at most once per QUEUE_DEPTH_INTERVAL"""
+        now = time.monotonic()
+        if self._queue_depth is None or now - self._queue_depth_checked < QUEUE_DEPTH_INTERVAL:
+            return
+        self._queue_depth_checked = now
+        try:
+            QUEUE_DEPTH.set(await self._queue_depth())
+        except Exception as e:
+            print(f"Could not sample queue depth: {e}")
+
+    async def _drain(self, consume):
+        """Let the message being handled finish, then stop waiting for more"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            print("Timed out waiting for the current message to finish")
+        consume.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await consume
+
+    def _deliveries(self):
+        if self.transport.name == TRANSPORT_MEMORY:
+            return self._memory_deliveries()
+        return self._aio_pika_deliveries()
+
+    async def _aio_pika_deliveries(self):
+        """Deliveries from RabbitMQ; QoS prefetch bounds what the broker pushes"""
+        self.connection = await aio_pika.connect_robust(
+            host=self.config["host"],
+            port=self.config["port"],
+            login=self.config["user"],
+            password=self.config["password"],
+            virtualhost=self.config["vhost"],
+            heartbeat=600,
+        )
+        channel = await self.connection.channel()
+        await channel.set_qos(prefetch_count=self.prefetch)
+
+        exchange = await channel.declare_exchange(
+            self.config["exchange"],
+            aio_pika.ExchangeType.TOPIC,
+            durable=True,
+        )
+        amqp_queue = await channel.declare_queue("", exclusive=True)
+        await amqp_queue.bind(exchange, routing_key=self.config["topic"])
+        self._log_connected()
+
+        async def queue_depth():
+            passive = await channel.declare_queue(amqp_queue.name, passive=True)
+            return passive.declaration_result.message_count
+
+        self._queue_depth = queue_depth
+
+        async with amqp_queue.iterator() as messages:
+            async for message in messages:
+                yield _Delivery(
+                    message.body,
+                    message.content_type,
+                    message.ack,
+                    message.nack,
+                    message.timestamp.timestamp() if message.timestamp else None,
+                )
+
+    async def _memory_deliveries(self):
+        """Deliveries from the in-memory broker without blocking the loop"""
+        self.connection = self.transport.connect(self.config)
+        channel = self.connection.channel()
+        channel.exchange_declare(
+            exchange=self.config["exchange"],
+            exchange_type="topic",
+            durable=True,
+        )
+        queue_name = channel.queue_declare(queue="", exclusive=True).method.queue
+        channel.queue_bind(
+            exchange=self.config["exchange"],
+            queue=queue_name,
+            routing_key=self.config["topic"],
+        )
+        self._log_connected()
+
+        target = self.transport.get_queue(queue_name)
+
+        async def queue_depth():
+            return target.qsize()
+
+        self._queue_depth = queue_depth
+        # Publishers may run on other threads; wake the loop instead of polling
+        loop = asyncio.get_running_loop()
+        published = asyncio.Event()
+        self.transport.add_listener(queue_name, lambda: loop.call_soon_threadsafe(published.set))
+        while True:
+            try:
+                item = target.get_nowait()
+            except queue.Empty:
+                published.clear()
+                if target.empty():
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(published.wait(), self.poll_interval)
+                continue
+
+            _exchange, _routing_key, properties, body, _redelivered = item
+
+            async def ack():
+                pass
+
+            async def nack(requeue=True, item=item):
+                if requeue:
+                    target.put((*item[:4], True))
+
+            yield _Delivery(
+                body,
+                getattr(properties, "content_type", None),
+                ack,
+                nack,
+                getattr(properties, "timestamp", None),
+            )
+
+    async def _close_connection(self):
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        result = connection.close()
+        if inspect.isawaitable(result):
+            with contextlib.suppress(Exception):
+                await result
+
+    def _log_connected(self):
+        print(f"Connected to RabbitMQ: {self.config['host']}:{self.config['port']} (asyncio)")
+        print(
+            f"Listening on exchange '{self.config['exchange']}' "
+            f"with topic '{self.config['topic']}'",
+        )
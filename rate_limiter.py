@@ -0,0 +1,271 @@
+"""
+Token-bucket rate limiting and admission control for the API gateway
+Buckets are kept per key (client id or IP) in process memory by default, or
+in Redis when several gateway processes must share one limit. A concurrency
+limiter caps the number of requests handled at once.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import counter, gauge
+
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BACKEND_MEMORY = "memory"
+BACKEND_REDIS = "redis"
+
+ADMITTED_REQUESTS = counter(
+    "darts_gateway_admitted_requests",
+    "Requests admitted by the gateway's admission control",
+)
+REJECTED_REQUESTS = counter(
+    "darts_gateway_rejected_requests",
+    "Requests rejected by the gateway's admission control (client, ip, concurrency)",
+    ("reason",),
+)
+BACKEND_ERRORS = counter(
+    "darts_gateway_rate_limit_backend_errors",
+    "Rate limit checks that failed open because the bucket backend errored",
+    ("limiter",),
+)
+IN_FLIGHT_REQUESTS = gauge("darts_gateway_in_flight_requests", "Requests being handled")
+
+# Admission control is on unless RATE_LIMIT_ENABLED=false
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+
+class MemoryBucketBackend:
+    """Per-process token buckets in a bounded LRU dictionary"""
+
+    def __init__(self, max_keys: int = 10000):
+        """
+        Initialize backend
+
+        Args:
+            max_keys: Buckets kept; the least recently used key is dropped
+                (a dropped key starts again with a full bucket)
+        """
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        """
+        Take cost tokens from a key's bucket
+
+        Returns:
+            0 if admitted, otherwise seconds until enough tokens are available
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        """Drop every bucket"""
+        with self._lock:
+            self._buckets.clear()
+
+
+# Refill and take tokens atomically on the Redis server
+_REDIS_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketBackend:
+    """Token buckets shared by every gateway process through Redis"""
+
+    def __init__(self, client, prefix: str = "darts:ratelimit:"):
+        """
+        Initialize backend
+
+        Args:
+            client: redis.Redis client
+            prefix: Key prefix for bucket hashes
+        """
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_REDIS_BUCKET_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBucketBackend":
+        """Create a backend connected to a Redis URL"""
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("The redis rate limit backend requires the 'redis' package")
+        return cls(redis.Redis.from_url(url))
+
+    def acquire(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        """Take cost tokens from a key's bucket; see MemoryBucketBackend.acquire"""
+        return float(self._script(keys=[self.prefix + key], args=[rate, burst, cost]))
+
+    def clear(self):
+        """Buckets expire on their own in Redis"""
+
+
+class RateLimiter:
+    """Token-bucket limiter: rate requests per second per key, bursts up to burst"""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: float,
+        backend: MemoryBucketBackend | RedisBucketBackend | None = None,
+    ):
+        """
+        Initialize limiter
+
+        Args:
+            name: Limiter name, used as the metrics label and key prefix
+            rate: Sustained requests per second per key
+            burst: Requests a key may make at once after being idle
+            backend: Bucket storage (per-process memory by default)
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.backend = backend or MemoryBucketBackend()
+
+    def acquire(self, key: str, cost: float = 1) -> float:
+        """
+        Admit a request for a key
+
+        The limiter fails open: if the backend errors (Redis unreachable),
+        the request is admitted and the error counted, so a Redis outage does
+        not take the gateway down. The per-process concurrency cap still
+        bounds the load in that case.
+
+        Returns:
+            0 if admitted, otherwise seconds the caller should wait (Retry-After)
+        """
+        try:
+            wait = self.backend.acquire(f"{self.name}:{key}", self.rate, self.burst, cost)
+        except Exception as e:
+            logger.warning("Rate limit backend failed, admitting request: %s", e)
+            BACKEND_ERRORS.labels(self.name).inc()
+            return 0.0
+        if wait:
+            REJECTED_REQUESTS.labels(self.name).inc()
+        return wait
+
+
+class ConcurrencyLimiter:
+    """Caps requests handled at once; excess requests are refused, not queued"""
+
+    def __init__(self, max_concurrent: int):
+        """
+        Initialize limiter
+
+        Args:
+            max_concurrent: Requests allowed in flight (0 disables the cap)
+        """
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Take a slot; False when the cap is reached"""
+        with self._lock:
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                REJECTED_REQUESTS.labels("concurrency").inc()
+                return False
+            self.in_flight += 1
+            IN_FLIGHT_REQUESTS.set(self.in_flight)
+            return True
+
+    def release(self):
+        """Return a slot taken by try_acquire"""
+        with self._lock:
+            self.in_flight -= 1
+            IN_FLIGHT_REQUESTS.set(self.in_flight)
+
+
+def create_bucket_backend(name: str, redis_url: str | None = None):
+    """
+    Create the bucket backend selected by name
+
+    Args:
+        name: 'memory' (default) or 'redis'
+        redis_url: Redis URL for the 'redis' backend
+    """
+    if name == BACKEND_MEMORY:
+        return MemoryBucketBackend()
+    if name == BACKEND_REDIS:
+        return RedisBucketBackend.from_url(redis_url or "redis://localhost:6379/0")
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+def _env_bucket(prefix: str, rate: str, burst: str) -> tuple[float, float]:
+    """
+    Read a limiter's {prefix}_RATE and {prefix}_BURST settings
+
+    Raises:
+        ValueError: If the rate is not positive or the burst is below one request
+    """
+    rate_value = float(os.getenv(f"{prefix}_RATE", rate))
+    burst_value = float(os.getenv(f"{prefix}_BURST", burst))
+    if not rate_value > 0:
+        raise ValueError(f"{prefix}_RATE must be positive, got {rate_value:g}")
+    if not burst_value >= 1:
+        raise ValueError(f"{prefix}_BURST must be at least 1, got {burst_value:g}")
+    return rate_value, burst_value
+
+
+def limiters_from_env() -> tuple[RateLimiter, RateLimiter, ConcurrencyLimiter]:
+    """
+    Create the gateway's limiters from RATE_LIMIT_* and GATEWAY_MAX_CONCURRENT
+
+    Returns:
+        (per-IP limiter, per-client limiter, concurrency limiter)
+
+    Raises:
+        ValueError: If a rate is not positive or a burst is below one request
+    """
+    backend = create_bucket_backend(
+        os.getenv("RATE_LIMIT_BACKEND", BACKEND_MEMORY),
+        os.getenv("RATE_LIMIT_REDIS_URL"),
+    )
+    ip_rate, ip_burst = _env_bucket("RATE_LIMIT_IP", "50", "100")
+    client_rate, client_burst = _env_bucket("RATE_LIMIT_CLIENT", "10", "20")
+    ip_limiter = RateLimiter("ip", rate=ip_rate, burst=ip_burst, backend=backend)
+    client_limiter = RateLimiter("client", rate=client_rate, burst=client_burst, backend=backend)
+    concurrency_limiter = ConcurrencyLimiter(int(os.getenv("GATEWAY_MAX_CONCURRENT", "64")))
+    return ip_limiter, client_limiter, concurrency_limiter
@@ -0,0 +1,48 @@
+"""
+Player ratings
+Elo ratings updated once per finished game. A game only records its winner,
+so the winner is scored as beating every other player and the rest are not
+compared with each other; the K-factor is shared across those pairings, so a
+win is worth about as much in a 4-player game as in a 2-player one.
+DatabaseService keeps the current ratings in player_ratings (one row per
+player, indexed by rating for the leaderboard) and every change in
+rating_history.
+"""
+
+# Rating of a player before their first rated game
+INITIAL_RATING = 1500.0
+
+# Largest rating change of a game
+K_FACTOR = 32.0
+
+# Rating difference at which the stronger player is expected to win 10:1
+SCALE = 400.0
+
+
+def expected_score(rating, opponent_rating):
+    """Probability that a player rated rating beats one rated opponent_rating"""
+    return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / SCALE))
+
+
+def rate_game(ratings, winner):
+    """
+    Ratings after a finished game
+
+    Args:
+        ratings: Ratings of the players before the game, in player order
+        winner: Index of the winner in ratings
+
+    Returns:
+        List of new ratings, in player order
+    """
+    if len(ratings) < 2:
+        return list(ratings)
+    k = K_FACTOR / (len(ratings) - 1)
+    changes = [0.0] * len(ratings)
+    for index, rating in enumerate(ratings):
+        if index == winner:
+            continue
+        change = k * (1.0 - expected_score(ratings[winner], rating))
+        changes[winner] += change
+        changes[index] -= change
+    return [rating + change for rating, change in zip(ratings, changes, strict=True)]
@@ -0,0 +1,176 @@
+"""
+Wire formats for score messages exchanged over RabbitMQ
+JSON remains the default; a compact fixed-layout binary encoding can be
+negotiated per message through the AMQP content_type property
+"""
+
+import math
+import struct
+from datetime import datetime, timezone
+from typing import Any
+
+import json_provider
+
+JSON_CONTENT_TYPE = "application/json"
+COMPACT_CONTENT_TYPE = "application/vnd.darts.score+binary"
+COMPACT_VERSION = 1
+
+WIRE_FORMAT_JSON = "json"
+WIRE_FORMAT_COMPACT = "compact"
+WIRE_FORMATS = (WIRE_FORMAT_JSON, WIRE_FORMAT_COMPACT)
+
+# Compact v1 layout, network byte order (19 byte header):
+#   B  version
+#   I  board id    (0 = not set)
+#   I  throw id    (0 = not set)
+#   B  segment     (base score, 0-60)
+#   B  multiplier  (see MULTIPLIER_CODES)
+#   d  timestamp   (seconds since the epoch, NaN = not set)
+# followed by the submitting user as UTF-8 (may be empty)
+_COMPACT_V1 = struct.Struct("!BIIBBd")
+
+MULTIPLIER_CODES = {
+    "SINGLE": 1,
+    "DOUBLE": 2,
+    "TRIPLE": 3,
+    "BULL": 4,
+    "DBLBULL": 5,
+}
+MULTIPLIER_NAMES = {code: name for name, code in MULTIPLIER_CODES.items()}
+
+# Keys a message may carry and still be encoded compactly
+_COMPACT_KEYS = frozenset(
+    {"score", "multiplier", "board_id", "throw_id", "timestamp", "user", "player_id", "game_id"},
+)
+_UINT32_MAX = 0xFFFFFFFF
+
+
+class MessageDecodeError(ValueError):
+    """Raised when a message body cannot be decoded for its content type"""
+
+
+def _is_uint32(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= _UINT32_MAX
+
+
+def _to_epoch(timestamp: Any) -> float | None:
+    """Convert an ISO 8601 string or epoch number to epoch seconds"""
+    if timestamp is None:
+        return math.nan
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+def can_encode_compact(message: dict[str, Any]) -> bool:
+    """Check whether a message fits the compact layout without losing data"""
+    if not _COMPACT_KEYS.issuperset(message):
+        return False
+    # player_id/game_id have no slot in the layout and may only be unset
+    if message.get("player_id") is not None or message.get("game_id") is not None:
+        return False
+    score = message.get("score")
+    if not isinstance(score, int) or isinstance(score, bool) or not 0 <= score <= 255:
+        return False
+    for key in ("board_id", "throw_id"):
+        if message.get(key) is not None and not _is_uint32(message[key]):
+            return False
+    user = message.get("user")
+    if user is not None and not isinstance(user, str):
+        return False
+    return (
+        message.get("multiplier") in MULTIPLIER_CODES
+        and _to_epoch(message.get("timestamp")) is not None
+    )
+
+
+def encode_compact(message: dict[str, Any]) -> bytes:
+    """Encode a score message with the compact v1 layout"""
+    header = _COMPACT_V1.pack(
+        COMPACT_VERSION,
+        message.get("board_id") or 0,
+        message.get("throw_id") or 0,
+        message["score"],
+        MULTIPLIER_CODES[message["multiplier"]],
+        _to_epoch(message.get("timestamp")),
+    )
+    return header + (message.get("user") or "").encode("utf-8")
+
+
+def decode_compact(body: bytes) -> dict[str, Any]:
+    """Decode a compact v1 score message"""
+    if len(body) < _COMPACT_V1.size:
+        raise MessageDecodeError(f"Compact message too short: {len(body)} bytes")
+
+    version, board_id, throw_id, score, multiplier_code, timestamp = _COMPACT_V1.unpack_from(
+        body,
+    )
+    if version != COMPACT_VERSION:
+        raise MessageDecodeError(f"Unsupported compact message version: {version}")
+    if multiplier_code not in MULTIPLIER_NAMES:
+        raise MessageDecodeError(f"Unknown multiplier code: {multiplier_code}")
+
+    message: dict[str, Any] = {
+        "score": score,
+        "multiplier": MULTIPLIER_NAMES[multiplier_code],
+    }
+    if board_id:
+        message["board_id"] = board_id
+    if throw_id:
+        message["throw_id"] = throw_id
+    if not math.isnan(timestamp):
+        message["timestamp"] = datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+    try:
+        user = body[_COMPACT_V1.size :].decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise MessageDecodeError(f"Invalid user field: {e}") from e
+    if user:
+        message["user"] = user
+    return message
+
+
+def encode_message(
+    message: dict[str, Any],
+    wire_format: str = WIRE_FORMAT_JSON,
+) -> tuple[bytes, str]:
+    """
+    Encode a message for publishing
+
+    Messages that do not fit the compact layout (batches, game and player
+    events, string ids) fall back to JSON so nothing is lost.
+
+    Returns:
+        (body, content_type) to use for the AMQP publish
+    """
+    if wire_format == WIRE_FORMAT_COMPACT and can_encode_compact(message):
+        return encode_compact(message), f"{COMPACT_CONTENT_TYPE}; v={COMPACT_VERSION}"
+    return json_provider.dumps_bytes(message), JSON_CONTENT_TYPE
+
+
+def decode_message(body: bytes, content_type: Any = None) -> dict[str, Any]:
+    """
+    Decode a message body according to its AMQP content_type
+
+    Anything that is not the compact content type is treated as JSON, which
+    keeps publishers that do not set a content type working.
+
+    Raises:
+        json.JSONDecodeError: If a JSON body is malformed
+        MessageDecodeError: If a compact body is malformed or of an unknown version
+    """
+    if isinstance(content_type, str):
+        media_type, _, params = content_type.partition(";")
+        if media_type.strip().lower() == COMPACT_CONTENT_TYPE:
+            version = params.strip().removeprefix("v=") or str(COMPACT_VERSION)
+            if version != str(COMPACT_VERSION):
+                raise MessageDecodeError(f"Unsupported compact message version: {version}")
+            return decode_compact(body)
+    return json_provider.loads(body)
@@ -0,0 +1,108 @@
+"""
+Validation helpers for dart score payloads
+Shared by the game server and the API gateway so single and batch submissions agree
+"""
+
+import os
+from typing import Any
+
+# Multipliers accepted by the API gateway
+GATEWAY_MULTIPLIERS = frozenset({"SINGLE", "DOUBLE", "TRIPLE"})
+
+# Multipliers understood by the game engine
+GAME_MULTIPLIERS = frozenset({"SINGLE", "DOUBLE", "TRIPLE", "BULL", "DBLBULL"})
+
+# Highest value a single dart can score (triple 20)
+MAX_DART_SCORE = 60
+
+# Upper bound on the number of throws accepted in one batch request
+MAX_BATCH_SIZE = int(os.getenv("MAX_SCORE_BATCH_SIZE", "500"))
+
+
+def validate_throw(
+    data: Any,
+    valid_multipliers: frozenset[str] = GATEWAY_MULTIPLIERS,
+    max_score: int = MAX_DART_SCORE,
+) -> tuple[dict[str, Any] | None, dict[str, str] | None]:
+    """
+    Validate a single throw payload
+
+    Returns:
+        (throw, None) with the score and upper-cased multiplier when valid,
+        (None, error) with an error/message dictionary otherwise
+    """
+    if not isinstance(data, dict) or not data:
+        return None, {
+            "error": "Invalid request",
+            "message": "Request body must be JSON",
+        }
+
+    missing_fields = [field for field in ("score", "multiplier") if field not in data]
+    if missing_fields:
+        return None, {
+            "error": "Missing required fields",
+            "message": f"Required fields: {', '.join(missing_fields)}",
+        }
+
+    score = data["score"]
+    if not isinstance(score, int) or isinstance(score, bool) or not 0 <= score <= max_score:
+        return None, {
+            "error": "Invalid score",
+            "message": f"Score must be an integer between 0 and {max_score}",
+        }
+
+    multiplier = data["multiplier"]
+    multiplier = multiplier.upper() if isinstance(multiplier, str) else None
+    if multiplier not in valid_multipliers:
+        return None, {
+            "error": "Invalid multiplier",
+            "message": f"Multiplier must be one of: {', '.join(sorted(valid_multipliers))}",
+        }
+
+    return {"score": score, "multiplier": multiplier}, None
+
+
+def validate_throws(
+    throws: Any,
+    valid_multipliers: frozenset[str] = GATEWAY_MULTIPLIERS,
+    max_score: int = MAX_DART_SCORE,
+    max_batch_size: int = MAX_BATCH_SIZE,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Validate an ordered batch of throws in a single pass
+
+    Every throw is checked so the caller can report all problems at once.
+    Extra keys on each throw (e.g. player_id, game_id) are preserved.
+
+    Returns:
+        (normalized_throws, errors) where errors is a list of dictionaries
+        carrying the offending "index" plus the error/message of validate_throw
+    """
+    if not isinstance(throws, list) or not throws:
+        return [], [
+            {
+                "index": None,
+                "error": "Invalid batch",
+                "message": "'throws' must be a non-empty array",
+            },
+        ]
+
+    if len(throws) > max_batch_size:
+        return [], [
+            {
+                "index": None,
+                "error": "Batch too large",
+                "message": f"A batch may contain at most {max_batch_size} throws",
+            },
+        ]
+
+    normalized = []
+    errors = []
+    for index, data in enumerate(throws):
+        throw, error = validate_throw(data, valid_multipliers, max_score)
+        if error:
+            errors.append({"index": index, **error})
+        else:
+            normalized.append({**data, **throw})
+
+    return normalized, errors
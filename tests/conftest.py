@@ -11,13 +11,24 @@ import pytest
 os.environ["TTS_ENABLED"] = "false"
 # Use in-memory SQLite for tests
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+# Route RabbitMQ traffic through the in-process broker
+os.environ["RABBITMQ_TRANSPORT"] = "memory"
 
 from app import app
+from token_cache import clear_token_caches
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 
+@pytest.fixture(autouse=True)
+def reset_token_caches():
+    """Start every test without cached token validations."""
+    clear_token_caches()
+    yield
+    clear_token_caches()
+
+
 @pytest.fixture
 def mock_socketio():
     """Mock SocketIO instance."""
@@ -103,3 +114,49 @@ def in_memory_db():
     db_service = DatabaseService("sqlite:///:memory:")
     db_service.initialize_database()
     return db_service
+
+
+@pytest.fixture
+def seeded_history():
+    """
+    Factory of in-memory databases with a 501 and a cricket game of Alice and Bob
+
+    Each player throws one turn of three treble 20s in each game. The
+    factory takes winners (game type -> winning player order; games left
+    out stay unfinished), running_scores (score_before/score_after count
+    down from 501 instead of staying 501/441) and final_score (stored for
+    each player after the turn, if given).
+    """
+    from database_service import DatabaseService
+
+    def seed(winners, *, running_scores=False, final_score=None):
+        service = DatabaseService("sqlite:///:memory:")
+        service.initialize_database()
+        for game_type in ("501", "cricket"):
+            service.start_new_game(game_type, ["Alice", "Bob"], start_score=501)
+            for player_id in (0, 1):
+                for throw_in_turn in (1, 2, 3):
+                    score_before, score_after = (
+                        (561 - 60 * throw_in_turn, 501 - 60 * throw_in_turn)
+                        if running_scores
+                        else (501, 441)
+                    )
+                    service.record_throw(
+                        player_id=player_id,
+                        base_score=20,
+                        multiplier="TRIPLE",
+                        multiplier_value=3,
+                        actual_score=60,
+                        score_before=score_before,
+                        score_after=score_after,
+                        turn_number=1,
+                        throw_in_turn=throw_in_turn,
+                        dartboard_sends_actual_score=False,
+                    )
+                if final_score is not None:
+                    service.update_player_score(player_id, final_score)
+            if game_type in winners:
+                service.mark_winner(player_id=winners[game_type])
+        return service
+
+    return seed
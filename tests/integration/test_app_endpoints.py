@@ -65,6 +65,100 @@ class TestAppEndpoints:
         assert "game_type" in data
         assert "is_started" in data
 
+    def test_get_game_state_not_modified(self, client):
+        """Test the state ETag holds until the game changes."""
+        first = client.get("/api/game/state")
+        etag = {"If-None-Match": first.headers["ETag"]}
+
+        unchanged = client.get("/api/game/state", headers=etag)
+        client.post(
+            "/api/game/new",
+            data=json.dumps({"game_type": "301", "players": ["Alice"]}),
+            content_type="application/json",
+        )
+        changed = client.get("/api/game/state", headers=etag)
+
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        assert unchanged.status_code == 304
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != first.headers["ETag"]
+
+    def test_stream_starts_with_snapshot(self, client):
+        """Test the SSE stream sends the current state first."""
+        with patch("app.STREAM_MAX_SECONDS", 0):
+            response = client.get("/api/game/stream")
+            body = response.get_data(as_text=True)
+
+        assert response.mimetype == "text/event-stream"
+        assert body.startswith("retry: ")
+        assert "event: game_state\ndata: {" in body
+
+    def test_stream_resumes_from_last_event_id(self, client):
+        """Test a reconnecting SSE client gets only the events it missed."""
+        first = client.get("/api/game/stream/poll").get_json()
+        client.post(
+            "/api/game/new",
+            data=json.dumps({"game_type": "301", "players": ["Alice"]}),
+            content_type="application/json",
+        )
+
+        with patch("app.STREAM_MAX_SECONDS", 0):
+            response = client.get(
+                "/api/game/stream",
+                headers={"Last-Event-ID": first["last_event_id"]},
+            )
+            body = response.get_data(as_text=True)
+
+        events = [line for line in body.split("\n") if line]
+        assert events[1].startswith("id: ")
+        assert events[2] == "event: game_state"
+        assert '"is_started":true' in events[3]
+
+    def test_long_poll(self, client):
+        """Test long polling returns new events and times out empty."""
+        snapshot = client.get("/api/game/stream/poll").get_json()
+        client.post(
+            "/api/game/new",
+            data=json.dumps({"game_type": "301", "players": ["Alice"]}),
+            content_type="application/json",
+        )
+        client.post(
+            "/api/Throw",
+            data=json.dumps({"score": 20, "multiplier": "TRIPLE"}),
+            content_type="application/json",
+        )
+
+        update = client.get(
+            f"/api/game/stream/poll?last_event_id={snapshot['last_event_id']}",
+        ).get_json()
+        idle = client.get(
+            f"/api/game/stream/poll?timeout=0&last_event_id={update['last_event_id']}",
+        ).get_json()
+
+        assert [event["event"] for event in snapshot["events"]] == ["game_state"]
+        assert [event["event"] for event in update["events"]] == [
+            "game_state",
+            "throw",
+            "game_state",
+        ]
+        assert update["events"][1]["data"]["actual_score"] == 60
+        assert idle["events"] == []
+        assert idle["last_event_id"] == update["last_event_id"]
+
+    @pytest.mark.parametrize("timeout", ["nan", "inf", "-inf"])
+    def test_long_poll_non_finite_timeout(self, client, timeout):
+        """Test a non-finite timeout falls back to the default wait."""
+        snapshot = client.get("/api/game/stream/poll").get_json()
+
+        with patch("app.game_manager.live_events.wait", return_value=[]) as mock_wait:
+            response = client.get(
+                f"/api/game/stream/poll?timeout={timeout}"
+                f"&last_event_id={snapshot['last_event_id']}",
+            )
+
+        assert response.status_code == 200
+        assert mock_wait.call_args.args[1] == 25
+
     def test_new_game_default(self, client):
         """Test starting new game with defaults."""
         response = client.post(
@@ -0,0 +1,70 @@
+"""Integration tests for token validation against the local IdP stand-in."""
+
+from unittest.mock import patch
+
+import pytest
+
+import auth
+from idp_client import IdPClient
+from jwks_store import JWKSKeyStore
+from local_idp import LocalIdP, LocalIdPServer
+from token_cache import TokenCache
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Local identity provider served over HTTP."""
+    with LocalIdPServer(LocalIdP()) as server:
+        yield server
+
+
+@pytest.fixture
+def idp_auth(server):
+    """Point auth at the local identity provider."""
+    http = IdPClient(retries=0)
+    store = JWKSKeyStore(f"{server.url}/oauth2/jwks", http=http)
+    with patch.multiple(
+        auth,
+        WSO2_IS_INTROSPECT_URL=f"{server.url}/oauth2/introspect",
+        WSO2_IS_USERINFO_URL=f"{server.url}/oauth2/userinfo",
+        idp_client=http,
+        jwks_client=store,
+        token_cache=TokenCache("local-idp"),
+    ):
+        yield server.idp
+    store.stop()
+    http.close()
+
+
+class TestAuthAgainstLocalIdP:
+    """Test auth validation paths end to end without WSO2 IS."""
+
+    @pytest.mark.parametrize("mode", ["jwks", "introspection"])
+    def test_validate_token(self, idp_auth, mode):
+        """Test issued tokens validate and foreign tokens do not."""
+        token = idp_auth.issue_token("alice", roles=("gamemaster",))
+
+        with patch("auth.JWT_VALIDATION_MODE", mode):
+            claims = auth.validate_token(token)
+            rejected = auth.validate_token(LocalIdP().issue_token("mallory"))
+
+        assert claims["sub"] == "alice"
+        assert auth.get_user_roles(claims) == ["gamemaster"]
+        assert rejected is None
+
+    def test_cached_validation_skips_idp(self, idp_auth):
+        """Test repeated validations are answered from the cache."""
+        token = idp_auth.issue_token("alice")
+
+        with patch("auth.JWT_VALIDATION_MODE", "introspection"):
+            before = idp_auth.requests["introspect"]
+            for _ in range(5):
+                assert auth.validate_token(token)
+
+        assert idp_auth.requests["introspect"] == before + 1
+
+    def test_get_user_info(self, idp_auth):
+        """Test userinfo is fetched over the pooled client."""
+        token = idp_auth.issue_token("bob", roles=("player",))
+
+        assert auth.get_user_info(token)["groups"] == ["player"]
@@ -0,0 +1,213 @@
+"""Integration tests checking the hot database queries use indexes (SQLite EXPLAIN QUERY PLAN)."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from database_models import GameResult, GameType, Player, Score
+from database_service import DatabaseService, history_cursor, leaderboard_cursor
+
+TABLES = ("player", "gameresults", "scores", "player_ratings", "rating_history")
+
+
+@pytest.fixture(scope="module")
+def db_service(tmp_path_factory):
+    """Database service over a seeded SQLite history with planner statistics."""
+    path = tmp_path_factory.mktemp("plans") / "darts.db"
+    service = DatabaseService(f"sqlite:///{path}")
+    service.initialize_database()
+    session = service.db_manager.get_session()
+    game_type_id = session.query(GameType).filter_by(name="501").one().id
+    session.execute(insert(Player), [{"name": f"Player {index}"} for index in range(20)])
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    results, scores = [], []
+    for game in range(300):
+        session_id = str(uuid.uuid4())
+        for order in range(2):
+            result_id = game * 2 + order + 1
+            results.append(
+                {
+                    "id": result_id,
+                    "game_type_id": game_type_id,
+                    "player_id": (game + order) % 20 + 1,
+                    "player_order": order,
+                    "start_score": 501,
+                    "final_score": 0,
+                    "is_winner": order == 0,
+                    "started_at": started + timedelta(minutes=game),
+                    "finished_at": started + timedelta(minutes=game + 1),
+                    "game_session_id": session_id,
+                },
+            )
+            scores.extend(
+                {
+                    "game_result_id": result_id,
+                    "player_id": (game + order) % 20 + 1,
+                    "throw_sequence": sequence,
+                    "turn_number": (sequence - 1) // 3 + 1,
+                    "throw_in_turn": (sequence - 1) % 3 + 1,
+                    "base_score": 20,
+                    "multiplier": "SINGLE",
+                    "multiplier_value": 1,
+                    "actual_score": 20,
+                    "score_before": 501,
+                    "score_after": 481,
+                    "dartboard_sends_actual_score": False,
+                    "thrown_at": started + timedelta(minutes=game, seconds=sequence),
+                }
+                for sequence in range(1, 10)
+            )
+    session.execute(insert(GameResult), results)
+    session.execute(insert(Score), scores)
+    session.commit()
+    service.rebuild_ratings()
+    session.execute(text("ANALYZE"))
+    session.close()
+    return service
+
+
+def captured_statements(service, workload):
+    """(statement, parameters) of every query run by workload, inserts excluded"""
+    statements = []
+
+    def record(_conn, _cursor, statement, parameters, *_args):
+        if not statement.lstrip().upper().startswith("INSERT"):
+            statements.append((statement, parameters))
+
+    event.listen(service.db_manager.engine, "before_cursor_execute", record)
+    try:
+        workload()
+    finally:
+        event.remove(service.db_manager.engine, "before_cursor_execute", record)
+    return statements
+
+
+def query_plan(service, statement, parameters):
+    """EXPLAIN QUERY PLAN detail lines of a statement"""
+    with service.db_manager.engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in rows]
+
+
+def full_table_scans(plan):
+    """Plan lines reading one of the game tables without an index"""
+    return [
+        line
+        for line in plan
+        if any(line == f"SCAN {table}" for table in TABLES)
+        or any(line.startswith(f"SCAN {table} ") and "USING" not in line for table in TABLES)
+    ]
+
+
+def play_and_read(service):
+    """Record a short game and read it back like the app does"""
+    session_id = service.start_new_game("501", ["Player 1", "Player 2"], start_score=501)
+    for throw_in_turn in range(1, 4):
+        service.record_throw(
+            player_id=0,
+            base_score=20,
+            multiplier="SINGLE",
+            multiplier_value=1,
+            actual_score=20,
+            score_before=501,
+            score_after=481,
+            turn_number=1,
+            throw_in_turn=throw_in_turn,
+            dartboard_sends_actual_score=False,
+            is_bust=False,
+            is_finish=False,
+        )
+    service.undo_throws_for_bust(player_id=0, throw_count=2)
+    service.update_player_score(player_id=0, final_score=481)
+    service.mark_winner(player_id=0)
+    service.get_game_replay_data(session_id)
+    first_page = service.get_recent_games(limit=20)
+    service.get_recent_games(limit=20, cursor=history_cursor(first_page[-1]))
+    leaders = service.get_leaderboard(limit=5)
+    service.get_leaderboard(limit=5, cursor=leaderboard_cursor(leaders[-1]))
+    service.get_player_rating(leaders[0]["player_id"])
+
+
+class TestQueryPlans:
+    """Test the queries behind throws, replays, history and ratings are served by indexes."""
+
+    def test_no_full_table_scans(self, db_service):
+        """Test no query of a game's lifecycle scans a whole table."""
+        statements = captured_statements(db_service, lambda: play_and_read(db_service))
+
+        plans = {
+            statement: query_plan(db_service, statement, params) for statement, params in statements
+        }
+
+        assert len(plans) >= 8
+        for statement, plan in plans.items():
+            assert not full_table_scans(plan), f"{plan}\n{statement}"
+
+    def test_expected_indexes_are_used(self, db_service):
+        """Test each new index backs the query it was added for."""
+        statements = captured_statements(db_service, lambda: play_and_read(db_service))
+
+        used = "\n".join(
+            line
+            for statement, params in statements
+            for line in query_plan(db_service, statement, params)
+        )
+
+        for index in (
+            "ix_player_name",
+            "ix_gameresults_game_session_id",
+            "ix_gameresults_history",
+            "uq_scores_game_result_id_throw_sequence",
+            "ix_player_ratings_leaderboard",
+            "ix_rating_history_player_id",
+        ):
+            assert index in used
+
+    def test_detects_missing_index(self, db_service):
+        """Test the check fails when an index is missing."""
+        statement = (
+            "SELECT id FROM scores WHERE game_result_id = ? ORDER BY throw_sequence DESC LIMIT 2"
+        )
+        with db_service.db_manager.engine.begin() as connection:
+            connection.execute(text("DROP INDEX uq_scores_game_result_id_throw_sequence"))
+        try:
+            assert full_table_scans(query_plan(db_service, statement, (1,)))
+        finally:
+            with db_service.db_manager.engine.begin() as connection:
+                connection.execute(
+                    text(
+                        "CREATE UNIQUE INDEX uq_scores_game_result_id_throw_sequence "
+                        "ON scores (game_result_id, throw_sequence)",
+                    ),
+                )
+
+        assert not full_table_scans(query_plan(db_service, statement, (1,)))
+
+    def test_duplicate_throw_sequence_rejected(self, db_service):
+        """Test a sequence number is stored once per result."""
+        session = db_service.db_manager.get_session()
+        try:
+            duplicate = session.query(Score).filter_by(game_result_id=1, throw_sequence=1).one()
+            session.add(
+                Score(
+                    game_result_id=1,
+                    player_id=duplicate.player_id,
+                    throw_sequence=1,
+                    turn_number=1,
+                    throw_in_turn=1,
+                    base_score=5,
+                    multiplier="SINGLE",
+                    multiplier_value=1,
+                    actual_score=5,
+                    score_before=501,
+                    score_after=496,
+                    dartboard_sends_actual_score=False,
+                ),
+            )
+            with pytest.raises(Exception, match="UNIQUE"):
+                session.commit()
+        finally:
+            session.rollback()
+            session.close()
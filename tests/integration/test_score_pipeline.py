@@ -0,0 +1,120 @@
+"""End-to-end tests for the gateway -> consumer -> GameManager pipeline.
+
+The in-memory transport (RABBITMQ_TRANSPORT=memory, set in conftest) stands in
+for RabbitMQ, so these run without a broker.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from game_manager import GameManager
+from rabbitmq_consumer import RabbitMQConsumer
+
+
+@pytest.fixture
+def gateway():
+    """API gateway test client with token validation stubbed out."""
+    import api_gateway
+
+    claims = {"sub": "dartboard-001", "scope": "score:write"}
+    with patch("api_gateway.validate_jwt_token", return_value=claims):
+        api_gateway.app.config["TESTING"] = True
+        with api_gateway.app.test_client() as client:
+            yield client
+
+
+@pytest.fixture
+def game_manager(mock_socketio):
+    """Game manager with a fresh 301 game."""
+    manager = GameManager(mock_socketio)
+    manager.new_game("301", ["Alice", "Bob"])
+    return manager
+
+
+@pytest.fixture
+def consumer(game_manager, mock_rabbitmq_config):
+    """Consumer bound to the scores topic that feeds the game manager."""
+    from app import on_score_received
+
+    config = {**mock_rabbitmq_config, "transport": "memory"}
+    with patch("app.game_manager", game_manager):
+        consumer = RabbitMQConsumer(config, on_score_received)
+        yield consumer
+        consumer.stop()
+
+
+def _subscribe(consumer):
+    queue_name = consumer.connect()
+    consumer.channel.basic_consume(queue=queue_name, on_message_callback=consumer.on_message)
+
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+
+class TestScorePipeline:
+    """Test scores flowing from the gateway to the game."""
+
+    def test_single_score(self, gateway, consumer, game_manager):
+        """Test a score posted to the gateway is applied to the game."""
+        _subscribe(consumer)
+
+        response = gateway.post(
+            "/api/v1/scores",
+            json={"score": 20, "multiplier": "TRIPLE"},
+            headers=HEADERS,
+        )
+        assert response.status_code == 201
+
+        consumer.connection.process_data_events()
+        assert game_manager.game.players[0]["score"] == 301 - 60
+
+    def test_batch(self, gateway, consumer, game_manager, mock_socketio):
+        """Test a gateway batch is applied with one state broadcast."""
+        _subscribe(consumer)
+        mock_socketio.emit.reset_mock()
+
+        response = gateway.post(
+            "/api/v1/scores:batch",
+            json={
+                "throws": [
+                    {"score": 20, "multiplier": "TRIPLE"},
+                    {"score": 19, "multiplier": "TRIPLE"},
+                ],
+            },
+            headers=HEADERS,
+        )
+        assert response.status_code == 201
+
+        consumer.connection.process_data_events()
+        assert game_manager.game.players[0]["score"] == 301 - 60 - 57
+        state_emits = [c for c in mock_socketio.emit.call_args_list if c[0][0] == "game_state"]
+        assert len(state_emits) == 1
+
+    def test_threaded_consumer(self, gateway, consumer, game_manager):
+        """Test the consumer's own start() loop delivers published scores."""
+        bound = threading.Event()
+        connect = consumer.connect
+
+        def connect_and_signal():
+            queue_name = connect()
+            bound.set()
+            return queue_name
+
+        consumer.connect = connect_and_signal
+        thread = threading.Thread(target=consumer.start, daemon=True)
+        thread.start()
+        assert bound.wait(timeout=5)
+        deadline = time.monotonic() + 5
+
+        gateway.post("/api/v1/scores", json={"score": 5, "multiplier": "SINGLE"}, headers=HEADERS)
+
+        while game_manager.game.players[0]["score"] == 301 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        consumer.stop()
+        thread.join(timeout=5)
+
+        assert game_manager.game.players[0]["score"] == 296
+        assert not thread.is_alive()
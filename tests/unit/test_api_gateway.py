@@ -0,0 +1,138 @@
+"""Unit tests for the API gateway's admission control."""
+
+from unittest.mock import patch
+
+import pytest
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+import api_gateway
+from rate_limiter import ConcurrencyLimiter, RateLimiter
+
+HEADERS = {"Authorization": "Bearer test-token"}
+THROW = {"score": 20, "multiplier": "SINGLE"}
+
+
+@pytest.fixture
+def client():
+    """Gateway test client with token validation stubbed out."""
+    claims = {"sub": "dartboard-001", "client_id": "board-client", "scope": "score:write"}
+    with (
+        patch("api_gateway.validate_jwt_token", return_value=claims),
+        patch("api_gateway.ip_limiter", RateLimiter("ip", rate=100, burst=100)),
+        patch("api_gateway.client_limiter", RateLimiter("client", rate=100, burst=100)),
+        patch("api_gateway.concurrency_limiter", ConcurrencyLimiter(8)),
+    ):
+        api_gateway.app.config["TESTING"] = True
+        with api_gateway.app.test_client() as client:
+            yield client
+
+
+class TestAdmissionControl:
+    """Test rate limits and the concurrency cap."""
+
+    def test_client_rate_limit(self, client):
+        """Test a client over its limit gets 429 with Retry-After."""
+        with patch("api_gateway.client_limiter", RateLimiter("client", rate=0.5, burst=2)):
+            statuses = [
+                client.post("/api/v1/scores", json=THROW, headers=HEADERS).status_code
+                for _ in range(3)
+            ]
+            response = client.post("/api/v1/scores", json=THROW, headers=HEADERS)
+
+        assert statuses == [201, 201, 429]
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        assert response.get_json()["error"] == "Too many requests"
+
+    def test_ip_rate_limit_before_auth(self, client):
+        """Test the IP limit rejects before the token is validated."""
+        with (
+            patch("api_gateway.ip_limiter", RateLimiter("ip", rate=1, burst=1)),
+            patch("api_gateway.validate_jwt_token") as mock_validate,
+        ):
+            mock_validate.return_value = {"sub": "dartboard-001", "scope": "score:write"}
+            client.post("/api/v1/scores", json=THROW, headers=HEADERS)
+            response = client.post("/api/v1/scores", json=THROW, headers=HEADERS)
+
+        assert response.status_code == 429
+        assert mock_validate.call_count == 1
+
+    def test_ip_rate_limit_uses_forwarded_for(self, client):
+        """Test clients behind a trusted proxy get their own IP bucket."""
+        with (
+            patch("api_gateway.ip_limiter", RateLimiter("ip", rate=1, burst=1)),
+            patch.object(api_gateway.app, "wsgi_app", ProxyFix(api_gateway.app.wsgi_app, x_for=1)),
+        ):
+            statuses = [
+                client.post(
+                    "/api/v1/scores",
+                    json=THROW,
+                    headers={**HEADERS, "X-Forwarded-For": forwarded_for},
+                ).status_code
+                for forwarded_for in ("10.0.0.1", "10.0.0.2", "10.0.0.9, 10.0.0.1")
+            ]
+
+        assert statuses == [201, 201, 429]
+
+    def test_concurrency_cap(self, client):
+        """Test requests beyond the concurrency cap get 503."""
+        limiter = ConcurrencyLimiter(1)
+        limiter.try_acquire()
+        with patch("api_gateway.concurrency_limiter", limiter):
+            response = client.post("/api/v1/scores", json=THROW, headers=HEADERS)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_concurrency_slot_released(self, client):
+        """Test every admitted request gives its slot back."""
+        limiter = ConcurrencyLimiter(1)
+        with patch("api_gateway.concurrency_limiter", limiter):
+            for _ in range(3):
+                response = client.post("/api/v1/scores", json=THROW, headers=HEADERS)
+                assert response.status_code == 201
+
+        assert limiter.in_flight == 0
+
+    def test_health_is_exempt(self, client):
+        """Test health checks are never limited."""
+        with patch("api_gateway.ip_limiter", RateLimiter("ip", rate=1, burst=1)):
+            statuses = {client.get("/health").status_code for _ in range(5)}
+
+        assert statuses == {200}
+
+    def test_oversized_body(self, client):
+        """Test a body over MAX_REQUEST_BODY_BYTES gets a JSON 413."""
+        with patch.dict(api_gateway.app.config, {"MAX_CONTENT_LENGTH": 16}):
+            response = client.post(
+                "/api/v1/scores",
+                json={**THROW, "note": "x" * 32},
+                headers=HEADERS,
+            )
+
+        assert response.status_code == 413
+        assert response.get_json()["error"] == "Payload too large"
+
+    def test_disabled(self, client):
+        """Test RATE_LIMIT_ENABLED=false turns admission control off."""
+        with (
+            patch("api_gateway.RATE_LIMIT_ENABLED", False),
+            patch("api_gateway.client_limiter", RateLimiter("client", rate=1, burst=1)),
+        ):
+            statuses = {
+                client.post("/api/v1/scores", json=THROW, headers=HEADERS).status_code
+                for _ in range(3)
+            }
+
+        assert statuses == {201}
+
+    def test_metrics_endpoint(self, client):
+        """Test admission metrics are exposed on /metrics."""
+        client.post("/api/v1/scores", json=THROW, headers=HEADERS)
+
+        response = client.get("/metrics")
+
+        body = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert "darts_gateway_admitted_requests" in body
+        assert "darts_gateway_rejected_requests" in body
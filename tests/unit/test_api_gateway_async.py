@@ -0,0 +1,272 @@
+"""Unit tests for the ASGI API gateway."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+import api_gateway_async
+from gateway_common import RABBITMQ_CONFIG
+from jwks_store import JWKSKeyStore
+from rate_limiter import ConcurrencyLimiter, RateLimiter
+from transport import get_default_broker
+
+CLAIMS = {
+    "sub": "dartboard-001",
+    "client_id": "board-client",
+    "scope": "score:write game:write player:write",
+}
+HEADERS = {"Authorization": "Bearer test-token"}
+
+
+def call(method, path, body=None, headers=None, raw=None):
+    """Send one request through the ASGI app; returns (status, headers, body)."""
+    sent = []
+    payload = raw if raw is not None else (json.dumps(body).encode() if body is not None else b"")
+    events = [{"type": "http.request", "body": payload, "more_body": False}]
+
+    async def receive():
+        return events.pop(0) if events else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 50000),
+    }
+    asyncio.run(api_gateway_async.app(scope, receive, send))
+    response_headers = dict(sent[0]["headers"])
+    content = sent[1]["body"]
+    if response_headers.get(b"content-type") == b"application/json":
+        content = json.loads(content)
+    return sent[0]["status"], response_headers, content
+
+
+@pytest.fixture
+def authorized():
+    """Stub token validation and use generous limits."""
+    with (
+        patch("api_gateway_async.validate_jwt_token", AsyncMock(return_value=CLAIMS)),
+        patch("api_gateway_async.ip_limiter", RateLimiter("ip", rate=100, burst=100)),
+        patch("api_gateway_async.client_limiter", RateLimiter("client", rate=100, burst=100)),
+        patch("api_gateway_async.concurrency_limiter", ConcurrencyLimiter(8)),
+    ):
+        yield
+
+
+@pytest.fixture
+def published_queue():
+    """In-memory queue receiving everything the gateway publishes."""
+    broker = get_default_broker()
+    channel = broker.connect(RABBITMQ_CONFIG).channel()
+    channel.exchange_declare(exchange=RABBITMQ_CONFIG["exchange"], exchange_type="topic")
+    name = channel.queue_declare(queue="", exclusive=True).method.queue
+    channel.queue_bind(exchange=RABBITMQ_CONFIG["exchange"], queue=name, routing_key="darts.#")
+    yield broker.get_queue(name)
+    broker.delete_queue(name)
+
+
+class TestAsyncGatewayEndpoints:
+    """Test the ASGI gateway keeps the Flask gateway's contract."""
+
+    def test_health(self):
+        """Test the health check needs no token."""
+        status, _headers, body = call("GET", "/health")
+
+        assert status == 200
+        assert body["status"] == "healthy"
+
+    def test_submit_score(self, authorized, published_queue):
+        """Test a score is validated and published."""
+        status, headers, body = call(
+            "POST",
+            "/api/v1/scores",
+            {"score": 20, "multiplier": "TRIPLE"},
+            HEADERS,
+        )
+
+        assert status == 201
+        assert body["message"] == "Score submitted successfully"
+        assert body["data"]["user"] == "dartboard-001"
+        assert headers[b"access-control-allow-origin"] == b"*"
+        _exchange, routing_key, _properties, payload, _redelivered = published_queue.get_nowait()
+        assert routing_key == "darts.scores.api"
+        assert json.loads(payload)["score"] == 20
+
+    def test_submit_score_batch(self, authorized, published_queue):
+        """Test a batch is published as one message."""
+        throws = [{"score": 20, "multiplier": "TRIPLE"}, {"score": 5, "multiplier": "SINGLE"}]
+
+        status, _headers, body = call("POST", "/api/v1/scores:batch", {"throws": throws}, HEADERS)
+
+        assert status == 201
+        assert body["message"] == "2 scores submitted successfully"
+        assert published_queue.get_nowait()[1] == "darts.scores.api.batch"
+
+    def test_create_game_and_add_player(self, authorized):
+        """Test game and player events are accepted."""
+        game = call("POST", "/api/v1/games", {"game_type": "501", "players": ["A"]}, HEADERS)
+        player = call("POST", "/api/v1/players", {"name": "Bob"}, HEADERS)
+
+        assert game[0] == 201
+        assert game[2]["data"]["game_type"] == "501"
+        assert player[0] == 201
+        assert player[2]["data"]["name"] == "Bob"
+
+    def test_validation_errors(self, authorized):
+        """Test invalid bodies get the same 400 responses as the Flask gateway."""
+        bad_score = call("POST", "/api/v1/scores", {"score": 99, "multiplier": "SINGLE"}, HEADERS)
+        bad_game = call("POST", "/api/v1/games", {"game_type": "999", "players": ["A"]}, HEADERS)
+        bad_json = call("POST", "/api/v1/players", headers=HEADERS, raw=b"{not json")
+
+        assert bad_score[0] == 400
+        assert bad_game[2]["error"] == "Invalid game type"
+        assert bad_json[0] == 400
+
+    def test_oversized_body(self, authorized):
+        """Test a streamed body over the limit gets 413 without reading the rest."""
+        sent = []
+        events = [{"type": "http.request", "body": b"x" * 16, "more_body": True}] * 10
+
+        async def receive():
+            return events.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/v1/players",
+            "headers": [(b"authorization", b"Bearer test-token")],
+            "client": ("127.0.0.1", 50000),
+        }
+        with patch("api_gateway_async.MAX_REQUEST_BODY_BYTES", 40):
+            asyncio.run(api_gateway_async.app(scope, receive, send))
+
+        assert sent[0]["status"] == 413
+        assert json.loads(sent[1]["body"])["error"] == "Payload too large"
+        assert len(events) == 7
+
+    def test_missing_token(self):
+        """Test requests without a bearer token get 401."""
+        status, _headers, body = call("POST", "/api/v1/scores", {"score": 20})
+
+        assert status == 401
+        assert body["error"] == "Missing Authorization header"
+
+    def test_insufficient_scope(self):
+        """Test tokens without the endpoint's scope get 403."""
+        claims = {"sub": "viewer", "scope": "score:read"}
+        with patch("api_gateway_async.validate_jwt_token", AsyncMock(return_value=claims)):
+            status, _headers, _body = call("POST", "/api/v1/games", {"players": ["A"]}, HEADERS)
+
+        assert status == 403
+
+    def test_not_found_and_method_not_allowed(self):
+        """Test unknown paths and methods."""
+        assert call("GET", "/api/v1/unknown")[0] == 404
+        assert call("GET", "/api/v1/scores")[0] == 405
+
+    def test_client_rate_limit(self, authorized):
+        """Test a client over its limit gets 429 with Retry-After."""
+        with patch("api_gateway_async.client_limiter", RateLimiter("client", rate=1, burst=1)):
+            call("POST", "/api/v1/players", {"name": "A"}, HEADERS)
+            status, headers, _body = call("POST", "/api/v1/players", {"name": "B"}, HEADERS)
+
+        assert status == 429
+        assert headers[b"retry-after"] == b"1"
+
+    def test_ip_rate_limit_uses_forwarded_for(self, authorized):
+        """Test clients behind a trusted proxy get their own IP bucket."""
+        with (
+            patch("api_gateway_async.ip_limiter", RateLimiter("ip", rate=1, burst=1)),
+            patch("api_gateway_async.TRUSTED_PROXY_HOPS", 1),
+        ):
+            statuses = [
+                call(
+                    "POST",
+                    "/api/v1/players",
+                    {"name": "A"},
+                    {**HEADERS, "X-Forwarded-For": forwarded_for},
+                )[0]
+                for forwarded_for in ("10.0.0.1", "10.0.0.2", "10.0.0.9, 10.0.0.1")
+            ]
+
+        assert statuses == [201, 201, 429]
+
+    def test_publish_failure(self, authorized):
+        """Test a failed publish returns 500."""
+        with patch.object(
+            api_gateway_async.rabbitmq_publisher,
+            "publish",
+            AsyncMock(return_value=False),
+        ):
+            status, _headers, body = call("POST", "/api/v1/players", {"name": "A"}, HEADERS)
+
+        assert status == 500
+        assert body["error"] == "Failed to add player"
+
+    def test_metrics(self):
+        """Test metrics are exposed in Prometheus format."""
+        status, headers, body = call("GET", "/metrics")
+
+        assert status == 200
+        assert headers[b"content-type"].startswith(b"text/plain")
+        assert b"darts_gateway_admitted_requests" in body
+
+
+class TestAsyncTokenValidation:
+    """Test token validation on the event loop."""
+
+    @patch("api_gateway_async.JWT_VALIDATION_MODE", "introspection")
+    @patch("api_gateway_async.HTTPX_AVAILABLE", False)
+    def test_introspection_is_cached(self):
+        """Test introspection results are cached like the Flask gateway."""
+        response = Mock(status_code=200)
+        response.json.return_value = {"active": True, "sub": "dartboard-001"}
+        with patch.object(api_gateway_async.idp_client, "post", return_value=response) as post:
+            first = asyncio.run(api_gateway_async.validate_jwt_token("token-a"))
+            second = asyncio.run(api_gateway_async.validate_jwt_token("token-a"))
+
+        assert first == second == {"active": True, "sub": "dartboard-001"}
+        post.assert_called_once()
+
+    @patch("api_gateway_async.JWT_VALIDATION_MODE", "introspection")
+    @patch("api_gateway_async.HTTPX_AVAILABLE", False)
+    def test_inactive_token(self):
+        """Test inactive tokens are rejected."""
+        response = Mock(status_code=200)
+        response.json.return_value = {"active": False}
+        with patch.object(api_gateway_async.idp_client, "post", return_value=response):
+            assert asyncio.run(api_gateway_async.validate_jwt_token("token-b")) is None
+
+    @patch("api_gateway_async.JWT_VALIDATION_MODE", "jwks")
+    def test_jwks(self):
+        """Test tokens are verified against the key store."""
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+        jwk.update({"kid": "key-1", "use": "sig"})
+        store = JWKSKeyStore("https://idp.example/oauth2/jwks")
+        store._refresher = Mock()
+        store.load_jwks({"keys": [jwk]})
+        token = jwt.encode(
+            {"sub": "dartboard-001", "exp": int(time.time()) + 60},
+            private_key,
+            algorithm="RS256",
+            headers={"kid": "key-1"},
+        )
+
+        with patch("api_gateway_async.jwks_client", store):
+            claims = asyncio.run(api_gateway_async.validate_jwt_token(token))
+
+        assert claims["sub"] == "dartboard-001"
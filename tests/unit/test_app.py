@@ -21,6 +21,16 @@ class TestAppModule:
             # Verify game_manager.process_score was called
             mock_game_manager.process_score.assert_called_once_with(score_data)
 
+    def test_on_score_received_batch(self):
+        """Test on_score_received routes gateway batches to process_scores."""
+        with patch("app.game_manager") as mock_game_manager:
+            throws = [{"score": 20, "multiplier": "TRIPLE"}, {"score": 5, "multiplier": "SINGLE"}]
+
+            on_score_received({"throws": throws, "user": "board-1"})
+
+            mock_game_manager.process_scores.assert_called_once_with(throws)
+            mock_game_manager.process_score.assert_not_called()
+
     @patch("app.RabbitMQConsumer")
     @patch("app.threading.Thread")
     def test_start_rabbitmq_consumer_success(self, mock_thread, mock_consumer_class):
@@ -122,3 +132,95 @@ class TestAppModule:
         assert config["vhost"] == "/custom"
         assert config["exchange"] == "custom_exchange"
         assert config["topic"] == "custom.topic"
+
+    @patch.dict(os.environ, {"RABBITMQ_CONSUMER": "asyncio", "RABBITMQ_PREFETCH": "4"})
+    @patch("app.RabbitMQConsumer")
+    @patch("app.AsyncRabbitMQConsumer")
+    @patch("app.threading.Thread")
+    def test_start_rabbitmq_consumer_asyncio(
+        self,
+        mock_thread,
+        mock_async_consumer_class,
+        mock_consumer_class,
+    ):
+        """Test RABBITMQ_CONSUMER=asyncio selects the asyncio consumer."""
+        from app import start_rabbitmq_consumer
+
+        start_rabbitmq_consumer()
+
+        mock_consumer_class.assert_not_called()
+        config = mock_async_consumer_class.call_args[0][0]
+        assert config["consumer"] == "asyncio"
+        assert config["prefetch"] == 4
+        mock_thread.assert_called_once_with(
+            target=mock_async_consumer_class.return_value.start,
+            daemon=True,
+        )
+
+
+class TestThrowBatchEndpoint:
+    """Test the /api/Throw/batch endpoint."""
+
+    def test_submit_batch(self, app_client):
+        """Test a valid batch is applied in one call."""
+        with patch("app.game_manager") as mock_game_manager:
+            mock_game_manager.process_scores.return_value = 2
+
+            response = app_client.post(
+                "/api/Throw/batch",
+                json={
+                    "throws": [
+                        {"score": 20, "multiplier": "triple"},
+                        {"score": 25, "multiplier": "BULL"},
+                    ],
+                },
+            )
+
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data["submitted"] == 2
+            assert data["applied"] == 2
+            mock_game_manager.process_scores.assert_called_once_with(
+                [
+                    {"score": 20, "multiplier": "TRIPLE"},
+                    {"score": 25, "multiplier": "BULL"},
+                ],
+            )
+
+    def test_submit_batch_rejects_invalid_throws(self, app_client):
+        """Test an invalid throw rejects the whole batch."""
+        with patch("app.game_manager") as mock_game_manager:
+            response = app_client.post(
+                "/api/Throw/batch",
+                json={
+                    "throws": [
+                        {"score": 20, "multiplier": "SINGLE"},
+                        {"score": -1, "multiplier": "SINGLE"},
+                    ],
+                },
+            )
+
+            assert response.status_code == 400
+            data = response.get_json()
+            assert data["errors"][0]["index"] == 1
+            mock_game_manager.process_scores.assert_not_called()
+
+    def test_submit_batch_requires_throws(self, app_client):
+        """Test a body without a throws array is rejected."""
+        response = app_client.post("/api/Throw/batch", json={"score": 20})
+        assert response.status_code == 400
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics endpoint."""
+
+    def test_metrics(self, app_client):
+        """Test pipeline metrics are exposed in the Prometheus text format."""
+        response = app_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        text = response.get_data(as_text=True)
+        assert "# TYPE darts_broker_delay_seconds histogram" in text
+        assert "# TYPE darts_process_score_seconds histogram" in text
+        assert "# TYPE darts_queue_depth gauge" in text
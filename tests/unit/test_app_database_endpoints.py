@@ -1,10 +1,13 @@
 """Unit tests for app.py database endpoints."""
 
+from datetime import date, datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from app import app
+from database_service import history_cursor, leaderboard_cursor
+from http_cache import ETagCache
 
 
 class TestDatabaseEndpoints:
@@ -52,7 +55,31 @@ class TestDatabaseEndpoints:
 
         response = client.get("/api/game/history?limit=5")
         assert response.status_code == 200
-        mock_db.get_recent_games.assert_called_once_with(limit=5)
+        mock_db.get_recent_games.assert_called_once_with(limit=5, cursor=None)
+
+    def test_get_game_history_next_cursor(self, client, mock_game_manager):
+        """Test a full page links to the next one and the cursor is passed on."""
+        _mock_gm, mock_db = mock_game_manager
+        game = {"game_session_id": "test-id", "started_at": "2024-01-01T00:00:00"}
+        mock_db.get_recent_games.return_value = [game]
+
+        full = client.get("/api/game/history?limit=1").get_json()
+        client.get(f"/api/game/history?limit=1&cursor={full['next_cursor']}")
+        mock_db.get_recent_games.return_value = []
+        last = client.get("/api/game/history?limit=1&cursor=abc").get_json()
+
+        assert full["next_cursor"] == history_cursor(game)
+        mock_db.get_recent_games.assert_any_call(limit=1, cursor=full["next_cursor"])
+        assert last["next_cursor"] is None
+
+    def test_get_game_history_invalid_cursor(self, client, mock_game_manager):
+        """Test a malformed cursor is a client error."""
+        _mock_gm, mock_db = mock_game_manager
+        mock_db.get_recent_games.side_effect = ValueError("Invalid history cursor: x")
+
+        response = client.get("/api/game/history?cursor=x")
+
+        assert response.status_code == 400
 
     def test_get_game_history_error(self, client, mock_game_manager):
         """Test game history endpoint when error occurs."""
@@ -100,6 +127,185 @@ class TestDatabaseEndpoints:
         data = response.get_json()
         assert data["status"] == "error"
 
+    def test_get_player_stats(self, client, mock_game_manager):
+        """Test player statistics are returned with filters passed on."""
+        _mock_gm, mock_db = mock_game_manager
+        mock_db.get_player_stats.return_value = {
+            "player_id": 7,
+            "player_name": "Alice",
+            "game_types": [{"game_type": "501", "three_dart_average": 60.0, "periods": []}],
+        }
+
+        response = client.get("/api/players/7/stats?game_type=501&period=2024-06")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["status"] == "success"
+        assert data["player_name"] == "Alice"
+        assert data["game_types"][0]["three_dart_average"] == 60.0
+        mock_db.get_player_stats.assert_called_once_with(
+            7,
+            game_type="501",
+            period=date(2024, 6, 1),
+        )
+
+    def test_get_player_stats_not_found(self, client, mock_game_manager):
+        """Test statistics of an unknown player."""
+        _mock_gm, mock_db = mock_game_manager
+        mock_db.get_player_stats.return_value = None
+
+        response = client.get("/api/players/999/stats")
+        assert response.status_code == 404
+
+    def test_get_player_stats_invalid_period(self, client, mock_game_manager):
+        """Test a malformed period is rejected."""
+        _mock_gm, mock_db = mock_game_manager
+
+        response = client.get("/api/players/7/stats?period=June")
+        assert response.status_code == 400
+        mock_db.get_player_stats.assert_not_called()
+
+    def test_get_leaderboard(self, client, mock_game_manager):
+        """Test a full leaderboard page links to the next one."""
+        _mock_gm, mock_db = mock_game_manager
+        players = [
+            {"rank": 1, "player_id": 3, "player_name": "Alice", "rating": 1530.5, "games_rated": 4},
+            {"rank": 2, "player_id": 1, "player_name": "Bob", "rating": 1490.0, "games_rated": 2},
+        ]
+        mock_db.get_leaderboard.return_value = players
+
+        response = client.get("/api/leaderboard?limit=2")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["players"] == players
+        assert data["next_cursor"] == leaderboard_cursor(players[-1])
+        mock_db.get_leaderboard.assert_called_once_with(limit=2, cursor=None)
+
+    def test_get_leaderboard_invalid_cursor(self, client, mock_game_manager):
+        """Test a malformed leaderboard cursor is rejected."""
+        _mock_gm, mock_db = mock_game_manager
+        mock_db.get_leaderboard.side_effect = ValueError("Invalid leaderboard cursor: x")
+
+        response = client.get("/api/leaderboard?cursor=x")
+        assert response.status_code == 400
+
+    def test_get_player_rating(self, client, mock_game_manager):
+        """Test a player's rating and history are returned."""
+        _mock_gm, mock_db = mock_game_manager
+        mock_db.get_player_rating.return_value = {
+            "player_id": 7,
+            "player_name": "Alice",
+            "rating": 1516.0,
+            "games_rated": 1,
+            "history": [{"game_session_id": "g1", "change": 16.0}],
+        }
+
+        response = client.get("/api/players/7/rating?limit=5")
+        assert response.status_code == 200
+        assert response.get_json()["rating"] == 1516.0
+        mock_db.get_player_rating.assert_called_once_with(7, history_limit=5)
+
+    def test_get_player_rating_not_found(self, client, mock_game_manager):
+        """Test the rating of an unknown player."""
+        _mock_gm, mock_db = mock_game_manager
+        mock_db.get_player_rating.return_value = None
+
+        response = client.get("/api/players/999/rating")
+        assert response.status_code == 404
+
+
+class TestConditionalRequests:
+    """Test ETag handling of the history and replay endpoints."""
+
+    @pytest.fixture
+    def client(self):
+        """Create test client."""
+        app.config["TESTING"] = True
+        with app.test_client() as client:
+            yield client
+
+    @pytest.fixture
+    def mock_db(self):
+        """Mock database service with fixed data versions."""
+        with (
+            patch("app.game_manager") as mock_gm,
+            patch("app.replay_etags", ETagCache()),
+        ):
+            mock_db = MagicMock(data_version=3, stored_version=0)
+            mock_db.data_versions.side_effect = lambda: (
+                mock_db.data_version,
+                mock_db.stored_version,
+            )
+            mock_gm.db_service = mock_db
+            yield mock_db
+
+    def test_history_not_modified(self, client, mock_db):
+        """Test history is not queried again until the data version changes."""
+        mock_db.get_recent_games.return_value = []
+
+        first = client.get("/api/game/history")
+        second = client.get("/api/game/history", headers={"If-None-Match": first.headers["ETag"]})
+        mock_db.data_version = 4
+        third = client.get("/api/game/history", headers={"If-None-Match": first.headers["ETag"]})
+
+        assert first.headers["Cache-Control"] == "no-cache"
+        assert second.status_code == 304
+        assert second.data == b""
+        assert third.status_code == 200
+        assert mock_db.get_recent_games.call_count == 2
+
+    def test_history_follows_stored_data_version(self, client, mock_db):
+        """Test a rebuild or import by db_manage invalidates the history ETag."""
+        mock_db.get_recent_games.return_value = []
+
+        first = client.get("/api/game/history")
+        mock_db.stored_version = 1
+        second = client.get("/api/game/history", headers={"If-None-Match": first.headers["ETag"]})
+
+        assert second.status_code == 200
+        assert second.headers["ETag"] != first.headers["ETag"]
+
+    def test_finished_replay_is_immutable(self, client, mock_db):
+        """Test a finished replay is cached by content hash across writes."""
+        mock_db.get_game_replay_data.return_value = {
+            "game_session_id": "test-id",
+            "finished_at": "2024-01-01T00:30:00",
+            "throws": [],
+        }
+
+        first = client.get("/api/game/replay/test-id")
+        mock_db.data_version = 4
+        second = client.get(
+            "/api/game/replay/test-id",
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+
+        assert "immutable" in first.headers["Cache-Control"]
+        assert second.status_code == 304
+        mock_db.get_game_replay_data.assert_called_once()
+
+    def test_unfinished_replay_follows_data_version(self, client, mock_db):
+        """Test an unfinished replay is refetched after a write."""
+        mock_db.get_game_replay_data.return_value = {"game_session_id": "test-id", "throws": []}
+
+        first = client.get("/api/game/replay/test-id")
+        etag = {"If-None-Match": first.headers["ETag"]}
+        second = client.get("/api/game/replay/test-id", headers=etag)
+        mock_db.data_version = 4
+        third = client.get("/api/game/replay/test-id", headers=etag)
+
+        assert first.headers["Cache-Control"] == "no-cache"
+        assert second.status_code == 304
+        assert third.status_code == 200
+
+    def test_missing_replay_has_no_etag(self, client, mock_db):
+        """Test error responses are not cacheable."""
+        mock_db.get_game_replay_data.return_value = None
+
+        response = client.get("/api/game/replay/nonexistent")
+
+        assert response.status_code == 404
+        assert "ETag" not in response.headers
+
 
 class TestTTSEndpoints:
     """Test TTS-related endpoints."""
@@ -257,3 +463,82 @@ class TestTTSEndpoints:
         assert response.status_code == 500
         data = response.get_json()
         assert data["status"] == "error"
+
+
+class TestExportEndpoint:
+    """Test the history export endpoint."""
+
+    @pytest.fixture
+    def client(self):
+        """Create test client."""
+        app.config["TESTING"] = True
+        with app.test_client() as client:
+            yield client
+
+    @pytest.fixture
+    def login(self, client):
+        """Log the client in with the given roles."""
+
+        def login_as(*roles):
+            with client.session_transaction() as sess:
+                sess["access_token"] = "test-token"
+                sess["roles"] = list(roles)
+
+        with patch("auth.validate_token", return_value={"sub": "test-user"}):
+            yield login_as
+
+    @pytest.fixture
+    def mock_export(self):
+        """Mock game manager and export function."""
+        with (
+            patch("app.game_manager") as mock_gm,
+            patch("app.export_history") as mock_export,
+        ):
+            mock_export.return_value = iter([b"id,game_session_id\n", b"1,g1\n"])
+            yield mock_gm, mock_export
+
+    def test_export_streams_file(self, client, login, mock_export):
+        """Test the export is streamed as an attachment with filters passed on."""
+        mock_gm, export = mock_export
+        login("admin")
+
+        response = client.get(
+            "/api/export?table=gameresults&since=2024-01-01&until=2024-02-01&game_type=501",
+        )
+        assert response.status_code == 200
+        assert response.data == b"id,game_session_id\n1,g1\n"
+        assert response.mimetype == "text/csv"
+        assert response.headers["Content-Disposition"] == "attachment; filename=gameresults.csv"
+        export.assert_called_once_with(
+            mock_gm.db_service.db_manager,
+            "gameresults",
+            "csv",
+            since=datetime(2024, 1, 1),  # noqa: DTZ001
+            until=datetime(2024, 2, 1),  # noqa: DTZ001
+            game_type="501",
+        )
+
+    def test_export_requires_permission(self, client, login, mock_export):
+        """Test players cannot export the history."""
+        _mock_gm, export = mock_export
+        login("player")
+
+        response = client.get("/api/export")
+        assert response.status_code == 403
+        export.assert_not_called()
+
+    def test_export_requires_login(self, client, mock_export):
+        """Test anonymous requests are sent to the login page."""
+        response = client.get("/api/export")
+        assert response.status_code == 302
+
+    def test_export_invalid_request(self, client, login, mock_export):
+        """Test invalid dates and formats are rejected."""
+        _mock_gm, export = mock_export
+        login("admin")
+
+        assert client.get("/api/export?since=June").status_code == 400
+        export.side_effect = ValueError("Unknown format: xlsx")
+        assert client.get("/api/export?format=xlsx").status_code == 400
+        export.side_effect = RuntimeError("Exporting parquet requires pyarrow")
+        assert client.get("/api/export?format=parquet").status_code == 501
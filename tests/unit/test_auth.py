@@ -1,19 +1,25 @@
 """Unit tests for authentication and authorization module."""
 
 import json
+import time
 from unittest.mock import Mock, patch
 
 import jwt
-from flask import Flask, jsonify
+from cryptography.hazmat.primitives.asymmetric import rsa
+from flask import Flask, jsonify, request
+from jwt.algorithms import RSAAlgorithm
 
 from auth import (
     get_user_roles,
     has_permission,
+    invalidate_token,
     login_required,
     permission_required,
+    resolve_permissions,
     role_required,
     validate_token,
 )
+from jwks_store import JWKSKeyStore
 
 
 class TestValidateToken:
@@ -75,8 +81,28 @@ class TestValidateToken:
             result = validate_token("test-token")
             assert result is None
 
+    @patch("auth.JWT_VALIDATION_MODE", "jwks")
+    def test_validate_token_jwks_key_store(self):
+        """Test a signed token is verified against the kid-indexed key store."""
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+        store = JWKSKeyStore("https://idp.example/oauth2/jwks")
+        store._refresher = Mock()
+        store.load_jwks({"keys": [{**jwk, "kid": "key-1", "use": "sig"}]})
+        token = jwt.encode(
+            {"sub": "test-user", "exp": int(time.time()) + 300},
+            private_key,
+            algorithm="RS256",
+            headers={"kid": "key-1"},
+        )
+
+        with patch("auth.jwks_client", store):
+            result = validate_token(token)
+
+        assert result["sub"] == "test-user"
+
     @patch("auth.JWT_VALIDATION_MODE", "introspection")
-    @patch("auth.requests.post")
+    @patch("auth.idp_client.post")
     def test_validate_token_introspection_success(self, mock_post):
         """Test successful token validation using introspection."""
         mock_response = Mock()
@@ -95,7 +121,18 @@ class TestValidateToken:
         assert result["groups"] == ["player"]
 
     @patch("auth.JWT_VALIDATION_MODE", "introspection")
-    @patch("auth.requests.post")
+    @patch("auth.idp_client.timeout", 1.5)
+    @patch("auth.idp_client.session.request")
+    def test_validate_token_introspection_uses_client_timeout(self, mock_request):
+        """Test introspection calls use the IdP client's IDP_TIMEOUT."""
+        mock_request.return_value = Mock(status_code=200, json=Mock(return_value={"active": False}))
+
+        validate_token("timeout-token")
+
+        assert mock_request.call_args.kwargs["timeout"] == 1.5
+
+    @patch("auth.JWT_VALIDATION_MODE", "introspection")
+    @patch("auth.idp_client.post")
     def test_validate_token_introspection_inactive(self, mock_post):
         """Test token validation with inactive token."""
         mock_response = Mock()
@@ -107,7 +144,7 @@ class TestValidateToken:
         assert result is None
 
     @patch("auth.JWT_VALIDATION_MODE", "introspection")
-    @patch("auth.requests.post")
+    @patch("auth.idp_client.post")
     def test_validate_token_introspection_error(self, mock_post):
         """Test token validation with introspection error."""
         mock_response = Mock()
@@ -118,7 +155,7 @@ class TestValidateToken:
         assert result is None
 
     @patch("auth.JWT_VALIDATION_MODE", "introspection")
-    @patch("auth.requests.post")
+    @patch("auth.idp_client.post")
     def test_validate_token_introspection_exception(self, mock_post):
         """Test token validation with request exception."""
         mock_post.side_effect = Exception("Connection error")
@@ -126,6 +163,59 @@ class TestValidateToken:
         result = validate_token("test-token")
         assert result is None
 
+    @patch("auth.JWT_VALIDATION_MODE", "introspection")
+    @patch("auth.idp_client.post")
+    def test_validate_token_introspection_cached(self, mock_post):
+        """Test a validated token does not hit the IdP again."""
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value={"active": True, "sub": "test-user"}),
+        )
+
+        first = validate_token("test-token")
+        second = validate_token("test-token")
+
+        assert first == second == {"active": True, "sub": "test-user"}
+        mock_post.assert_called_once()
+
+    @patch("auth.JWT_VALIDATION_MODE", "introspection")
+    @patch("auth.idp_client.post")
+    def test_validate_token_inactive_cached_briefly(self, mock_post):
+        """Test inactive tokens are negatively cached."""
+        mock_post.return_value = Mock(status_code=200, json=Mock(return_value={"active": False}))
+
+        assert validate_token("inactive-token") is None
+        assert validate_token("inactive-token") is None
+        mock_post.assert_called_once()
+
+    @patch("auth.JWT_VALIDATION_MODE", "introspection")
+    @patch("auth.idp_client.post")
+    def test_validate_token_idp_errors_not_cached(self, mock_post):
+        """Test IdP failures are retried on the next request."""
+        mock_post.side_effect = [
+            Exception("Connection error"),
+            Mock(status_code=200, json=Mock(return_value={"active": True, "sub": "u"})),
+        ]
+
+        assert validate_token("test-token") is None
+        assert validate_token("test-token") == {"active": True, "sub": "u"}
+        assert mock_post.call_count == 2
+
+    @patch("auth.JWT_VALIDATION_MODE", "introspection")
+    @patch("auth.idp_client.post")
+    def test_invalidate_token(self, mock_post):
+        """Test invalidation forces revalidation."""
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value={"active": True, "sub": "test-user"}),
+        )
+        validate_token("test-token")
+
+        assert invalidate_token("test-token") is True
+        validate_token("test-token")
+
+        assert mock_post.call_count == 2
+
 
 class TestGetUserRoles:
     """Test user role extraction."""
@@ -183,6 +273,19 @@ class TestGetUserRoles:
         assert "admin" in roles
         assert "player" in roles
 
+    def test_get_user_roles_from_userinfo(self):
+        """Test userinfo fetched at login is used when claims have no roles."""
+        roles = get_user_roles({"sub": "test-user"}, {"groups": ["Internal/gamemaster"]})
+        assert roles == ["gamemaster"]
+
+    def test_get_user_roles_no_io_or_output(self, capsys):
+        """Test role extraction neither calls the IdP nor prints claims."""
+        with patch("auth.idp_client") as mock_idp:
+            get_user_roles({"sub": "test-user"})
+
+        mock_idp.get.assert_not_called()
+        assert capsys.readouterr().out == ""
+
 
 class TestHasPermission:
     """Test permission checking."""
@@ -226,6 +329,15 @@ class TestHasPermission:
         """Test permission check with unknown role."""
         assert not has_permission(["unknown"], "game:view")
 
+    def test_resolve_permissions(self):
+        """Test roles resolve to a precompiled permission set."""
+        permissions = resolve_permissions(["player", "gamemaster"])
+
+        assert isinstance(permissions, frozenset)
+        assert {"game:view", "game:create", "score:submit"} <= permissions
+        assert "*" not in permissions
+        assert "*" in resolve_permissions(["admin"])
+
 
 class TestLoginRequired:
     """Test login_required decorator."""
@@ -298,6 +410,53 @@ class TestLoginRequired:
                 assert response.status_code == 302
                 assert "/login" in response.location
 
+    def test_login_required_stores_roles_in_session(self):
+        """Test roles are extracted once and then read from the session."""
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "test-secret"
+
+        @app.route("/protected")
+        @login_required
+        def protected_route():
+            return jsonify({"roles": request.user_roles})
+
+        with app.test_client() as client:
+            with client.session_transaction() as sess:
+                sess["access_token"] = "test-token"
+
+            with (
+                patch("auth.validate_token", return_value={"groups": ["player"]}),
+                patch("auth.get_user_roles", wraps=get_user_roles) as mock_roles,
+            ):
+                first = client.get("/protected")
+                second = client.get("/protected")
+
+            assert first.get_json()["roles"] == ["player"]
+            assert second.get_json()["roles"] == ["player"]
+            assert mock_roles.call_count == 1
+            with client.session_transaction() as sess:
+                assert sess["roles"] == ["player"]
+
+    def test_login_required_prefers_session_roles(self):
+        """Test roles resolved at login win over the token claims."""
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "test-secret"
+
+        @app.route("/protected")
+        @permission_required("game:create")
+        def protected_route():
+            return jsonify({"message": "success"})
+
+        with app.test_client() as client:
+            with client.session_transaction() as sess:
+                sess["access_token"] = "test-token"
+                sess["roles"] = ["gamemaster"]
+
+            with patch("auth.validate_token", return_value={"sub": "test-user"}):
+                response = client.get("/protected")
+
+            assert response.status_code == 200
+
 
 class TestRoleRequired:
     """Test role_required decorator."""
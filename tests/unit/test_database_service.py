@@ -1,11 +1,27 @@
 """Unit tests for database_service module."""
 
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
+import greenlet
 import pytest
-
-from database_models import DatabaseManager
-from database_service import DatabaseService
+from sqlalchemy import delete, event
+
+from database_models import (
+    POOL_CHECKED_OUT,
+    POOL_WAIT_SECONDS,
+    DatabaseManager,
+    GameResult,
+    Player,
+    PlayerRating,
+    Score,
+)
+from database_service import (
+    DatabaseService,
+    decode_history_cursor,
+    history_cursor,
+    leaderboard_cursor,
+)
 
 
 class TestDatabaseManager:
@@ -30,6 +46,67 @@ class TestDatabaseManager:
         db_manager.create_tables()
         # Should not raise an error
 
+    def test_pool_from_env(self):
+        """Test pool sizing, recycling and statement caching come from the environment."""
+        env = {
+            "DB_POOL_SIZE": "3",
+            "DB_MAX_OVERFLOW": "2",
+            "DB_POOL_TIMEOUT": "1.5",
+            "DB_POOL_RECYCLE": "60",
+            "DB_POOL_PRE_PING": "false",
+            "DB_STATEMENT_CACHE_SIZE": "42",
+        }
+        with patch.dict("os.environ", env):
+            db_manager = DatabaseManager.from_env("postgresql://user:pw@localhost/dartsdb")
+
+        pool = db_manager.engine.pool
+        assert pool.size() == 3
+        assert pool._max_overflow == 2
+        assert pool._timeout == 1.5
+        assert pool._recycle == 60
+        assert pool._pre_ping is False
+        assert db_manager.engine._compiled_cache.capacity == 42
+
+    def test_pool_defaults(self):
+        """Test connections are pre-pinged and recycled by default."""
+        db_manager = DatabaseManager("postgresql://user:pw@localhost/dartsdb")
+
+        assert db_manager.engine.pool.size() == 5
+        assert db_manager.engine.pool._pre_ping is True
+        assert db_manager.engine.pool._recycle == 1800
+
+    def test_pool_metrics(self, tmp_path):
+        """Test checkouts update the pool gauges and wait histogram."""
+        db_manager = DatabaseManager(f"sqlite:///{tmp_path}/pool.db")
+        waits = POOL_WAIT_SECONDS.labels().count
+
+        with db_manager.connect():
+            assert POOL_CHECKED_OUT.labels().value == 1
+        assert POOL_CHECKED_OUT.labels().value == 0
+        assert POOL_WAIT_SECONDS.labels().count == waits + 1
+
+    def test_session_scope(self):
+        """Test a session scope commits on success and rolls back on error."""
+        db_manager = DatabaseManager("sqlite:///:memory:")
+        db_manager.create_tables()
+
+        def add_and_fail():
+            with db_manager.session_scope() as session:
+                session.add(Player(name="Bob"))
+                session.flush()
+                raise RuntimeError("command failed")
+
+        with db_manager.session_scope() as session:
+            session.add(Player(name="Alice"))
+        with pytest.raises(RuntimeError):
+            add_and_fail()
+
+        session = db_manager.get_session()
+        try:
+            assert [player.name for player in session.query(Player)] == ["Alice"]
+        finally:
+            session.close()
+
 
 class TestDatabaseService:
     """Test DatabaseService class."""
@@ -117,6 +194,194 @@ class TestDatabaseService:
         )
         # Should not raise an error
 
+    def test_writes_skip_reads(self, db_service):
+        """Test throws, score updates, undo and winner write by cached ids, reading only ratings."""
+        db_service.start_new_game(
+            game_type_name="301",
+            player_names=["Player 1", "Player 2"],
+            start_score=301,
+        )
+        statements = []
+
+        def record(_conn, _cursor, statement, *_args):
+            statements.append(statement.split()[0])
+
+        event.listen(db_service.db_manager.engine, "before_cursor_execute", record)
+        try:
+            for throw_in_turn in range(1, 4):
+                db_service.record_throw(
+                    player_id=1,
+                    base_score=20,
+                    multiplier="SINGLE",
+                    multiplier_value=1,
+                    actual_score=20,
+                    score_before=301,
+                    score_after=281,
+                    turn_number=1,
+                    throw_in_turn=throw_in_turn,
+                    dartboard_sends_actual_score=False,
+                )
+            db_service.undo_throws_for_bust(player_id=1, throw_count=2)
+            db_service.update_player_score(player_id=1, final_score=281)
+            db_service.mark_winner(player_id=1)
+        finally:
+            event.remove(db_service.db_manager.engine, "before_cursor_execute", record)
+
+        # Each throw, undo and win also updates the player's statistics row;
+        # the win reads the players' ratings and stores the new ones
+        assert statements == [
+            *("INSERT", "UPDATE") * 3,
+            "DELETE",
+            "UPDATE",
+            "UPDATE",
+            "UPDATE",
+            "UPDATE",
+            "SELECT",
+            "INSERT",
+            "INSERT",
+        ]
+        assert db_service.throw_counters[1] == 1
+
+        session = db_service.db_manager.get_session()
+        try:
+            results = (
+                session.query(GameResult)
+                .filter_by(game_session_id=db_service.current_game_session_id)
+                .order_by(GameResult.player_order)
+                .all()
+            )
+            throws = session.query(Score).filter_by(game_result_id=results[1].id).all()
+        finally:
+            session.close()
+        assert [result.is_winner for result in results] == [False, True]
+        assert all(result.finished_at for result in results)
+        assert results[1].final_score == 281
+        assert [(throw.throw_sequence, throw.player_id) for throw in throws] == [
+            (1, results[1].player_id),
+        ]
+
+    def test_unit_of_work_commits_once(self, db_service):
+        """Test writes inside a unit of work share one transaction."""
+        db_service.start_new_game(game_type_name="301", player_names=["Player 1"], start_score=301)
+        version = db_service.data_version
+        commits = []
+
+        def record(_conn):
+            commits.append(1)
+
+        event.listen(db_service.db_manager.engine, "commit", record)
+        try:
+            with db_service.unit_of_work():
+                for throw_in_turn in range(1, 4):
+                    db_service.record_throw(
+                        player_id=0,
+                        base_score=20,
+                        multiplier="SINGLE",
+                        multiplier_value=1,
+                        actual_score=20,
+                        score_before=301,
+                        score_after=281,
+                        turn_number=1,
+                        throw_in_turn=throw_in_turn,
+                        dartboard_sends_actual_score=False,
+                    )
+                db_service.update_player_score(player_id=0, final_score=241)
+                assert db_service.data_version == version
+        finally:
+            event.remove(db_service.db_manager.engine, "commit", record)
+
+        assert len(commits) == 1
+        assert db_service.data_version > version
+        replay = db_service.get_game_replay_data(db_service.current_game_session_id)
+        assert len(replay["throws"]) == 3
+        assert replay["players"][0]["final_score"] == 241
+
+    def test_unit_of_work_rolls_back(self, db_service):
+        """Test a failing command leaves no writes and restores the throw counters."""
+        db_service.start_new_game(game_type_name="301", player_names=["Player 1"], start_score=301)
+        version = db_service.data_version
+
+        def throw_and_fail():
+            with db_service.unit_of_work():
+                db_service.record_throw(
+                    player_id=0,
+                    base_score=20,
+                    multiplier="SINGLE",
+                    multiplier_value=1,
+                    actual_score=20,
+                    score_before=301,
+                    score_after=281,
+                    turn_number=1,
+                    throw_in_turn=1,
+                    dartboard_sends_actual_score=False,
+                )
+                raise RuntimeError("command failed")
+
+        with pytest.raises(RuntimeError):
+            throw_and_fail()
+
+        assert db_service.throw_counters[0] == 0
+        assert db_service.data_version == version
+        replay = db_service.get_game_replay_data(db_service.current_game_session_id)
+        assert replay["throws"] == []
+
+    def test_unit_of_work_commit_failure_is_raised(self, db_service):
+        """Test a failed commit is raised and restores the throw counters."""
+        db_service.start_new_game(game_type_name="301", player_names=["Player 1"], start_score=301)
+        version = db_service.data_version
+
+        def fail(_conn):
+            raise RuntimeError("commit failed")
+
+        def throw():
+            with db_service.unit_of_work():
+                db_service.record_throw(
+                    player_id=0,
+                    base_score=20,
+                    multiplier="SINGLE",
+                    multiplier_value=1,
+                    actual_score=20,
+                    score_before=301,
+                    score_after=281,
+                    turn_number=1,
+                    throw_in_turn=1,
+                    dartboard_sends_actual_score=False,
+                )
+
+        event.listen(db_service.db_manager.engine, "commit", fail)
+        try:
+            with pytest.raises(RuntimeError, match="commit failed"):
+                throw()
+        finally:
+            event.remove(db_service.db_manager.engine, "commit", fail)
+
+        assert db_service.throw_counters[0] == 0
+        assert db_service.data_version == version
+
+    def test_unit_of_work_write_failure_is_raised(self, db_service):
+        """Test a failing write fails the unit of work instead of being skipped."""
+        db_service.start_new_game(game_type_name="301", player_names=["Player 1"], start_score=301)
+
+        with (
+            patch.object(db_service, "_add_player_stats", side_effect=RuntimeError("no stats")),
+            pytest.raises(RuntimeError, match="no stats"),
+            db_service.unit_of_work(),
+        ):
+            db_service.mark_winner(0)
+
+        replay = db_service.get_game_replay_data(db_service.current_game_session_id)
+        assert replay["players"][0]["is_winner"] is False
+
+    def test_unit_of_work_is_per_greenlet(self, db_service):
+        """Test greenlets sharing a thread do not join each other's unit of work."""
+        seen = []
+
+        with db_service.unit_of_work():
+            greenlet.greenlet(lambda: seen.append(db_service._unit())).switch()
+            assert db_service._unit() is not None
+
+        assert seen == [None]
+
     def test_record_throw_without_game(self, db_service):
         """Test recording a throw without starting a game."""
         # Should not raise an error (silently fails)
@@ -149,6 +414,33 @@ class TestDatabaseService:
         db_service.mark_winner(player_id=0)
         # Should not raise an error
 
+    def test_data_version_changes_on_write(self, db_service):
+        """Test every committed write bumps the data version."""
+        versions = [db_service.data_version]
+        db_service.start_new_game(game_type_name="301", player_names=["Player 1"])
+        versions.append(db_service.data_version)
+        db_service.update_player_score(player_id=0, final_score=241)
+        versions.append(db_service.data_version)
+        db_service.mark_winner(player_id=0)
+        versions.append(db_service.data_version)
+        db_service.get_recent_games()
+
+        assert versions == sorted(set(versions))
+        assert db_service.data_version == versions[-1]
+
+    def test_rebuild_in_another_process_changes_data_versions(self, tmp_path):
+        """Test a db_manage rebuild invalidates the server's ETags."""
+        url = f"sqlite:///{tmp_path / 'darts.db'}"
+        server = DatabaseService(url)
+        server.initialize_database()
+        server.start_new_game(game_type_name="301", player_names=["Player 1"])
+        before = server.data_versions()
+
+        DatabaseService(url).rebuild_player_stats()
+
+        assert server.data_versions() != before
+        assert server.data_versions()[0] == before[0]
+
     def test_mark_winner_without_active_game(self, db_service):
         """Test marking winner when no game is active."""
         # Should not raise an error (silently fails)
@@ -190,6 +482,59 @@ class TestDatabaseService:
         assert isinstance(games, list)
         assert len(games) == 0
 
+    def test_get_recent_games_pages(self, db_service):
+        """Test history pages by cursor in one query each without gaps or repeats."""
+        started = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+        session_ids = []
+        for _game in range(5):
+            session_ids.append(
+                db_service.start_new_game(game_type_name="301", player_names=["Alice", "Bob"]),
+            )
+            db_service.mark_winner(player_id=1)
+        # Two games share a start time; the session id breaks the tie
+        session = db_service.db_manager.get_session()
+        for index, session_id in enumerate(session_ids):
+            session.query(GameResult).filter_by(game_session_id=session_id).update(
+                {"started_at": started + timedelta(minutes=min(index, 3))},
+            )
+        session.commit()
+        session.close()
+
+        statements = []
+
+        def record(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(db_service.db_manager.engine, "before_cursor_execute", record)
+        try:
+            pages = [db_service.get_recent_games(limit=2)]
+            while len(pages[-1]) == 2:
+                pages.append(
+                    db_service.get_recent_games(limit=2, cursor=history_cursor(pages[-1][-1])),
+                )
+        finally:
+            event.remove(db_service.db_manager.engine, "before_cursor_execute", record)
+
+        games = [game for page in pages for game in page]
+        assert len(statements) == len(pages) == 3
+        assert {game["game_session_id"] for game in games} == set(session_ids)
+        assert len(games) == 5
+        assert [game["started_at"] for game in games] == sorted(
+            (game["started_at"] for game in games),
+            reverse=True,
+        )
+        assert games[0]["winner"] == "Bob"
+        assert games[0]["player_count"] == 2
+        assert games[0]["game_type"] == "301"
+        assert games[0]["finished_at"] is not None
+
+    def test_invalid_history_cursor(self, db_service):
+        """Test malformed cursors are rejected."""
+        with pytest.raises(ValueError, match="Invalid history cursor"):
+            db_service.get_recent_games(cursor="not-a-cursor")
+        with pytest.raises(ValueError, match="Invalid history cursor"):
+            decode_history_cursor(history_cursor({"started_at": "x", "game_session_id": "y"}))
+
     def test_get_game_replay_data(self, db_service):
         """Test getting game replay data."""
         # Start a game and record some throws
@@ -223,6 +568,55 @@ class TestDatabaseService:
         assert len(replay_data["players"]) == 2
         assert len(replay_data["throws"]) == 1
 
+    def test_get_game_replay_data_query_count(self, db_service):
+        """Test replay takes a fixed number of queries and interleaves players by time."""
+        session_id = db_service.start_new_game(
+            game_type_name="501",
+            player_names=["Alice", "Bob"],
+            start_score=501,
+        )
+        for turn in range(1, 6):
+            for player_id in (0, 1):
+                for throw_in_turn in range(1, 4):
+                    db_service.record_throw(
+                        player_id=player_id,
+                        base_score=20,
+                        multiplier="SINGLE",
+                        multiplier_value=1,
+                        actual_score=20,
+                        score_before=501,
+                        score_after=481,
+                        turn_number=turn,
+                        throw_in_turn=throw_in_turn,
+                        dartboard_sends_actual_score=False,
+                        is_bust=False,
+                        is_finish=False,
+                    )
+
+        statements = []
+
+        def record(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(db_service.db_manager.engine, "before_cursor_execute", record)
+        try:
+            replay_data = db_service.get_game_replay_data(session_id)
+        finally:
+            event.remove(db_service.db_manager.engine, "before_cursor_execute", record)
+
+        assert len(statements) == 2
+        assert len(replay_data["throws"]) == 30
+        assert [throw["player_name"] for throw in replay_data["throws"][:6]] == [
+            "Alice",
+            "Alice",
+            "Alice",
+            "Bob",
+            "Bob",
+            "Bob",
+        ]
+        assert replay_data["throws"][3]["player_order"] == 1
+        assert isinstance(replay_data["throws"][0]["thrown_at"], str)
+
     def test_get_game_replay_data_nonexistent(self, db_service):
         """Test getting replay data for nonexistent game."""
         replay_data = db_service.get_game_replay_data("nonexistent-id")
@@ -385,3 +779,142 @@ class TestDatabaseService:
         # Undo 2 throws
         db_service.undo_throws_for_bust(player_id=0, throw_count=2)
         # Should not raise an error
+
+    def test_player_stats_maintained_on_write(self, db_service):
+        """Test statistics follow throws, busts and wins and match a rebuild."""
+        db_service.start_new_game(
+            game_type_name="501",
+            player_names=["Alice", "Bob"],
+            start_score=501,
+            double_out=True,
+        )
+        scores = {0: 501, 1: 501}
+
+        def throw(player_id, points, turn, throw_in_turn, *, is_bust=False, is_finish=False):
+            score_before = scores[player_id]
+            scores[player_id] = score_before if is_bust else score_before - points
+            db_service.record_throw(
+                player_id=player_id,
+                base_score=points // 3 if points % 3 == 0 else points,
+                multiplier="TRIPLE" if points % 3 == 0 else "SINGLE",
+                multiplier_value=3 if points % 3 == 0 else 1,
+                actual_score=points,
+                score_before=score_before,
+                score_after=scores[player_id],
+                turn_number=turn,
+                throw_in_turn=throw_in_turn,
+                dartboard_sends_actual_score=False,
+                is_bust=is_bust,
+                is_finish=is_finish,
+            )
+
+        for throw_in_turn in (1, 2, 3):
+            throw(0, 60, 1, throw_in_turn)  # 180
+            throw(1, 20, 1, throw_in_turn)
+        for throw_in_turn in (1, 2, 3):
+            throw(0, 57, 2, throw_in_turn)  # 171, leaves 150
+        # The undone bust dart leaves no trace in the statistics
+        throw(1, 60, 2, 1)
+        throw(1, 60, 2, 2, is_bust=True)
+        db_service.undo_throws_for_bust(player_id=1, throw_count=1)
+
+        alice = db_service.get_player_stats(db_service.current_game_players[0])
+        bob = db_service.get_player_stats(db_service.current_game_players[1])
+        db_service.mark_winner(player_id=0)
+        alice_won = db_service.get_player_stats(db_service.current_game_players[0])
+
+        stats = alice["game_types"][0]
+        assert stats["game_type"] == "501"
+        assert stats["games_played"] == 1
+        assert stats["darts_thrown"] == 6
+        assert stats["points_scored"] == 351
+        assert stats["three_dart_average"] == 175.5
+        assert stats["ton_plus"] == 2
+        assert stats["one_eighties"] == 1
+        assert len(stats["periods"]) == 1
+        assert alice_won["game_types"][0]["games_won"] == 1
+        assert bob["game_types"][0]["darts_thrown"] == 4
+        assert bob["game_types"][0]["points_scored"] == 120
+
+        assert db_service.rebuild_player_stats() == 2
+        assert db_service.get_player_stats(db_service.current_game_players[0]) == alice_won
+        assert db_service.get_player_stats(db_service.current_game_players[1]) == bob
+
+    def test_get_player_stats_unknown_player(self, db_service):
+        """Test statistics of a player that does not exist."""
+        assert db_service.get_player_stats(999) is None
+
+    def test_mark_winner_rates_game_once(self, db_service):
+        """Test finishing a game updates ratings and history once."""
+        db_service.start_new_game(game_type_name="501", player_names=["Alice", "Bob"])
+        db_service.mark_winner(player_id=0)
+        db_service.mark_winner(player_id=0)
+        alice_id = db_service.current_game_players[0]
+        bob_id = db_service.current_game_players[1]
+
+        alice = db_service.get_player_rating(alice_id)
+        bob = db_service.get_player_rating(bob_id)
+
+        assert alice["rating"] == 1516.0
+        assert alice["games_rated"] == 1
+        assert bob["rating"] == 1484.0
+        assert len(alice["history"]) == 1
+        assert alice["history"][0]["change"] == 16.0
+        assert alice["history"][0]["game_session_id"] == db_service.current_game_session_id
+
+    def test_leaderboard_pages(self, db_service):
+        """Test leaderboard pages continue by cursor with running ranks."""
+        for winner, players in ((0, ["A", "B"]), (0, ["A", "C"]), (1, ["B", "C"]), (0, ["D", "C"])):
+            db_service.start_new_game(game_type_name="501", player_names=players)
+            db_service.mark_winner(player_id=winner)
+
+        first = db_service.get_leaderboard(limit=3)
+        second = db_service.get_leaderboard(limit=3, cursor=leaderboard_cursor(first[-1]))
+
+        entries = first + second
+        assert [entry["rank"] for entry in entries] == [1, 2, 3, 4]
+        assert entries[0]["player_name"] == "A"
+        assert entries[-1]["player_name"] == "B"
+        ratings = [entry["rating"] for entry in entries]
+        assert ratings == sorted(ratings, reverse=True)
+
+    def test_leaderboard_invalid_cursor(self, db_service):
+        """Test a malformed leaderboard cursor is rejected."""
+        with pytest.raises(ValueError, match="Invalid leaderboard cursor"):
+            db_service.get_leaderboard(cursor="not-a-cursor")
+
+    def test_rebuild_ratings_matches_live_ratings(self, db_service):
+        """Test the backfill replays finished games to the same ratings."""
+        for winner, players in ((0, ["A", "B", "C"]), (2, ["A", "B", "C"]), (1, ["C", "D"])):
+            db_service.start_new_game(game_type_name="501", player_names=players)
+            db_service.mark_winner(player_id=winner)
+        db_service.start_new_game(game_type_name="501", player_names=["A", "D"])  # Unfinished
+        live = db_service.get_leaderboard(limit=10)
+        history = db_service.get_player_rating(live[0]["player_id"])["history"]
+
+        assert db_service.rebuild_ratings() == 3
+        assert db_service.get_leaderboard(limit=10) == live
+        rebuilt = db_service.get_player_rating(live[0]["player_id"])["history"]
+        assert [entry["rating_after"] for entry in rebuilt] == [
+            entry["rating_after"] for entry in history
+        ]
+
+    def test_rebuild_ratings_in_another_process_changes_data_versions(self, tmp_path):
+        """Test the leaderboard ETag changes when db_manage rebuilds ratings."""
+        url = f"sqlite:///{tmp_path / 'darts.db'}"
+        server = DatabaseService(url)
+        server.initialize_database()
+        server.start_new_game(game_type_name="501", player_names=["A", "B"])
+        server.mark_winner(player_id=0)
+        with server.db_manager.connect() as connection, connection.begin():
+            connection.execute(delete(PlayerRating))
+        before = server.data_versions()
+
+        assert DatabaseService(url).rebuild_ratings() == 1
+
+        assert server.data_versions() != before
+        assert [entry["player_name"] for entry in server.get_leaderboard()] == ["A", "B"]
+
+    def test_get_player_rating_unknown_player(self, db_service):
+        """Test the rating of a player that does not exist."""
+        assert db_service.get_player_rating(999) is None
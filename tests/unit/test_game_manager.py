@@ -1,6 +1,15 @@
 """Unit tests for GameManager class."""
 
-from game_manager import GameManager
+from unittest.mock import patch
+
+import pytest
+
+from game_manager import (
+    DB_WRITE_SECONDS,
+    EMIT_SECONDS,
+    PROCESS_SCORE_SECONDS,
+    GameManager,
+)
 
 
 class TestGameManager:
@@ -402,3 +411,124 @@ class TestGameManager:
         # All throws should be undone
         assert manager.game.players[0]["score"] == initial_score
         assert manager.is_paused is True
+
+    def test_process_scores_emits_state_once(self, mock_socketio):
+        """Test a batch of throws broadcasts game_state only once."""
+        manager = GameManager(mock_socketio)
+        manager.new_game("301", ["Alice", "Bob"])
+        mock_socketio.emit.reset_mock()
+
+        applied = manager.process_scores(
+            [
+                {"score": 20, "multiplier": "SINGLE"},
+                {"score": 20, "multiplier": "DOUBLE"},
+            ],
+        )
+
+        assert applied == 2
+        assert manager.game.players[0]["score"] == 301 - 60
+        state_emits = [c for c in mock_socketio.emit.call_args_list if c[0][0] == "game_state"]
+        assert len(state_emits) == 1
+
+    def test_process_scores_ignores_throws_after_turn_ends(self, mock_socketio):
+        """Test throws after the turn pauses are ignored like single submissions."""
+        manager = GameManager(mock_socketio)
+        manager.new_game("301", ["Alice", "Bob"])
+
+        applied = manager.process_scores([{"score": 1, "multiplier": "SINGLE"}] * 5)
+
+        assert applied == 3
+        assert manager.is_paused is True
+        assert manager.game.players[0]["score"] == 298
+
+    def test_process_scores_with_bust(self, mock_socketio):
+        """Test a bust inside a batch still undoes the turn."""
+        manager = GameManager(mock_socketio)
+        manager.new_game("301", ["Alice", "Bob"])
+        manager.game.players[0]["score"] = 30
+        manager._save_turn_start_state()
+
+        manager.process_scores(
+            [
+                {"score": 20, "multiplier": "SINGLE"},
+                {"score": 20, "multiplier": "SINGLE"},
+            ],
+        )
+
+        assert manager.game.players[0]["score"] == 30
+        assert manager.is_paused is True
+
+    def test_process_score_records_metrics(self, mock_socketio):
+        """Test process_score, database write and emit durations are recorded."""
+        manager = GameManager(mock_socketio)
+        manager.new_game("301", ["Alice", "Bob"])
+        processed = PROCESS_SCORE_SECONDS.labels().count
+        writes = DB_WRITE_SECONDS.labels("record_throw").count
+        emits = EMIT_SECONDS.labels("game_state").count
+
+        manager.process_score({"score": 20, "multiplier": "SINGLE"})
+
+        assert PROCESS_SCORE_SECONDS.labels().count == processed + 1
+        assert DB_WRITE_SECONDS.labels("record_throw").count == writes + 1
+        assert EMIT_SECONDS.labels("game_state").count == emits + 1
+
+    def test_effects_follow_commit(self, mock_socketio):
+        """Test clients are notified after the throw's writes commit, outside the unit."""
+        manager = GameManager(mock_socketio)
+        manager.new_game("301", ["Alice", "Bob"])
+        events = []
+        record_throw = manager.db_service.record_throw
+
+        def write(**kwargs):
+            events.append("write")
+            record_throw(**kwargs)
+
+        mock_socketio.emit.side_effect = lambda *_args, **_kwargs: events.append(
+            "emit" if manager.db_service._unit() is None else "emit in unit",
+        )
+        with patch.object(manager.db_service, "record_throw", side_effect=write):
+            manager.process_score({"score": 20, "multiplier": "TRIPLE"})
+
+        assert events[0] == "write"
+        assert set(events[1:]) == {"emit"}
+
+    def test_failed_write_keeps_game(self, mock_socketio, capsys):
+        """Test a throw whose writes fail is kept and broadcast, and its writes rolled back."""
+        manager = GameManager(mock_socketio)
+        manager.new_game("301", ["Alice", "Bob"])
+        manager.process_score({"score": 20, "multiplier": "SINGLE"})
+        mock_socketio.emit.reset_mock()
+        last_seq = manager.live_events.last_seq
+
+        with patch.object(
+            manager.db_service,
+            "record_throw",
+            side_effect=RuntimeError("database gone"),
+        ):
+            manager.process_score({"score": 20, "multiplier": "SINGLE"})
+
+        assert "Could not save throw to database: database gone" in capsys.readouterr().out
+        assert manager.game.players[0]["score"] == 261
+        assert manager.current_throw == 3
+        assert len(manager.turn_throws) == 2
+        mock_socketio.emit.assert_called()
+        assert manager.live_events.last_seq > last_seq
+        assert manager.db_service.throw_counters[0] == 1
+
+    def test_failed_command_restores_game(self, mock_socketio):
+        """Test a throw whose game logic fails is undone and nothing is written."""
+        manager = GameManager(mock_socketio)
+        manager.new_game("301", ["Alice", "Bob"])
+        manager.process_score({"score": 20, "multiplier": "SINGLE"})
+        mock_socketio.emit.reset_mock()
+
+        with (
+            patch.object(manager, "_end_turn", side_effect=RuntimeError("bug")),
+            pytest.raises(RuntimeError, match="bug"),
+        ):
+            manager.process_scores([{"score": 20, "multiplier": "SINGLE"}] * 2)
+
+        assert manager.game.players[0]["score"] == 281
+        assert manager.current_throw == 2
+        mock_socketio.emit.assert_not_called()
+        assert manager.db_service.throw_counters[0] == 1
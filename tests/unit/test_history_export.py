@@ -0,0 +1,110 @@
+"""Unit tests for history_export module."""
+
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from history_export import (
+    PYARROW_AVAILABLE,
+    TABLE_COLUMNS,
+    export_history,
+    parse_export_date,
+)
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+requires_pyarrow = pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+
+
+@pytest.fixture
+def db_service(seeded_history):
+    """Database service with an unfinished 501 game and a finished cricket game."""
+    return seeded_history({"cricket": 0})
+
+
+def read_csv(chunks):
+    """Rows of an exported CSV as dictionaries"""
+    return list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+
+class TestExportHistory:
+    """Test streaming exports of the history tables."""
+
+    def test_csv_scores(self, db_service):
+        """Test every throw is exported with its game, in game order."""
+        rows = read_csv(export_history(db_service.db_manager, "scores", chunk_size=4))
+
+        assert len(rows) == 12
+        assert list(rows[0]) == [name for name, _, _ in TABLE_COLUMNS["scores"]]
+        assert [row["game_type"] for row in rows] == ["501"] * 6 + ["cricket"] * 6
+        assert rows[0]["actual_score"] == "60"
+        assert rows[0]["multiplier"] == "TRIPLE"
+
+    def test_csv_streams_one_piece_per_chunk(self, db_service):
+        """Test the CSV is produced a chunk at a time."""
+        chunks = list(export_history(db_service.db_manager, "scores", chunk_size=5))
+
+        assert len(chunks) == 3
+        assert b"".join(chunks).count(b"\n") == 13
+
+    def test_filters(self, db_service):
+        """Test game type and start date filters."""
+        results = read_csv(
+            export_history(db_service.db_manager, "gameresults", game_type="cricket"),
+        )
+        future = read_csv(
+            export_history(db_service.db_manager, "scores", since=parse_export_date("2100-01-01")),
+        )
+
+        assert [row["player_name"] for row in results] == ["Alice", "Bob"]
+        assert {row["game_type"] for row in results} == {"cricket"}
+        assert future == []
+
+    def test_unknown_table_and_format(self, db_service):
+        """Test unknown tables and formats are rejected before reading."""
+        with pytest.raises(ValueError, match="Unknown table"):
+            export_history(db_service.db_manager, "player")
+        with pytest.raises(ValueError, match="Unknown format"):
+            export_history(db_service.db_manager, "scores", "xlsx")
+
+    @requires_pyarrow
+    def test_parquet(self, db_service):
+        """Test a Parquet export has one row group per chunk and typed columns."""
+        data = b"".join(export_history(db_service.db_manager, "scores", "parquet", chunk_size=5))
+
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        table = parquet.read()
+        assert parquet.num_row_groups == 3
+        assert table.num_rows == 12
+        assert table.schema.field("is_bust").type == pa.bool_()
+        assert table.schema.field("thrown_at").type == pa.timestamp("us")
+        assert table.column("actual_score").to_pylist() == [60] * 12
+
+    @requires_pyarrow
+    def test_arrow_stream(self, db_service):
+        """Test an Arrow IPC export reads back, including winners and finish times."""
+        data = b"".join(export_history(db_service.db_manager, "gameresults", "arrow"))
+
+        table = pa.ipc.open_stream(data).read_all()
+        assert table.column("is_winner").to_pylist() == [False, False, True, False]
+        assert table.column("finished_at").null_count == 2
+
+    @requires_pyarrow
+    def test_empty_parquet(self, db_service):
+        """Test an export without rows is still a valid file."""
+        data = b"".join(
+            export_history(db_service.db_manager, "scores", "parquet", game_type="301"),
+        )
+
+        assert pq.read_table(io.BytesIO(data)).num_rows == 0
+
+    def test_parse_export_date(self):
+        """Test dates and datetimes are accepted, anything else is not."""
+        assert parse_export_date("2024-06-01") == datetime(2024, 6, 1)  # noqa: DTZ001
+        assert parse_export_date("2024-06-01T12:30:00") == datetime(2024, 6, 1, 12, 30)  # noqa: DTZ001
+        with pytest.raises(ValueError, match="Invalid date"):
+            parse_export_date("June")
@@ -0,0 +1,222 @@
+"""Unit tests for history_import module."""
+
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from database_models import Player, Score
+from database_service import DatabaseService
+from history_import import CSV_COLUMNS, import_history
+
+
+def new_service():
+    """Database service on an empty in-memory database"""
+    service = DatabaseService("sqlite:///:memory:")
+    service.initialize_database()
+    return service
+
+
+@pytest.fixture
+def source(seeded_history):
+    """Database service with a finished 501 game and a finished cricket game."""
+    return seeded_history({"501": 0, "cricket": 1}, running_scores=True, final_score=321)
+
+
+def replays(service):
+    """Replay documents of every game, oldest first"""
+    games = reversed(service.get_recent_games(limit=100))
+    return [service.get_game_replay_data(game["game_session_id"]) for game in games]
+
+
+def jsonl(documents):
+    """A JSONL game log"""
+    return io.StringIO("".join(json.dumps(document) + "\n" for document in documents))
+
+
+def csv_log(documents):
+    """A CSV game log: one row per throw with its game and player columns"""
+    text = io.StringIO()
+    writer = csv.DictWriter(text, CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for document in documents:
+        players = {player["player_order"]: player for player in document["players"]}
+        for throw in document["throws"]:
+            writer.writerow({**document, **players[throw["player_order"]], **throw})
+    text.seek(0)
+    return text
+
+
+def without_ids(document):
+    """A replay document without the database's own ids"""
+    return {
+        **document,
+        "players": [
+            {key: value for key, value in player.items() if key != "player_id"}
+            for player in document["players"]
+        ],
+    }
+
+
+class TestImportHistory:
+    """Test bulk loading of game logs in the replay format."""
+
+    @pytest.mark.parametrize("log", [jsonl, csv_log])
+    def test_round_trip(self, source, log):
+        """Test imported games replay like the originals."""
+        target = new_service()
+
+        counts = import_history(
+            target.db_manager,
+            log(replays(source)),
+            "csv" if log is csv_log else "jsonl",
+            batch_size=1,
+        )
+
+        assert counts == {"games": 2, "skipped": 0, "players": 2, "results": 4, "throws": 12}
+        assert [without_ids(game) for game in replays(target)] == [
+            without_ids(game) for game in replays(source)
+        ]
+
+    @pytest.mark.parametrize("log", [jsonl, csv_log])
+    def test_round_trip_of_any_accepted_score(self, log):
+        """Test a throw the server accepted, such as a SINGLE 40, imports unchanged."""
+        source = new_service()
+        source.start_new_game("301", ["Alice"], start_score=301)
+        source.record_throw(
+            player_id=0,
+            base_score=40,
+            multiplier="SINGLE",
+            multiplier_value=1,
+            actual_score=40,
+            score_before=301,
+            score_after=261,
+            turn_number=1,
+            throw_in_turn=1,
+            dartboard_sends_actual_score=True,
+        )
+        target = new_service()
+
+        counts = import_history(
+            target.db_manager,
+            log(replays(source)),
+            "csv" if log is csv_log else "jsonl",
+        )
+
+        assert counts["throws"] == 1
+        assert replays(target)[0]["throws"] == replays(source)[0]["throws"]
+
+    def test_rebuilt_stats_and_ratings_match(self, source):
+        """Test stats and ratings rebuilt after an import match the live ones."""
+        target = new_service()
+        import_history(target.db_manager, jsonl(replays(source)))
+
+        target.rebuild_player_stats()
+        target.rebuild_ratings()
+
+        for name in ("Alice", "Bob"):
+            with source.db_manager.session_scope() as session:
+                source_id = session.execute(select(Player.id).where(Player.name == name)).scalar()
+            with target.db_manager.session_scope() as session:
+                target_id = session.execute(select(Player.id).where(Player.name == name)).scalar()
+            assert target.get_player_stats(target_id) == source.get_player_stats(source_id)
+            assert (
+                target.get_player_rating(target_id)["rating"]
+                == source.get_player_rating(source_id)["rating"]
+            )
+
+    def test_existing_players_and_games_are_reused(self, source):
+        """Test players resolve by name and a repeated import skips its games."""
+        documents = replays(source)
+        documents[1]["players"][1]["player_name"] = "Carol"
+
+        counts = import_history(source.db_manager, jsonl(documents))
+
+        assert counts["games"] == 0
+        assert counts["skipped"] == 2
+        assert counts["players"] == 0
+
+        for document in documents:
+            document["game_session_id"] += "-imported"
+        counts = import_history(source.db_manager, jsonl(documents))
+
+        assert counts["games"] == 2
+        assert counts["players"] == 1
+        with source.db_manager.session_scope() as session:
+            names = session.execute(select(Player.name).order_by(Player.id)).scalars().all()
+        assert names == ["Alice", "Bob", "Carol"]
+
+    def test_invalid_games_write_nothing(self, source):
+        """Test every invalid field is reported by line and no game is written."""
+        documents = replays(source)
+        documents[0]["game_type"] = "killer"
+        documents[1]["throws"][0]["multiplier_value"] = "double"
+        documents[1]["throws"][1]["player_order"] = 7
+        target = new_service()
+
+        with pytest.raises(ValueError, match="3 invalid field") as error:
+            import_history(
+                target.db_manager,
+                io.StringIO(json.dumps(documents[0]) + "\n\n" + json.dumps(documents[1])),
+                batch_size=1,
+            )
+
+        message = str(error.value)
+        assert "line 1: game_type: unknown game type 'killer'" in message
+        assert "line 3: throws[0].multiplier_value: expected an integer" in message
+        assert "line 3: throws[1]: player_order 7 is not a player of the game" in message
+        with target.db_manager.session_scope() as session:
+            assert session.execute(select(func.count(Score.id))).scalar() == 0
+            assert session.execute(select(func.count(Player.id))).scalar() == 0
+
+    def test_interleaved_csv_rows_are_invalid(self, source):
+        """Test a game whose CSV rows are split by another game is rejected, not skipped."""
+        documents = replays(source)
+        rows = csv_log(documents).read().splitlines(keepends=True)
+        # Header, six rows of the 501 game and six of the cricket game
+        interleaved = [rows[0], *rows[1:4], *rows[7:13], *rows[4:7]]
+        target = new_service()
+
+        with pytest.raises(ValueError, match="1 invalid field") as error:
+            import_history(target.db_manager, io.StringIO("".join(interleaved)), "csv")
+
+        session_id = documents[0]["game_session_id"]
+        assert f"line 11: game_session_id {session_id!r} was already read on line 2" in str(
+            error.value,
+        )
+        with target.db_manager.session_scope() as session:
+            assert session.execute(select(func.count(Score.id))).scalar() == 0
+
+    def test_repeated_game_in_file_is_invalid(self, source):
+        """Test a game listed twice in one log is an error even in another batch."""
+        documents = replays(source)
+        target = new_service()
+
+        with pytest.raises(ValueError, match=r"line 3: game_session_id .* line 1"):
+            import_history(target.db_manager, jsonl([*documents, documents[0]]), batch_size=1)
+
+    def test_import_bumps_stored_data_version(self, source):
+        """Test an import changes the data version other processes read."""
+        target = new_service()
+        _, before = target.data_versions()
+
+        import_history(target.db_manager, jsonl(replays(source)))
+        _, after = target.data_versions()
+        import_history(target.db_manager, jsonl(replays(source)))
+
+        assert after == before + 1
+        # Nothing new was written the second time
+        assert target.data_versions()[1] == after
+
+    def test_unreadable_input(self):
+        """Test broken JSON, unknown formats and incomplete CSV headers are rejected."""
+        target = new_service()
+
+        with pytest.raises(ValueError, match="line 1: not a replay document"):
+            import_history(target.db_manager, io.StringIO("{not json\n"))
+        with pytest.raises(ValueError, match="Unknown format"):
+            import_history(target.db_manager, io.StringIO(""), "xml")
+        with pytest.raises(ValueError, match="missing columns: game_type"):
+            import_history(target.db_manager, io.StringIO("game_session_id\n"), "csv")
@@ -0,0 +1,83 @@
+"""Unit tests for http_cache module."""
+
+from flask import Flask
+
+from http_cache import (
+    BOOT_ID,
+    CACHE_IMMUTABLE,
+    ETagCache,
+    content_etag,
+    not_modified,
+    version_etag,
+    with_etag,
+)
+
+app = Flask(__name__)
+
+
+class TestETags:
+    """Test ETag construction and matching."""
+
+    def test_version_etag_includes_boot_id(self):
+        """Test version ETags differ between processes."""
+        assert version_etag(7) == f"{BOOT_ID}-7"
+        assert version_etag(7, 2) != version_etag(7)
+
+    def test_content_etag(self):
+        """Test content ETags depend only on the body."""
+        assert content_etag(b"{}") == content_etag(b"{}")
+        assert content_etag(b"{}") != content_etag(b"[]")
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match gets a 304 with the cache headers."""
+        with app.test_request_context(headers={"If-None-Match": '"abc"'}):
+            response = not_modified("abc", CACHE_IMMUTABLE)
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == '"abc"'
+        assert response.headers["Cache-Control"] == CACHE_IMMUTABLE
+
+    def test_weak_and_star_match(self):
+        """Test weak validators and * match as required for If-None-Match."""
+        with app.test_request_context(headers={"If-None-Match": 'W/"abc"'}):
+            assert not_modified("abc") is not None
+        with app.test_request_context(headers={"If-None-Match": "*"}):
+            assert not_modified("abc") is not None
+
+    def test_modified(self):
+        """Test a missing or different validator gets no 304."""
+        with app.test_request_context():
+            assert not_modified("abc") is None
+        with app.test_request_context(headers={"If-None-Match": '"old", "older"'}):
+            assert not_modified("abc") is None
+
+    def test_with_etag(self):
+        """Test headers are set on a full response."""
+        response = with_etag(app.response_class("{}"), "abc")
+
+        assert response.headers["ETag"] == '"abc"'
+        assert response.headers["Cache-Control"] == "no-cache"
+
+
+class TestETagCache:
+    """Test the bounded ETag cache."""
+
+    def test_lru_eviction(self):
+        """Test the least recently used key is dropped."""
+        cache = ETagCache(max_size=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+    def test_clear(self):
+        """Test clear drops every ETag."""
+        cache = ETagCache()
+        cache.set("a", "1")
+        cache.clear()
+
+        assert cache.get("a") is None
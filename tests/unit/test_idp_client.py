@@ -0,0 +1,117 @@
+"""Unit tests for idp_client module."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from idp_client import IdPClient, RetryBudget
+
+
+def _response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+
+@pytest.fixture
+def client():
+    """Create a client without backoff delays."""
+    return IdPClient(pool_size=4, timeout=2, retries=2, backoff=0)
+
+
+class TestRetryBudget:
+    """Test the retry budget."""
+
+    def test_withdraw_until_exhausted(self):
+        """Test retries stop once the tokens are spent."""
+        budget = RetryBudget(ratio=0.5, min_tokens=2, max_tokens=10)
+
+        assert budget.withdraw() is True
+        assert budget.withdraw() is True
+        assert budget.withdraw() is False
+
+    def test_deposit_refills(self):
+        """Test requests earn retry tokens up to the cap."""
+        budget = RetryBudget(ratio=0.5, min_tokens=0, max_tokens=1)
+        for _ in range(10):
+            budget.deposit()
+
+        assert budget.withdraw() is True
+        assert budget.withdraw() is False
+
+
+class TestIdPClient:
+    """Test the pooled identity provider client."""
+
+    def test_session_is_pooled(self, client):
+        """Test one keep-alive session with a sized pool is used."""
+        adapter = client.session.get_adapter("https://idp.example.com/")
+
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 0
+
+    def test_default_timeout(self, client):
+        """Test the client timeout is applied to every call."""
+        with patch.object(client.session, "request", return_value=_response(200)) as request:
+            client.get("https://idp.example.com/jwks")
+
+        assert request.call_args.kwargs["timeout"] == 2
+
+    def test_retries_gateway_errors(self, client):
+        """Test 503 responses are retried."""
+        responses = [_response(503), _response(200)]
+        with patch.object(client.session, "request", side_effect=responses) as request:
+            response = client.post("https://idp.example.com/introspect")
+
+        assert response.status_code == 200
+        assert request.call_count == 2
+
+    def test_retries_connection_errors(self, client):
+        """Test connection errors are retried, then raised."""
+        with (
+            patch.object(
+                client.session,
+                "request",
+                side_effect=requests.ConnectionError("refused"),
+            ) as request,
+            pytest.raises(requests.ConnectionError),
+        ):
+            client.get("https://idp.example.com/jwks")
+
+        assert request.call_count == 3
+
+    def test_no_retry_when_disabled(self, client):
+        """Test retries=0 sends a single attempt."""
+        with patch.object(client.session, "request", return_value=_response(503)) as request:
+            response = client.post("https://idp.example.com/token", retries=0)
+
+        assert response.status_code == 503
+        assert request.call_count == 1
+
+    def test_client_errors_not_retried(self, client):
+        """Test 4xx responses are returned as-is."""
+        with patch.object(client.session, "request", return_value=_response(401)) as request:
+            client.post("https://idp.example.com/introspect")
+
+        assert request.call_count == 1
+
+    def test_budget_limits_retries(self):
+        """Test an exhausted budget stops retries."""
+        client = IdPClient(backoff=0, retry_budget=RetryBudget(ratio=0, min_tokens=1))
+        with patch.object(client.session, "request", return_value=_response(503)) as request:
+            client.get("https://idp.example.com/jwks")
+            client.get("https://idp.example.com/jwks")
+
+        # First call retries once, second call has no budget left
+        assert request.call_count == 3
+
+    def test_from_env(self):
+        """Test configuration from environment variables."""
+        env = {"IDP_POOL_SIZE": "20", "IDP_TIMEOUT": "1.5", "IDP_RETRIES": "1"}
+        with patch.dict("os.environ", env):
+            client = IdPClient.from_env()
+
+        assert (client.timeout, client.retries) == (1.5, 1)
+        assert client.session.get_adapter("https://x/")._pool_maxsize == 20
@@ -0,0 +1,120 @@
+"""Unit tests for json_provider module."""
+
+import importlib
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import flask
+import pytest
+from flask import Flask, jsonify
+
+import json_provider
+from json_provider import BACKEND_ORJSON, BACKEND_STDLIB, ORJSON_AVAILABLE, FastJSONProvider
+
+BACKENDS = [
+    BACKEND_STDLIB,
+    pytest.param(
+        BACKEND_ORJSON,
+        marks=pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed"),
+    ),
+]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    """Run a test with each available backend."""
+    with patch("json_provider.BACKEND", request.param):
+        yield request.param
+
+
+class TestSerialization:
+    """Test dumps/loads behave the same with every backend."""
+
+    def test_round_trip(self, backend):
+        """Test a document survives dumps and loads."""
+        document = {"name": "Ålice", "scores": [20, 60, 0.5], "active": True, "game": None}
+
+        assert json_provider.loads(json_provider.dumps(document)) == document
+        assert json_provider.loads(json_provider.dumps_bytes(document)) == document
+
+    def test_compact_insertion_order(self, backend):
+        """Test output is compact and keeps key order unless sorting is asked for."""
+        assert json_provider.dumps({"b": 1, "a": [1, 2]}) == '{"b":1,"a":[1,2]}'
+        assert json_provider.dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
+
+    def test_socketio_keyword_arguments(self, backend):
+        """Test json.dumps-style arguments passed by python-socketio are accepted."""
+        assert json_provider.dumps(["update", {}], separators=(",", ":")) == '["update",{}]'
+
+    def test_integer_keys(self, backend):
+        """Test integer keys (cricket targets) become strings."""
+        assert json_provider.loads(json_provider.dumps({20: {"hits": 3}})) == {"20": {"hits": 3}}
+
+    def test_extra_types(self, backend):
+        """Test datetimes and decimals are serialized."""
+        moment = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+        document = json_provider.loads(json_provider.dumps({"at": moment, "avg": Decimal("1.5")}))
+
+        assert document == {"at": "2024-01-01T12:00:00+00:00", "avg": "1.5"}
+
+    def test_unserializable(self, backend):
+        """Test unknown types raise TypeError."""
+        with pytest.raises(TypeError):
+            json_provider.dumps({"value": object()})
+
+    def test_malformed_input(self, backend):
+        """Test malformed input raises json.JSONDecodeError with every backend."""
+        with pytest.raises(json.JSONDecodeError):
+            json_provider.loads(b"{not json")
+
+    def test_orjson_requested_but_missing(self):
+        """Test the stdlib is used when orjson is requested but not installed."""
+        with patch.dict("os.environ", {"JSON_BACKEND": BACKEND_ORJSON}):
+            module = importlib.reload(json_provider)
+        try:
+            expected = BACKEND_ORJSON if ORJSON_AVAILABLE else BACKEND_STDLIB
+            assert expected == module.BACKEND
+        finally:
+            importlib.reload(json_provider)
+
+
+class TestFastJSONProvider:
+    """Test the Flask JSON provider."""
+
+    @pytest.fixture
+    def app(self):
+        """Flask app using the provider."""
+        app = Flask(__name__)
+        app.json = FastJSONProvider(app)
+        return app
+
+    def test_jsonify(self, app, backend):
+        """Test jsonify responses use the provider."""
+        with app.app_context():
+            response = jsonify({"status": "ok", "count": 2})
+
+        assert response.mimetype == "application/json"
+        assert response.get_data() == b'{"status":"ok","count":2}\n'
+
+    def test_debug_output_is_indented(self, app, backend):
+        """Test debug mode pretty-prints like Flask's default provider."""
+        app.debug = True
+        with app.app_context():
+            response = jsonify({"status": "ok"})
+
+        assert json.loads(response.get_data()) == {"status": "ok"}
+        assert b"\n  " in response.get_data()
+
+    def test_request_parsing(self, app, backend):
+        """Test request bodies are parsed by the provider."""
+
+        @app.post("/echo")
+        def echo():
+            return flask.request.get_json()
+
+        response = app.test_client().post("/echo", json={"score": 20})
+
+        assert response.get_json() == {"score": 20}
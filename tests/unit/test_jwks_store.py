@@ -0,0 +1,192 @@
+"""Unit tests for jwks_store module."""
+
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from jwt.exceptions import PyJWKClientError
+
+from jwks_store import JWKSKeyStore, get_jwks_store
+
+JWKS_URL = "https://idp.example/oauth2/jwks"
+
+
+def make_key(kid):
+    """Create an RSA key pair and its public JWK."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_key, jwk
+
+
+@pytest.fixture(scope="module")
+def key_one():
+    """First signing key."""
+    return make_key("key-1")
+
+
+@pytest.fixture(scope="module")
+def key_two():
+    """Second signing key (after rotation)."""
+    return make_key("key-2")
+
+
+def jwks_response(*jwks):
+    """Mock HTTP response carrying a JWKS document."""
+    response = Mock()
+    response.json.return_value = {"keys": list(jwks)}
+    response.raise_for_status = Mock()
+    return response
+
+
+def sign(private_key, kid, **claims):
+    """Sign an RS256 token."""
+    payload = {"sub": "test-user", "exp": int(time.time()) + 300, **claims}
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def store():
+    """Key store without a background refresh thread."""
+    store = JWKSKeyStore(JWKS_URL, min_refetch_interval=30)
+    store._refresher = Mock()
+    return store
+
+
+class TestJWKSKeyStore:
+    """Test the JWKS key store."""
+
+    def test_get_signing_key_from_jwt(self, store, key_one):
+        """Test a token is verified with the key indexed by its kid."""
+        private_key, jwk = key_one
+        with patch("idp_client.IdPClient.get", return_value=jwks_response(jwk)) as mock_get:
+            token = sign(private_key, "key-1")
+            signing_key = store.get_signing_key_from_jwt(token)
+            claims = jwt.decode(token, signing_key.key, algorithms=["RS256"])
+
+            assert claims["sub"] == "test-user"
+            # Second lookup is served from the index
+            store.get_signing_key_from_jwt(token)
+            mock_get.assert_called_once()
+
+    def test_unknown_kid_refetch_is_rate_limited(self, store, key_one):
+        """Test tokens with unknown kids cannot make the store hammer the IdP."""
+        _private_key, jwk = key_one
+        with patch("idp_client.IdPClient.get", return_value=jwks_response(jwk)) as mock_get:
+            for _ in range(5):
+                with pytest.raises(PyJWKClientError, match="unknown"):
+                    store.get_signing_key("unknown")
+
+            mock_get.assert_called_once()
+
+    def test_rotated_key_is_fetched(self, store, key_one, key_two):
+        """Test a new kid is picked up once the rate limit allows a refetch."""
+        _private_key, jwk_one = key_one
+        _private_key, jwk_two = key_two
+        responses = [jwks_response(jwk_one), jwks_response(jwk_one, jwk_two)]
+        with patch("idp_client.IdPClient.get", side_effect=responses):
+            store.get_signing_key("key-1")
+            store._last_attempt -= 31
+
+            assert store.get_signing_key("key-2").key_id == "key-2"
+
+    def test_fetch_failure_keeps_previous_keys(self, store, key_one):
+        """Test a failed refresh does not drop the indexed keys."""
+        _private_key, jwk = key_one
+        store.load_jwks({"keys": [jwk]})
+
+        with patch("idp_client.IdPClient.get", side_effect=Exception("IdP down")):
+            assert store.refresh() is False
+
+        assert store.kids == ["key-1"]
+
+    def test_token_without_kid(self, store, key_one):
+        """Test tokens without a kid header are rejected."""
+        private_key, _jwk = key_one
+        token = jwt.encode({"sub": "x"}, private_key, algorithm="RS256")
+
+        with pytest.raises(PyJWKClientError, match="kid"):
+            store.get_signing_key_from_jwt(token)
+
+    def test_encryption_keys_ignored(self, store, key_one):
+        """Test only signing keys are indexed."""
+        _private_key, jwk = key_one
+        with pytest.raises(Exception, match="signing keys"):
+            store.load_jwks({"keys": [{**jwk, "use": "enc"}]})
+
+    def test_preload_file(self, tmp_path, key_one):
+        """Test keys can be preloaded without contacting the IdP."""
+        private_key, jwk = key_one
+        path = tmp_path / "jwks.json"
+        path.write_text(json.dumps({"keys": [jwk]}))
+
+        store = JWKSKeyStore(JWKS_URL, preload_file=str(path))
+        store._refresher = Mock()
+
+        with patch("idp_client.IdPClient.get") as mock_get:
+            store.get_signing_key_from_jwt(sign(private_key, "key-1"))
+            mock_get.assert_not_called()
+
+    def test_missing_preload_file_starts_cold(self, tmp_path, key_one):
+        """Test a missing preload file is logged and keys are fetched instead."""
+        private_key, jwk = key_one
+
+        store = JWKSKeyStore(JWKS_URL, preload_file=str(tmp_path / "missing.json"))
+
+        assert store.kids == []
+        with patch("idp_client.IdPClient.get", return_value=jwks_response(jwk)):
+            signing_key = store.get_signing_key_from_jwt(sign(private_key, "key-1"))
+        assert signing_key.key_id == "key-1"
+
+    def test_background_refresh(self, key_one):
+        """Test the refresh thread fetches keys and stops cleanly."""
+        _private_key, jwk = key_one
+        store = JWKSKeyStore(JWKS_URL, refresh_interval=0.05, min_refetch_interval=0.01)
+        fetched = threading.Event()
+        calls = []
+
+        def fake_get(*_args, **_kwargs):
+            calls.append(1)
+            if len(calls) >= 2:
+                fetched.set()
+            return jwks_response(jwk)
+
+        with patch("idp_client.IdPClient.get", side_effect=fake_get):
+            store.start()
+            assert fetched.wait(timeout=5)
+            store.stop()
+            store._refresher.join(timeout=5)
+
+        assert not store._refresher.is_alive()
+        assert store.kids == ["key-1"]
+
+    def test_first_lookup_waits_for_initial_fetch(self, key_one):
+        """Test a cold store does not reject tokens while the first fetch runs."""
+        private_key, jwk = key_one
+        store = JWKSKeyStore(JWKS_URL, min_refetch_interval=30)
+        started = threading.Event()
+
+        def slow_get(*_args, **_kwargs):
+            started.set()
+            time.sleep(0.1)
+            return jwks_response(jwk)
+
+        with patch("idp_client.IdPClient.get", side_effect=slow_get) as mock_get:
+            store.start()
+            assert started.wait(timeout=5)
+            signing_key = store.get_signing_key_from_jwt(sign(private_key, "key-1"))
+            store.stop()
+
+        assert signing_key.key_id == "key-1"
+        assert mock_get.call_count == 1
+
+    def test_shared_store_per_url(self):
+        """Test the app and the gateway share one store per JWKS URL."""
+        url = "https://shared.example/oauth2/jwks"
+
+        assert get_jwks_store(url) is get_jwks_store(url)
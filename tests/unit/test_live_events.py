@@ -0,0 +1,95 @@
+"""Unit tests for live_events module."""
+
+import json
+import threading
+import time
+
+from http_cache import BOOT_ID
+from live_events import LiveEventBuffer, format_event_id, parse_event_id
+
+
+class TestEventIds:
+    """Test event id formatting and parsing."""
+
+    def test_round_trip(self):
+        """Test ids of this process parse back to their sequence number."""
+        assert parse_event_id(format_event_id(42)) == 42
+
+    def test_foreign_or_malformed_ids(self):
+        """Test ids from another process or garbage are not resumable."""
+        assert parse_event_id(None) is None
+        assert parse_event_id("") is None
+        assert parse_event_id(f"not-{BOOT_ID}.5") is None
+        assert parse_event_id(f"{BOOT_ID}.x") is None
+        assert parse_event_id("5") is None
+
+
+class TestLiveEventBuffer:
+    """Test the ring buffer of recent events."""
+
+    def test_publish_serializes_once(self):
+        """Test events carry their serialized payload in every format."""
+        buffer = LiveEventBuffer()
+
+        event = buffer.publish("throw", {"base_score": 20, "multiplier": "TRIPLE"})
+
+        assert event.seq == buffer.last_seq == 1
+        assert event.sse() == (
+            f'id: {event.id}\nevent: throw\ndata: {{"base_score":20,"multiplier":"TRIPLE"}}\n\n'
+        )
+        assert json.loads(event.json()) == {
+            "id": event.id,
+            "event": "throw",
+            "data": {"base_score": 20, "multiplier": "TRIPLE"},
+        }
+
+    def test_since(self):
+        """Test resuming returns exactly the missed events."""
+        buffer = LiveEventBuffer()
+        for score in range(3):
+            buffer.publish("throw", {"score": score})
+
+        assert [event.seq for event in buffer.since(1)] == [2, 3]
+        assert buffer.since(3) == []
+        assert buffer.since(0) is not None
+
+    def test_since_after_overflow(self):
+        """Test a client behind the buffer must resync."""
+        buffer = LiveEventBuffer(max_events=2)
+        for score in range(4):
+            buffer.publish("throw", {"score": score})
+
+        assert buffer.since(1) is None
+        assert [event.seq for event in buffer.since(2)] == [3, 4]
+
+    def test_since_unknown_sequence(self):
+        """Test a sequence ahead of the buffer must resync."""
+        assert LiveEventBuffer().since(7) is None
+
+    def test_wait_returns_published_event(self):
+        """Test a waiting client wakes as soon as another thread publishes."""
+        buffer = LiveEventBuffer()
+        publisher = threading.Timer(0.05, buffer.publish, ("game_state", {}))
+        publisher.start()
+        start = time.monotonic()
+
+        events = buffer.wait(0, timeout=5)
+
+        assert [event.event for event in events] == ["game_state"]
+        assert time.monotonic() - start < 1
+        publisher.join()
+
+    def test_wait_returns_missed_events_at_once(self):
+        """Test waiting does not block when events were already published."""
+        buffer = LiveEventBuffer()
+        buffer.publish("throw", {})
+
+        assert [event.seq for event in buffer.wait(0, timeout=5)] == [1]
+
+    def test_wait_times_out(self):
+        """Test waiting returns an empty list when nothing is published."""
+        buffer = LiveEventBuffer()
+        start = time.monotonic()
+
+        assert buffer.wait(0, timeout=0.03) == []
+        assert time.monotonic() - start >= 0.03
@@ -0,0 +1,97 @@
+"""Unit tests for local_idp module."""
+
+import jwt
+import pytest
+from jwt import PyJWKSet
+
+from local_idp import LocalIdP, create_app
+
+
+@pytest.fixture(scope="module")
+def idp():
+    """Local identity provider shared by the tests."""
+    return LocalIdP()
+
+
+@pytest.fixture
+def client(idp):
+    """Flask test client for the identity provider."""
+    idp.latency = 0
+    idp.failure_rate = 0
+    return create_app(idp).test_client()
+
+
+class TestLocalIdP:
+    """Test the local identity provider stand-in."""
+
+    def test_jwks_verifies_issued_tokens(self, idp, client):
+        """Test tokens verify against the published key set."""
+        token = idp.issue_token("alice", roles=("gamemaster",))
+
+        key_set = PyJWKSet.from_dict(client.get("/oauth2/jwks").get_json())
+        claims = jwt.decode(token, key_set[idp.kid].key, algorithms=["RS256"])
+
+        assert claims["sub"] == "alice"
+        assert claims["groups"] == ["gamemaster"]
+
+    def test_introspect_active(self, idp, client):
+        """Test introspection reports issued tokens as active."""
+        token = idp.issue_token("alice")
+
+        result = client.post("/oauth2/introspect", data={"token": token}).get_json()
+
+        assert result["active"] is True
+        assert result["username"] == "alice"
+
+    def test_introspect_inactive(self, idp, client):
+        """Test expired, revoked and foreign tokens are inactive."""
+        expired = idp.issue_token(expires_in=-10)
+        revoked = idp.issue_token()
+        idp.revoke(revoked)
+        foreign = LocalIdP().issue_token()
+
+        for token in (expired, revoked, foreign, "garbage"):
+            result = client.post("/oauth2/introspect", data={"token": token}).get_json()
+            assert result == {"active": False}
+
+    def test_token_endpoint(self, idp, client):
+        """Test the token endpoint issues usable tokens."""
+        response = client.post(
+            "/oauth2/token",
+            data={"grant_type": "authorization_code", "code": "abc"},
+        )
+
+        body = response.get_json()
+        assert response.status_code == 200
+        assert idp.decode(body["access_token"])["sub"] == "test-user"
+
+    def test_token_endpoint_rejects_unknown_grant(self, client):
+        """Test unsupported grant types are rejected."""
+        response = client.post("/oauth2/token", data={"grant_type": "implicit"})
+
+        assert response.status_code == 400
+
+    def test_userinfo(self, idp, client):
+        """Test userinfo returns the token's subject and groups."""
+        token = idp.issue_token("bob", roles=("player",))
+
+        response = client.get("/oauth2/userinfo", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.get_json() == {"sub": "bob", "username": "bob", "groups": ["player"]}
+        assert client.get("/oauth2/userinfo").status_code == 401
+
+    def test_failure_injection(self, idp, client):
+        """Test injected failures use the configured status."""
+        idp.failure_rate = 1
+
+        response = client.get("/oauth2/jwks")
+
+        assert response.status_code == 503
+
+    def test_requests_are_counted(self, idp, client):
+        """Test requests are counted per endpoint."""
+        before = idp.requests["jwks"]
+
+        client.get("/oauth2/jwks")
+
+        assert idp.requests["jwks"] == before + 1
@@ -0,0 +1,113 @@
+"""Unit tests for metrics module."""
+
+import pytest
+
+from metrics import Counter, Gauge, Histogram, Registry
+
+
+@pytest.fixture
+def registry():
+    """Create an isolated metrics registry."""
+    return Registry()
+
+
+class TestCounter:
+    """Test counters."""
+
+    def test_inc(self):
+        """Test counters accumulate increments."""
+        counter = Counter("darts_test", "Test counter")
+        counter.inc()
+        counter.inc(2)
+
+        assert "darts_test_total 3" in counter.render()
+
+    def test_negative_increment_rejected(self):
+        """Test counters cannot decrease."""
+        with pytest.raises(ValueError, match="only increase"):
+            Counter("darts_test", "Test counter").inc(-1)
+
+    def test_labels(self):
+        """Test labelled children are rendered separately."""
+        counter = Counter("darts_test", "Test counter", ("outcome",))
+        counter.labels("ack").inc()
+        counter.labels(outcome="reject").inc(2)
+
+        text = counter.render()
+        assert 'darts_test_total{outcome="ack"} 1' in text
+        assert 'darts_test_total{outcome="reject"} 2' in text
+
+    def test_labels_required(self):
+        """Test labelled metrics cannot be used without labels."""
+        with pytest.raises(ValueError, match="requires labels"):
+            Counter("darts_test", "Test counter", ("outcome",)).inc()
+
+
+class TestGauge:
+    """Test gauges."""
+
+    def test_set_inc_dec(self):
+        """Test gauges go up and down."""
+        gauge = Gauge("darts_depth", "Test gauge")
+        gauge.set(5)
+        gauge.inc()
+        gauge.dec(3)
+
+        assert "darts_depth 3" in gauge.render()
+
+
+class TestHistogram:
+    """Test histograms."""
+
+    def test_buckets_are_cumulative(self):
+        """Test observations fill cumulative buckets with sum and count."""
+        histogram = Histogram("darts_latency_seconds", "Test histogram", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        text = histogram.render()
+        assert "# TYPE darts_latency_seconds histogram" in text
+        assert 'darts_latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'darts_latency_seconds_bucket{le="1"} 3' in text
+        assert 'darts_latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "darts_latency_seconds_sum 2.65" in text
+        assert "darts_latency_seconds_count 4" in text
+
+    def test_time(self):
+        """Test the timer records one observation."""
+        histogram = Histogram("darts_latency_seconds", "Test histogram", ("event",))
+        with histogram.labels("game_state").time():
+            pass
+
+        assert histogram.labels("game_state").count == 1
+        assert 'darts_latency_seconds_count{event="game_state"} 1' in histogram.render()
+
+
+class TestRegistry:
+    """Test the registry."""
+
+    def test_get_or_create(self, registry):
+        """Test metrics are shared by name."""
+        assert registry.counter("darts_a", "A") is registry.counter("darts_a", "A")
+
+    def test_type_conflict(self, registry):
+        """Test a name cannot be reused for another metric type."""
+        registry.counter("darts_a", "A")
+        with pytest.raises(ValueError, match="already registered"):
+            registry.gauge("darts_a", "A")
+
+    def test_render(self, registry):
+        """Test all metrics are rendered with HELP and TYPE lines."""
+        registry.counter("darts_a", "A").inc()
+        registry.gauge("darts_b", "B").set(1)
+
+        text = registry.render()
+        assert "# HELP darts_a_total A\n# TYPE darts_a_total counter\ndarts_a_total 1" in text
+        assert "# TYPE darts_b gauge\ndarts_b 1" in text
+        assert text.endswith("\n")
+
+    def test_label_values_escaped(self, registry):
+        """Test quotes and backslashes in label values are escaped."""
+        registry.counter("darts_a", "A", ("name",)).labels('say "hi"\\').inc()
+
+        assert 'darts_a_total{name="say \\"hi\\"\\\\"} 1' in registry.render()
@@ -0,0 +1,187 @@
+"""Unit tests for player_stats module."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from player_stats import (
+    add_turn_points,
+    checkout_possible,
+    merge,
+    negate,
+    parse_period,
+    stats_period,
+    summarize,
+    throw_stats,
+)
+
+
+def x01_throw(score_before, score_after, throw_sequence=1, is_finish=False, double_out=True):
+    """Increments of an x01 throw"""
+    return throw_stats(
+        cricket=False,
+        double_out=double_out,
+        throw_sequence=throw_sequence,
+        base_score=20,
+        multiplier_value=1,
+        score_before=score_before,
+        score_after=score_after,
+        is_finish=is_finish,
+    )
+
+
+class TestThrowStats:
+    """Test the increments of single throws."""
+
+    def test_x01_points_and_first_nine(self):
+        """Test points are the drop in score and early darts count for the first 9."""
+        assert x01_throw(501, 441) == {
+            "darts_thrown": 1,
+            "points_scored": 60,
+            "first9_darts": 1,
+            "first9_points": 60,
+        }
+        assert "first9_darts" not in x01_throw(301, 241, throw_sequence=10)
+
+    def test_bust_scores_nothing(self):
+        """Test a bust throw counts as a dart without points."""
+        assert x01_throw(301, 301, throw_sequence=12)["points_scored"] == 0
+
+    def test_checkout_attempts(self):
+        """Test darts at a finish count as checkout attempts."""
+        assert x01_throw(40, 0, is_finish=True) == {
+            "darts_thrown": 1,
+            "points_scored": 40,
+            "first9_darts": 1,
+            "first9_points": 40,
+            "checkout_attempts": 1,
+            "checkouts": 1,
+        }
+        assert x01_throw(40, 20)["checkouts"] == 0
+        assert "checkout_attempts" not in x01_throw(41, 40)
+
+    def test_checkout_possible(self):
+        """Test single-dart finishes with and without double-out."""
+        assert checkout_possible(40, double_out=True)
+        assert checkout_possible(50, double_out=True)
+        assert not checkout_possible(57, double_out=True)
+        assert checkout_possible(57, double_out=False)
+        assert checkout_possible(25, double_out=False)
+        assert not checkout_possible(61, double_out=False)
+
+    def test_cricket_marks(self):
+        """Test cricket throws count marks on 15-20 and the bull only."""
+        triple_20 = throw_stats(
+            cricket=True,
+            double_out=False,
+            throw_sequence=1,
+            base_score=20,
+            multiplier_value=3,
+            score_before=0,
+            score_after=0,
+            is_finish=False,
+        )
+        single_5 = throw_stats(
+            cricket=True,
+            double_out=False,
+            throw_sequence=2,
+            base_score=5,
+            multiplier_value=1,
+            score_before=0,
+            score_after=0,
+            is_finish=False,
+        )
+
+        assert triple_20 == {"darts_thrown": 1, "cricket_marks": 3}
+        assert single_5 == {"darts_thrown": 1, "cricket_marks": 0}
+
+
+class TestTurnPoints:
+    """Test ton-plus and 180 counting."""
+
+    def test_one_eighty(self):
+        """Test three treble 20s are a ton-plus and a 180."""
+        turns = {}
+        results = [
+            add_turn_points(turns, 0, 1, 60, turn_over=throw == 3, is_bust=False)
+            for throw in (1, 2, 3)
+        ]
+
+        assert results == [{}, {}, {"ton_plus": 1, "one_eighties": 1}]
+        assert turns == {}
+
+    def test_ton_plus_and_low_turns(self):
+        """Test turns of 100+ count, lower turns do not."""
+        turns = {}
+        add_turn_points(turns, 0, 1, 60, turn_over=False, is_bust=False)
+        assert add_turn_points(turns, 0, 1, 40, turn_over=True, is_bust=False) == {
+            "ton_plus": 1,
+            "one_eighties": 0,
+        }
+        add_turn_points(turns, 0, 2, 60, turn_over=False, is_bust=False)
+        assert add_turn_points(turns, 0, 2, 20, turn_over=True, is_bust=False) == {}
+
+    def test_bust_turn_never_counts(self):
+        """Test a busted turn is dropped."""
+        turns = {}
+        add_turn_points(turns, 0, 1, 60, turn_over=False, is_bust=False)
+        add_turn_points(turns, 0, 1, 60, turn_over=False, is_bust=False)
+
+        assert add_turn_points(turns, 0, 1, 0, turn_over=True, is_bust=True) == {}
+        assert turns == {}
+
+    def test_new_turn_resets(self):
+        """Test points of an unfinished earlier turn are not carried over."""
+        turns = {}
+        add_turn_points(turns, 0, 1, 60, turn_over=False, is_bust=False)
+
+        assert add_turn_points(turns, 0, 2, 60, turn_over=False, is_bust=False) == {}
+        assert turns[0] == (2, 60)
+
+
+class TestSummaries:
+    """Test derived statistics and periods."""
+
+    def test_x01_summary(self):
+        """Test averages and checkout percentage of x01 totals."""
+        totals = merge({}, x01_throw(501, 441))
+        merge(totals, x01_throw(40, 0, throw_sequence=12, is_finish=True))
+        merge(totals, x01_throw(40, 40, throw_sequence=11))
+
+        summary = summarize(totals)
+
+        assert summary["three_dart_average"] == 100.0
+        assert summary["first9_average"] == 180.0
+        assert summary["checkout_percentage"] == 50.0
+        assert summary["marks_per_round"] is None
+        assert summary["one_eighties"] == 0
+
+    def test_cricket_summary(self):
+        """Test marks per round of cricket totals."""
+        summary = summarize({"darts_thrown": 6, "cricket_marks": 8}, cricket=True)
+
+        assert summary["marks_per_round"] == 4.0
+        assert summary["three_dart_average"] is None
+
+    def test_empty_summary(self):
+        """Test nothing thrown yet gives no averages."""
+        summary = summarize({})
+
+        assert summary["darts_thrown"] == 0
+        assert summary["three_dart_average"] is None
+
+    def test_negate(self):
+        """Test negated increments cancel out."""
+        stats = x01_throw(501, 441)
+
+        assert set(merge(dict(stats), negate(stats)).values()) == {0}
+
+    def test_periods(self):
+        """Test periods are UTC months."""
+        late = datetime(2024, 6, 30, 23, 30, tzinfo=timezone(timedelta(hours=-2)))
+
+        assert stats_period(late) == date(2024, 7, 1)
+        assert stats_period(datetime(2024, 6, 3, 12, 0)) == date(2024, 6, 1)  # noqa: DTZ001
+        assert parse_period("2024-06") == date(2024, 6, 1)
+        with pytest.raises(ValueError, match="Invalid period"):
+            parse_period("2024-06-03")
@@ -1,11 +1,19 @@
 """Unit tests for RabbitMQ consumer."""
 
 import json
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
-from rabbitmq_consumer import RabbitMQConsumer
+from rabbitmq_consumer import (
+    BROKER_DELAY_SECONDS,
+    MESSAGES_CONSUMED,
+    QUEUE_DEPTH,
+    THROW_LATENCY_SECONDS,
+    RabbitMQConsumer,
+    message_age,
+)
 
 
 @pytest.fixture
@@ -148,6 +156,41 @@ class TestRabbitMQConsumer:
         # Verify message was rejected (requeued)
         mock_channel.basic_nack.assert_called_once_with(delivery_tag="test_tag", requeue=True)
 
+    def test_on_message_compact_format(self, consumer, callback):
+        """Test messages in the compact wire format are decoded by content type."""
+        from score_codec import WIRE_FORMAT_COMPACT, encode_message
+
+        mock_channel = MagicMock()
+        mock_method = MagicMock()
+        mock_method.delivery_tag = "test_tag"
+        mock_properties = MagicMock()
+
+        body, content_type = encode_message(
+            {"score": 20, "multiplier": "TRIPLE", "user": "board"},
+            WIRE_FORMAT_COMPACT,
+        )
+        mock_properties.content_type = content_type
+
+        consumer.on_message(mock_channel, mock_method, mock_properties, body)
+
+        callback.assert_called_once_with({"score": 20, "multiplier": "TRIPLE", "user": "board"})
+        mock_channel.basic_ack.assert_called_once_with(delivery_tag="test_tag")
+
+    def test_on_message_malformed_compact(self, consumer, callback):
+        """Test malformed compact messages are rejected without requeue."""
+        from score_codec import COMPACT_CONTENT_TYPE
+
+        mock_channel = MagicMock()
+        mock_method = MagicMock()
+        mock_method.delivery_tag = "test_tag"
+        mock_properties = MagicMock()
+        mock_properties.content_type = COMPACT_CONTENT_TYPE
+
+        consumer.on_message(mock_channel, mock_method, mock_properties, b"\x01")
+
+        callback.assert_not_called()
+        mock_channel.basic_nack.assert_called_once_with(delivery_tag="test_tag", requeue=False)
+
     @patch("rabbitmq_consumer.pika.BlockingConnection")
     @patch("rabbitmq_consumer.time.sleep")
     def test_start_with_connection_error(self, mock_sleep, mock_connection, consumer):
@@ -305,6 +348,54 @@ class TestRabbitMQConsumer:
             requeue=False,
         )
 
+    def test_on_message_records_metrics(self, consumer, callback):
+        """Test broker delay, latency and outcome metrics are recorded."""
+        mock_channel = MagicMock()
+        mock_method = MagicMock()
+        mock_method.delivery_tag = "test_tag"
+        sent = datetime.now(timezone.utc) - timedelta(seconds=2)
+        body = json.dumps({"score": 20, "timestamp": sent.isoformat()}).encode("utf-8")
+        delays = BROKER_DELAY_SECONDS.labels().count
+        latencies = THROW_LATENCY_SECONDS.labels().count
+        acked = MESSAGES_CONSUMED.labels("ack").value
+
+        consumer.on_message(mock_channel, mock_method, MagicMock(), body)
+
+        assert BROKER_DELAY_SECONDS.labels().count == delays + 1
+        assert THROW_LATENCY_SECONDS.labels().count == latencies + 1
+        assert MESSAGES_CONSUMED.labels("ack").value == acked + 1
+
+    def test_on_message_samples_queue_depth(self, consumer, callback):
+        """Test the queue depth gauge is sampled with a passive declare."""
+        mock_channel = MagicMock()
+        mock_channel.queue_declare.return_value.method.message_count = 7
+        consumer.queue_name = "test_queue"
+
+        consumer.on_message(mock_channel, MagicMock(), MagicMock(), b'{"score": 1}')
+
+        mock_channel.queue_declare.assert_called_once_with(queue="test_queue", passive=True)
+        assert QUEUE_DEPTH.labels().value == 7
+
+    @pytest.mark.parametrize(
+        ("message", "properties", "expected"),
+        [
+            ({"timestamp": "2024-01-01T00:00:00+00:00"}, None, 100.0),
+            ({"timestamp": "2024-01-01T00:00:00"}, None, 100.0),
+            ({}, Mock(timestamp=1704067180), 120.0),
+            ({"timestamp": "not a date"}, Mock(timestamp=None), None),
+            ({}, None, None),
+        ],
+    )
+    def test_message_age(self, message, properties, expected):
+        """Test message age from the body timestamp or the AMQP property."""
+        with patch("rabbitmq_consumer.time.time", return_value=1704067300.0):
+            assert message_age(message, properties) == expected
+
+    def test_message_age_clamped_for_clock_skew(self):
+        """Test timestamps from the future give an age of zero."""
+        future = datetime.now(timezone.utc) + timedelta(minutes=1)
+        assert message_age({"timestamp": future.isoformat()}) == 0.0
+
     @patch("rabbitmq_consumer.pika.BlockingConnection")
     def test_connect_with_custom_config(self, mock_connection):
         """Test connection with custom configuration."""
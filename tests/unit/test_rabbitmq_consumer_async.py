@@ -0,0 +1,266 @@
+"""Unit tests for the asyncio RabbitMQ consumer."""
+
+import asyncio
+import json
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from rabbitmq_consumer_async import AsyncRabbitMQConsumer, _Delivery
+from score_codec import WIRE_FORMAT_COMPACT, encode_message
+from transport import InMemoryBroker
+
+
+@pytest.fixture
+def broker():
+    """Create an isolated in-memory broker."""
+    return InMemoryBroker()
+
+
+@pytest.fixture
+def config():
+    """Provide in-memory RabbitMQ configuration for testing."""
+    return {
+        "host": "localhost",
+        "port": 5672,
+        "user": "guest",
+        "password": "guest",
+        "vhost": "/",
+        "exchange": "test_exchange",
+        "topic": "test.topic.#",
+        "transport": "memory",
+        "poll_interval": 0.001,
+        "shutdown_timeout": 1,
+    }
+
+
+def make_consumer(config, callback, broker):
+    """Create a consumer bound to an isolated broker."""
+    with patch("rabbitmq_consumer_async.create_transport", return_value=broker):
+        return AsyncRabbitMQConsumer(config, callback)
+
+
+def make_delivery(body, content_type=None):
+    """Create a delivery whose ack/nack calls are recorded."""
+    settled = Mock()
+
+    async def ack():
+        settled.ack()
+
+    async def nack(requeue=True):
+        settled.nack(requeue=requeue)
+
+    return _Delivery(body, content_type, ack, nack), settled
+
+
+async def run_until(consumer, broker, publish, done):
+    """Run the consumer, publish once it is bound and stop when done() is true."""
+    task = asyncio.create_task(consumer.run())
+    while consumer.connection is None:
+        await asyncio.sleep(0.001)
+    publish(broker.connect().channel())
+    for _ in range(2000):
+        if done():
+            break
+        await asyncio.sleep(0.001)
+    consumer.stop()
+    await asyncio.wait_for(task, timeout=5)
+
+
+class TestAsyncRabbitMQConsumer:
+    """Test asyncio RabbitMQ consumer class."""
+
+    def test_initialization(self, config, broker):
+        """Test consumer initialization."""
+        callback = Mock()
+        consumer = make_consumer({**config, "prefetch": 8}, callback, broker)
+
+        assert consumer.callback == callback
+        assert consumer.connection is None
+        assert consumer.should_stop is False
+        assert consumer.prefetch == 8
+
+    def test_rabbitmq_requires_aio_pika(self, config):
+        """Test the RabbitMQ transport is refused without aio-pika."""
+        with (
+            patch("rabbitmq_consumer_async.AIO_PIKA_AVAILABLE", False),
+            pytest.raises(RuntimeError, match="aio-pika"),
+        ):
+            AsyncRabbitMQConsumer({**config, "transport": "pika"}, Mock())
+
+    def test_handle_acks_after_callback(self, config, broker):
+        """Test a valid message is passed to the callback and acknowledged."""
+        callback = Mock()
+        consumer = make_consumer(config, callback, broker)
+        delivery, settled = make_delivery(json.dumps({"score": 20}).encode())
+
+        asyncio.run(consumer.handle(delivery))
+
+        callback.assert_called_once_with({"score": 20})
+        settled.ack.assert_called_once()
+
+    def test_handle_runs_plain_callback_off_the_loop(self, config, broker):
+        """Test a blocking callback runs in a worker thread, not on the event loop."""
+        threads = []
+        consumer = make_consumer(
+            config,
+            lambda _message: threads.append(threading.current_thread()),
+            broker,
+        )
+        delivery, settled = make_delivery(b'{"score": 5}')
+
+        asyncio.run(consumer.handle(delivery))
+
+        assert threads
+        assert threads[0] is not threading.current_thread()
+        settled.ack.assert_called_once()
+
+    def test_handle_awaits_coroutine_callback(self, config, broker):
+        """Test coroutine callbacks are awaited before the ack."""
+        received = []
+
+        async def callback(message):
+            await asyncio.sleep(0)
+            received.append(message)
+
+        consumer = make_consumer(config, callback, broker)
+        delivery, settled = make_delivery(b'{"score": 5}')
+
+        asyncio.run(consumer.handle(delivery))
+
+        assert received == [{"score": 5}]
+        settled.ack.assert_called_once()
+
+    def test_handle_rejects_malformed_message(self, config, broker):
+        """Test malformed messages are rejected without requeue."""
+        callback = Mock()
+        consumer = make_consumer(config, callback, broker)
+        delivery, settled = make_delivery(b"not json")
+
+        asyncio.run(consumer.handle(delivery))
+
+        callback.assert_not_called()
+        settled.nack.assert_called_once_with(requeue=False)
+
+    def test_handle_requeues_on_callback_error(self, config, broker):
+        """Test callback errors requeue the message."""
+        consumer = make_consumer(config, Mock(side_effect=RuntimeError("boom")), broker)
+        delivery, settled = make_delivery(b'{"score": 1}')
+
+        asyncio.run(consumer.handle(delivery))
+
+        settled.nack.assert_called_once_with(requeue=True)
+
+    def test_consumes_in_publish_order(self, config, broker):
+        """Test messages routed by the broker reach the callback in order."""
+        received = []
+        consumer = make_consumer(config, received.append, broker)
+
+        def publish(channel):
+            for score in range(5):
+                channel.basic_publish(
+                    exchange="test_exchange",
+                    routing_key="test.topic.api",
+                    body=json.dumps({"score": score}),
+                )
+
+        asyncio.run(run_until(consumer, broker, publish, lambda: len(received) == 5))
+
+        assert [message["score"] for message in received] == [0, 1, 2, 3, 4]
+        assert consumer.connection is None
+
+    def test_decodes_compact_messages(self, config, broker):
+        """Test the content type selects the compact decoder."""
+        received = []
+        consumer = make_consumer(config, received.append, broker)
+        body, content_type = encode_message(
+            {"score": 20, "multiplier": "TRIPLE"},
+            WIRE_FORMAT_COMPACT,
+        )
+
+        def publish(channel):
+            channel.basic_publish(
+                exchange="test_exchange",
+                routing_key="test.topic.api",
+                body=body,
+                properties=Mock(content_type=content_type),
+            )
+
+        asyncio.run(run_until(consumer, broker, publish, lambda: received))
+
+        assert received == [{"score": 20, "multiplier": "TRIPLE"}]
+
+    def test_stop_lets_current_message_finish(self, config, broker):
+        """Test stop() waits for the message being handled and leaves the rest queued."""
+        started = asyncio.Event()
+        release = asyncio.Event()
+        received = []
+
+        async def callback(message):
+            started.set()
+            await release.wait()
+            received.append(message)
+
+        consumer = make_consumer(config, callback, broker)
+
+        async def scenario():
+            task = asyncio.create_task(consumer.run())
+            while consumer.connection is None:
+                await asyncio.sleep(0.001)
+            channel = broker.connect().channel()
+            for score in (1, 2):
+                channel.basic_publish(
+                    exchange="test_exchange",
+                    routing_key="test.topic.api",
+                    body=json.dumps({"score": score}),
+                )
+            await started.wait()
+            consumer.stop()
+            await asyncio.sleep(0.01)
+            assert not task.done()
+            release.set()
+            await asyncio.wait_for(task, timeout=5)
+
+        asyncio.run(scenario())
+
+        assert received == [{"score": 1}]
+
+    def test_start_and_stop_from_another_thread(self, config, broker):
+        """Test start() blocks in its own thread until stop() is called."""
+        consumer = make_consumer(config, Mock(), broker)
+        thread = threading.Thread(target=consumer.start, daemon=True)
+        thread.start()
+        for _ in range(500):
+            if consumer.connection is not None:
+                break
+            threading.Event().wait(0.01)
+
+        consumer.stop()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+
+    def test_reconnects_after_error(self, config, broker):
+        """Test a failing connection is retried until stop()."""
+        consumer = make_consumer({**config, "reconnect_delay": 0.01}, Mock(), broker)
+        attempts = []
+        connect = broker.connect
+
+        def flaky_connect(*args):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("broker unavailable")
+            return connect(*args)
+
+        async def scenario():
+            task = asyncio.create_task(consumer.run())
+            while consumer.connection is None:
+                await asyncio.sleep(0.001)
+            consumer.stop()
+            await asyncio.wait_for(task, timeout=5)
+
+        with patch.object(broker, "connect", side_effect=flaky_connect):
+            asyncio.run(scenario())
+
+        assert len(attempts) == 2
@@ -0,0 +1,127 @@
+"""Unit tests for rate_limiter module."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from rate_limiter import (
+    ConcurrencyLimiter,
+    MemoryBucketBackend,
+    RateLimiter,
+    RedisBucketBackend,
+    create_bucket_backend,
+    limiters_from_env,
+)
+
+
+class TestRateLimiter:
+    """Test the token-bucket rate limiter."""
+
+    def test_burst_then_reject(self):
+        """Test a key may burst, then has to wait."""
+        limiter = RateLimiter("test", rate=2, burst=3)
+
+        assert [limiter.acquire("board-1") for _ in range(3)] == [0, 0, 0]
+        assert limiter.acquire("board-1") == pytest.approx(0.5, abs=0.01)
+
+    def test_keys_are_independent(self):
+        """Test one key's usage does not limit another key."""
+        limiter = RateLimiter("test", rate=1, burst=1)
+
+        assert limiter.acquire("board-1") == 0
+        assert limiter.acquire("board-1") > 0
+        assert limiter.acquire("board-2") == 0
+
+    def test_refill(self):
+        """Test tokens refill at the configured rate."""
+        limiter = RateLimiter("test", rate=10, burst=1)
+        start = time.monotonic()
+        limiter.acquire("board-1")
+
+        with patch("rate_limiter.time.monotonic", return_value=start + 0.2):
+            assert limiter.acquire("board-1") == 0
+
+    def test_cost(self):
+        """Test a request can take several tokens."""
+        limiter = RateLimiter("test", rate=1, burst=5)
+
+        assert limiter.acquire("board-1", cost=5) == 0
+        assert limiter.acquire("board-1", cost=2) == pytest.approx(2, abs=0.01)
+
+    def test_memory_backend_is_bounded(self):
+        """Test the least recently used bucket is dropped at capacity."""
+        backend = MemoryBucketBackend(max_keys=2)
+        for key in ("a", "b", "c"):
+            backend.acquire(key, rate=1, burst=1)
+
+        assert list(backend._buckets) == ["b", "c"]
+
+    def test_redis_backend(self):
+        """Test the Redis backend runs the bucket script per key."""
+        client = MagicMock()
+        client.register_script.return_value.return_value = b"0.25"
+        limiter = RateLimiter("client", rate=4, burst=8, backend=RedisBucketBackend(client))
+
+        assert limiter.acquire("board-1") == 0.25
+        client.register_script.return_value.assert_called_once_with(
+            keys=["darts:ratelimit:client:board-1"],
+            args=[4, 8, 1],
+        )
+
+    def test_backend_error_fails_open(self):
+        """Test a failing backend admits the request instead of erroring."""
+        client = MagicMock()
+        client.register_script.return_value.side_effect = ConnectionError("redis down")
+        limiter = RateLimiter("client", rate=4, burst=8, backend=RedisBucketBackend(client))
+
+        assert limiter.acquire("board-1") == 0
+
+    @pytest.mark.parametrize(
+        ("name", "value"),
+        [
+            ("RATE_LIMIT_IP_RATE", "0"),
+            ("RATE_LIMIT_CLIENT_RATE", "-1"),
+            ("RATE_LIMIT_CLIENT_BURST", "0.5"),
+        ],
+    )
+    def test_limiters_from_env_rejects_invalid_buckets(self, monkeypatch, name, value):
+        """Test a zero rate or a burst below one request is refused at startup."""
+        monkeypatch.setenv(name, value)
+
+        with pytest.raises(ValueError, match=name):
+            limiters_from_env()
+
+    def test_create_bucket_backend(self):
+        """Test backend selection by name."""
+        assert isinstance(create_bucket_backend("memory"), MemoryBucketBackend)
+        with pytest.raises(ValueError, match="Unknown rate limit backend"):
+            create_bucket_backend("carrier-pigeon")
+
+    @patch("rate_limiter.REDIS_AVAILABLE", False)
+    def test_redis_backend_requires_package(self):
+        """Test a clear error when redis is not installed."""
+        with pytest.raises(RuntimeError, match="redis"):
+            create_bucket_backend("redis")
+
+
+class TestConcurrencyLimiter:
+    """Test the concurrency cap."""
+
+    def test_cap(self):
+        """Test requests beyond the cap are refused until a slot is released."""
+        limiter = ConcurrencyLimiter(2)
+
+        assert limiter.try_acquire()
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+
+        limiter.release()
+        assert limiter.try_acquire()
+        assert limiter.in_flight == 2
+
+    def test_zero_disables_cap(self):
+        """Test max_concurrent=0 admits everything."""
+        limiter = ConcurrencyLimiter(0)
+
+        assert all(limiter.try_acquire() for _ in range(100))
@@ -0,0 +1,41 @@
+"""Unit tests for ratings module."""
+
+import pytest
+
+from ratings import INITIAL_RATING, K_FACTOR, expected_score, rate_game
+
+
+class TestRateGame:
+    """Test Elo updates of finished games."""
+
+    def test_equal_players(self):
+        """Test equal players exchange half the K-factor."""
+        assert rate_game([INITIAL_RATING, INITIAL_RATING], 1) == [
+            INITIAL_RATING - K_FACTOR / 2,
+            INITIAL_RATING + K_FACTOR / 2,
+        ]
+
+    def test_upset_gains_more(self):
+        """Test beating a stronger player is worth more than beating a weaker one."""
+        underdog_win = rate_game([1400.0, 1600.0], 0)
+        favourite_win = rate_game([1400.0, 1600.0], 1)
+
+        assert underdog_win[0] - 1400.0 > favourite_win[1] - 1600.0
+        assert underdog_win[0] - 1400.0 == pytest.approx(K_FACTOR * expected_score(1600.0, 1400.0))
+
+    def test_multiplayer_game(self):
+        """Test the K-factor is shared by the winner's pairings and ratings are conserved."""
+        after = rate_game([1500.0, 1500.0, 1500.0, 1500.0], 2)
+
+        assert after[2] == pytest.approx(1500.0 + K_FACTOR / 2)
+        assert after[0] == after[1] == after[3]
+        assert sum(after) == pytest.approx(6000.0)
+
+    def test_single_player_unrated(self):
+        """Test a game without opponents changes nothing."""
+        assert rate_game([1520.0], 0) == [1520.0]
+
+    def test_expected_score(self):
+        """Test a 400 point edge is a 10:1 favourite."""
+        assert expected_score(1900.0, 1500.0) == pytest.approx(10 / 11)
+        assert expected_score(1500.0, 1500.0) == 0.5
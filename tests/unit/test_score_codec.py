@@ -0,0 +1,84 @@
+"""Unit tests for score_codec module."""
+
+import json
+
+import pytest
+
+from score_codec import (
+    COMPACT_CONTENT_TYPE,
+    JSON_CONTENT_TYPE,
+    WIRE_FORMAT_COMPACT,
+    MessageDecodeError,
+    can_encode_compact,
+    decode_message,
+    encode_message,
+)
+
+
+@pytest.fixture
+def gateway_message():
+    """Score message as published by the API gateway."""
+    return {
+        "score": 20,
+        "multiplier": "TRIPLE",
+        "player_id": None,
+        "game_id": None,
+        "user": "dartboard-001",
+        "timestamp": "2024-01-01T12:00:00.500000+00:00",
+    }
+
+
+class TestScoreCodec:
+    """Test score message encoding and decoding."""
+
+    def test_json_is_default(self, gateway_message):
+        """Test JSON encoding is used unless compact is requested."""
+        body, content_type = encode_message(gateway_message)
+        assert content_type == JSON_CONTENT_TYPE
+        assert json.loads(body) == gateway_message
+
+    def test_compact_round_trip(self, gateway_message):
+        """Test a compact message decodes to the fields the consumer needs."""
+        body, content_type = encode_message(gateway_message, WIRE_FORMAT_COMPACT)
+        assert content_type.startswith(COMPACT_CONTENT_TYPE)
+        assert len(body) < len(json.dumps(gateway_message))
+
+        decoded = decode_message(body, content_type)
+        assert decoded == {
+            "score": 20,
+            "multiplier": "TRIPLE",
+            "user": "dartboard-001",
+            "timestamp": "2024-01-01T12:00:00.500000+00:00",
+        }
+
+    def test_compact_board_and_throw_ids(self):
+        """Test board and throw ids survive the compact layout."""
+        message = {"score": 25, "multiplier": "DBLBULL", "board_id": 7, "throw_id": 123456}
+        body, content_type = encode_message(message, WIRE_FORMAT_COMPACT)
+        assert decode_message(body, content_type) == message
+
+    def test_compact_falls_back_to_json(self, gateway_message):
+        """Test messages that do not fit the layout are sent as JSON."""
+        batch = {"throws": [gateway_message], "user": "dartboard-001"}
+        assert not can_encode_compact(batch)
+        _body, content_type = encode_message(batch, WIRE_FORMAT_COMPACT)
+        assert content_type == JSON_CONTENT_TYPE
+
+        with_game_id = {**gateway_message, "game_id": "game-456"}
+        _body, content_type = encode_message(with_game_id, WIRE_FORMAT_COMPACT)
+        assert content_type == JSON_CONTENT_TYPE
+
+    def test_missing_content_type_decodes_json(self):
+        """Test bodies without a content type are treated as JSON."""
+        assert decode_message(b'{"score": 5}', None) == {"score": 5}
+
+    def test_unknown_compact_version(self, gateway_message):
+        """Test an unsupported compact version is rejected."""
+        body, _content_type = encode_message(gateway_message, WIRE_FORMAT_COMPACT)
+        with pytest.raises(MessageDecodeError):
+            decode_message(body, f"{COMPACT_CONTENT_TYPE}; v=99")
+
+    def test_truncated_compact_body(self):
+        """Test a truncated compact body is rejected."""
+        with pytest.raises(MessageDecodeError):
+            decode_message(b"\x01\x00", COMPACT_CONTENT_TYPE)
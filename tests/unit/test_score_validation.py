@@ -0,0 +1,100 @@
+"""Unit tests for score_validation module."""
+
+from score_validation import GAME_MULTIPLIERS, validate_throw, validate_throws
+
+
+class TestValidateThrow:
+    """Test single throw validation."""
+
+    def test_valid_throw_normalizes_multiplier(self):
+        """Test a valid throw is returned with an upper-cased multiplier."""
+        throw, error = validate_throw({"score": 20, "multiplier": "triple"})
+        assert error is None
+        assert throw == {"score": 20, "multiplier": "TRIPLE"}
+
+    def test_empty_payload(self):
+        """Test an empty payload is rejected."""
+        throw, error = validate_throw({})
+        assert throw is None
+        assert error["error"] == "Invalid request"
+
+    def test_missing_fields(self):
+        """Test missing fields are reported by name."""
+        _throw, error = validate_throw({"score": 20})
+        assert error["error"] == "Missing required fields"
+        assert "multiplier" in error["message"]
+
+    def test_score_out_of_range(self):
+        """Test scores above the maximum are rejected."""
+        _throw, error = validate_throw({"score": 61, "multiplier": "SINGLE"})
+        assert error["error"] == "Invalid score"
+
+    def test_score_must_be_integer(self):
+        """Test non-integer and boolean scores are rejected."""
+        _throw, error = validate_throw({"score": "20", "multiplier": "SINGLE"})
+        assert error["error"] == "Invalid score"
+        _throw, error = validate_throw({"score": True, "multiplier": "SINGLE"})
+        assert error["error"] == "Invalid score"
+
+    def test_gateway_rejects_bull_multiplier(self):
+        """Test the default multiplier set matches the gateway contract."""
+        _throw, error = validate_throw({"score": 25, "multiplier": "BULL"})
+        assert error["error"] == "Invalid multiplier"
+
+    def test_game_multipliers_accept_bull(self):
+        """Test the game multiplier set accepts bull multipliers."""
+        throw, error = validate_throw(
+            {"score": 25, "multiplier": "DBLBULL"},
+            valid_multipliers=GAME_MULTIPLIERS,
+        )
+        assert error is None
+        assert throw["multiplier"] == "DBLBULL"
+
+    def test_non_string_multiplier(self):
+        """Test a non-string multiplier is rejected instead of raising."""
+        _throw, error = validate_throw({"score": 20, "multiplier": 3})
+        assert error["error"] == "Invalid multiplier"
+
+
+class TestValidateThrows:
+    """Test batch validation."""
+
+    def test_valid_batch_preserves_order_and_extra_fields(self):
+        """Test a valid batch keeps order and per-throw metadata."""
+        throws, errors = validate_throws(
+            [
+                {"score": 20, "multiplier": "single", "player_id": 1},
+                {"score": 19, "multiplier": "TRIPLE"},
+            ],
+        )
+        assert errors == []
+        assert throws == [
+            {"score": 20, "multiplier": "SINGLE", "player_id": 1},
+            {"score": 19, "multiplier": "TRIPLE"},
+        ]
+
+    def test_all_errors_reported_with_index(self):
+        """Test every invalid throw is reported in one pass."""
+        _throws, errors = validate_throws(
+            [
+                {"score": 20, "multiplier": "SINGLE"},
+                {"score": 99, "multiplier": "SINGLE"},
+                {"score": 20, "multiplier": "QUAD"},
+            ],
+        )
+        assert [error["index"] for error in errors] == [1, 2]
+        assert errors[0]["error"] == "Invalid score"
+        assert errors[1]["error"] == "Invalid multiplier"
+
+    def test_empty_or_missing_batch(self):
+        """Test an empty or non-list batch is rejected."""
+        for payload in (None, [], {"score": 20}):
+            throws, errors = validate_throws(payload)
+            assert throws == []
+            assert errors[0]["error"] == "Invalid batch"
+
+    def test_batch_too_large(self):
+        """Test the batch size limit."""
+        batch = [{"score": 1, "multiplier": "SINGLE"}] * 3
+        _throws, errors = validate_throws(batch, max_batch_size=2)
+        assert errors[0]["error"] == "Batch too large"
@@ -0,0 +1,204 @@
+"""Unit tests for throw_analytics module."""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import insert, select
+
+from database_models import GameResult, GameType, Player, Score
+from database_service import DatabaseService
+from history_export import export_history
+from throw_analytics import NUMPY_AVAILABLE, PYARROW_AVAILABLE, analyze_export, analyze_throws
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+STARTED = datetime(2024, 3, 1, 20, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db_service():
+    """Create a test database service."""
+    service = DatabaseService("sqlite:///:memory:")
+    service.initialize_database()
+    return service
+
+
+def add_game(db_service, game_type, turns_by_player, started_at=STARTED, start_score=501):
+    """
+    Insert one game; turns_by_player maps player name to turns of
+    (base_score, multiplier_value[, flag]) throws, flag being "bust" or "finish"
+    """
+    multipliers = {1: "SINGLE", 2: "DOUBLE", 3: "TRIPLE"}
+    with db_service.db_manager.session_scope() as session:
+        game_type_id = session.execute(
+            select(GameType.id).where(GameType.name == game_type),
+        ).scalar_one()
+        for order, (name, turns) in enumerate(turns_by_player.items()):
+            player_id = session.execute(select(Player.id).where(Player.name == name)).scalar()
+            if player_id is None:
+                player_id = session.execute(
+                    insert(Player).values(name=name).returning(Player.id),
+                ).scalar_one()
+            result_id = session.execute(
+                insert(GameResult)
+                .values(
+                    game_type_id=game_type_id,
+                    player_id=player_id,
+                    player_order=order,
+                    start_score=start_score,
+                    game_session_id=f"{game_type}-{started_at.isoformat()}",
+                    started_at=started_at,
+                )
+                .returning(GameResult.id),
+            ).scalar_one()
+            score = start_score
+            sequence = 0
+            for turn_number, turn in enumerate(turns, start=1):
+                for throw_in_turn, (base_score, multiplier_value, *flag) in enumerate(turn, 1):
+                    sequence += 1
+                    points = base_score * multiplier_value
+                    session.execute(
+                        insert(Score).values(
+                            game_result_id=result_id,
+                            player_id=player_id,
+                            throw_sequence=sequence,
+                            turn_number=turn_number,
+                            throw_in_turn=throw_in_turn,
+                            base_score=base_score,
+                            multiplier=multipliers[multiplier_value],
+                            multiplier_value=multiplier_value,
+                            actual_score=points,
+                            score_before=score,
+                            score_after=score - points,
+                            dartboard_sends_actual_score=False,
+                            is_bust=flag == ["bust"],
+                            is_finish=flag == ["finish"],
+                        ),
+                    )
+                    score -= points
+
+
+def player_id(db_service, name):
+    """Database id of a player"""
+    with db_service.db_manager.session_scope() as session:
+        return session.execute(select(Player.id).where(Player.name == name)).scalar_one()
+
+
+T20 = (20, 3)
+S20 = (20, 1)
+MISS = (0, 1)
+
+
+class TestAnalyzeThrows:
+    """Test throw distributions computed from the scores table."""
+
+    @pytest.fixture
+    def season(self, db_service):
+        """Two 501 games and a cricket game"""
+        add_game(
+            db_service,
+            "501",
+            {
+                "Alice": [[T20, T20, T20], [T20, T20, S20], [S20, S20, S20], [T20, T20, T20]],
+                "Bob": [[S20, S20, MISS], [(20, 1, "bust")]],
+            },
+        )
+        add_game(
+            db_service,
+            "501",
+            {
+                "Alice": [[T20, T20, T20], [(8, 1), (16, 2, "finish")]],
+                "Bob": [[(20, 2)]],
+            },
+            started_at=datetime(2024, 3, 2, 20, 0, tzinfo=timezone.utc),
+            start_score=220,
+        )
+        add_game(
+            db_service,
+            "cricket",
+            {"Alice": [[T20, T20, T20]]},
+            started_at=datetime(2024, 4, 1, 20, 0, tzinfo=timezone.utc),
+        )
+        return player_id(db_service, "Alice"), player_id(db_service, "Bob")
+
+    def test_distributions(self, db_service, season):
+        """Test heatmap, turn totals, busts, doubles and streaks."""
+        alice_id, bob_id = season
+
+        report = analyze_throws(db_service.db_manager, [alice_id, bob_id])
+        alice = report[alice_id]
+        bob = report[bob_id]
+
+        assert alice["throws"] == 20
+        assert alice["heatmap"][20][3] == 14
+        assert alice["heatmap"][16][2] == 1
+        assert alice["multiplier_rates"] == {"single": 0.25, "double": 0.05, "triple": 0.7}
+        # Cricket turns are left out of the x01 turn statistics
+        assert alice["turns"] == 6
+        assert alice["turn_totals"][180] == 3
+        assert alice["turn_totals"][140] == 1
+        assert alice["turn_totals"][60] == 1
+        assert alice["turn_totals"][40] == 1
+        assert alice["bust_rate"] == 0.0
+        assert alice["longest_streak"] == 2
+        # Darts thrown from 40 and 32, the second finishing on double 16
+        assert alice["double_attempts"] == 2
+        assert alice["double_hits"] == 1
+        assert alice["doubles_percentage"] == 50.0
+
+        assert bob["turns"] == 3
+        assert bob["bust_rate"] == round(1 / 3, 4)
+        assert bob["longest_streak"] == 0
+        assert bob["multiplier_rates"]["double"] == 0.2
+
+    def test_chunk_size_does_not_change_results(self, db_service, season):
+        """Test turns and streaks spanning chunks are counted once."""
+        whole = analyze_throws(db_service.db_manager, season)
+
+        for chunk_size in (1, 2, 4, 7):
+            assert analyze_throws(db_service.db_manager, season, chunk_size=chunk_size) == whole
+
+    def test_period_filter(self, db_service, season):
+        """Test only games started in the period are analyzed."""
+        alice_id, _ = season
+
+        report = analyze_throws(
+            db_service.db_manager,
+            [alice_id],
+            since=datetime(2024, 3, 2, tzinfo=timezone.utc),
+            until=datetime(2024, 4, 1, tzinfo=timezone.utc),
+        )
+
+        assert report[alice_id]["throws"] == 5
+        assert report[alice_id]["turns"] == 2
+
+    def test_player_without_throws(self, db_service):
+        """Test a player without throws has no rates."""
+        report = analyze_throws(db_service.db_manager, [42])
+
+        assert report[42]["throws"] == 0
+        assert report[42]["bust_rate"] is None
+        assert report[42]["multiplier_rates"]["single"] is None
+
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+    @pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+    def test_export_matches_database(self, db_service, season, tmp_path, export_format):
+        """Test a scores export gives the report read from the database."""
+        path = tmp_path / f"scores.{export_format}"
+        path.write_bytes(
+            b"".join(
+                export_history(db_service.db_manager, "scores", export_format, chunk_size=3),
+            ),
+        )
+        alice_id, _ = season
+
+        for player_ids in (season, [alice_id]):
+            expected = analyze_throws(db_service.db_manager, player_ids)
+            for chunk_size in (1, 4, 100):
+                report = analyze_export(path, player_ids, export_format, chunk_size=chunk_size)
+                assert report == expected
+
+    def test_export_format_must_be_columnar(self, tmp_path):
+        """Test CSV exports are refused."""
+        with pytest.raises(ValueError, match="csv"):
+            analyze_export(tmp_path / "scores.csv", [1], "csv")
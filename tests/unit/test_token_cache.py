@@ -0,0 +1,139 @@
+"""Unit tests for token_cache module."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from token_cache import TokenCache, clear_token_caches
+
+
+@pytest.fixture
+def cache():
+    """Create a small token cache."""
+    return TokenCache("test", max_size=3, ttl=60, negative_ttl=5)
+
+
+class TestTokenCache:
+    """Test the token validation cache."""
+
+    def test_miss_then_hit(self, cache):
+        """Test a stored token is served from the cache."""
+        assert cache.lookup("token-a") == (False, None)
+
+        cache.store("token-a", {"sub": "alice"})
+
+        assert cache.lookup("token-a") == (True, {"sub": "alice"})
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.hit_rate == 0.5
+
+    def test_keys_are_hashes(self, cache):
+        """Test raw tokens are not used as keys."""
+        cache.store("secret-token", {"sub": "alice"})
+
+        assert "secret-token" not in cache._entries
+        assert TokenCache.key("secret-token") in cache._entries
+        assert len(TokenCache.key("secret-token")) == 64
+
+    def test_negative_result_cached(self, cache):
+        """Test rejected tokens are remembered as hits with no claims."""
+        cache.store("bad-token", None)
+
+        assert cache.lookup("bad-token") == (True, None)
+
+    def test_entry_expires_with_token(self, cache):
+        """Test entries never outlive the token's exp claim."""
+        cache.store("token-a", {"sub": "alice", "exp": time.time() + 1})
+
+        with patch("token_cache.time.monotonic", return_value=time.monotonic() + 2):
+            assert cache.lookup("token-a") == (False, None)
+        assert len(cache) == 0
+
+    def test_ttl_caps_long_lived_tokens(self, cache):
+        """Test the configured TTL bounds entries for long-lived tokens."""
+        cache.store("token-a", {"sub": "alice", "exp": time.time() + 3600})
+
+        with patch("token_cache.time.monotonic", return_value=time.monotonic() + 61):
+            assert cache.lookup("token-a") == (False, None)
+
+    def test_negative_ttl(self, cache):
+        """Test rejections expire after the negative TTL."""
+        cache.store("bad-token", None)
+
+        with patch("token_cache.time.monotonic", return_value=time.monotonic() + 6):
+            assert cache.lookup("bad-token") == (False, None)
+
+    def test_expired_token_not_stored(self, cache):
+        """Test claims that are already expired are not cached."""
+        cache.store("token-a", {"sub": "alice", "exp": time.time() - 1})
+
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, cache):
+        """Test the least recently used token is evicted at capacity."""
+        for name in ("a", "b", "c"):
+            cache.store(name, {"sub": name})
+        cache.lookup("a")
+
+        cache.store("d", {"sub": "d"})
+
+        assert cache.lookup("b") == (False, None)
+        assert cache.lookup("a") == (True, {"sub": "a"})
+
+    def test_invalidate(self, cache):
+        """Test invalidation drops a token."""
+        cache.store("token-a", {"sub": "alice"})
+
+        assert cache.invalidate("token-a") is True
+        assert cache.invalidate("token-a") is False
+        assert cache.lookup("token-a") == (False, None)
+
+    def test_disabled(self):
+        """Test a disabled cache never stores or hits."""
+        cache = TokenCache("test", enabled=False)
+        cache.store("token-a", {"sub": "alice"})
+
+        assert cache.lookup("token-a") == (False, None)
+        assert len(cache) == 0
+
+    def test_from_env(self):
+        """Test configuration from environment variables."""
+        env = {
+            "TOKEN_CACHE_MAX_SIZE": "5",
+            "TOKEN_CACHE_TTL": "30",
+            "TOKEN_CACHE_NEGATIVE_TTL": "2",
+            "TOKEN_CACHE_ENABLED": "false",
+        }
+        with patch.dict("os.environ", env):
+            cache = TokenCache.from_env("test")
+
+        assert (cache.max_size, cache.ttl, cache.negative_ttl) == (5, 30, 2)
+        assert cache.enabled is False
+
+    def test_clear_token_caches(self, cache):
+        """Test every cache in the process can be cleared."""
+        cache.store("token-a", {"sub": "alice"})
+
+        clear_token_caches()
+
+        assert len(cache) == 0
+
+    def test_concurrent_access(self):
+        """Test concurrent stores and lookups keep the cache bounded."""
+        cache = TokenCache("test", max_size=50)
+
+        def worker(offset):
+            for i in range(200):
+                cache.store(f"token-{offset}-{i}", {"sub": str(i)})
+                cache.lookup(f"token-{offset}-{i // 2}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(cache) == 50
+        assert cache.hits + cache.misses == 8 * 200
@@ -0,0 +1,158 @@
+"""Unit tests for transport module."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from rabbitmq_consumer import RabbitMQConsumer
+from transport import (
+    InMemoryBroker,
+    PikaTransport,
+    create_transport,
+    get_default_broker,
+    topic_matches,
+)
+
+
+@pytest.fixture
+def broker():
+    """Create an isolated in-memory broker."""
+    return InMemoryBroker()
+
+
+@pytest.fixture
+def channel(broker):
+    """Open a channel with a declared topic exchange."""
+    channel = broker.connect().channel()
+    channel.exchange_declare(exchange="darts_exchange", exchange_type="topic", durable=True)
+    return channel
+
+
+class TestTopicMatching:
+    """Test AMQP topic matching semantics."""
+
+    @pytest.mark.parametrize(
+        ("binding_key", "routing_key", "expected"),
+        [
+            ("darts.scores.#", "darts.scores.api", True),
+            ("darts.scores.#", "darts.scores", True),
+            ("darts.scores.#", "darts.scores.api.batch", True),
+            ("darts.scores.#", "darts.games.create", False),
+            ("darts.*.create", "darts.games.create", True),
+            ("darts.*.create", "darts.create", False),
+            ("#", "anything.at.all", True),
+            ("darts.scores", "darts.scores.api", False),
+        ],
+    )
+    def test_topic_matches(self, binding_key, routing_key, expected):
+        """Test '*' and '#' wildcards."""
+        assert topic_matches(binding_key, routing_key) is expected
+
+
+class TestInMemoryBroker:
+    """Test the in-memory broker."""
+
+    def test_routes_to_matching_queues_only(self, channel):
+        """Test messages are routed by binding key."""
+        scores = channel.queue_declare(queue="", exclusive=True).method.queue
+        games = channel.queue_declare(queue="games").method.queue
+        channel.queue_bind(exchange="darts_exchange", queue=scores, routing_key="darts.scores.#")
+        channel.queue_bind(exchange="darts_exchange", queue=games, routing_key="darts.games.#")
+
+        channel.basic_publish(exchange="darts_exchange", routing_key="darts.scores.api", body="{}")
+
+        assert channel.queue_declare(queue=scores, passive=True).method.message_count == 1
+        assert channel.queue_declare(queue=games, passive=True).method.message_count == 0
+
+    def test_consume_ack_and_requeue(self, channel):
+        """Test deliveries are acked, and nacked deliveries are redelivered."""
+        queue_name = channel.queue_declare(queue="").method.queue
+        channel.queue_bind(exchange="darts_exchange", queue=queue_name, routing_key="#")
+        received = []
+
+        def on_message(ch, method, _properties, body):
+            received.append((body, method.redelivered))
+            if not method.redelivered:
+                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            else:
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+
+        channel.basic_consume(queue=queue_name, on_message_callback=on_message)
+        channel.basic_publish(exchange="darts_exchange", routing_key="x", body=b"hello")
+        channel.deliver_pending()
+
+        assert received == [(b"hello", False), (b"hello", True)]
+
+    def test_listeners_notified_on_publish(self, broker, channel):
+        """Test queue listeners are called for routed messages only."""
+        scores = channel.queue_declare(queue="scores").method.queue
+        channel.queue_bind(exchange="darts_exchange", queue=scores, routing_key="darts.scores.#")
+        notify = Mock()
+        broker.add_listener(scores, notify)
+
+        channel.basic_publish(exchange="darts_exchange", routing_key="darts.games.new", body="{}")
+        channel.basic_publish(exchange="darts_exchange", routing_key="darts.scores.api", body="{}")
+
+        notify.assert_called_once_with()
+
+    def test_bind_requires_declared_exchange(self, broker):
+        """Test binding to an undeclared exchange fails."""
+        channel = broker.connect().channel()
+        queue_name = channel.queue_declare(queue="").method.queue
+        with pytest.raises(ValueError, match="has not been declared"):
+            channel.queue_bind(exchange="missing", queue=queue_name, routing_key="#")
+
+    def test_exclusive_queue_removed_on_close(self, broker, channel):
+        """Test exclusive queues are deleted when their channel closes."""
+        queue_name = channel.queue_declare(queue="", exclusive=True).method.queue
+        channel.close()
+        with pytest.raises(KeyError):
+            broker.get_queue(queue_name)
+
+
+class TestCreateTransport:
+    """Test transport selection."""
+
+    def test_default_is_pika(self):
+        """Test the pika transport is the default."""
+        assert isinstance(create_transport({}), PikaTransport)
+
+    def test_memory_uses_shared_broker(self):
+        """Test the memory transport returns the process-wide broker."""
+        assert create_transport({"transport": "memory"}) is get_default_broker()
+
+    def test_unknown_transport(self):
+        """Test unknown transports are rejected."""
+        with pytest.raises(ValueError, match="Unknown RabbitMQ transport"):
+            create_transport({"transport": "carrier-pigeon"})
+
+    @patch("transport.pika.BlockingConnection")
+    def test_pika_transport_connect(self, mock_connection, mock_rabbitmq_config):
+        """Test the pika transport opens a blocking connection."""
+        connection = PikaTransport().connect(mock_rabbitmq_config)
+        assert connection is mock_connection.return_value
+        parameters = mock_connection.call_args[0][0]
+        assert parameters.host == "localhost"
+        assert parameters.port == 5672
+
+
+class TestConsumerOverMemoryTransport:
+    """Test RabbitMQConsumer against the in-memory transport."""
+
+    def test_consumer_receives_published_score(self, mock_rabbitmq_config):
+        """Test a published score reaches the consumer callback."""
+        callback = Mock()
+        consumer = RabbitMQConsumer({**mock_rabbitmq_config, "transport": "memory"}, callback)
+        queue_name = consumer.connect()
+        consumer.channel.basic_consume(queue=queue_name, on_message_callback=consumer.on_message)
+
+        publisher = get_default_broker().connect().channel()
+        publisher.basic_publish(
+            exchange="darts_exchange",
+            routing_key="darts.scores.test",
+            body='{"score": 20, "multiplier": "TRIPLE"}',
+        )
+        consumer.connection.process_data_events()
+
+        callback.assert_called_once_with({"score": 20, "multiplier": "TRIPLE"})
+        consumer.stop()
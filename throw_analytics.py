@@ -0,0 +1,426 @@
+"""
+Throw analytics for season reports
+Streams the scores of a set of players from the database in chunks of
+columnar NumPy arrays and accumulates their distributions with array
+operations (no per-throw Python code), so a season of millions of throws is
+summarized in a single pass with bounded memory:
+
+- segment heatmap: throws per base score (0-20, 25) and multiplier
+- multiplier rates: share of singles, doubles and trebles
+- per-turn totals: histogram of completed x01 turn scores (0-180)
+- bust rate: busted x01 turns per x01 turn
+- doubles finishing: darts thrown from a one-double finish that won the leg
+- streaks: longest run of consecutive x01 turns scoring STREAK_SCORE or more
+
+The throws are read from the database (analyze_throws) or from a Parquet or
+Arrow scores export of history_export (analyze_export), so season reports can
+run off a file instead of the primary.
+
+NumPy is optional; analyze_throws raises RuntimeError without it, and
+analyze_export also needs pyarrow.
+Benchmark: python benchmarks/bench_analytics.py
+"""
+
+import itertools
+
+from sqlalchemy import Integer, and_, cast, func, select
+
+from database_models import GameResult, GameType, Score
+from history_export import FORMAT_ARROW, FORMAT_PARQUET
+from player_stats import DOUBLE_OUT_FINISHES
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Rows fetched and converted per chunk
+CHUNK_SIZE = 100_000
+
+# Turn score that extends a streak
+STREAK_SCORE = 100
+
+# Heatmap axes: base scores 0-25 (21-24 unused) by multiplier value 0-3
+SEGMENTS = 26
+MULTIPLIERS = 4
+
+# Highest x01 turn score
+MAX_TURN = 180
+
+# Multiplier value of doubles (and the double bull)
+DOUBLE = 2
+
+# Columns streamed per throw, in order; booleans are loaded as 0/1
+COLUMNS = (
+    "player_id",
+    "game_result_id",
+    "turn_number",
+    "base_score",
+    "multiplier_value",
+    "actual_score",
+    "score_before",
+    "is_bust",
+    "is_finish",
+    "cricket",
+)
+
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Throw analytics require numpy (pip install numpy)")
+
+
+def throws_query(player_ids, since=None, until=None):
+    """
+    Select the COLUMNS of the players' throws
+
+    Throws are ordered by game result and sequence, the order of the
+    scores index, so the turns of a result are contiguous.
+
+    Args:
+        player_ids: Database ids of the players
+        since: Only games started at or after this datetime
+        until: Only games started before this datetime
+    """
+    conditions = [Score.player_id.in_(player_ids)]
+    if since is not None:
+        conditions.append(GameResult.started_at >= since)
+    if until is not None:
+        conditions.append(GameResult.started_at < until)
+    return (
+        select(
+            Score.player_id,
+            Score.game_result_id,
+            Score.turn_number,
+            Score.base_score,
+            Score.multiplier_value,
+            Score.actual_score,
+            Score.score_before,
+            # NULL flags (rows written before their defaults) count as 0
+            func.coalesce(cast(Score.is_bust, Integer), 0).label("is_bust"),
+            func.coalesce(cast(Score.is_finish, Integer), 0).label("is_finish"),
+            cast(GameType.name == "cricket", Integer).label("cricket"),
+        )
+        .join(GameResult, GameResult.id == Score.game_result_id)
+        .join(GameType, GameType.id == GameResult.game_type_id)
+        .where(and_(*conditions))
+        .order_by(Score.game_result_id, Score.throw_sequence)
+    )
+
+
+def stream_throws(db_manager, player_ids, *, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream the players' throws as columnar chunks
+
+    Args:
+        db_manager: DatabaseManager to read from
+        player_ids: Database ids of the players
+        since: Only games started at or after this datetime
+        until: Only games started before this datetime
+        chunk_size: Rows per chunk
+
+    Yields:
+        Dictionary of COLUMNS name -> int64 array, at most chunk_size long
+    """
+    _require_numpy()
+    with db_manager.connect() as connection:
+        result = connection.execution_options(stream_results=True).execute(
+            throws_query(player_ids, since, until),
+        )
+        for rows in result.partitions(chunk_size):
+            values = np.fromiter(
+                itertools.chain.from_iterable(rows),
+                dtype=np.int64,
+                count=len(rows) * len(COLUMNS),
+            ).reshape(len(rows), len(COLUMNS))
+            yield {column: values[:, index] for index, column in enumerate(COLUMNS)}
+
+
+def _export_chunk(batch, player_ids):
+    """COLUMNS of a scores export batch, as int64 arrays, for the players"""
+    columns = [batch.column(column) for column in COLUMNS[:-1]]
+    columns.append(pc.equal(batch.column("game_type"), "cricket"))
+    # NULL flags (rows written before their defaults) count as 0
+    chunk = {
+        column: pc.fill_null(values.cast(pa.int64()), 0).to_numpy()
+        for column, values in zip(COLUMNS, columns, strict=True)
+    }
+    keep = np.isin(chunk["player_id"], player_ids)
+    return {column: values[keep] for column, values in chunk.items()}
+
+
+def stream_export_throws(
+    source,
+    player_ids,
+    export_format=FORMAT_PARQUET,
+    *,
+    chunk_size=CHUNK_SIZE,
+):
+    """
+    Stream the players' throws from a scores export as columnar chunks
+
+    The export must come from export_history("scores", ...), whose rows
+    are in throws_query order. An Arrow stream is read one exported record
+    batch at a time.
+
+    Args:
+        source: Path or binary file of the export
+        player_ids: Database ids of the players
+        export_format: 'parquet' or 'arrow'
+        chunk_size: Rows per chunk read from a Parquet file
+
+    Yields:
+        Dictionary of COLUMNS name -> int64 array
+
+    Raises:
+        ValueError: If the format is not parquet or arrow
+        RuntimeError: If numpy or pyarrow is not installed
+    """
+    _require_numpy()
+    if export_format not in {FORMAT_PARQUET, FORMAT_ARROW}:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Reading an export requires pyarrow (pip install pyarrow)")
+    player_ids = np.asarray(list(player_ids), dtype=np.int64)
+    if export_format == FORMAT_PARQUET:
+        batches = pq.ParquetFile(source).iter_batches(
+            batch_size=chunk_size,
+            columns=[*COLUMNS[:-1], "game_type"],
+        )
+    else:
+        batches = pa.ipc.open_stream(source)
+    for batch in batches:
+        chunk = _export_chunk(batch, player_ids)
+        if len(chunk["player_id"]):
+            yield chunk
+
+
+class ThrowAnalytics:
+    """Accumulates throw distributions per player over chunks of throws"""
+
+    def __init__(self, player_ids, streak_score=STREAK_SCORE):
+        """
+        Initialize empty distributions
+
+        Args:
+            player_ids: Database ids of the players reported on
+            streak_score: Turn score that extends a streak
+        """
+        _require_numpy()
+        self.player_ids = np.unique(np.asarray(list(player_ids), dtype=np.int64))
+        self.streak_score = streak_score
+        players = len(self.player_ids)
+        self.heatmap = np.zeros((players, SEGMENTS, MULTIPLIERS), dtype=np.int64)
+        self.turn_totals = np.zeros((players, MAX_TURN + 1), dtype=np.int64)
+        self.busts = np.zeros(players, dtype=np.int64)
+        self.double_attempts = np.zeros(players, dtype=np.int64)
+        self.double_hits = np.zeros(players, dtype=np.int64)
+        self.current_streak = np.zeros(players, dtype=np.int64)
+        self.longest_streak = np.zeros(players, dtype=np.int64)
+        # Throws of the last turn of the previous chunk, completed by the next
+        self._pending = None
+
+    def add(self, chunk):
+        """
+        Add a chunk of throws (as yielded by stream_throws)
+
+        Chunks must arrive in throws_query order.
+        """
+        if not len(chunk["player_id"]):
+            return
+        self._add_throws(chunk, np.searchsorted(self.player_ids, chunk["player_id"]))
+
+        # Turn boundaries; the last turn may continue in the next chunk
+        if self._pending is not None:
+            chunk = {
+                column: np.concatenate((self._pending[column], chunk[column])) for column in COLUMNS
+            }
+        player = np.searchsorted(self.player_ids, chunk["player_id"])
+        result = chunk["game_result_id"]
+        turn = chunk["turn_number"]
+        starts = np.flatnonzero(
+            np.concatenate(([True], (result[1:] != result[:-1]) | (turn[1:] != turn[:-1]))),
+        )
+        self._pending = {column: chunk[column][starts[-1] :] for column in COLUMNS}
+        self._add_turns(chunk, player, starts[:-1], starts[-1])
+
+    def finish(self):
+        """Count the last turn held back by add"""
+        if self._pending is not None:
+            chunk, self._pending = self._pending, None
+            player = np.searchsorted(self.player_ids, chunk["player_id"])
+            self._add_turns(chunk, player, np.array([0]), len(player))
+
+    def _add_throws(self, chunk, player):
+        """Heatmap and doubles, counted per throw"""
+        base = np.clip(chunk["base_score"], 0, SEGMENTS - 1)
+        multiplier = np.clip(chunk["multiplier_value"], 0, MULTIPLIERS - 1)
+        cells = (player * SEGMENTS + base) * MULTIPLIERS + multiplier
+        self.heatmap += np.bincount(cells, minlength=self.heatmap.size).reshape(
+            self.heatmap.shape,
+        )
+
+        x01 = chunk["cricket"] == 0
+        attempts = x01 & np.isin(chunk["score_before"], list(DOUBLE_OUT_FINISHES))
+        hits = attempts & (chunk["is_finish"] != 0) & (chunk["multiplier_value"] == DOUBLE)
+        players = len(self.player_ids)
+        self.double_attempts += np.bincount(player[attempts], minlength=players)
+        self.double_hits += np.bincount(player[hits], minlength=players)
+
+    def _add_turns(self, chunk, player, starts, end):
+        """Turn totals, busts and streaks of the turns starting at starts (before end)"""
+        if not len(starts):
+            return
+        totals = np.add.reduceat(chunk["actual_score"][:end], starts)
+        busted = np.maximum.reduceat(chunk["is_bust"][:end], starts) != 0
+        x01 = chunk["cricket"][starts] == 0
+        turn_player = player[starts][x01]
+        totals = totals[x01]
+        busted = busted[x01]
+        if not len(turn_player):
+            return
+
+        players = len(self.player_ids)
+        # A bust turn's throws are partly undone, so only its count is kept
+        scored = ~busted
+        cells = turn_player[scored] * (MAX_TURN + 1) + np.clip(totals[scored], 0, MAX_TURN)
+        self.turn_totals += np.bincount(cells, minlength=self.turn_totals.size).reshape(
+            self.turn_totals.shape,
+        )
+        self.busts += np.bincount(turn_player[busted], minlength=players)
+        self._add_streaks(turn_player, scored & (totals >= self.streak_score))
+
+    def _add_streaks(self, turn_player, hit):
+        """Run lengths of consecutive hit turns per player, continuing earlier chunks"""
+        order = np.argsort(turn_player, kind="stable")
+        player = turn_player[order]
+        hit = hit[order]
+        index = np.arange(len(player))
+        first = np.concatenate(([True], player[1:] != player[:-1]))
+        last = np.concatenate((player[1:] != player[:-1], [True]))
+
+        # Position of the last miss at or before each turn; a player's first
+        # turn starts with a virtual miss just before it
+        misses = np.where(~hit, index, np.where(first, index - 1, -1))
+        last_miss = np.maximum.accumulate(misses)
+        group_start = np.maximum.accumulate(np.where(first, index, 0))
+        runs = np.where(hit, index - last_miss, 0)
+        runs += np.where(hit & (last_miss == group_start - 1), self.current_streak[player], 0)
+
+        np.maximum.at(self.longest_streak, player, runs)
+        self.current_streak[player[last]] = runs[last]
+
+    def report(self):
+        """
+        Distributions per player
+
+        Returns:
+            Dictionary of player id -> dictionary of throws, heatmap
+            ([base score][multiplier value] counts), multiplier_rates, turns,
+            turn_totals (count per score 0-180), bust_rate, double_attempts,
+            double_hits, doubles_percentage and longest_streak; rates are
+            None when there is nothing to divide by
+        """
+        throws = self.heatmap.sum(axis=(1, 2))
+        by_multiplier = self.heatmap.sum(axis=1)
+        turns = self.turn_totals.sum(axis=1) + self.busts
+
+        def rate(numerator, denominator, scale=1):
+            return round(float(numerator) * scale / denominator, 4) if denominator else None
+
+        return {
+            int(player_id): {
+                "throws": int(throws[index]),
+                "heatmap": self.heatmap[index].tolist(),
+                "multiplier_rates": {
+                    name: rate(by_multiplier[index, value], throws[index])
+                    for value, name in ((1, "single"), (DOUBLE, "double"), (3, "triple"))
+                },
+                "turns": int(turns[index]),
+                "turn_totals": self.turn_totals[index].tolist(),
+                "bust_rate": rate(self.busts[index], turns[index]),
+                "double_attempts": int(self.double_attempts[index]),
+                "double_hits": int(self.double_hits[index]),
+                "doubles_percentage": rate(
+                    self.double_hits[index],
+                    self.double_attempts[index],
+                    100,
+                ),
+                "longest_streak": int(self.longest_streak[index]),
+            }
+            for index, player_id in enumerate(self.player_ids)
+        }
+
+
+def analyze_throws(db_manager, player_ids, *, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """
+    Throw distributions of a set of players
+
+    Args:
+        db_manager: DatabaseManager to read from
+        player_ids: Database ids of the players
+        since: Only games started at or after this datetime
+        until: Only games started before this datetime
+        chunk_size: Rows loaded per chunk
+
+    Returns:
+        ThrowAnalytics.report() of the players' throws
+
+    Raises:
+        RuntimeError: If numpy is not installed
+    """
+    analytics = ThrowAnalytics(player_ids)
+    chunks = stream_throws(
+        db_manager,
+        analytics.player_ids.tolist(),
+        since=since,
+        until=until,
+        chunk_size=chunk_size,
+    )
+    return _report(analytics, chunks)
+
+
+def analyze_export(source, player_ids, export_format=FORMAT_PARQUET, *, chunk_size=CHUNK_SIZE):
+    """
+    Throw distributions of a set of players from a scores export
+
+    Args:
+        source: Path or binary file of a Parquet or Arrow scores export
+        player_ids: Database ids of the players
+        export_format: 'parquet' or 'arrow'
+        chunk_size: Rows read per chunk from a Parquet file
+
+    Returns:
+        ThrowAnalytics.report() of the players' throws
+
+    Raises:
+        ValueError: If the format is not parquet or arrow
+        RuntimeError: If numpy or pyarrow is not installed
+    """
+    analytics = ThrowAnalytics(player_ids)
+    chunks = stream_export_throws(
+        source,
+        analytics.player_ids,
+        export_format,
+        chunk_size=chunk_size,
+    )
+    return _report(analytics, chunks)
+
+
+def _report(analytics, chunks):
+    """Add the chunks to analytics and report"""
+    for chunk in chunks:
+        analytics.add(chunk)
+    analytics.finish()
+    return analytics.report()
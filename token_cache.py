@@ -0,0 +1,164 @@
+"""
+Bounded cache of token validation results
+Keeps authenticated requests from paying an identity provider round-trip
+(introspection) or a signature check (JWKS) for a token that was already
+validated. Entries are keyed by a SHA-256 hash of the token, so raw bearer
+tokens are never held as dictionary keys.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+from metrics import counter, gauge
+
+CACHE_LOOKUPS = counter(
+    "darts_token_cache_lookups",
+    "Token validation cache lookups by result (hit, negative_hit, miss)",
+    ("cache", "result"),
+)
+CACHE_ENTRIES = gauge("darts_token_cache_entries", "Entries in the token cache", ("cache",))
+
+_caches: "weakref.WeakSet[TokenCache]" = weakref.WeakSet()
+
+
+class TokenCache:
+    """Thread-safe LRU cache of validated token claims with per-entry expiry"""
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 10000,
+        ttl: float = 300,
+        negative_ttl: float = 10,
+        enabled: bool = True,
+    ):
+        """
+        Initialize token cache
+
+        Args:
+            name: Cache name used as the metrics label
+            max_size: Maximum number of cached tokens (least recently used evicted)
+            ttl: Upper bound in seconds for caching valid tokens; entries never
+                outlive the token's 'exp' claim
+            negative_ttl: Seconds to remember tokens that failed validation
+            enabled: When False every lookup misses and nothing is stored
+        """
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any] | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        _caches.add(self)
+
+    @classmethod
+    def from_env(cls, name: str) -> "TokenCache":
+        """Create a cache configured from TOKEN_CACHE_* environment variables"""
+        return cls(
+            name,
+            max_size=int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000")),
+            ttl=float(os.getenv("TOKEN_CACHE_TTL", "300")),
+            negative_ttl=float(os.getenv("TOKEN_CACHE_NEGATIVE_TTL", "10")),
+            enabled=os.getenv("TOKEN_CACHE_ENABLED", "true").lower() == "true",
+        )
+
+    @staticmethod
+    def key(token: str) -> str:
+        """Hash a token into its cache key"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def lookup(self, token: str) -> tuple[bool, dict[str, Any] | None]:
+        """
+        Look up a token
+
+        Returns:
+            (True, claims) on a hit, where claims is None for a cached
+            rejection; (False, None) on a miss
+        """
+        if not self.enabled:
+            return False, None
+        key = self.key(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            CACHE_LOOKUPS.labels(self.name, "miss").inc()
+            return False, None
+        CACHE_LOOKUPS.labels(self.name, "hit" if entry[1] is not None else "negative_hit").inc()
+        return True, entry[1]
+
+    def store(self, token: str, claims: dict[str, Any] | None):
+        """
+        Cache a validation result
+
+        Valid claims are kept until 'exp' (capped by ttl); None records a
+        rejection for negative_ttl seconds.
+        """
+        if not self.enabled:
+            return
+        if claims is None:
+            lifetime = self.negative_ttl
+        else:
+            lifetime = self.ttl
+            exp = claims.get("exp")
+            if isinstance(exp, (int, float)) and not isinstance(exp, bool):
+                lifetime = min(lifetime, exp - time.time())
+        if lifetime <= 0:
+            return
+
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + lifetime, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        CACHE_ENTRIES.labels(self.name).set(size)
+
+    def invalidate(self, token: str) -> bool:
+        """Drop a token (e.g. on logout or revocation); True if it was cached"""
+        with self._lock:
+            removed = self._entries.pop(self.key(token), None) is not None
+            size = len(self._entries)
+        CACHE_ENTRIES.labels(self.name).set(size)
+        return removed
+
+    def clear(self):
+        """Drop every cached token"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+        CACHE_ENTRIES.labels(self.name).set(0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def clear_token_caches():
+    """Clear every token cache in the process (used by tests)"""
+    for cache in list(_caches):
+        cache.clear()
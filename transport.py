@@ -0,0 +1,344 @@
+"""
+Message transports for the RabbitMQ publisher and consumer
+The pika transport talks to a real RabbitMQ broker; the in-memory transport
+routes messages between publishers and consumers inside one process with the
+same topic exchange semantics, for tests and benchmarks
+"""
+
+import itertools
+import queue
+import threading
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any
+
+import pika
+
+TRANSPORT_PIKA = "pika"
+TRANSPORT_MEMORY = "memory"
+
+
+class PikaTransport:
+    """Transport backed by a RabbitMQ broker through pika.BlockingConnection"""
+
+    name = TRANSPORT_PIKA
+
+    def connect(self, config: dict[str, Any]):
+        """
+        Open a blocking connection to RabbitMQ
+
+        Args:
+            config: Dictionary with RabbitMQ configuration
+
+        Returns:
+            pika.BlockingConnection
+        """
+        credentials = pika.PlainCredentials(
+            config["user"],
+            config["password"],
+        )
+
+        parameters = pika.ConnectionParameters(
+            host=config["host"],
+            port=config["port"],
+            virtual_host=config["vhost"],
+            credentials=credentials,
+            heartbeat=600,
+            blocked_connection_timeout=300,
+        )
+
+        return pika.BlockingConnection(parameters)
+
+
+@lru_cache(maxsize=1024)
+def topic_matches(binding_key: str, routing_key: str) -> bool:
+    """
+    Check a routing key against a topic binding key
+
+    '*' matches exactly one word and '#' matches zero or more words,
+    as in a RabbitMQ topic exchange.
+    """
+    return _match_words(tuple(binding_key.split(".")), tuple(routing_key.split(".")))
+
+
+def _match_words(binding: tuple[str, ...], routing: tuple[str, ...]) -> bool:
+    if not binding:
+        return not routing
+    head, rest = binding[0], binding[1:]
+    if head == "#":
+        return any(_match_words(rest, routing[i:]) for i in range(len(routing) + 1))
+    if not routing:
+        return False
+    return head in ("*", routing[0]) and _match_words(rest, routing[1:])
+
+
+class InMemoryBroker:
+    """
+    In-process message broker with topic exchanges
+
+    Connections returned by connect() implement the subset of the
+    pika.BlockingConnection / BlockingChannel API used by RabbitMQConsumer and
+    RabbitMQPublisher, so they can be swapped in through configuration.
+    """
+
+    name = TRANSPORT_MEMORY
+
+    def __init__(self):
+        """Initialize an empty broker"""
+        self._lock = threading.Lock()
+        self._bindings: dict[str, list[tuple[str, str]]] = {}
+        self._queues: dict[str, queue.Queue] = {}
+        self._listeners: dict[str, list] = {}
+        self._queue_names = itertools.count(1)
+
+    def connect(self, _config: dict[str, Any] | None = None):
+        """Open a connection to this broker"""
+        return InMemoryConnection(self)
+
+    def declare_exchange(self, exchange: str):
+        """Declare a topic exchange (idempotent)"""
+        with self._lock:
+            self._bindings.setdefault(exchange, [])
+
+    def declare_queue(self, name: str = "") -> str:
+        """Declare a queue, generating a name when none is given"""
+        with self._lock:
+            if not name:
+                name = f"memory.gen-{next(self._queue_names)}"
+            self._queues.setdefault(name, queue.Queue())
+            return name
+
+    def delete_queue(self, name: str):
+        """Delete a queue and its bindings"""
+        with self._lock:
+            self._queues.pop(name, None)
+            self._listeners.pop(name, None)
+            for exchange, bindings in self._bindings.items():
+                self._bindings[exchange] = [b for b in bindings if b[1] != name]
+
+    def bind(self, exchange: str, queue_name: str, routing_key: str):
+        """Bind a queue to an exchange with a topic binding key"""
+        with self._lock:
+            if exchange not in self._bindings:
+                raise ValueError(f"Exchange '{exchange}' has not been declared")
+            if queue_name not in self._queues:
+                raise ValueError(f"Queue '{queue_name}' has not been declared")
+            if (routing_key, queue_name) not in self._bindings[exchange]:
+                self._bindings[exchange].append((routing_key, queue_name))
+
+    def publish(self, exchange: str, routing_key: str, body: Any, properties: Any = None) -> int:
+        """
+        Route a message to every queue bound with a matching key
+
+        Returns:
+            Number of queues the message was delivered to
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        with self._lock:
+            targets = {
+                queue_name
+                for binding_key, queue_name in self._bindings.get(exchange, [])
+                if topic_matches(binding_key, routing_key)
+            }
+            queues = [self._queues[name] for name in targets if name in self._queues]
+            listeners = [fn for name in targets for fn in self._listeners.get(name, ())]
+        for target in queues:
+            target.put((exchange, routing_key, properties, body, False))
+        for notify in listeners:
+            notify()
+        return len(queues)
+
+    def add_listener(self, name: str, notify):
+        """Call notify() (from the publishing thread) whenever a message reaches a queue"""
+        with self._lock:
+            self._listeners.setdefault(name, []).append(notify)
+
+    def get_queue(self, name: str) -> queue.Queue:
+        """Return the underlying queue for a declared queue name"""
+        with self._lock:
+            return self._queues[name]
+
+    def message_count(self, name: str) -> int:
+        """Number of messages waiting in a queue"""
+        return self.get_queue(name).qsize()
+
+
+class InMemoryConnection:
+    """Connection to an InMemoryBroker (pika.BlockingConnection subset)"""
+
+    def __init__(self, broker: InMemoryBroker):
+        """Initialize connection"""
+        self.broker = broker
+        self._channels: list[InMemoryChannel] = []
+        self.is_open = True
+
+    @property
+    def is_closed(self) -> bool:
+        return not self.is_open
+
+    def channel(self):
+        """Open a new channel"""
+        if not self.is_open:
+            raise pika.exceptions.ConnectionWrongStateError("Connection is closed")
+        channel = InMemoryChannel(self.broker)
+        self._channels.append(channel)
+        return channel
+
+    def process_data_events(self, time_limit: float = 0):
+        """Deliver messages that are already queued to this connection's consumers"""
+        for channel in self._channels:
+            channel.deliver_pending(time_limit)
+
+    def close(self):
+        """Close the connection and all of its channels"""
+        for channel in self._channels:
+            channel.close()
+        self.is_open = False
+
+
+class InMemoryChannel:
+    """Channel on an InMemoryBroker (pika BlockingChannel subset)"""
+
+    # How long start_consuming blocks on an empty queue before rechecking stop
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, broker: InMemoryBroker):
+        """Initialize channel"""
+        self.broker = broker
+        self.is_open = True
+        self._consumers: dict[str, tuple[str, Any, bool]] = {}
+        self._unacked: dict[int, tuple[str, tuple]] = {}
+        self._exclusive_queues: list[str] = []
+        self._delivery_tags = itertools.count(1)
+        self._consumer_tags = itertools.count(1)
+        self._consuming = False
+
+    @property
+    def is_closed(self) -> bool:
+        return not self.is_open
+
+    def exchange_declare(self, exchange, exchange_type="topic", **_kwargs):
+        """Declare an exchange; only topic exchanges are supported"""
+        if exchange_type != "topic":
+            raise ValueError(f"In-memory broker only supports topic exchanges: {exchange_type}")
+        self.broker.declare_exchange(exchange)
+
+    def queue_declare(self, queue="", exclusive=False, passive=False, **_kwargs):
+        """Declare a queue; passive declares report the current message count"""
+        if passive:
+            name = queue
+            count = self.broker.message_count(name)
+        else:
+            name = self.broker.declare_queue(queue)
+            count = self.broker.message_count(name)
+            if exclusive:
+                self._exclusive_queues.append(name)
+        return SimpleNamespace(
+            method=SimpleNamespace(queue=name, message_count=count, consumer_count=0),
+        )
+
+    def queue_bind(self, exchange, queue, routing_key=None, **_kwargs):
+        """Bind a queue to an exchange"""
+        self.broker.bind(exchange, queue, routing_key or queue)
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, **_kwargs):
+        """Publish a message"""
+        if not self.is_open:
+            raise pika.exceptions.ChannelWrongStateError("Channel is closed")
+        self.broker.publish(exchange, routing_key, body, properties)
+
+    def basic_consume(self, queue, on_message_callback, auto_ack=False, **_kwargs):
+        """Register a consumer callback for a queue"""
+        consumer_tag = f"ctag-{next(self._consumer_tags)}"
+        self._consumers[consumer_tag] = (queue, on_message_callback, auto_ack)
+        return consumer_tag
+
+    def basic_ack(self, delivery_tag=0, **_kwargs):
+        """Acknowledge a delivery"""
+        self._unacked.pop(delivery_tag, None)
+
+    def basic_nack(self, delivery_tag=0, requeue=True, **_kwargs):
+        """Reject a delivery, optionally putting it back on its queue"""
+        entry = self._unacked.pop(delivery_tag, None)
+        if entry and requeue:
+            queue_name, (exchange, routing_key, properties, body, _redelivered) = entry
+            self.broker.get_queue(queue_name).put((exchange, routing_key, properties, body, True))
+
+    def start_consuming(self):
+        """Deliver messages to consumers until stop_consuming() is called"""
+        self._consuming = True
+        while self._consuming and self.is_open:
+            self._deliver_next(self.POLL_INTERVAL)
+
+    def stop_consuming(self):
+        """Stop a start_consuming() loop"""
+        self._consuming = False
+
+    def deliver_pending(self, time_limit: float = 0):
+        """Deliver queued messages, waiting up to time_limit for the first one"""
+        while self._deliver_next(time_limit):
+            time_limit = 0
+
+    def close(self):
+        """Close the channel, requeueing unacknowledged messages"""
+        if not self.is_open:
+            return
+        self._consuming = False
+        self.is_open = False
+        for delivery_tag in list(self._unacked):
+            self.basic_nack(delivery_tag=delivery_tag, requeue=True)
+        for name in self._exclusive_queues:
+            self.broker.delete_queue(name)
+
+    def _deliver_next(self, timeout: float) -> bool:
+        """Deliver at most one message per consumer; True if anything was delivered"""
+        delivered = False
+        consumers = list(self._consumers.values())
+        wait = timeout / len(consumers) if consumers else 0
+        for queue_name, callback, auto_ack in consumers:
+            try:
+                target = self.broker.get_queue(queue_name)
+                item = target.get(timeout=wait) if wait > 0 else target.get_nowait()
+            except (KeyError, queue.Empty):
+                continue
+            exchange, routing_key, properties, body, redelivered = item
+            delivery_tag = next(self._delivery_tags)
+            if not auto_ack:
+                self._unacked[delivery_tag] = (queue_name, item)
+            method = SimpleNamespace(
+                delivery_tag=delivery_tag,
+                exchange=exchange,
+                routing_key=routing_key,
+                redelivered=redelivered,
+            )
+            if properties is None:
+                properties = pika.BasicProperties()
+            callback(self, method, properties, body)
+            delivered = True
+        if not consumers and timeout > 0:
+            threading.Event().wait(timeout)
+        return delivered
+
+
+_default_broker = InMemoryBroker()
+
+
+def get_default_broker() -> InMemoryBroker:
+    """Process-wide broker shared by in-memory publishers and consumers"""
+    return _default_broker
+
+
+def create_transport(config: dict[str, Any]):
+    """
+    Create the transport selected by config["transport"]
+
+    Args:
+        config: RabbitMQ configuration; 'transport' is 'pika' (default) or 'memory'
+    """
+    name = config.get("transport", TRANSPORT_PIKA)
+    if name == TRANSPORT_PIKA:
+        return PikaTransport()
+    if name == TRANSPORT_MEMORY:
+        return get_default_broker()
+    raise ValueError(f"Unknown RabbitMQ transport: {name}")